@@ -0,0 +1,81 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.ambient import AmbientPipeline, ArraySource, EdgeLayout, EdgeSampler
+from core.group import DeviceGroup
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+from core.transport.worker import TransportWorker
+
+# 氛围光：4K 输入下边缘采样的单帧耗时（不同降采样目标）与三线程流水线在 60 FPS 下的吞吐 / 抓取到发送延迟
+# python -m bench.ambient_bench --width 3840 --height 2160 --fps 60 --seconds 3
+
+
+def _frames(w: int, h: int, n: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (h, w, 3), np.uint8) for _ in range(n)]
+
+
+def reduce_cost(frames: list[np.ndarray], layout: EdgeLayout) -> dict:
+    out = {}
+    h, w = frames[0].shape[:2]
+    for max_side in (160, 320, 640, max(h, w)):
+        sampler = EdgeSampler(layout, max_side=max_side)
+        sampler(frames[0])
+        t0 = time.perf_counter()
+        for i in range(200):
+            sampler(frames[i % len(frames)])
+        ms = (time.perf_counter() - t0) / 200 * 1000.0
+        out[max_side] = ms
+        print(f"max_side {max_side:5d} (step {sampler.step_for(h, w):2d}): {ms:7.3f} ms/frame  "
+              f"-> {1000.0 / ms:7.0f} FPS ceiling")
+    return out
+
+
+def pipeline(frames: list[np.ndarray], layout: EdgeLayout, fps: float, seconds: float) -> dict:
+    worker = TransportWorker()
+    worker.start()
+    group = DeviceGroup(worker, max_leds=layout.leds)
+    member = group.add(DeviceInfo("loopback", "loopback", "loopback"), backend=LoopbackBackend())
+
+    pipe = AmbientPipeline(EdgeSampler(layout), lambda px, origin: group.send_frame(px, origin=origin),
+                           ArraySource(frames, fps=fps), fps)
+    try:
+        pipe.start()
+        time.sleep(seconds)
+        st = pipe.stats()
+        write = member.channel().stats()["ui_ms"]
+    finally:
+        pipe.stop()
+        for f in group.close():
+            f.result()
+        worker.stop()
+
+    print(f"pipeline: {st['fps']:.1f} FPS sent (target {fps:.0f})  skipped {st['skipped']}  "
+          f"reduce p99 {st['reduce_ms']['p99']:.3f} ms  grab->send p99 {st['latency_ms']['p99']:.2f} ms  "
+          f"grab->write p99 {write['p99']:.2f} ms")
+    return {**st, "grab_to_write_ms": write}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    frames = _frames(args.width, args.height, 4)
+    layout = EdgeLayout(top=60, right=34, bottom=60, left=34)
+    results = {"reduce_ms": reduce_cost(frames, layout), "pipeline": pipeline(frames, layout, args.fps, args.seconds)}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
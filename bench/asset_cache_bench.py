@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from core.asset_cache import MB, AssetCache
+from core.gif import GifPlayer
+from core.layout import Matrix
+
+# 动画缓存：同一个 GIF 首次（解码 + 重采样 + 写缓存）与再次打开（mmap 直读）的首帧耗时与每帧 CPU，
+# 以及小上限下的 LRU 淘汰
+# python -m bench.asset_cache_bench --width 640 --height 360 --frames 120 --leds 300
+
+
+def make_gif(path: str, w: int, h: int, n: int):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (h, w, 3), np.uint8)
+    frames = [Image.fromarray(np.roll(base, i * 4, axis=1)) for i in range(n)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=33, loop=0)
+
+
+# 不按帧延时节拍，直接把帧流迭代完：首帧耗时、每帧 CPU（process_time）
+def drain(player: GifPlayer) -> dict:
+    t0, c0 = time.perf_counter(), time.process_time()
+    first = None
+    n = 0
+    for _ in player._frames():
+        if first is None:
+            first = time.perf_counter() - t0
+        n += 1
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - c0
+    return {"frames": n, "first_frame_ms": first * 1000.0, "wall_ms": wall * 1000.0,
+            "cpu_ms_per_frame": cpu * 1000.0 / max(1, n), "cached": player.cached}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=360)
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as d:
+        gif = os.path.join(d, "bench.gif")
+        make_gif(gif, args.width, args.height, args.frames)
+        cache = AssetCache(os.path.join(d, "cache"))
+
+        for label, kw in (("strip", {}), ("matrix 32x32", {"layout": Matrix(32, 32)})):
+            cold = drain(GifPlayer(gif, args.leds, lambda px: None, loop=False, cache=cache, **kw))
+            warm = drain(GifPlayer(gif, args.leds, lambda px: None, loop=False, cache=cache, **kw))
+            results[label] = {"cold": cold, "warm": warm}
+            print(f"{label:12s} cold: first frame {cold['first_frame_ms']:7.2f} ms, {cold['cpu_ms_per_frame']:6.3f} ms CPU/frame"
+                  f" | warm: first frame {warm['first_frame_ms']:6.3f} ms, {warm['cpu_ms_per_frame']:6.4f} ms CPU/frame"
+                  f" ({cold['cpu_ms_per_frame'] / max(1e-9, warm['cpu_ms_per_frame']):.0f}x less)")
+
+        # 上限只够放一个动画：换参数再转换一次，最旧的被淘汰
+        one = max(size for _, size, _ in cache._entries())
+        cache.set_max_bytes(one + 1)
+        drain(GifPlayer(gif, args.leds // 2, lambda px: None, loop=False, cache=cache))
+        st = cache.stats()
+        results["stats"] = st
+        print(f"cache: {st['entries']} entries / {st['bytes'] / MB:.2f} MB (cap {st['max_bytes'] / MB:.2f} MB), "
+              f"hits {st['hits']} misses {st['misses']} writes {st['writes']} evictions {st['evictions']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
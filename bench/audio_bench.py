@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from core.audio import AudioReactive, BandAnalyzer, RingBuffer
+from core.daemon import Daemon
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+
+# 音频律动：每帧分析耗时、纯音落在正确频带、以及 WAV 实时播放时采集 -> 分析 -> 写出的端到端延迟
+# python -m bench.audio_bench --leds 300 --fps 60 --seconds 3
+
+
+def _write_wav(path: str, samplerate: int, seconds: float):
+    # 110 Hz 底鼓式脉冲 + 对数扫频，覆盖全部频带
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    sweep = np.sin(2 * np.pi * 50.0 * (np.power(300.0, t / seconds) - 1) * seconds / np.log(300.0))
+    kick = np.sin(2 * np.pi * 110.0 * t) * np.exp(-((t % 0.5) * 12.0))
+    pcm = (np.clip(0.5 * sweep + 0.4 * kick, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(samplerate)
+        w.writeframes(pcm.tobytes())
+
+
+def micro(args) -> dict:
+    sr = 48000
+    rng = np.random.default_rng(1)
+    out = {}
+    for fft_size in (1024, 2048, 4096):
+        an = BandAnalyzer(sr, fft_size, args.bands)
+        x = rng.standard_normal(fft_size).astype(np.float32) * 0.1
+        t0 = time.perf_counter()
+        for _ in range(2000):
+            an.analyze(x, 1 / 60)
+        out[f"analyze_{fft_size}_us"] = (time.perf_counter() - t0) / 2000 * 1e6
+
+    ring = RingBuffer(sr)
+    block = rng.standard_normal(1024).astype(np.float32)
+    t0 = time.perf_counter()
+    for _ in range(20000):
+        ring.write(block)
+    out["ring_write_1024_us"] = (time.perf_counter() - t0) / 20000 * 1e6
+
+    class _Fixed:
+        samplerate = sr
+        ring = RingBuffer(sr)
+
+        def stats(self):
+            return {}
+
+    _Fixed.ring.write(rng.standard_normal(sr).astype(np.float32))
+    effect = AudioReactive(args.leds, source=_Fixed(), bands=args.bands)
+    t0 = time.perf_counter()
+    for i in range(2000):
+        effect.render(i / 60, 1 / 60)
+    out["render_us"] = (time.perf_counter() - t0) / 2000 * 1e6
+
+    # 纯音应当点亮包含它的频带
+    hits = []
+    an = BandAnalyzer(sr, 2048, args.bands)
+    for f in (100.0, 1000.0, 5000.0):
+        x = np.sin(2 * np.pi * f * np.arange(2048) / sr).astype(np.float32)
+        for _ in range(30):
+            levels = an.analyze(x, 1 / 60)
+        hits.append({"tone_hz": f, "loudest_band_hz": round(float(an.centers[int(levels.argmax())]), 1)})
+    out["tones"] = hits
+
+    print(" ".join(f"{k} {v:.1f}" for k, v in out.items() if k.endswith("_us")) + "  (us)")
+    for h in hits:
+        print(f"tone {h['tone_hz']:.0f} Hz -> loudest band centred at {h['loudest_band_hz']:.0f} Hz")
+    return out
+
+
+def online(args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="prismfx-"), "bench.wav")
+    _write_wav(path, 44100, args.seconds + 1.0)
+
+    daemon = Daemon(args.leds, fps=args.fps)
+    daemon.start()
+    member = daemon.group.add(DeviceInfo("loopback", "loopback", "loopback"), backend=LoopbackBackend())
+    daemon.wait_connected()
+    try:
+        daemon.run_audio(path)
+        time.sleep(args.seconds)
+        audio = daemon._audio.stats()
+        sched = daemon._source.stats()
+        send = member.channel().stats()["ui_ms"]
+    finally:
+        daemon.close()
+
+    src = audio["source"]
+    bound = src["block_ms"] + audio["window_ms"] + 1000.0 / args.fps
+    out = {"capture_ms": audio["capture_ms"], "analysis_ms": audio["analysis_ms"], "analysis_to_write_ms": send,
+           "window_ms": audio["window_ms"], "block_ms": src["block_ms"], "latency_bound_ms": bound,
+           "fps": sched.get("_scheduler", {}).get("fps", 0.0)}
+    print(f"capture->analysis p50 {out['capture_ms']['p50']:.2f} / max {out['capture_ms']['max']:.2f} ms  "
+          f"analysis p99 {out['analysis_ms']['p99']:.3f} ms  analysis->write p50 {send['p50']:.3f} / "
+          f"p99 {send['p99']:.3f} ms  at {out['fps']:.1f} fps")
+    print(f"sample->LED bound: block {src['block_ms']:.1f} + window {audio['window_ms']:.1f} + frame "
+          f"{1000.0 / args.fps:.1f} = {bound:.1f} ms")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--bands", type=int, default=16)
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    results = {"micro": micro(args), "online": online(args)}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import time
+
+from core.protocol.codec import Encoder, decode
+from core.protocol.fragment import Fragmenter, Reassembler
+
+# 协议编解码微基准：python -m bench.codec_bench [--mtu 244] [--json out.json]
+
+LED_COUNTS = (60, 144, 300, 600, 1000, 2000)
+
+
+def bench_one(leds: int, mtu: int, seconds: float) -> dict:
+    enc = Encoder(max_leds=max(LED_COUNTS))
+    frag = Fragmenter(mtu)
+    reasm = Reassembler()
+
+    pixels = bytearray(range(256)) * (leds * 3 // 256 + 1)
+    pixels = memoryview(pixels)[:leds * 3]
+
+    msg = enc.frame(pixels)
+    msg_bytes = msg.nbytes
+    chunks = frag.split(msg)
+    wire_bytes = sum(c.nbytes for c in chunks)
+
+    # 编码 + 分片
+    n = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while True:
+        for _ in range(64):
+            frag.split(enc.frame(pixels))
+        n += 64
+        if time.perf_counter() >= deadline:
+            break
+    encode_s = time.perf_counter() - t0
+
+    # 重组 + 解码
+    chunks = [bytes(c) for c in frag.split(enc.frame(pixels))]
+    m = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while True:
+        for _ in range(64):
+            for c in chunks:
+                out = reasm.feed(c)
+            decode(out)
+        m += 64
+        if time.perf_counter() >= deadline:
+            break
+    decode_s = time.perf_counter() - t0
+
+    return {
+        "leds": leds,
+        "mtu": mtu,
+        "fragments": len(chunks),
+        "bytes_per_frame": msg_bytes,
+        "wire_bytes_per_frame": wire_bytes,
+        "encode_fps": n / encode_s,
+        "decode_fps": m / decode_s,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mtu", type=int, default=244)
+    ap.add_argument("--seconds", type=float, default=0.5)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    rows = [bench_one(n, args.mtu, args.seconds) for n in LED_COUNTS]
+
+    print(f"{'leds':>6} {'frags':>6} {'bytes':>7} {'wire':>7} {'enc fps':>10} {'dec fps':>10}")
+    for r in rows:
+        print(f"{r['leds']:>6} {r['fragments']:>6} {r['bytes_per_frame']:>7} {r['wire_bytes_per_frame']:>7} "
+              f"{r['encode_fps']:>10.0f} {r['decode_fps']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
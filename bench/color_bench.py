@@ -0,0 +1,76 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core import color
+from core.link import DeviceLink
+
+# 颜色模块基准：百万像素批量换算与输出校正，python -m bench.color_bench --pixels 1000000
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pixels", type=int, default=1_000_000)
+    ap.add_argument("--leds", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.pixels
+    rgb8 = rng.integers(0, 256, (n, 3), dtype=np.uint8)
+    h = rng.random(n, dtype=np.float32) * 360.0
+    s = rng.random(n, dtype=np.float32)
+    v = rng.random(n, dtype=np.float32)
+    rgb01 = np.empty((n, 3), np.float32)
+    out8 = np.empty_like(rgb8)
+    hexes = [color.to_hex(c) for c in rgb8[:min(n, 100_000)]]
+    kelvin = rng.uniform(1000.0, 12000.0, n).astype(np.float32)
+
+    identity = color.OutputCorrection()
+    gamma = color.OutputCorrection(gamma=2.2)
+    full = color.OutputCorrection(gamma=2.2, gains=color.white_balance(5000), brightness=0.6)
+
+    cases = {
+        "hsv_to_rgb": lambda: color.hsv_to_rgb(h, s, v, rgb01),
+        "rgb_to_hsv": lambda: color.rgb_to_hsv(rgb8),
+        "to_rgb8": lambda: color.to_rgb8(rgb01, out8),
+        "parse_hex_array": lambda: color.parse_hex_array(hexes),
+        "kelvin_to_rgb": lambda: color.kelvin_to_rgb(kelvin),
+        "correct_identity": lambda: identity.apply(rgb8, out8),
+        "correct_gamma": lambda: gamma.apply(rgb8, out8),
+        "correct_gamma_wb_brightness": lambda: full.apply(rgb8, out8),
+    }
+
+    rows = []
+    for name, fn in cases.items():
+        count = len(hexes) if name == "parse_hex_array" else n
+        ms = timed(fn, args.repeat)
+        rows.append({"case": name, "pixels": count, "ms": ms, "mpix_per_s": count / ms / 1000.0})
+        print(f"{name:>28}: {ms:8.2f} ms  {count / ms / 1000.0:8.1f} Mpx/s  ({count} px)")
+
+    # 单设备整帧：校正直接写入编码缓冲
+    frame = rgb8[:args.leds]
+    for label, corr in (("identity", identity), ("corrected", full)):
+        link = DeviceLink(max_leds=args.leds, correction=corr)
+        us = timed(lambda: link._encode_frame(frame, 0), args.repeat * 100) * 1000.0
+        rows.append({"case": f"encode_frame_{label}", "leds": args.leds, "us": us})
+        print(f"{'encode_frame_' + label:>28}: {us:8.2f} us  ({args.leds} leds)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
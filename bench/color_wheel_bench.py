@@ -0,0 +1,112 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QBrush, QColor, QConicalGradient, QGuiApplication, QImage, QPainter, QRadialGradient
+
+from ui.widgets import color_wheel
+
+# 色盘位图生成基准：旧的锥形 + 径向渐变 vs 精确 HSV（NumPy），以及与取色公式的颜色误差
+# python -m bench.color_wheel_bench
+
+
+# 旧实现（渐变近似），仅用于对比
+def gradient_image(size: int, dpr: float) -> QImage:
+    px = round(size * dpr)
+    center = QPoint(size // 2, size // 2)
+    radius = max(1, (size // 2) - 2)
+
+    img = QImage(px, px, QImage.Format.Format_ARGB32_Premultiplied)
+    img.setDevicePixelRatio(dpr)
+    img.fill(Qt.GlobalColor.transparent)
+
+    p = QPainter(img)
+    p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+
+    conical = QConicalGradient(center, 0)
+    for i, c in enumerate([(255, 0, 0), (255, 255, 0), (0, 255, 0), (0, 255, 255),
+                           (0, 0, 255), (255, 0, 255), (255, 0, 0)]):
+        conical.setColorAt(i / 6, QColor(*c))
+    p.setBrush(QBrush(conical))
+    p.setPen(Qt.PenStyle.NoPen)
+    p.drawEllipse(center, radius, radius)
+
+    radial = QRadialGradient(center, radius)
+    radial.setColorAt(0.0, QColor(255, 255, 255))
+    radial.setColorAt(1.0, QColor(255, 255, 255, 0))
+    p.setBrush(QBrush(radial))
+    p.drawEllipse(center, radius, radius)
+    p.end()
+    return img
+
+
+# 在圆内均匀取点：按取色公式算 (h, s)，与位图像素比较，返回最大通道误差
+def color_error(img: QImage, size: int, dpr: float) -> int:
+    c = size // 2
+    radius = max(1, (size // 2) - 2)
+    worst = 0
+    for ring in range(1, 10):
+        r = radius * ring / 10
+        for step in range(36):
+            a = math.radians(step * 10 + 3)
+            ix, iy = int((c + r * math.cos(a)) * dpr), int((c - r * math.sin(a)) * dpr)
+            x, y = (ix + 0.5) / dpr, (iy + 0.5) / dpr
+
+            ang = math.degrees(math.atan2(-(y - c), x - c)) % 360.0
+            expect = QColor()
+            expect.setHsv(int(ang) % 360, int(min(1.0, math.hypot(x - c, y - c) / radius) * 255), 255)
+
+            got = img.pixelColor(ix, iy)
+            worst = max(worst, abs(got.red() - expect.red()), abs(got.green() - expect.green()),
+                        abs(got.blue() - expect.blue()))
+    return worst
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    rows = []
+    for size in (360, 480):
+        for dpr in (1.0, 1.5, 2.0):
+            def hsv_cold():
+                color_wheel._wheel_image.cache_clear()
+                color_wheel._wheel_image(size, dpr, 255)
+
+            row = {
+                "size": size,
+                "dpr": dpr,
+                "gradient_ms": timed(lambda: gradient_image(size, dpr), args.repeat),
+                "hsv_ms": timed(hsv_cold, args.repeat),
+                "hsv_cached_ms": timed(lambda: color_wheel._wheel_image(size, dpr, 255), args.repeat * 100),
+                "gradient_max_error": color_error(gradient_image(size, dpr), size, dpr),
+                "hsv_max_error": color_error(color_wheel._wheel_image(size, dpr, 255), size, dpr),
+            }
+            rows.append(row)
+            print(f"{size}px @{dpr}x: gradient {row['gradient_ms']:.2f} ms (err {row['gradient_max_error']})  "
+                  f"hsv {row['hsv_ms']:.2f} ms (err {row['hsv_max_error']})  cached {row['hsv_cached_ms']:.4f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import json
+import tempfile
+import time
+
+from core.connection import ConnectionManager
+from core.emulator import LinkProfile, VirtualDevice
+from core.group import DeviceGroup
+from core.store import StateStore
+from core.transport.registry import discover_all
+from core.transport.socket_link import DEFAULT_PORT, SCAN_PORTS
+from core.transport.worker import TransportWorker
+
+# 连接管理：首次启动（扫描 + 连接）vs 再次启动（按已知设备并行直连）的 time-to-connected，
+# 以及脚本化掉线 / 断电 / 换地址后的重连耗时、重试次数与状态补发是否到位
+# python -m bench.connection_bench --devices 3 --latency 20
+
+
+def _wait(pred, timeout: float = 10.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.002)
+    return False
+
+
+async def _state(dev: VirtualDevice) -> tuple:
+    return dev.power, dev.hs, dev.brightness
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--devices", type=int, default=3)
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--latency", type=float, default=20.0, help="simulated link latency, ms")
+    ap.add_argument("--outage", type=float, default=1.0, help="power-off time for the outage phase, s")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT + 3, help="first port; must be in the scan range")
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+    spare = args.port + args.devices
+    if spare >= DEFAULT_PORT + SCAN_PORTS:
+        ap.error(f"--port + --devices must stay below {DEFAULT_PORT + SCAN_PORTS - 1} (scan range)")
+
+    worker = TransportWorker()
+    worker.start()
+    devs = [VirtualDevice(f"bench-{i}", args.leds, LinkProfile(latency_ms=args.latency), port=args.port + i)
+            for i in range(args.devices)]
+    for d in devs:
+        worker.call(d.start()).result()
+    names = [d.name for d in devs]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as root:
+        store = StateStore(root)
+        store.update("last_state", {"hs": [200, 80], "brightness": 55, "power": True})
+        expect = (True, (200, 80), 55)
+        group = DeviceGroup(worker, args.leds * args.devices)
+        mgr = ConnectionManager(worker, group, store)
+        try:
+            # 1) 首次启动：没有已知设备，只能先扫描再连接
+            t0 = time.monotonic()
+            found = worker.call(discover_all(3.0, ["socket"])).result()
+            found = [d for d in found if d.name in names]
+            for i, info in enumerate(found):
+                mgr.connect(info, span=(i * args.leds, args.leds))
+            ok = mgr.wait_connected(names)
+            cold = (time.monotonic() - t0) * 1000.0
+            # 本机套接字扫描几乎不花时间；BLE 扫描要等满扫描窗口（连接页默认 3 s），首次启动的差距远大于这里
+            print(f"cold start (scan + connect {len(found)}): {cold:7.1f} ms  connected={ok}")
+            for f in mgr.close():
+                f.result()
+
+            # 2) 再次启动：新的管理器只读存储里的已知设备，并行直连，不扫描
+            group = DeviceGroup(worker, args.leds * args.devices)
+            mgr = ConnectionManager(worker, group, store)
+            t0 = time.monotonic()
+            restored = mgr.restore()
+            ok = mgr.wait_connected(names)
+            warm = (time.monotonic() - t0) * 1000.0
+            st = mgr.stats()
+            per = ", ".join(f"{st[n]['time_to_connected_ms']:.1f}" for n in names)
+            print(f"warm start (direct reconnect {len(restored)}): {warm:7.1f} ms  connected={ok}  "
+                  f"per device {per} ms -> {cold / max(1e-9, warm):.1f}x faster")
+            results.update({"cold_ms": cold, "warm_ms": warm, "warm_per_device": {n: st[n] for n in names}})
+
+            def reconnect(phase: str, name: str, script):
+                before = mgr.stats()[name]["reconnects"]
+                t0 = time.monotonic()
+                worker.call(script()).result()
+                ok = _wait(lambda: mgr.stats()[name]["reconnects"] > before, 20.0)
+                wall = (time.monotonic() - t0) * 1000.0
+                dev = next(d for d in devs if d.name == name)
+                # 补发的命令要经过模拟链路时延才生效
+                restored = _wait(lambda: worker.call(_state(dev)).result() == expect, 2.0)
+                st = mgr.stats()[name]
+                print(f"{phase:16s} reconnected={ok} in {wall:7.1f} ms (since drop {st['last_reconnect_ms'] or 0:7.1f} ms), "
+                      f"attempts {st['attempts']}, discoveries {st['discoveries']}, state resent={restored}")
+                results[phase] = {"ok": ok, "wall_ms": wall, "state_restored": restored, **st}
+
+            # 3) 链路中断：设备仍在线并保持状态，立即直连回来
+            async def drop():
+                devs[0].drop()
+
+            reconnect("drop", names[0], drop)
+
+            # 4) 断电：设备离线 outage 秒、上电后状态清零；退避重试，连上后补发上次状态
+            async def outage():
+                await devs[1 % len(devs)].outage(args.outage)
+
+            reconnect("outage", names[1 % len(devs)], outage)
+
+            # 5) 换地址：上电后监听在另一个端口，直连失败两次后扫描按名字找回
+            async def moved():
+                await devs[-1].outage(0.1, port=spare)
+
+            reconnect("address change", names[-1], moved)
+            results["known"] = {k.address: k.to_dict() for k in mgr.known()}
+        finally:
+            for f in mgr.close():
+                f.result()
+            for d in devs:
+                worker.call(d.stop()).result()
+            worker.stop()
+            store.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
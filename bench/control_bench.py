@@ -0,0 +1,122 @@
+import argparse
+import base64
+import json
+import os
+import socket
+import tempfile
+import time
+
+from core.control import FRAME_LEN
+from core.daemon import Daemon
+from core.telemetry import Histogram
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+
+# 本地控制接口：命令批次往返时延（行协议）、流模式推帧吞吐与背压
+# 设备用回环后端，--write-delay 模拟慢链路（每片写出耗时），观察生产者被节流、发送队列不丢帧
+# （虚拟设备不模拟 TCP 背压，写出总是立即完成，看不出节流）
+# python -m bench.control_bench --batches 2000 --seconds 3 --write-delay 0.2
+
+
+def _connect(path: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    return sock
+
+
+def batches(path: str, n: int) -> dict:
+    hist = Histogram()
+    with _connect(path) as sock:
+        rfile = sock.makefile("rb")
+        for i in range(n):
+            batch = {"id": i, "commands": [
+                {"op": "color", "h": i % 360, "s": 255},
+                {"op": "brightness", "value": i % 101},
+            ]}
+            t0 = time.perf_counter()
+            sock.sendall(json.dumps(batch).encode() + b"\n")
+            reply = json.loads(rfile.readline())
+            hist.record(time.perf_counter() - t0)
+            assert reply["ok"] and reply["id"] == i, reply
+    out = hist.summary()
+    print(f"batch round trip  p50 {out['p50']:.3f} ms  p99 {out['p99']:.3f} ms  max {out['max']:.3f} ms  ({n} batches)")
+    return out
+
+
+def stream(path: str, leds: int, seconds: float) -> dict:
+    frame = bytearray(leds * 3)
+    sent = 0
+    with _connect(path) as sock:
+        rfile = sock.makefile("rb")
+        sock.sendall(b'{"op": "stream"}\n')
+        assert json.loads(rfile.readline())["stream"]
+        head = FRAME_LEN.pack(len(frame))
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            frame[(sent * 3) % len(frame)] = sent & 0xFF
+            sock.sendall(head + frame)
+            sent += 1
+        sock.sendall(FRAME_LEN.pack(0))
+        reply = json.loads(rfile.readline())
+        elapsed = time.perf_counter() - t0
+    out = {"sent": sent, "accepted": reply["frames"], "fps": reply["frames"] / elapsed}
+    print(f"stream            {out['fps']:.0f} frames/s accepted ({leds} leds, {sent} pushed)")
+    return out
+
+
+def frame_line(path: str, leds: int, n: int) -> dict:
+    hist = Histogram()
+    rgb = base64.b64encode(bytes(leds * 3)).decode()
+    with _connect(path) as sock:
+        rfile = sock.makefile("rb")
+        for i in range(n):
+            t0 = time.perf_counter()
+            sock.sendall(json.dumps({"id": i, "op": "frame", "rgb": rgb}).encode() + b"\n")
+            json.loads(rfile.readline())
+            hist.record(time.perf_counter() - t0)
+    out = hist.summary()
+    print(f"json frame        p50 {out['p50']:.3f} ms  p99 {out['p99']:.3f} ms  ({n} frames)")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--batches", type=int, default=2000)
+    ap.add_argument("--frames", type=int, default=500)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--write-delay", type=float, default=0.2, help="ms per written chunk, 0 = unlimited")
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="prismfx-"), "control.sock")
+    daemon = Daemon(args.leds, queue_size=16)
+    daemon.start()
+    backend = LoopbackBackend(write_delay=args.write_delay / 1000.0)
+    member = daemon.group.add(DeviceInfo("loopback", "loopback", "loopback"), backend=backend, queue_size=16)
+    daemon.wait_connected()
+    daemon.start_control(path)
+
+    try:
+        results = {
+            "batches": batches(path, args.batches),
+            "json_frame": frame_line(path, args.leds, args.frames),
+            "stream": stream(path, args.leds, args.seconds),
+        }
+        time.sleep(0.5)
+        ch = member.channel().stats()
+        results["server"] = daemon.control.stats()
+        results["device"] = {"messages": backend.messages, "dropped": ch["dropped"], "queue": ch["queue"]}
+    finally:
+        daemon.close()
+
+    srv = results["server"]
+    print(f"backpressure      {srv['stalls']} stalls, {srv['stall_ms']:.0f} ms paused  "
+          f"device got {results['device']['messages']} messages, queue dropped {results['device']['dropped']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.effects import EFFECTS, create_effect
+from core.emulator import LinkProfile, VirtualDevice
+from core.link import DeviceLink
+from core.protocol.codec import FRAME_HDR, OVERHEAD
+from core.protocol.delta import DeltaEncoder
+from core.protocol.fragment import FRAG, Fragmenter
+from core.transport.socket_link import SocketBackend
+from core.transport.worker import TransportWorker
+
+# 增量帧基准：各灯效 / 类 GIF 画面的压缩比、编码耗时，以及在给定链路带宽下整帧与增量的可达帧率
+# python -m bench.delta_bench --leds 300 --bandwidth 20000
+# 加 --online 时再经虚拟设备实测（可配丢片率，验证关键帧恢复）
+
+
+# 静态背景上移动的小图块，近似常见的像素风 GIF
+class Sprite:
+    name = "sprite"
+
+    def __init__(self, leds: int, width: int = 12):
+        self.leds = leds
+        self.width = width
+        self._bg = np.zeros((leds, 3), np.uint8)
+        self._bg[:, 2] = 40
+        self._out = np.empty_like(self._bg)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        self._out[...] = self._bg
+        head = int(t * 60) % self.leds
+        self._out[head:head + self.width] = (255, 200, 0)
+        return self._out
+
+
+def sources(leds: int) -> dict:
+    out = {name: create_effect(name, leds) for name in EFFECTS}
+    out["sprite"] = Sprite(leds)
+    return out
+
+
+def wire_bytes(payload: int, mtu: int) -> int:
+    msg = OVERHEAD + payload
+    return msg + Fragmenter(mtu).count(msg) * FRAG.size
+
+
+def offline(leds: int, frames: int, fps: float, bandwidth: float, mtu: int, keyframe: int) -> list[dict]:
+    rows = []
+    full_wire = wire_bytes(FRAME_HDR.size + leds * 3, mtu)
+    for name, src in sources(leds).items():
+        enc = DeltaEncoder(leds, keyframe)
+        wire = 0
+        for i in range(frames):
+            payload = enc.encode(src.render(i / fps, 1.0 / fps))
+            wire += wire_bytes(len(payload), mtu)
+
+        st = enc.stats()
+        row = {
+            "source": name,
+            "leds": leds,
+            **st,
+            "wire_bytes_full": full_wire,
+            "wire_bytes_delta": wire / frames,
+            "fps_full": bandwidth / full_wire,
+            "fps_delta": bandwidth / (wire / frames),
+        }
+        rows.append(row)
+        print(f"{name:>10}: ratio {st['ratio']:6.1f}x  {st['bytes_per_frame']:7.1f} B/frame  "
+              f"spans {st['spans_per_frame']:5.1f}  key {st['keyframes']:>3}  encode {st['encode_us_avg']:6.1f} us  "
+              f"fps @{bandwidth:.0f} B/s: full {row['fps_full']:6.1f} -> delta {row['fps_delta']:7.1f}")
+    return rows
+
+
+async def _reset(dev: VirtualDevice):
+    dev.reset_stats()
+
+
+async def _snapshot(dev: VirtualDevice) -> tuple[dict, bytes]:
+    return dev.stats(), bytes(dev.pixels)
+
+
+def online(args) -> list[dict]:
+    worker = TransportWorker()
+    worker.start()
+    profile = LinkProfile(args.mtu, args.bandwidth, args.latency, 0.0, args.loss)
+    dev = VirtualDevice(leds=args.leds, profile=profile, port=args.port, seed=1)
+    worker.call(dev.start()).result()
+
+    rows = []
+    try:
+        for mode in ("full", "delta"):
+            src = sources(args.leds)[args.source]
+            link = DeviceLink(args.leds, delta=(mode == "delta"), keyframe_interval=args.keyframe)
+            ch = worker.open(SocketBackend(dev.host, dev.port), queue_size=4, window=8)
+            link.attach(ch)
+            deadline = time.monotonic() + 2.0
+            while ch.state != "connected" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            worker.call(_reset(dev)).result()
+
+            t0 = time.monotonic()
+            next_t = t0
+            last = None
+            while time.monotonic() - t0 < args.seconds:
+                last = src.render(next_t - t0, 1.0 / args.fps)
+                link.send_frame(last)
+                next_t += 1.0 / args.fps
+                time.sleep(max(0.0, next_t - time.monotonic()))
+
+            # 停止后补一帧关键帧之前的最后状态：等队列排空再比对
+            time.sleep(1.0)
+            stats, pixels = worker.call(_snapshot(dev)).result()
+            ch.close().result()
+
+            row = {
+                "mode": mode,
+                "source": args.source,
+                "delivered_fps": stats["frames_received"] / args.seconds,
+                "queue_dropped": ch.stats()["dropped"],
+                "delta_rejected": stats["delta_rejected"],
+                "last_frame_matches": pixels == last.tobytes(),
+                "latency_p50_ms": stats.get("latency_ms", {}).get("p50", 0.0),
+            }
+            rows.append(row)
+            print(f"{mode:>6}: delivered {row['delivered_fps']:6.1f} fps  dropped {row['queue_dropped']:>4}  "
+                  f"rejected {row['delta_rejected']:>3}  p50 {row['latency_p50_ms']:.1f} ms  "
+                  f"last frame {'ok' if row['last_frame_matches'] else 'stale'}")
+    finally:
+        worker.call(dev.stop()).result()
+        worker.stop()
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--bandwidth", type=float, default=20000.0, help="bytes/s used for the fps estimate")
+    ap.add_argument("--mtu", type=int, default=244)
+    ap.add_argument("--keyframe", type=int, default=60)
+    ap.add_argument("--online", action="store_true")
+    ap.add_argument("--source", default="comet")
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--latency", type=float, default=5.0)
+    ap.add_argument("--loss", type=float, default=0.0)
+    ap.add_argument("--port", type=int, default=47808)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    results = {"offline": offline(args.leds, args.frames, args.fps, args.bandwidth, args.mtu, args.keyframe)}
+    if args.online:
+        results["online"] = online(args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import json
+import time
+
+from core.effects import EFFECTS, create_effect
+from core.protocol.codec import Encoder
+from core.scheduler import FixedStepScheduler
+
+# 灯效引擎基准：python -m bench.effects_bench --leds 1000 --fps 120
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=1000)
+    ap.add_argument("--fps", type=float, default=120.0)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    enc = Encoder(max_leds=args.leds)
+    sched = FixedStepScheduler(args.fps, enc.frame)
+
+    rows = []
+    for name in EFFECTS:
+        sched.set_effect(create_effect(name, args.leds))
+        sched.start()
+        time.sleep(args.seconds)
+        stats = sched.stats()
+        sched.stop()
+
+        row = {"effect": name, "leds": args.leds, "fps": stats["_scheduler"]["fps"], **stats[name]}
+        rows.append(row)
+        print(f"{name:>10}: {row['fps']:6.1f} fps  mean {row['mean_ms']:.3f} ms  "
+              f"p95 {row['p95_ms']:.3f} ms  max {row['max_ms']:.3f} ms  skipped {row['skipped']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
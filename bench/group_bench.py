@@ -0,0 +1,137 @@
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from core.emulator import LinkProfile, VirtualDevice
+from core.group import DeviceGroup
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+from core.transport.worker import TransportWorker
+
+# 多控制器扇出基准：N 台虚拟设备共用一个传输线程，另有若干条写入很慢的回环链路
+# 看慢链路是否拖累其他设备（它们只应在自己的队列里积压 / 丢旧帧），以及同步起点在各设备间的偏差
+# python -m bench.group_bench --devices 24 --slow 2 --leds 100 --fps 60
+
+
+async def _reset(dev: VirtualDevice):
+    dev.reset_stats()
+
+
+async def _stats(dev: VirtualDevice) -> dict:
+    return dev.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--devices", type=int, default=24)
+    ap.add_argument("--slow", type=int, default=2, help="number of extra stalled loopback links")
+    ap.add_argument("--slow-delay", type=float, default=0.2, help="seconds per chunk write on slow links")
+    ap.add_argument("--leds", type=int, default=100, help="leds per device")
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--latency", type=float, default=5.0)
+    ap.add_argument("--jitter", type=float, default=1.0)
+    ap.add_argument("--port", type=int, default=47820)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    worker = TransportWorker()
+    worker.start()
+
+    devs = []
+    profile = LinkProfile(244, 0.0, args.latency, args.jitter)
+    for i in range(args.devices):
+        dev = VirtualDevice(f"virt-{i:02d}", args.leds, profile, port=args.port + i, seed=i)
+        worker.call(dev.start()).result()
+        devs.append(dev)
+
+    # 整体场景按设备切片；慢链路镜像第一段
+    group = DeviceGroup(worker, max_leds=args.leds)
+    for i, dev in enumerate(devs):
+        group.add(DeviceInfo("socket", dev.address(), dev.name), span=(i * args.leds, args.leds))
+    for i in range(args.slow):
+        name = f"slow-{i:02d}"
+        group.add(DeviceInfo("loopback", name, name), span=(0, args.leds), window=1,
+                  backend=LoopbackBackend(write_delay=args.slow_delay))
+
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline and any(m.channel().state != "connected" for m in group.members()):
+        time.sleep(0.01)
+    for dev in devs:
+        worker.call(_reset(dev)).result()
+
+    scene = np.zeros((args.devices * args.leds, 3), np.uint8)
+    interval = 1.0 / args.fps
+    sent = 0
+    fanout_us = []
+    worst_lag = {m.name: 0.0 for m in group.members()}
+
+    try:
+        start_at = group.sync_start(0.5)
+
+        t0 = time.monotonic()
+        next_t = t0
+        while time.monotonic() - t0 < args.seconds:
+            scene[:, 0] = sent & 0xFF
+            t = time.perf_counter()
+            group.send_frame(scene)
+            fanout_us.append((time.perf_counter() - t) * 1e6)
+            sent += 1
+
+            for name, st in group.stats().items():
+                worst_lag[name] = max(worst_lag[name], st["lag_ms"])
+
+            next_t += interval
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+        time.sleep(0.5)
+        group_stats = group.stats()
+        dev_stats = [worker.call(_stats(d)).result() for d in devs]
+    finally:
+        for f in group.close():
+            f.result()
+        for dev in devs:
+            worker.call(dev.stop()).result()
+        worker.stop()
+
+    rows = []
+    by_name = {d.name: st for d, st in zip(devs, dev_stats)}
+    for name, gs in group_stats.items():
+        st = by_name.get(name)
+        rows.append({
+            "device": name,
+            "delivered_fps": st["frames_received"] / args.seconds if st else gs["sent_msgs"] / args.seconds,
+            "queue": gs["queue"],
+            "queue_dropped": gs["dropped"],
+            "worst_lag_ms": worst_lag[name],
+            "start_offset_ms": (st["start_at"] - start_at) * 1000.0 if st and "start_at" in st else None,
+        })
+
+    for r in rows:
+        off = r["start_offset_ms"]
+        print(f"{r['device']:>10}: {r['delivered_fps']:6.1f} fps  queue {r['queue']:>3}  "
+              f"dropped {r['queue_dropped']:>4}  worst lag {r['worst_lag_ms']:7.1f} ms  "
+              f"start {'-' if off is None else f'{off:+.2f} ms'}")
+
+    fast = [r for r in rows if not r["device"].startswith("slow")]
+    offsets = [r["start_offset_ms"] for r in rows if r["start_offset_ms"] is not None]
+    summary = {
+        "devices": args.devices,
+        "slow_links": args.slow,
+        "sent": sent,
+        "fanout_us_mean": statistics.fmean(fanout_us) if fanout_us else 0.0,
+        "fast_fps_min": min((r["delivered_fps"] for r in fast), default=0.0),
+        "start_spread_ms": (max(offsets) - min(offsets)) if offsets else None,
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "devices": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
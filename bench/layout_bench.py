@@ -0,0 +1,67 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.gif import StripResampler
+from core.layout import Matrix, Ring, Strip
+
+# 空间布局：缓存的 gather 映射 vs 每帧逐灯按几何现算足迹并对整块求均值，以及首次建表的开销
+# python -m bench.layout_bench --width 640 --height 480 --frames 200
+
+
+# 对照组：不缓存，每帧对每颗灯算足迹范围再切片求均值
+def naive_sample(layout, rgb: np.ndarray) -> np.ndarray:
+    h, w = rgb.shape[:2]
+    out = np.empty((layout.leds, 3), np.uint8)
+    for i, ((x, y), (hx, hy)) in enumerate(zip(layout.positions(), layout.footprints())):
+        x0, x1 = int(max(0.0, x - hx) * w), int(min(1.0, x + hx) * w)
+        y0, y1 = int(max(0.0, y - hy) * h), int(min(1.0, y + hy) * h)
+        patch = rgb[y0:max(y1, y0 + 1), x0:max(x1, x0 + 1)]
+        out[i] = patch.reshape(-1, 3).mean(axis=0)
+    return out
+
+
+def _time(fn, frames: list[np.ndarray], n: int) -> float:
+    fn(frames[0])
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(frames[i % len(frames)])
+    return (time.perf_counter() - t0) / n * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), np.uint8) for _ in range(4)]
+    layouts = {"strip 300": Strip(300), "ring 60": Ring(60), "matrix 32x32": Matrix(32, 32)}
+
+    results = {}
+    for name, layout in layouts.items():
+        t0 = time.perf_counter()
+        layout.image_map(args.height, args.width)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        gather_ms = _time(layout.sample, frames, args.frames)
+        naive_ms = _time(lambda f, lay=layout: naive_sample(lay, f), frames, max(1, args.frames // 10))
+        results[name] = {"build_ms": build_ms, "gather_ms": gather_ms, "naive_ms": naive_ms}
+        print(f"{name:13s} build {build_ms:6.2f} ms  gather {gather_ms:6.3f} ms/frame  "
+              f"per-LED {naive_ms:7.3f} ms/frame  ({naive_ms / gather_ms:5.1f}x)")
+
+    strip_ms = _time(StripResampler(300), frames, args.frames)
+    results["strip_resampler 300"] = {"ms": strip_ms}
+    print(f"StripResampler(300) {strip_ms:.3f} ms/frame (整帧均值，无布局时的 GIF 路径)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
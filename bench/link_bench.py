@@ -0,0 +1,107 @@
+import argparse
+import json
+import time
+
+from core.emulator import LinkProfile, VirtualDevice
+from core.link import DeviceLink
+from core.transport.socket_link import SocketBackend
+from core.transport.worker import TransportWorker
+
+# 无界面发送路径基准：DeviceLink -> TransportWorker -> SocketBackend -> VirtualDevice
+# python -m bench.link_bench --leds 300 --fps 60 --bandwidth 100000 --latency 8 --jitter 2 --loss 0.0
+
+
+def run_path(worker: TransportWorker, dev: VirtualDevice, kind: str, leds: int, fps: float,
+             seconds: float, window: int) -> dict:
+    link = DeviceLink(max_leds=max(leds, 1))
+    ch = worker.open(SocketBackend(dev.host, dev.port), queue_size=8, window=window)
+    link.attach(ch)
+
+    deadline = time.monotonic() + 2.0
+    while ch.state != "connected" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    worker.call(_reset(dev)).result()
+    frame = bytearray(leds * 3)
+    interval = 1.0 / fps
+    sent = 0
+
+    t0 = time.monotonic()
+    next_t = t0
+    while time.monotonic() - t0 < seconds:
+        if kind == "static":
+            link.send_command("hs", (sent % 360, 255))
+        else:
+            frame[(sent * 3) % len(frame)] = sent & 0xFF
+            link.send_frame(frame)
+        sent += 1
+        next_t += interval
+        time.sleep(max(0.0, next_t - time.monotonic()))
+
+    time.sleep(0.5)
+    stats = worker.call(_stats(dev)).result()
+    ch_stats = ch.stats()
+    ch.close().result()
+
+    return {
+        "path": kind,
+        "leds": leds,
+        "target_fps": fps,
+        "sent": sent,
+        "queue_dropped": ch_stats["dropped"],
+        "delivered_fps": stats["frames_received"] / seconds,
+        **stats,
+    }
+
+
+async def _reset(dev: VirtualDevice):
+    dev.reset_stats()
+
+
+async def _stats(dev: VirtualDevice) -> dict:
+    return dev.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--mtu", type=int, default=244)
+    ap.add_argument("--bandwidth", type=float, default=0.0)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--loss", type=float, default=0.0)
+    ap.add_argument("--window", type=int, default=8)
+    ap.add_argument("--port", type=int, default=47807)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    worker = TransportWorker()
+    worker.start()
+    profile = LinkProfile(args.mtu, args.bandwidth, args.latency, args.jitter, args.loss)
+    dev = VirtualDevice(leds=args.leds, profile=profile, port=args.port, seed=1)
+    worker.call(dev.start()).result()
+
+    rows = []
+    try:
+        # static：StaticPage 合并后的命令；dynamic / gif：整帧推送
+        for kind in ("static", "dynamic", "gif"):
+            rows.append(run_path(worker, dev, kind, args.leds, args.fps, args.seconds, args.window))
+    finally:
+        worker.call(dev.stop()).result()
+        worker.stop()
+
+    for r in rows:
+        lat = r.get("latency_ms", {})
+        print(f"{r['path']:>8}: sent {r['sent']:>5}  delivered {r['frames_received']:>5} "
+              f"({r['delivered_fps']:.1f}/s)  dropped {r['frames_dropped'] + r['queue_dropped']:>4}  "
+              f"latency p50 {lat.get('p50', 0):.2f} ms  p95 {lat.get('p95', 0):.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
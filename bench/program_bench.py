@@ -0,0 +1,131 @@
+import argparse
+import json
+import time
+
+from core.emulator import LinkProfile, VirtualDevice
+from core.group import DeviceGroup
+from core.program import Program, ProgramRunner, ProgramSession, compile_program, size_report
+from core.transport.base import DeviceInfo
+from core.transport.worker import TransportWorker
+
+# 灯效程序 vs 逐帧推流：编译后的大小、同样时长下主机实际写出的字节数，
+# 以及虚拟设备（参考执行器）执行结果与离线 ProgramRunner 是否逐字节一致、参数更新多快生效
+# python -m bench.program_bench --leds 300 --fps 60 --seconds 4 --mtu 244
+
+
+def demo_show(leds: int, fps: int, seconds: float) -> Program:
+    third = seconds / 3.0
+    prog = Program(leds, fps)
+    rainbow = prog.add("rainbow", 0.0, 2 * third, density=2.0)
+    rainbow.key("level", 0.0, 0.0).key("level", 0.5, 1.0, "ease_in_out").key("speed", 0.0, 0.5).key("speed", 2 * third, 3.0)
+    comet = prog.add("comet", third, 2 * third, color=(0, 120, 255), tail=0.2)
+    comet.key("color", 0.0, (0, 0, 255), "ease_out").key("color", third, (255, 40, 0))
+    prog.add("breathing", 2 * third, third, color=(255, 255, 255), period=1.0)
+    return prog
+
+
+async def _stats(dev: VirtualDevice) -> dict:
+    return dev.stats()
+
+
+async def _pixels(dev: VirtualDevice) -> bytes:
+    return bytes(dev.pixels)
+
+
+def _wait(pred, timeout: float = 2.0) -> float | None:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return time.monotonic() - t0
+        time.sleep(0.0005)
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--fps", type=int, default=60)
+    ap.add_argument("--seconds", type=float, default=4.0)
+    ap.add_argument("--mtu", type=int, default=244)
+    ap.add_argument("--latency", type=float, default=8.0)
+    ap.add_argument("--port", type=int, default=47860)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    prog = demo_show(args.leds, args.fps, args.seconds)
+    blob = compile_program(prog)
+    report = size_report(blob, mtu=args.mtu)
+    print(f"program {report['program_bytes']} B, upload {report['upload_bytes']} B on the wire; "
+          f"stream {report['frames']} frames = {report['stream_bytes'] / 1024:.0f} KB "
+          f"({report['stream_bytes_per_s'] / 1024:.1f} KB/s) -> {report['ratio']:.0f}x smaller; "
+          f"param update {report['param_update_bytes']} B")
+
+    worker = TransportWorker()
+    worker.start()
+    dev = VirtualDevice("virt-prog", args.leds, LinkProfile(args.mtu, 0.0, args.latency), port=args.port)
+    worker.call(dev.start()).result()
+    group = DeviceGroup(worker, args.leds)
+    member = group.add(DeviceInfo("socket", dev.address(), dev.name))
+    _wait(lambda: member.channel() is not None and member.channel().state == "connected", 5.0)
+    ch = member.channel()
+    results = {"size": report}
+
+    try:
+        # 1) 程序模式：上传 + START，播放期间不发帧；STOP 后对照离线执行到同一 tick 的结果
+        session = ProgramSession(group)
+        sent0 = ch.sent_bytes
+        session.upload(blob)
+        session.start()
+        time.sleep(args.seconds)
+        session.stop()
+        _wait(lambda: worker.call(_stats(dev)).result()["program"]["running"] is None)
+        st = worker.call(_stats(dev)).result()["program"]
+        tick = st["tick"]
+        expect = ProgramRunner(prog).advance_to(tick).tobytes()
+        match = worker.call(_pixels(dev)).result() == expect
+        program_bytes = ch.sent_bytes - sent0
+        print(f"program mode: {program_bytes} B written in {args.seconds:.1f} s, device ran {tick + 1} ticks, "
+              f"matches reference: {match}")
+
+        # 2) 参数更新：一直运行的程序上把亮度压到 0，量到设备灯珠全黑的耗时
+        live = Program(args.leds, args.fps)
+        live.add("rainbow")
+        session.upload(compile_program(live))
+        session.start()
+        time.sleep(0.3)
+        session.set_param("level", 0.0)
+        black = _wait(lambda: not any(worker.call(_pixels(dev)).result()))
+        session.stop()
+        print(f"param update: level -> 0 visible after {black * 1000 if black is not None else float('nan'):.1f} ms "
+              f"(link latency {args.latency:.0f} ms)")
+
+        # 3) 对照：同一时间轴在主机上执行、逐帧推流
+        runner = ProgramRunner(prog)
+        frames = int(args.seconds * args.fps)
+        sent0 = ch.sent_bytes
+        start = time.monotonic()
+        for k in range(frames):
+            group.send_frame(runner.advance_to(k))
+            delay = start + (k + 1) / args.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        _wait(lambda: ch.queue_depth() == 0 and ch.in_flight == 0)
+        stream_bytes = ch.sent_bytes - sent0
+        print(f"stream mode: {stream_bytes / 1024:.0f} KB written for {frames} frames "
+              f"-> program mode wrote {stream_bytes / max(1, program_bytes):.0f}x less")
+
+        results.update({"program_written": program_bytes, "stream_written": stream_bytes, "reference_match": match,
+                        "param_visible_ms": black * 1000 if black is not None else None})
+    finally:
+        for f in group.close():
+            f.result()
+        worker.call(dev.stop()).result()
+        worker.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# 启动开销对比：完整界面（QApplication + MainWindow，离屏平台）与无界面守护进程
+# 各自从进程启动到就绪的墙钟时间和峰值 RSS；守护进程还会带着虚拟设备实际跑一段灯效
+# python -m bench.startup_bench --runs 3 --seconds 3
+# 峰值 RSS 依赖 os.wait4（Linux / macOS），其它平台只报时间
+
+GUI_SNIPPET = """
+import sys, time, json
+t0 = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+from qfluentwidgets import setTheme, Theme
+from ui.main_window import MainWindow
+app = QApplication(sys.argv)
+setTheme(Theme.AUTO)
+w = MainWindow(warm_pages=False)
+w.show()
+app.processEvents()
+print(json.dumps({"ready_ms": (time.perf_counter() - t0) * 1000.0}), flush=True)
+w.close()
+"""
+
+
+def _run(cmd: list[str], env: dict) -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, text=True)
+    # 跳过库自己打印的横幅，第一行 JSON 即就绪
+    ready = {}
+    for line in proc.stdout:
+        try:
+            ready = json.loads(line)
+            break
+        except ValueError:
+            continue
+    wall_ready = (time.perf_counter() - t0) * 1000.0
+    proc.stdout.read()
+
+    rss_mb = None
+    if hasattr(os, "wait4"):
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss_mb = usage.ru_maxrss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+    else:
+        proc.wait()
+    return {"wall_ready_ms": wall_ready, "in_process_ready_ms": ready.get("ready_ms"),
+            "peak_rss_mb": rss_mb, "returncode": proc.returncode}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--seconds", type=float, default=3.0, help="how long the daemon plays an effect")
+    ap.add_argument("--effect", default="rainbow")
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+               PYTHONPATH=os.getcwd())
+    cases = {
+        "gui": [sys.executable, "-c", GUI_SNIPPET],
+        "daemon": [sys.executable, "-m", "core.daemon", "--emulator", "1", "--no-store",
+                   "--effect", args.effect, "--leds", str(args.leds), "--duration", str(args.seconds)],
+    }
+
+    results = {}
+    for name, cmd in cases.items():
+        runs = [_run(cmd, env) for _ in range(args.runs)]
+        best = min(runs, key=lambda r: r["wall_ready_ms"])
+        results[name] = {"runs": runs, "best_wall_ready_ms": best["wall_ready_ms"],
+                         "peak_rss_mb": max((r["peak_rss_mb"] or 0.0) for r in runs) or None}
+        rss = results[name]["peak_rss_mb"]
+        print(f"{name:>7}: ready {best['wall_ready_ms']:7.1f} ms  "
+              f"peak RSS {'-' if rss is None else f'{rss:6.1f} MB'}")
+
+    gui, daemon = results["gui"]["best_wall_ready_ms"], results["daemon"]["best_wall_ready_ms"]
+    print(f"daemon starts in {daemon / gui:.0%} of the GUI's time")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEvent, QPointF, Qt
+from PySide6.QtGui import QMouseEvent
+from PySide6.QtWidgets import QApplication, QFrame
+
+from core.color import hs_to_rgb8, to_hex
+from ui.pages.static import StaticPage
+
+# 静态页拖动时主线程耗时：旧实现（每次更新立即 setText + 改样式表色块）vs 按显示帧合并 + 自绘色块
+# 按固定鼠标事件率回放拖动，只计事件处理（含重绘）时间，不计回放间隔的空等
+# python -m bench.static_page_bench --seconds 1 --rate 250
+
+
+class ImmediateUpdater:
+    # 旧行为：视图更新立即应用，仅用于对比
+
+    def set(self, key: str, fn, *args):
+        fn(*args)
+
+    def discard(self, key: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LegacyStaticPage(StaticPage):
+    # 旧实现：QFrame 色块每次改色都 setStyleSheet，仅用于对比
+
+    def __init__(self):
+        super().__init__()
+        self._view = ImmediateUpdater()
+        frame = QFrame()
+        frame.setFixedSize(28, 28)
+        self.colorSwatch.parentWidget().layout().replaceWidget(self.colorSwatch, frame)
+        self.colorSwatch.deleteLater()
+        self.colorSwatch = frame
+        self._apply_current_color_card(*self._hs)
+
+    def _apply_current_color_card(self, h: int, s: int):
+        color_hex = to_hex(hs_to_rgb8(h, s))
+        self.hexLabel.setText(color_hex)
+        self.colorSwatch.setStyleSheet(
+            f"border-radius:8px; background:{color_hex}; border:1px solid rgba(0,0,0,0.08);"
+        )
+
+
+def _summary(samples: list[float]) -> dict:
+    s = sorted(samples)
+    return {"mean": statistics.fmean(s), "p95": s[min(len(s) - 1, int(len(s) * 0.95))], "max": s[-1]}
+
+
+# 按 rate Hz 回放 seconds 秒：每个事件 step(i) 后处理完事件队列（含重绘），再睡到下一个节拍
+def replay(qapp, step, seconds: float, rate: float) -> dict:
+    n = int(seconds * rate)
+    busy = []
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        step(i)
+        qapp.processEvents()
+        busy.append((time.perf_counter() - t0) * 1000.0)
+        delay = start + (i + 1) / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    # 拖动结束后等最后一帧的合并更新应用完
+    time.sleep(0.05)
+    t0 = time.perf_counter()
+    qapp.processEvents()
+    tail = (time.perf_counter() - t0) * 1000.0
+    return {"events": n, "drag_ms": sum(busy) + tail, "event_ms": _summary(busy)}
+
+
+def bench_page(qapp, cls, seconds: float, rate: float) -> dict:
+    page = cls()
+    page.resize(1100, 720)
+    page.show()
+    qapp.processEvents()
+    wheel = page.wheel
+    c = wheel.rect().center()
+
+    def mouse(kind, x, y):
+        btn = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseMove else Qt.MouseButton.LeftButton
+        btns = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseButtonRelease else Qt.MouseButton.LeftButton
+        qapp.sendEvent(wheel, QMouseEvent(kind, QPointF(x, y), QPointF(x, y), btn, btns,
+                                          Qt.KeyboardModifier.NoModifier))
+
+    # 色盘拖动：沿一圈移动，色盘自身已按刷新周期合并取色
+    radius = min(wheel.width(), wheel.height()) * 0.3
+    mouse(QEvent.Type.MouseButtonPress, c.x() + radius, c.y())
+
+    def drag(i):
+        a = i * 0.05
+        mouse(QEvent.Type.MouseMove, c.x() + radius * math.cos(a), c.y() + radius * math.sin(a))
+
+    out = {"wheel_drag": replay(qapp, drag, seconds, rate)}
+    mouse(QEvent.Type.MouseButtonRelease, c.x(), c.y())
+    qapp.processEvents()
+
+    # 亮度滑块拖动：每次移动都发 valueChanged
+    out["slider_drag"] = replay(qapp, lambda i: page.slider.setValue(i % 101), seconds, rate)
+
+    # 外部命令连发（控制接口 / 脚本）：每条都要同步文字、色块与色盘位置
+    out["ipc_burst"] = replay(qapp, lambda i: page.static_color_update(i % 360, 200, source="ipc"),
+                              seconds, rate * 4)
+    out["view"] = page.dispatchStats().get("view", {})
+    page.close()
+    qapp.processEvents()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=1.0, help="length of each replayed drag")
+    ap.add_argument("--rate", type=float, default=250.0, help="mouse events per second")
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    qapp = QApplication.instance() or QApplication(sys.argv)
+    results = {
+        "before": bench_page(qapp, LegacyStaticPage, args.seconds, args.rate),
+        "after": bench_page(qapp, StaticPage, args.seconds, args.rate),
+    }
+
+    for name in ("wheel_drag", "slider_drag", "ipc_burst"):
+        b, a = results["before"][name], results["after"][name]
+        print(f"{name:12s} {b['events']:4d} events: main thread {b['drag_ms']:7.1f} ms -> {a['drag_ms']:7.1f} ms per drag "
+              f"({b['drag_ms'] / max(1e-9, a['drag_ms']):.1f}x), worst event {b['event_ms']['max']:5.2f} -> "
+              f"{a['event_ms']['max']:5.2f} ms")
+    v = results["after"]["view"]
+    print(f"view updates: {v['requests']} requested, {v['applied']} applied in {v['flushes']} frames")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import json
+import random
+import time
+
+from core.emulator import LinkProfile, VirtualDevice
+from core.group import DeviceGroup
+from core.telemetry import Histogram, Telemetry
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+from core.transport.worker import TransportWorker
+
+# 遥测开销与正确性：直方图记录 / 汇总耗时、N 台设备时一次采样的耗时，
+# 以及经虚拟设备实测的往返时延（应接近模拟的单向时延）和界面事件到写出的延迟
+# python -m bench.telemetry_bench --devices 32 --latency 8
+
+
+def micro(devices: int) -> dict:
+    h = Histogram()
+    values = [random.expovariate(200.0) for _ in range(200_000)]
+    t0 = time.perf_counter()
+    for v in values:
+        h.record(v)
+    record_ns = (time.perf_counter() - t0) / len(values) * 1e9
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        h.summary()
+    summary_us = (time.perf_counter() - t0) * 1e3
+
+    worker = TransportWorker()
+    worker.start()
+    group = DeviceGroup(worker, max_leds=100)
+    for i in range(devices):
+        name = f"lb-{i:02d}"
+        group.add(DeviceInfo("loopback", name, name), backend=LoopbackBackend())
+    tel = Telemetry()
+    tel.add_source("devices", group.stats)
+    for _ in range(20):
+        tel.sample()
+    sample_us = tel.sample_us
+    for f in group.close():
+        f.result()
+    worker.stop()
+
+    out = {"record_ns": record_ns, "summary_us": summary_us, "devices": devices, "sample_us": sample_us}
+    print(f"record {record_ns:.0f} ns  summary {summary_us:.1f} us  sample({devices} devices) {sample_us:.0f} us")
+    return out
+
+
+async def _stats(dev: VirtualDevice) -> dict:
+    return dev.stats()
+
+
+def online(args) -> dict:
+    worker = TransportWorker()
+    worker.start()
+    dev = VirtualDevice(leds=args.leds, profile=LinkProfile(244, 0.0, args.latency, args.jitter), port=args.port)
+    worker.call(dev.start()).result()
+
+    group = DeviceGroup(worker, max_leds=args.leds)
+    member = group.add(DeviceInfo("socket", dev.address(), dev.name))
+    deadline = time.monotonic() + 2.0
+    while member.channel().state != "connected" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    tel = Telemetry()
+    tel.add_source("devices", group.stats)
+    frame = bytearray(args.leds * 3)
+    interval = 1.0 / args.fps
+    try:
+        t0 = time.monotonic()
+        next_t = t0
+        next_sample = t0
+        i = 0
+        while time.monotonic() - t0 < args.seconds:
+            frame[(i * 3) % len(frame)] = i & 0xFF
+            group.send_frame(frame)
+            group.send_command("hs", (i % 360, 255), time.monotonic())
+            if time.monotonic() >= next_sample:
+                group.ping()
+                tel.sample()
+                next_sample += 0.5
+            i += 1
+            next_t += interval
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+        time.sleep(0.5)
+        snap = tel.sample()["devices"][member.name]
+        dev_stats = worker.call(_stats(dev)).result()
+    finally:
+        for f in group.close():
+            f.result()
+        worker.call(dev.stop()).result()
+        worker.stop()
+
+    out = {
+        "latency_ms": args.latency,
+        "rtt_ms": snap["rtt_ms"],
+        "wait_ms": snap["wait_ms"],
+        "ui_ms": snap["ui_ms"],
+        "frames_per_s": snap.get("frames_per_s", 0.0),
+        "pings_answered": dev_stats["pings"],
+    }
+    print(f"rtt p50 {out['rtt_ms']['p50']:.2f} ms (simulated one-way {args.latency} ms)  "
+          f"ui->write p50 {out['ui_ms']['p50']:.3f} / p99 {out['ui_ms']['p99']:.3f} ms  "
+          f"queue wait p99 {out['wait_ms']['p99']:.3f} ms  pings {out['pings_answered']}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--devices", type=int, default=32)
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--latency", type=float, default=8.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--port", type=int, default=47840)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    results = {"micro": micro(args.devices), "online": online(args)}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# 无界面 UI 性能基准（offscreen 平台），结果写入 JSON 便于跨提交对比
+# python -m bench.ui_bench --json ui_bench.json
+
+
+def _summary(samples: list[float]) -> dict:
+    s = sorted(samples)
+    if not s:
+        return {"n": 0}
+    return {
+        "n": len(s),
+        "mean": statistics.fmean(s),
+        "p50": s[len(s) // 2],
+        "p95": s[min(len(s) - 1, int(len(s) * 0.95))],
+        "max": s[-1],
+    }
+
+
+# ---------- app.main 启动到首帧（子进程） ----------
+
+def _startup_child():
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    import app as app_module
+
+    class FirstPaint(QObject):
+        def __init__(self, qapp):
+            super().__init__()
+            self.qapp = qapp
+            self.done = False
+
+        def eventFilter(self, obj, e):
+            if not self.done and e.type() == QEvent.Type.Paint and obj.isWidgetType() and obj.window().isVisible():
+                self.done = True
+                QTimer.singleShot(0, self.finish)
+            return False
+
+        def finish(self):
+            print(f"FIRST_PAINT {time.time():.6f}", flush=True)
+            for w in self.qapp.topLevelWidgets():
+                w.close()
+            self.qapp.quit()
+
+    original_exec = QApplication.exec
+
+    def exec_with_probe(*_args):
+        qapp = QApplication.instance()
+        probe = FirstPaint(qapp)
+        qapp.installEventFilter(probe)
+        return original_exec()
+
+    QApplication.exec = exec_with_probe
+    try:
+        app_module.main()
+    except SystemExit:
+        pass
+
+
+def bench_startup(runs: int) -> dict:
+    samples = []
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    for _ in range(runs):
+        t0 = time.time()
+        r = subprocess.run([sys.executable, "-m", "bench.ui_bench", "--startup-child"],
+                           capture_output=True, text=True, env=env, timeout=120)
+        for line in r.stdout.splitlines():
+            if line.startswith("FIRST_PAINT"):
+                samples.append((float(line.split()[1]) - t0) * 1000.0)
+    return _summary(samples)
+
+
+# ---------- 进程内测量 ----------
+
+def bench_main_window(qapp, runs: int) -> dict:
+    from ui.main_window import MainWindow
+
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        w = MainWindow(warm_pages=False)
+        w.show()
+        qapp.processEvents()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        w.close()
+        w.deleteLater()
+        qapp.processEvents()
+    return _summary(samples)
+
+
+def bench_page_switch(qapp, rounds: int) -> dict:
+    from ui.main_window import MainWindow
+
+    w = MainWindow(warm_pages=False)
+    w.show()
+    qapp.processEvents()
+
+    names = list(w._lazyPages)
+    first, again = {}, []
+    for r in range(rounds):
+        for name in names:
+            holder = w._lazyPages[name]
+            t0 = time.perf_counter()
+            w.switchTo(holder)
+            qapp.processEvents()
+            ms = (time.perf_counter() - t0) * 1000.0
+            if r == 0 and name not in first:
+                first[name] = ms
+            else:
+                again.append(ms)
+
+    w.close()
+    qapp.processEvents()
+    return {"first_ms": first, "repeat": _summary(again)}
+
+
+def bench_wheel_drag(qapp, seconds: float) -> dict:
+    from PySide6.QtCore import QEvent, QPointF, Qt
+    from PySide6.QtGui import QMouseEvent
+
+    from ui.widgets.color_wheel import ColorWheel
+
+    paint_ms: list[float] = []
+    original_paint = ColorWheel.paintEvent
+
+    def timed_paint(self, e):
+        t0 = time.perf_counter()
+        original_paint(self, e)
+        paint_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    ColorWheel.paintEvent = timed_paint
+    try:
+        w = ColorWheel()
+        w.resize(480, 480)
+        w.show()
+        qapp.processEvents()
+
+        previews = []
+        w.hsPreview.connect(lambda h, s: previews.append((h, s)))
+        paint_ms.clear()
+
+        def send(kind, x, y):
+            btn = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseMove else Qt.MouseButton.LeftButton
+            btns = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseButtonRelease else Qt.MouseButton.LeftButton
+            qapp.sendEvent(w, QMouseEvent(kind, QPointF(x, y), QPointF(x, y), btn, btns,
+                                          Qt.KeyboardModifier.NoModifier))
+
+        send(QEvent.Type.MouseButtonPress, 300, 240)
+        n = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            send(QEvent.Type.MouseMove, 140 + (n * 7) % 200, 140 + (n * 3) % 200)
+            qapp.processEvents()
+            n += 1
+        elapsed = time.perf_counter() - t0
+        stats = w.paintStats()
+        send(QEvent.Type.MouseButtonRelease, 240, 240)
+        w.close()
+    finally:
+        ColorWheel.paintEvent = original_paint
+
+    return {
+        "events_per_s": n / elapsed,
+        "previews_per_s": len(previews) / elapsed,
+        "paints_per_s": len(paint_ms) / elapsed,
+        "paint_ms": _summary(paint_ms),
+        "repainted_area_per_s": stats["area_per_s"],
+    }
+
+
+def bench_static_update(qapp, calls: int) -> dict:
+    from ui.pages.static import StaticPage
+
+    page = StaticPage()
+    page.show()
+    qapp.processEvents()
+
+    samples = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        page.static_color_update(i % 360, 128 + i % 128, source="wheel")
+        samples.append((time.perf_counter() - t0) * 1e6)
+    qapp.processEvents()
+    page.close()
+    return {"us": _summary(samples)}
+
+
+def _meta() -> dict:
+    import PySide6
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", default="ui_bench.json")
+    ap.add_argument("--startup-runs", type=int, default=3)
+    ap.add_argument("--window-runs", type=int, default=5)
+    ap.add_argument("--switch-rounds", type=int, default=5)
+    ap.add_argument("--drag-seconds", type=float, default=1.0)
+    ap.add_argument("--update-calls", type=int, default=2000)
+    ap.add_argument("--startup-child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.startup_child:
+        _startup_child()
+        return
+
+    from PySide6.QtWidgets import QApplication
+
+    results = {"meta": _meta(), "startup_to_first_paint_ms": bench_startup(args.startup_runs)}
+
+    qapp = QApplication.instance() or QApplication(sys.argv)
+    results["main_window_ms"] = bench_main_window(qapp, args.window_runs)
+    results["page_switch_ms"] = bench_page_switch(qapp, args.switch_rounds)
+    results["wheel_drag"] = bench_wheel_drag(qapp, args.drag_seconds)
+    results["static_color_update"] = bench_static_update(qapp, args.update_calls)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import glob
+import os
+import threading
+import time
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from core.telemetry import Histogram
+
+# 氛围光：采样画面四周的边缘区域，映射到显示器背后一圈灯珠
+# 抓取 -> 降采样（步长视图，不拷贝）-> 各边条带按行 / 列求均值 -> reduceat 分箱 -> 预先算好的顺序表拼成灯带
+# 抓取、归约、发送各占一个线程，线程之间只传“最新一帧”，后级跟不上时丢弃旧帧而不是排队（新鲜度优先）
+# 帧源：视频（需要 opencv-python）、图片序列（Pillow）；屏幕抓取依赖 Qt，见 ui.pages.ambient
+
+
+class AmbientError(RuntimeError):
+    pass
+
+
+class EdgeLayout(NamedTuple):
+    # 每条边的灯珠数；depth 为采样条带占画面宽 / 高的比例
+    # 灯带顺序：从左下角起顺时针（左边自下而上 -> 上边自左而右 -> 右边自上而下 -> 下边自右而左）
+    # offset 把起点沿这个顺序挪动若干颗；reverse 改为逆时针
+    top: int
+    right: int
+    bottom: int
+    left: int
+    depth: float = 0.1
+    offset: int = 0
+    reverse: bool = False
+
+    @property
+    def leds(self) -> int:
+        return self.top + self.right + self.bottom + self.left
+
+
+def _bins(length: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    # 与 StripResampler 相同的分箱：相邻起点相同时 reduceat 只取单列，计数记 1
+    starts = np.minimum(np.linspace(0, length, n + 1)[:-1].astype(np.int64), length - 1)
+    nxt = np.append(starts[1:], length)
+    return starts, np.where(nxt > starts, nxt - starts, 1)[:, None].astype(np.float32)
+
+
+class EdgeSampler:
+    # 帧 (H, W, C) -> (leds, 3) uint8；索引表按（降采样后的）画面尺寸缓存，尺寸不变时每帧只做数组归约
+    # max_side：降采样后长边的目标像素数，步长取整数；channels：源通道顺序到 RGB 的映射（BGRA 用 (2, 1, 0)）
+
+    def __init__(self, layout: EdgeLayout, max_side: int = 320, channels: tuple[int, int, int] = (0, 1, 2)):
+        self.layout = layout
+        self.max_side = max_side
+        self.channels = list(channels)
+        self._shape: tuple[int, int] | None = None
+        self._step = 1
+
+    def step_for(self, h: int, w: int) -> int:
+        return max(1, max(h, w) // self.max_side)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if (h, w) != self._shape:
+            self._prepare(h, w)
+
+        s = self._step
+        small = frame[::s, ::s]
+        dh, dw = self._depth
+        parts = []
+        for n, strip, axis, (starts, counts) in (
+            (self.layout.top, small[:dh], 0, self._bins[0]),
+            (self.layout.right, small[:, -dw:], 1, self._bins[1]),
+            (self.layout.bottom, small[-dh:], 0, self._bins[2]),
+            (self.layout.left, small[:, :dw], 1, self._bins[3]),
+        ):
+            if n:
+                line = strip.mean(axis=axis, dtype=np.float32)              # (len, C)
+                parts.append(np.add.reduceat(line, starts, axis=0) / counts)
+        rgb = np.concatenate(parts)[self._order][:, self.channels]
+        return rgb.astype(np.uint8, order="C")
+
+    def _prepare(self, h: int, w: int):
+        lay = self.layout
+        self._step = s = self.step_for(h, w)
+        sh, sw = -(-h // s), -(-w // s)
+        self._depth = (max(1, round(sh * lay.depth)), max(1, round(sw * lay.depth)))
+        self._bins = [_bins(sw, max(1, lay.top)), _bins(sh, max(1, lay.right)),
+                      _bins(sw, max(1, lay.bottom)), _bins(sh, max(1, lay.left))]
+
+        # 拼接顺序是 上、右、下、左 各自的自然方向（左 -> 右、上 -> 下）；换算成从左下角起的顺时针
+        base = np.cumsum([0, lay.top, lay.right, lay.bottom])
+        order = np.concatenate([
+            base[3] + np.arange(lay.left)[::-1],
+            base[0] + np.arange(lay.top),
+            base[1] + np.arange(lay.right),
+            base[2] + np.arange(lay.bottom)[::-1],
+        ]).astype(np.int64)
+        if lay.reverse:
+            order = order[::-1]
+        self._order = np.roll(order, -lay.offset) if len(order) else order
+        self._shape = (h, w)
+
+
+# ---------- 帧源 ----------
+
+class FrameSource:
+    # read() 阻塞到下一帧，返回 (H, W, C) uint8，结束返回 None；fps 为源的自然帧率（0 表示尽快）
+    fps = 0.0
+    channels = (0, 1, 2)
+
+    def open(self):
+        pass
+
+    def read(self) -> np.ndarray | None:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def label(self) -> str:
+        return ""
+
+
+class VideoSource(FrameSource):
+    # OpenCV 解码（BGR）；只在打开视频时导入
+    channels = (2, 1, 0)
+
+    def __init__(self, path: str, loop: bool = True):
+        self.path = path
+        self.loop = loop
+        self._cap = None
+
+    def label(self) -> str:
+        return os.path.basename(self.path)
+
+    def open(self):
+        try:
+            import cv2
+        except ImportError as e:
+            raise AmbientError("video input requires opencv-python: pip install opencv-python") from e
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            raise AmbientError(f"cannot open video {self.path}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def read(self) -> np.ndarray | None:
+        ok, frame = self._cap.read()
+        if not ok and self.loop:
+            self._cap.set(1, 0)             # CAP_PROP_POS_FRAMES
+            ok, frame = self._cap.read()
+        return frame if ok else None
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ImageSequenceSource(FrameSource):
+    # 目录（按文件名排序）或通配符；按 fps 播放，可循环
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+    def __init__(self, pattern: str, fps: float = 30.0, loop: bool = True):
+        self.pattern = pattern
+        self.fps = fps
+        self.loop = loop
+        self._paths: list[str] = []
+        self._i = 0
+
+    def label(self) -> str:
+        return f"{os.path.basename(self.pattern.rstrip(os.sep))} ({len(self._paths)} 张)"
+
+    def open(self):
+        if os.path.isdir(self.pattern):
+            paths = [os.path.join(self.pattern, n) for n in os.listdir(self.pattern)]
+            paths = [p for p in paths if p.lower().endswith(self.EXTENSIONS)]
+        else:
+            paths = glob.glob(self.pattern)
+        self._paths = sorted(paths)
+        if not self._paths:
+            raise AmbientError(f"no images match {self.pattern}")
+        self._i = 0
+
+    def read(self) -> np.ndarray | None:
+        from PIL import Image
+
+        if self._i >= len(self._paths):
+            if not self.loop:
+                return None
+            self._i = 0
+        path = self._paths[self._i]
+        self._i += 1
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGB"))
+
+
+class ArraySource(FrameSource):
+    # 内存里的帧循环播放（基准测试 / 调试）
+    def __init__(self, frames: list[np.ndarray], fps: float = 0.0, channels: tuple[int, int, int] = (0, 1, 2)):
+        self.frames = frames
+        self.fps = fps
+        self.channels = channels
+        self._i = 0
+
+    def label(self) -> str:
+        return f"{len(self.frames)} frames"
+
+    def read(self) -> np.ndarray | None:
+        frame = self.frames[self._i % len(self.frames)]
+        self._i += 1
+        return frame
+
+
+# ---------- 流水线 ----------
+
+class Latest:
+    # 单槽信箱：put 覆盖未取走的旧值（计入 overwritten），get 等到有新值为止
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has = False
+        self.overwritten = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._has:
+                self.overwritten += 1
+            self._item = item
+            self._has = True
+            self._cond.notify()
+
+    def get(self, timeout: float):
+        with self._cond:
+            if not self._has and not self._cond.wait(timeout):
+                return None
+            if not self._has:
+                return None
+            item, self._item, self._has = self._item, None, False
+            return item
+
+
+class AmbientPipeline:
+    # 抓取线程（或外部 push，如 GUI 线程上的屏幕抓取）-> 归约线程 -> 发送线程
+    # 发送端按 fps 限速；sink(pixels, origin)，origin 为这一帧的抓取时刻（time.monotonic）
+
+    def __init__(self, sampler: EdgeSampler, sink: Callable[[np.ndarray, float], None],
+                 source: FrameSource | None = None, fps: float = 60.0):
+        self.sampler = sampler
+        self.sink = sink
+        self.source = source
+        self.fps = fps
+
+        self._grabbed = Latest()
+        self._reduced = Latest()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+        self.grab_hist = Histogram()        # 帧源取一帧
+        self.reduce_hist = Histogram()      # 边缘采样
+        self.latency_hist = Histogram()     # 抓取 -> 交给 sink
+        self.grabbed = 0
+        self.sent = 0
+        self.error: str | None = None
+        self._t_start = 0.0
+
+    def start(self):
+        if self._threads:
+            return
+        if self.source is not None:
+            self.source.open()
+            self.sampler.channels = list(self.source.channels)
+        self._stop.clear()
+        self._t_start = time.monotonic()
+        targets = [(self._reduce, "ambient-reduce"), (self._send, "ambient-send")]
+        if self.source is not None:
+            targets.insert(0, (self._grab, "ambient-grab"))
+        self._threads = [threading.Thread(target=fn, name=name, daemon=True) for fn, name in targets]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(1.0)
+        self._threads = []
+        if self.source is not None:
+            self.source.close()
+
+    def is_running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    # 外部抓取（如 GUI 线程的 QScreen）直接投递；frame 之后不能再被修改
+    def push(self, frame: np.ndarray, grabbed_at: float | None = None):
+        self.grabbed += 1
+        self._grabbed.put((frame, grabbed_at if grabbed_at is not None else time.monotonic()))
+
+    def stats(self) -> dict:
+        elapsed = max(1e-6, time.monotonic() - self._t_start) if self._t_start else 0.0
+        return {
+            "grabbed": self.grabbed,
+            "sent": self.sent,
+            "fps": self.sent / elapsed if elapsed else 0.0,
+            "skipped": self._grabbed.overwritten + self._reduced.overwritten,
+            "grab_ms": self.grab_hist.summary(),
+            "reduce_ms": self.reduce_hist.summary(),
+            "latency_ms": self.latency_hist.summary(),
+            "error": self.error,
+        }
+
+    def _grab(self):
+        src = self.source
+        interval = 1.0 / src.fps if src.fps > 0 else 0.0
+        due = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                t0 = time.monotonic()
+                frame = src.read()
+                if frame is None:
+                    return
+                self.grab_hist.record(time.monotonic() - t0)
+                self.push(frame, t0)
+                if interval:
+                    due += interval
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        self._stop.wait(wait)
+                    elif wait < -interval:
+                        due = time.monotonic()
+        except Exception as e:
+            self.error = str(e)
+
+    def _reduce(self):
+        while not self._stop.is_set():
+            item = self._grabbed.get(0.1)
+            if item is None:
+                continue
+            frame, t_grab = item
+            t0 = time.monotonic()
+            try:
+                pixels = self.sampler(frame)
+            except Exception as e:
+                self.error = str(e)
+                continue
+            self.reduce_hist.record(time.monotonic() - t0)
+            self._reduced.put((pixels, t_grab))
+
+    def _send(self):
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        due = time.monotonic()
+        while not self._stop.is_set():
+            item = self._reduced.get(0.1)
+            if item is None:
+                continue
+            if interval:
+                wait = due - time.monotonic()
+                if wait > 0 and self._stop.wait(wait):
+                    return
+                # 限速期间来了更新的一帧就发更新的
+                newer = self._reduced.get(0.0)
+                if newer is not None:
+                    item = newer
+                due = max(due + interval, time.monotonic() - interval)
+
+            pixels, t_grab = item
+            try:
+                self.sink(pixels, t_grab)
+            except Exception as e:
+                self.error = str(e)
+                continue
+            self.latency_hist.record(time.monotonic() - t_grab)
+            self.sent += 1
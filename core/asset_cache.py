@@ -0,0 +1,245 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+# 转换后动画的磁盘缓存：键 = 源文件内容哈希 + 转换参数（灯数 / 布局 / 帧率 ...），内容寻址，源文件改名也能命中
+# 文件：| magic 4s | version u16 | reserved u16 | leds u32 | frames u32 | frames × leds × RGB | delays u16 × frames |
+# 读取时整文件 mmap，帧是指向映射区的只读视图，播放不解码、不拷贝
+# 总大小超过上限时按最近使用时间（命中时刷新文件 mtime）淘汰最旧的；先写临时文件再 os.replace，半截文件不会被读到
+
+MAGIC = b"PFXA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+SUFFIX = ".pfxa"
+
+MB = 1024 * 1024
+DEFAULT_MAX_BYTES = 512 * MB
+HASH_CHUNK = 1024 * 1024
+
+
+class CachedAnimation:
+    # frames: (n, leds, 3) uint8 只读视图；delays: (n,) uint16 毫秒
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, leds, n = HEADER.unpack_from(self._mm, 0)
+            data_end = HEADER.size + n * leds * 3
+            if magic != MAGIC or version != VERSION or len(self._mm) != data_end + n * 2:
+                raise ValueError(f"not a valid cached animation: {path}")
+        except (struct.error, ValueError):
+            self._mm.close()
+            raise
+        self.leds = leds
+        self.frames = np.frombuffer(self._mm, np.uint8, n * leds * 3, HEADER.size).reshape(n, leds, 3)
+        self.delays = np.frombuffer(self._mm, np.uint16, n, data_end)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    # 仍有帧视图在外面（如播放队列里）时映射关不掉，交给垃圾回收
+    def close(self):
+        self.frames = self.delays = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+
+class AssetWriter:
+    # 边转换边写：帧顺序追加到临时文件，commit 时补上延时表与文件头再原子替换
+
+    def __init__(self, cache: "AssetCache", key: str, leds: int):
+        self.cache = cache
+        self.key = key
+        self.leds = leds
+        self.path = cache.path(key)
+        self._tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._delays: list[int] = []
+        self._f = None
+        self.bytes = 0
+        self.aborted = False
+
+    def add(self, pixels: np.ndarray, delay_ms: int):
+        if self.aborted:
+            return
+        if self._f is None:
+            os.makedirs(self.cache.root, exist_ok=True)
+            self._f = open(self._tmp, "wb")
+            self._f.write(HEADER.pack(MAGIC, VERSION, 0, self.leds, 0))
+        data = np.ascontiguousarray(pixels, np.uint8)
+        if data.size != self.leds * 3:
+            raise ValueError(f"frame has {data.size // 3} leds, writer expects {self.leds}")
+        self.bytes += data.nbytes + 2
+        if self.bytes > self.cache.max_bytes:
+            # 单个资源就超过上限：不缓存
+            self.abort()
+            return
+        self._f.write(data.data)
+        self._delays.append(max(0, min(0xFFFF, int(delay_ms))))
+
+    def commit(self) -> bool:
+        if self.aborted or self._f is None:
+            return False
+        f, self._f = self._f, None
+        try:
+            f.write(np.asarray(self._delays, "<u2").tobytes())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, self.leds, len(self._delays)))
+            f.close()
+            os.replace(self._tmp, self.path)
+        except OSError:
+            f.close()
+            self.abort()
+            return False
+        self.cache._written(self)
+        return True
+
+    def abort(self):
+        self.aborted = True
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+
+class AssetCache:
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hashes: dict[tuple[str, int, int], str] = {}
+        self._usage: tuple[int, int] | None = None     # (个数, 字节)，写入 / 淘汰 / 清空时更新，不必每次扫目录
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key + SUFFIX)
+
+    # 源文件内容哈希按 (路径, 大小, mtime) 记忆，同一进程内重复打开不再读文件
+    def source_hash(self, path: str) -> str:
+        st = os.stat(path)
+        memo = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(memo)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                while chunk := f.read(HASH_CHUNK):
+                    h.update(chunk)
+            digest = self._hashes[memo] = h.hexdigest()
+        return digest
+
+    # variant：影响转换结果的全部参数，需可 JSON 序列化
+    def key(self, path: str, **variant) -> str:
+        h = hashlib.blake2b(self.source_hash(path).encode(), digest_size=16)
+        h.update(json.dumps(variant, sort_keys=True, separators=(",", ":")).encode())
+        return h.hexdigest()
+
+    # 命中返回映射好的动画并刷新其最近使用时间；未命中 / 文件损坏返回 None
+    def open(self, key: str) -> CachedAnimation | None:
+        path = self.path(key)
+        try:
+            anim = CachedAnimation(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return anim
+
+    def writer(self, key: str, leds: int) -> AssetWriter:
+        return AssetWriter(self, key, leds)
+
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    # 按 mtime 从旧到新删除，直到总大小不超过上限；正在被映射的文件（Windows）删不掉就跳过
+    def evict(self) -> int:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+            self._usage = (len(entries) - removed, total)
+        return removed
+
+    def clear(self) -> int:
+        entries = self._entries()
+        removed = 0
+        kept = 0
+        for path, size, _ in entries:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                kept += size
+        with self._lock:
+            self._usage = (len(entries) - removed, kept)
+        return removed
+
+    # 第一次调用扫一遍目录，之后用写入 / 淘汰时维护的数字
+    def usage(self) -> tuple[int, int]:
+        with self._lock:
+            usage = self._usage
+        if usage is None:
+            entries = self._entries()
+            usage = len(entries), sum(size for _, size, _ in entries)
+            with self._lock:
+                self._usage = usage
+        return usage
+
+    def stats(self) -> dict:
+        count, size = self.usage()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": count, "bytes": size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes, "evictions": self.evictions,
+            }
+
+    def _written(self, writer: AssetWriter):
+        with self._lock:
+            self.writes += 1
+        self.evict()
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        out = []
+        try:
+            with os.scandir(self.root) as it:
+                for e in it:
+                    if e.name.endswith(SUFFIX):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        out.append((e.path, st.st_size, st.st_mtime))
+        except FileNotFoundError:
+            pass
+        return out
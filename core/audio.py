@@ -0,0 +1,408 @@
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+from core.color import hsv_to_rgb
+from core.effects import Effect
+from core.telemetry import Histogram
+
+# 音频律动：音源线程按块写入环形缓冲 -> 灯效每帧取最新一窗做加窗 FFT -> 对数分布的频带能量 -> 映射到灯带
+# 全程按块 / 按整窗的数组运算，没有逐采样的 Python 循环
+# 延迟上界 = 音源块长 + FFT 窗长 + 一个显示帧；capture_ms（最新采样到分析开始）、analysis_ms 由效果统计，
+# 分析开始时刻作为帧的 origin 交给设备组，分析到写出的耗时记入各连接的 ui_ms
+# 音源规格（open_source）：WAV 文件路径；"-" 或 "pipe:<path>" 为原始 PCM 管道；"live" / "live:<设备>" 为实时采集（需要 sounddevice）
+# ffmpeg -re -i song.mp3 -f s16le -ac 1 -ar 44100 - | python -m core.daemon --emulator 1 --audio -   # -re：按实时速率输出
+
+PIPE_FORMATS = {"s16le": "<i2", "s32le": "<i4", "f32le": "<f4", "u8": "u1"}
+
+
+class AudioError(RuntimeError):
+    pass
+
+
+# 交织 PCM -> 单声道 float32 [-1, 1]
+def pcm_to_mono(raw: bytes, dtype: str, channels: int = 1) -> np.ndarray:
+    dt = np.dtype(dtype)
+    usable = len(raw) - len(raw) % (dt.itemsize * channels)
+    x = np.frombuffer(raw, dt, usable // dt.itemsize)
+    if dt.kind == "f":
+        x = x.astype(np.float32)
+    elif dt.kind == "u":
+        x = (x.astype(np.float32) - 128.0) * np.float32(1.0 / 128.0)
+    else:
+        x = x.astype(np.float32) * np.float32(1.0 / (1 << (8 * dt.itemsize - 1)))
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return x
+
+
+# 24 位 PCM 没有对应的 NumPy 类型：按字节拼成 int32 再归一化
+def _pcm24_to_mono(raw: bytes, channels: int) -> np.ndarray:
+    b = np.frombuffer(raw, np.uint8, len(raw) - len(raw) % (3 * channels)).reshape(-1, 3)
+    x = b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int8).astype(np.int32) << 16)
+    x = x.astype(np.float32) * np.float32(1.0 / (1 << 23))
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return x
+
+
+class RingBuffer:
+    # 单声道采样环：写满后覆盖最旧的数据，读端只关心最新一窗
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, np.float32)
+        self._lock = threading.Lock()
+        self.written = 0
+        self.last_write = 0.0           # 最新一块到达的时刻（time.monotonic）
+
+    def write(self, block: np.ndarray):
+        n = len(block)
+        if not n:
+            return
+        data = block[-self.capacity:]
+        k = len(data)
+        with self._lock:
+            pos = (self.written + n - k) % self.capacity
+            first = min(k, self.capacity - pos)
+            self._buf[pos:pos + first] = data[:first]
+            self._buf[:k - first] = data[first:]
+            self.written += n
+            self.last_write = time.monotonic()
+
+    # 最新 len(out) 个采样拷进 out；返回 (累计写入数, 最新一块到达时刻)
+    def latest(self, out: np.ndarray) -> tuple[int, float]:
+        n = len(out)
+        with self._lock:
+            end = self.written % self.capacity
+            if n <= end:
+                out[:] = self._buf[end - n:end]
+            else:
+                k = n - end
+                out[:k] = self._buf[self.capacity - k:]
+                out[k:] = self._buf[:end]
+            return self.written, self.last_write
+
+
+class AudioSource:
+    # 音源：独立线程按块读取并写入 ring；start 之后 samplerate 才确定（WAV 取文件头）
+
+    def __init__(self, samplerate: int = 44100, block: int = 512, ring_seconds: float = 1.0):
+        self.samplerate = samplerate
+        self.block = block
+        self.ring_seconds = ring_seconds
+        self.ring: RingBuffer | None = None
+        self.blocks = 0
+        self.error: str | None = None
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def label(self) -> str:
+        return ""
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._open()
+        self.ring = RingBuffer(max(4096, int(self.samplerate * self.ring_seconds)))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._guarded_run, name="audio-source", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        self._close()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self) -> dict:
+        return {
+            "source": self.label(),
+            "samplerate": self.samplerate,
+            "block_ms": self.block / self.samplerate * 1000.0,
+            "blocks": self.blocks,
+            "samples": self.ring.written if self.ring is not None else 0,
+            "error": self.error,
+        }
+
+    def _write(self, block: np.ndarray):
+        self.ring.write(block)
+        self.blocks += 1
+
+    def _guarded_run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = str(e)
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class WavSource(AudioSource):
+    # WAV 文件按实时速率播放（按块的绝对截止时间推进），loop 时读到结尾从头再来
+
+    def __init__(self, path: str, block: int = 512, loop: bool = True, realtime: bool = True, **kw):
+        super().__init__(block=block, **kw)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self._wav: wave.Wave_read | None = None
+
+    def label(self) -> str:
+        return self.path
+
+    def _open(self):
+        try:
+            self._wav = wave.open(self.path, "rb")
+        except (OSError, wave.Error, EOFError) as e:
+            raise AudioError(f"cannot open {self.path}: {e}") from e
+        self.samplerate = self._wav.getframerate()
+        if self._wav.getsampwidth() not in (1, 2, 3, 4):
+            raise AudioError(f"{self.path}: unsupported sample width {self._wav.getsampwidth()}")
+
+    def _close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def _run(self):
+        wav = self._wav
+        width, channels = wav.getsampwidth(), wav.getnchannels()
+        dtype = {1: "u1", 2: "<i2", 4: "<i4"}.get(width)
+        deadline = time.perf_counter()
+
+        while not self._stop.is_set():
+            raw = wav.readframes(self.block)
+            if not raw:
+                if not self.loop:
+                    return
+                wav.rewind()
+                continue
+
+            block = _pcm24_to_mono(raw, channels) if width == 3 else pcm_to_mono(raw, dtype, channels)
+            self._write(block)
+
+            if self.realtime:
+                deadline += len(block) / self.samplerate
+                wait = deadline - time.perf_counter()
+                if wait > 0:
+                    self._stop.wait(wait)
+                elif wait < -0.25:
+                    deadline = time.perf_counter()
+
+
+class PipeSource(AudioSource):
+    # 原始 PCM 管道（标准输入或命名管道），由生产者决定节奏
+
+    def __init__(self, path: str = "-", samplerate: int = 44100, channels: int = 1,
+                 sample_format: str = "s16le", block: int = 512, **kw):
+        super().__init__(samplerate, block, **kw)
+        if sample_format not in PIPE_FORMATS:
+            raise AudioError(f"unknown sample format {sample_format!r}, expected one of {sorted(PIPE_FORMATS)}")
+        self.path = path
+        self.channels = channels
+        self.dtype = PIPE_FORMATS[sample_format]
+        self._stream = None
+
+    def label(self) -> str:
+        return "stdin" if self.path == "-" else self.path
+
+    def _open(self):
+        try:
+            self._stream = sys.stdin.buffer if self.path == "-" else open(self.path, "rb")
+        except OSError as e:
+            raise AudioError(f"cannot open {self.path}: {e}") from e
+
+    def _close(self):
+        if self._stream is not None and self.path != "-":
+            self._stream.close()
+        self._stream = None
+
+    def _run(self):
+        size = self.block * self.channels * np.dtype(self.dtype).itemsize
+        while not self._stop.is_set():
+            raw = self._stream.read(size)
+            if not raw:
+                return
+            self._write(pcm_to_mono(raw, self.dtype, self.channels))
+
+
+class LiveSource(AudioSource):
+    # 实时采集：sounddevice 的回调线程直接写环形缓冲，不另起线程
+
+    def __init__(self, device: str | int | None = None, samplerate: int = 48000, channels: int = 1,
+                 block: int = 512, **kw):
+        super().__init__(samplerate, block, **kw)
+        self.device = device
+        self.channels = channels
+        self._stream = None
+
+    def label(self) -> str:
+        return f"live:{self.device}" if self.device is not None else "live"
+
+    def start(self):
+        if self._stream is not None:
+            return
+        try:
+            import sounddevice
+        except ImportError as e:
+            raise AudioError("live capture requires sounddevice: pip install sounddevice") from e
+
+        self.ring = RingBuffer(max(4096, int(self.samplerate * self.ring_seconds)))
+        try:
+            self._stream = sounddevice.InputStream(
+                samplerate=self.samplerate, blocksize=self.block, device=self.device,
+                channels=self.channels, dtype="float32", callback=self._callback)
+            self._stream.start()
+        except Exception as e:
+            self._stream = None
+            raise AudioError(f"cannot open input device {self.device!r}: {e}") from e
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    def _callback(self, indata, frames, time_info, status):
+        self._write(indata[:, 0] if self.channels == 1 else indata.mean(axis=1, dtype=np.float32))
+
+
+def open_source(spec: str, **kw) -> AudioSource:
+    if spec == "live" or spec.startswith("live:"):
+        device = spec.partition(":")[2] or None
+        if device is not None and device.isdigit():
+            device = int(device)
+        return LiveSource(device, **kw)
+    if spec == "-":
+        return PipeSource("-", **kw)
+    if spec.startswith("pipe:"):
+        return PipeSource(spec[5:], **kw)
+    return WavSource(spec, **kw)
+
+
+class BandAnalyzer:
+    # 加窗 rfft -> 对数间隔频带的平均功率（reduceat）-> dB -> 自动增益 -> 起落平滑
+    # 频带边界按 FFT 分辨率预先算好；低频带窄于一个频点时退化为单个频点
+
+    def __init__(self, samplerate: int, fft_size: int = 2048, bands: int = 16,
+                 fmin: float = 40.0, fmax: float = 16000.0, range_db: float = 45.0,
+                 attack: float = 0.02, release: float = 0.25, agc_release_db: float = 6.0):
+        self.samplerate = samplerate
+        self.fft_size = fft_size
+        self.bands = bands
+        self.range_db = range_db
+        self.attack = attack
+        self.release = release
+        self.agc_release_db = agc_release_db
+
+        self._window = np.hanning(fft_size).astype(np.float32)
+        self._frame = np.empty(fft_size, np.float32)
+
+        nbins = fft_size // 2 + 1
+        freqs = np.fft.rfftfreq(fft_size, 1.0 / samplerate)
+        edges = np.geomspace(fmin, min(fmax, samplerate / 2.0), bands + 1)
+        idx = np.clip(np.searchsorted(freqs, edges), 1, nbins - 1)
+        starts = idx[:-1]
+        ends = np.maximum(idx[1:], starts + 1)
+        self._starts = starts
+        self._counts = (ends - starts).astype(np.float32)
+        self.centers = np.sqrt(edges[:-1] * edges[1:])
+
+        self._peak_db = -60.0
+        self.levels = np.zeros(bands, np.float32)
+
+    def analyze(self, samples: np.ndarray, dt: float) -> np.ndarray:
+        np.multiply(samples, self._window, out=self._frame)
+        spec = np.fft.rfft(self._frame)
+        power = spec.real * spec.real + spec.imag * spec.imag
+        energy = np.add.reduceat(power, self._starts)[:self.bands] / self._counts
+        db = 10.0 * np.log10(energy + 1e-12)
+
+        # 自动增益：跟随最响频带，峰值回落有速率上限，静音时不会把底噪放大成满亮
+        self._peak_db = max(float(db.max()), self._peak_db - self.agc_release_db * dt, -20.0)
+        level = np.clip((db - (self._peak_db - self.range_db)) / self.range_db, 0.0, 1.0).astype(np.float32)
+
+        rise = 1.0 - np.exp(-dt / self.attack)
+        fall = 1.0 - np.exp(-dt / self.release)
+        coef = np.where(level > self.levels, rise, fall).astype(np.float32)
+        self.levels += (level - self.levels) * coef
+        return self.levels
+
+
+class AudioReactive(Effect):
+    # 低频在灯带起点、高频在末端，频带之间线性插值；色相随频带分布并随时间缓慢旋转
+    name = "audio"
+    title = "音频律动"
+
+    def __init__(self, leds: int, speed: float = 1.0, source: AudioSource | None = None,
+                 bands: int = 16, fft_size: int = 2048, **kw):
+        super().__init__(leds, speed, **kw)
+        self.source = source
+        self.fft_size = fft_size
+        self.bands = bands
+        self._analyzer: BandAnalyzer | None = None
+        self._samples = np.zeros(fft_size, np.float32)
+
+        self._pos = self._idx * ((bands - 1) / max(1, leds - 1))
+        self._band_pos = np.arange(bands, dtype=np.float32)
+        self._hue_base = self._idx * (300.0 / max(1, leds))
+        self._ones = np.ones(leds, np.float32)
+        self._rgb = np.empty((leds, 3), np.float32)
+
+        self.origin = 0.0                   # 本帧分析开始时刻（time.monotonic），随帧交给设备组
+        self.capture_hist = Histogram()     # 最新采样到达 -> 分析开始
+        self.analysis_hist = Histogram()    # FFT + 映射耗时
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        t0 = time.monotonic()
+        self.origin = t0
+        levels = self._analyze(t0, dt)
+
+        value = np.interp(self._pos, self._band_pos, levels).astype(np.float32)
+        np.multiply(value, value, out=value)
+        hsv_to_rgb(self._hue_base + t * self.speed * 20.0, self._ones, value, self._rgb)
+        out = self._emit(self._rgb)
+
+        self.analysis_hist.record(time.monotonic() - t0)
+        return out
+
+    def _analyze(self, now: float, dt: float) -> np.ndarray:
+        source = self.source
+        ring = source.ring if source is not None else None
+        if ring is None:
+            return np.zeros(self.bands, np.float32)
+
+        if self._analyzer is None or self._analyzer.samplerate != source.samplerate:
+            self._analyzer = BandAnalyzer(source.samplerate, self.fft_size, self.bands)
+        written, arrived = ring.latest(self._samples)
+        if written:
+            self.capture_hist.record(now - arrived)
+        return self._analyzer.analyze(self._samples, dt)
+
+    def stats(self) -> dict:
+        sr = self.source.samplerate if self.source is not None else 0
+        return {
+            "capture_ms": self.capture_hist.summary(),
+            "analysis_ms": self.analysis_hist.summary(),
+            "window_ms": self.fft_size / sr * 1000.0 if sr else 0.0,
+            **({"source": self.source.stats()} if self.source is not None else {}),
+        }
@@ -0,0 +1,216 @@
+import threading
+
+import numpy as np
+
+# 颜色换算：全部按 NumPy 批量处理，标量接口只是长度为 1 的批量
+# 约定：h 为角度 [0, 360)，s / v 为 [0, 1] 浮点；8 位 RGB 为 uint8 (..., 3)
+
+
+# ---------- HSV <-> RGB ----------
+
+def hsv_to_rgb(h, s, v, out: np.ndarray | None = None) -> np.ndarray:
+    # h: [0, 360)  s, v: [0, 1]  ->  (..., 3) float32 [0, 1]
+    h6 = (np.asarray(h, np.float32) % 360.0) / 60.0
+    s = np.asarray(s, np.float32)
+    v = np.asarray(v, np.float32)
+
+    k = (np.array([5.0, 3.0, 1.0], np.float32) + h6[..., None]) % 6.0
+    ch = np.minimum(k, 4.0 - k).clip(0.0, 1.0)
+    res = v[..., None] - (v * s)[..., None] * ch
+    if out is not None:
+        out[...] = res
+        return out
+    return res
+
+
+# 整数色相 -> 满饱和 RGB [0, 1]，色盘位图等逐像素场景直接查表
+HUE_LUT = hsv_to_rgb(np.arange(360), 1.0, 1.0)
+
+
+def rgb_to_hsv(rgb) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # uint8 按 [0, 255]、浮点按 [0, 1] 解释  ->  (h [0, 360), s [0, 1], v [0, 1]) float32
+    rgb = np.asarray(rgb)
+    x = rgb.astype(np.float32)
+    if rgb.dtype == np.uint8:
+        x *= np.float32(1.0 / 255.0)
+
+    r, g, b = x[..., 0], x[..., 1], x[..., 2]
+    v = x.max(axis=-1)
+    c = v - x.min(axis=-1)
+
+    safe_c = np.where(c > 0.0, c, 1.0)
+    h = np.where(v == r, (g - b) / safe_c,
+                 np.where(v == g, (b - r) / safe_c + 2.0, (r - g) / safe_c + 4.0))
+    h = np.where(c > 0.0, (h * 60.0) % 360.0, 0.0).astype(np.float32)
+    s = np.where(v > 0.0, c / np.where(v > 0.0, v, 1.0), 0.0).astype(np.float32)
+    return h, s, v
+
+
+def to_rgb8(rgb01: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    res = np.rint(np.clip(rgb01, 0.0, 1.0) * 255.0)
+    if out is not None:
+        out[...] = res
+        return out
+    return res.astype(np.uint8)
+
+
+# 静态模式的 (h 度, s 0~255) 与 8 位 RGB 互转，V 固定为满
+def hs_to_rgb8(h: int, s: int) -> tuple[int, int, int]:
+    r, g, b = to_rgb8(hsv_to_rgb(h, s / 255.0, 1.0))
+    return int(r), int(g), int(b)
+
+
+def rgb8_to_hs(rgb) -> tuple[int, int]:
+    h, s, _v = rgb_to_hsv(np.asarray(rgb, np.uint8))
+    return int(np.rint(h)) % 360, int(np.rint(s * 255.0))
+
+
+# ---------- hex ----------
+
+def parse_hex(text: str) -> tuple[int, int, int]:
+    r, g, b = parse_hex_array([text])[0]
+    return int(r), int(g), int(b)
+
+
+# ["#RRGGBB" | "RRGGBB" | "#RGB", ...] -> (N, 3) uint8；任一项非法时抛 ValueError
+def parse_hex_array(texts) -> np.ndarray:
+    digits = []
+    for t in texts:
+        d = t.strip().lstrip("#")
+        if len(d) == 3:
+            d = "".join(ch * 2 for ch in d)
+        if len(d) != 6:
+            raise ValueError(f"invalid hex color: {t!r}")
+        digits.append(d)
+
+    try:
+        raw = bytes.fromhex("".join(digits))
+    except ValueError:
+        raise ValueError(f"invalid hex color in {list(texts)!r}") from None
+    return np.frombuffer(raw, np.uint8).reshape(-1, 3).copy()
+
+
+def to_hex(rgb) -> str:
+    r, g, b = (int(c) for c in np.asarray(rgb).reshape(3))
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def hex_to_hs(text: str) -> tuple[int, int]:
+    return rgb8_to_hs(parse_hex(text))
+
+
+# ---------- 色温 ----------
+
+def kelvin_to_rgb(kelvin) -> np.ndarray:
+    # 黑体色温近似（Tanner Helland 拟合），1000K ~ 40000K  ->  (..., 3) float32 [0, 1]
+    t = np.clip(np.asarray(kelvin, np.float32), 1000.0, 40000.0) / 100.0
+    ln_t = np.log(t)
+
+    r = np.where(t <= 66.0, 255.0, 329.698727446 * np.power(np.maximum(t - 60.0, 1e-6), -0.1332047592))
+    g = np.where(t <= 66.0, 99.4708025861 * ln_t - 161.1195681661,
+                 288.1221695283 * np.power(np.maximum(t - 60.0, 1e-6), -0.0755148492))
+    b = np.where(t >= 66.0, 255.0,
+                 np.where(t <= 19.0, 0.0, 138.5177312231 * np.log(np.maximum(t - 10.0, 1e-6)) - 305.0447927307))
+
+    rgb = np.stack([r, g, b], axis=-1) / 255.0
+    return np.clip(rgb, 0.0, 1.0).astype(np.float32)
+
+
+# 以最亮通道归一的白平衡增益，用于校正偏色的灯珠
+def white_balance(kelvin: float) -> tuple[float, float, float]:
+    rgb = kelvin_to_rgb(kelvin)
+    r, g, b = (float(c) for c in rgb / rgb.max())
+    return r, g, b
+
+
+# ---------- 输出校正 ----------
+
+# 设置页 / 状态存储里的校准参数；色温取 6500K 时不做白平衡，brightness 为百分比
+DEFAULT_CALIBRATION = {"gamma": 1.0, "kelvin": 6500, "brightness": 100}
+
+class OutputCorrection:
+    # 每台设备一份：gamma、通道增益（白平衡 / 校准）和整体亮度合成一张 3x256 查找表
+    # apply 只做一次查表，把 8 位输入直接映射成线上字节；参数变化时整表重算（768 项）
+
+    def __init__(self, gamma: float = 1.0, gains: tuple[float, float, float] = (1.0, 1.0, 1.0),
+                 brightness: float = 1.0):
+        self._lock = threading.Lock()
+        self._gamma = 1.0
+        self._gains = (1.0, 1.0, 1.0)
+        self._brightness = 1.0
+        self._state = (np.tile(np.arange(256, dtype=np.uint8), (3, 1)), True)     # (表, 是否恒等)
+        self.update(gamma=gamma, gains=gains, brightness=brightness)
+
+    def gamma(self) -> float:
+        return self._gamma
+
+    def gains(self) -> tuple[float, float, float]:
+        return self._gains
+
+    def brightness(self) -> float:
+        return self._brightness
+
+    def is_identity(self) -> bool:
+        return self._state[1]
+
+    def table(self) -> np.ndarray:
+        return self._state[0]
+
+    def set_gamma(self, gamma: float):
+        self.update(gamma=gamma)
+
+    def set_gains(self, r: float, g: float, b: float):
+        self.update(gains=(r, g, b))
+
+    def set_color_temperature(self, kelvin: float):
+        self.update(gains=white_balance(kelvin))
+
+    def set_brightness(self, brightness: float):
+        self.update(brightness=brightness)
+
+    # values 为 DEFAULT_CALIBRATION 形式的字典，缺项取默认
+    def set_calibration(self, values: dict):
+        v = {**DEFAULT_CALIBRATION, **values}
+        kelvin = v["kelvin"]
+        gains = (1.0, 1.0, 1.0) if kelvin == DEFAULT_CALIBRATION["kelvin"] else white_balance(kelvin)
+        self.update(gamma=v["gamma"], gains=gains, brightness=v["brightness"] / 100.0)
+
+    def update(self, *, gamma: float | None = None, gains: tuple[float, float, float] | None = None,
+               brightness: float | None = None):
+        with self._lock:
+            if gamma is not None:
+                if gamma <= 0:
+                    raise ValueError(f"gamma must be positive, got {gamma}")
+                self._gamma = float(gamma)
+            if gains is not None:
+                self._gains = tuple(float(max(0.0, min(1.0, g))) for g in gains)
+            if brightness is not None:
+                self._brightness = float(max(0.0, min(1.0, brightness)))
+
+            # gamma 在归一化输入上做，增益和亮度乘在线性（PWM）域
+            x = np.arange(256, dtype=np.float64) / 255.0
+            curve = np.power(x, self._gamma)
+            scale = np.array(self._gains)[:, None] * self._brightness
+            table = np.rint(curve[None, :] * scale * 255.0).astype(np.uint8)
+
+            # 整表替换，apply 读到的总是完整的一张表
+            self._state = (table, bool((table == np.arange(256, dtype=np.uint8)).all()))
+
+    # pixels: (..., 3) uint8；out 可以是任意同形状的 uint8 视图（例如编码缓冲），允许与 pixels 相同
+    def apply(self, pixels, out: np.ndarray | None = None) -> np.ndarray:
+        if isinstance(pixels, np.ndarray):
+            src = pixels
+        else:
+            src = np.frombuffer(pixels, np.uint8).reshape(-1, 3)
+        table, identity = self._state
+        if out is None:
+            out = np.empty_like(src)
+
+        if identity:
+            if out is not src:
+                out[...] = src
+            return out
+
+        for c in range(3):
+            np.take(table[c], src[..., c], out=out[..., c])
+        return out
@@ -0,0 +1,396 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable
+
+from core.group import DeviceGroup
+from core.link import DeviceLink
+from core.store import StateStore
+from core.transport.base import DeviceInfo
+from core.transport.registry import create_backend, discover_all
+from core.transport.worker import Channel, TransportWorker
+
+# 快速重连：已知控制器的连接参数（地址 / MTU / 固件能力 / 特征句柄）记在状态存储的 "devices" 分区
+# 启动时并行直连上次在用的设备，不先扫描；直连连续失败后，重试前才按该类型后台扫描（按名字找回换了地址的设备）
+# 断线 / 失败按带抖动的指数退避重试；连上后补发上次的静态状态（电源 / 颜色 / 亮度），并记录发起到 connected 的耗时
+# 所有连接状态只在传输线程里修改，对外方法线程安全
+
+PRIMARY = "primary"
+DIRECT_ATTEMPTS = 2         # 连续直连失败这么多次后，每次重试前先扫描
+RESEND_KEYS = ("power", "hs", "brightness")
+
+
+@dataclass
+class KnownDevice:
+    kind: str
+    address: str
+    name: str = ""
+    mtu: int = 0
+    caps: dict = field(default_factory=dict)        # 固件能力（首次连接时读取，之后直连不再查询）
+    handles: dict = field(default_factory=dict)     # 特征句柄（BLE），直连时跳过按 UUID 查找
+    role: str = ""                                  # 上次在用的角色："primary" / "group"，空表示只是连过
+    span: list | None = None
+    last_seen: int = 0
+    last_used: float = 0.0
+    connect_ms: float | None = None                 # 最近一次建立连接的耗时
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, self.address, self.name,
+                          extra={"mtu": self.mtu, "caps": dict(self.caps), "handles": dict(self.handles)})
+
+    def label(self) -> str:
+        return self.info().label()
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind, "name": self.name, "mtu": self.mtu, "caps": self.caps, "handles": self.handles,
+            "role": self.role, "span": self.span, "last_seen": self.last_seen, "last_used": self.last_used,
+            "connect_ms": self.connect_ms,
+        }
+
+    # 兼容只有 kind / name / last_seen 的旧记录
+    @classmethod
+    def from_dict(cls, address: str, data: dict) -> "KnownDevice":
+        return cls(
+            data.get("kind", ""), address, data.get("name", ""), data.get("mtu", 0),
+            dict(data.get("caps") or {}), dict(data.get("handles") or {}), data.get("role", ""),
+            data.get("span"), data.get("last_seen", 0), data.get("last_used", 0.0), data.get("connect_ms"),
+        )
+
+
+class Backoff:
+    # 指数退避：base × factor^n，封顶 cap，再乘 ±jitter 的随机抖动，多台设备不会同一时刻扎堆重试
+
+    def __init__(self, base: float = 0.25, factor: float = 2.0, cap: float = 30.0, jitter: float = 0.2,
+                 rng: random.Random | None = None):
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.failures = 0
+        self._rng = rng or random.Random()
+
+    def next(self) -> float:
+        delay = min(self.cap, self.base * self.factor ** self.failures)
+        self.failures += 1
+        return delay * (1.0 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def reset(self):
+        self.failures = 0
+
+
+class Slot:
+    # 一个受管连接：名字 + 输出用的 DeviceLink + 当前 Channel；掉线后按退避重开新的 Channel
+
+    def __init__(self, name: str, link: DeviceLink, known: KnownDevice, backoff: Backoff,
+                 queue_size: int, window: int):
+        self.name = name
+        self.link = link
+        self.known = known
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.window = window
+
+        self.channel: Channel | None = None
+        self.state = "idle"
+        self.closed = False
+        self.retry: asyncio.Task | None = None
+        self.t_request = 0.0            # 本轮开始：首次发起连接或掉线的时刻
+        self.t_attempt = 0.0
+
+        self.attempts = 0
+        self.failures = 0               # 连续失败次数，连上后清零
+        self.reconnects = 0
+        self.discoveries = 0
+        self.resends = 0
+        self.time_to_connected: float | None = None     # 首次连接：发起 -> connected，秒
+        self.last_reconnect: float | None = None        # 最近一次掉线 -> 重新 connected，秒
+
+    def stats(self) -> dict:
+        return {
+            "address": self.known.address,
+            "state": self.state,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+            "discoveries": self.discoveries,
+            "resends": self.resends,
+            "time_to_connected_ms": _ms(self.time_to_connected),
+            "last_reconnect_ms": _ms(self.last_reconnect),
+            "connect_ms": self.known.connect_ms,
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return seconds * 1000.0 if seconds is not None else None
+
+
+class ConnectionManager:
+
+    def __init__(self, worker: TransportWorker, group: DeviceGroup, store: StateStore | None = None,
+                 primary: DeviceLink | None = None, resend: Callable[[], dict] | None = None,
+                 backoff: Callable[[], Backoff] = Backoff, discover_timeout: float = 3.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.worker = worker
+        self.group = group
+        self.store = store
+        self.primary = primary
+        self.discover_timeout = discover_timeout
+        self._resend = resend or self._last_state
+        self._backoff = backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots: dict[str, Slot] = {}
+        self._listeners: list[Callable[[str, str], None]] = []
+
+    # 回调 (slot 名, 状态) 在传输线程触发；状态："connecting" / "connected" / "disconnected" /
+    # "error: ..." / "retry in N s" / "discovering" / "closed"
+    def add_listener(self, fn: Callable[[str, str], None]):
+        self._listeners.append(fn)
+
+    # ---------- 已知设备 ----------
+
+    # 最近用过的在前
+    def known(self) -> list[KnownDevice]:
+        if self.store is None:
+            return []
+        devices = [KnownDevice.from_dict(addr, d) for addr, d in self.store.section("devices").items()]
+        return sorted(devices, key=lambda k: (k.last_used, k.last_seen), reverse=True)
+
+    def forget(self, address: str):
+        if self.store is not None:
+            self.store.delete("devices", address)
+
+    # 上次在用的设备（主连接在前），最多 limit 台
+    def restorable(self, limit: int = 4) -> list[KnownDevice]:
+        used = [k for k in self.known() if k.role in (PRIMARY, "group")]
+        used.sort(key=lambda k: k.role != PRIMARY)
+        if self.primary is None:
+            used = [k for k in used if k.role != PRIMARY]
+        return used[:limit]
+
+    # 并行直连：只投递到传输线程，各连接在同一个事件循环里同时握手
+    def restore(self, limit: int = 4) -> list[KnownDevice]:
+        started = self.restorable(limit)
+        for k in started:
+            if k.role == PRIMARY:
+                self.connect(k.info(), PRIMARY)
+            else:
+                self.connect(k.info(), span=tuple(k.span) if k.span else None)
+        return started
+
+    # ---------- 连接 ----------
+
+    # name 为 PRIMARY 时输出到主连接的 DeviceLink，否则新建一员加入设备组
+    def connect(self, info: DeviceInfo, name: str | None = None, span: tuple[int, int] | None = None,
+                queue_size: int | None = None, window: int = 8) -> str:
+        name = name or info.name or info.address
+        if name != PRIMARY and self.group.member(name) is not None and self._slot(name) is None:
+            raise ValueError(f"device group already has a member named {name!r}")
+        self.disconnect(name, forget_role=False)
+
+        known = self._known(info)
+        known.role = PRIMARY if name == PRIMARY else "group"
+        known.span = list(span) if span else None
+        known.last_used = time.time()
+
+        if name == PRIMARY:
+            if self.primary is None:
+                raise ValueError("connection manager has no primary link")
+            link = self.primary
+        else:
+            link = DeviceLink(self.group.max_leds)
+            self.group.add_link(name, link, span, info)
+
+        queue_size = queue_size or (64 if name == PRIMARY else 16)
+        slot = Slot(name, link, known, self._backoff(), queue_size, window)
+        with self._lock:
+            self._slots[name] = slot
+        self._save(known)
+        self.worker.loop.call_soon_threadsafe(self._begin, slot)
+        return name
+
+    # 用户主动断开：停止重试并关闭连接；forget_role 时不再在下次启动自动重连
+    def disconnect(self, name: str, forget_role: bool = True) -> Future | None:
+        with self._lock:
+            slot = self._slots.pop(name, None)
+        if slot is None:
+            return None
+        slot.closed = True
+        slot.link.attach(None)
+        if name != PRIMARY:
+            self.group.remove(name)
+        if forget_role:
+            slot.known.role = ""
+            slot.known.span = None
+            self._save(slot.known)
+        return self.worker.call(self._shutdown(slot))
+
+    # 退出时关闭全部连接，保留角色供下次启动直连
+    def close(self) -> list[Future]:
+        futures = [self.disconnect(name, forget_role=False) for name in list(self._slots)]
+        return [f for f in futures if f is not None]
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._slots)
+
+    def state(self, name: str) -> str | None:
+        slot = self._slot(name)
+        return slot.state if slot is not None else None
+
+    # 等到指定（缺省全部）连接进入 connected；超时返回 False
+    def wait_connected(self, names: list[str] | None = None, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            slots = [self._slot(n) for n in (names or self.names())]
+            if slots and all(s is not None and s.state == "connected" for s in slots):
+                return True
+            time.sleep(0.002)
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            slots = list(self._slots.values())
+        out = {s.name: s.stats() for s in slots}
+        ttc = [s.time_to_connected for s in slots if s.time_to_connected is not None]
+        if ttc:
+            out["time_to_connected_ms"] = max(ttc) * 1000.0
+        return out
+
+    # ---------- 传输线程 ----------
+
+    def _begin(self, slot: Slot):
+        slot.t_request = self._clock()
+        self._open(slot)
+
+    def _open(self, slot: Slot):
+        slot.retry = None
+        if slot.closed:
+            return
+        try:
+            backend = create_backend(slot.known.info())
+        except Exception as e:
+            self._failed(slot, f"error: {e}")
+            return
+
+        slot.attempts += 1
+        slot.t_attempt = self._clock()
+        slot.channel = self.worker.open(backend, slot.queue_size, slot.window,
+                                        listener=lambda ch, state, slot=slot: self._on_channel_state(slot, ch, state))
+
+    def _on_channel_state(self, slot: Slot, ch: Channel, state: str):
+        if ch is not slot.channel or slot.closed:
+            return
+        if state == "connected":
+            self._connected(slot, ch)
+        elif state == "disconnected" or state.startswith("error"):
+            slot.channel = None
+            slot.link.attach(None)
+            ch.close()
+            if state == "disconnected":
+                slot.t_request = self._clock()
+            self._failed(slot, state)
+        elif state == "connecting":
+            self._set_state(slot, state)
+
+    def _connected(self, slot: Slot, ch: Channel):
+        now = self._clock()
+        elapsed = now - slot.t_request
+        if slot.time_to_connected is None:
+            slot.time_to_connected = elapsed
+        else:
+            slot.reconnects += 1
+            slot.last_reconnect = elapsed
+        slot.failures = 0
+        slot.backoff.reset()
+
+        known = slot.known
+        backend = ch.backend
+        known.mtu = backend.mtu
+        known.name = getattr(backend, "name", "") or known.name
+        known.caps = dict(backend.caps) or known.caps
+        known.handles = dict(backend.handles) or known.handles
+        known.last_seen = int(time.time())
+        known.connect_ms = (now - slot.t_attempt) * 1000.0
+        self._save(known)
+
+        # 先补发上次的静态状态，再交给页面继续输出（换了连接后下一帧自动是关键帧）
+        slot.link.attach(ch)
+        state = self._resend()
+        for key in RESEND_KEYS:
+            if state.get(key) is not None:
+                slot.link.send_command(key, tuple(state[key]) if key == "hs" else state[key])
+                slot.resends += 1
+        self._set_state(slot, "connected")
+
+    def _failed(self, slot: Slot, state: str):
+        slot.failures += 1
+        self._set_state(slot, state)
+        if slot.closed:
+            return
+        # 刚掉线的第一次重连不等待，之后才按退避
+        delay = 0.0 if state == "disconnected" and slot.failures == 1 else slot.backoff.next()
+        slot.retry = asyncio.get_running_loop().create_task(self._retry(slot, delay))
+        self._set_state(slot, f"retry in {delay:.1f} s")
+
+    # 直连连续失败后先按类型扫描：地址没变直接重连，地址变了（端口 / 随机地址）按名字找回
+    async def _retry(self, slot: Slot, delay: float):
+        await asyncio.sleep(delay)
+        if slot.closed:
+            return
+        if slot.failures >= DIRECT_ATTEMPTS:
+            slot.discoveries += 1
+            self._set_state(slot, "discovering")
+            found = await discover_all(self.discover_timeout, [slot.known.kind])
+            if slot.closed:
+                return
+            match = next((d for d in found if d.address == slot.known.address), None)
+            if match is None and slot.known.name:
+                match = next((d for d in found if d.name == slot.known.name), None)
+            if match is not None and match.address != slot.known.address:
+                self.forget(slot.known.address)
+                slot.known.address = match.address
+                self._save(slot.known)
+        self._open(slot)
+
+    async def _shutdown(self, slot: Slot):
+        if slot.retry is not None:
+            slot.retry.cancel()
+            slot.retry = None
+        ch, slot.channel = slot.channel, None
+        if ch is not None:
+            await ch._close()
+        self._set_state(slot, "closed")
+
+    def _set_state(self, slot: Slot, state: str):
+        slot.state = state
+        for fn in self._listeners:
+            fn(slot.name, state)
+
+    # ---------- 存储 ----------
+
+    def _slot(self, name: str) -> Slot | None:
+        with self._lock:
+            return self._slots.get(name)
+
+    def _known(self, info: DeviceInfo) -> KnownDevice:
+        saved = self.store.get("devices", info.address) if self.store is not None else None
+        known = KnownDevice.from_dict(info.address, saved or {})
+        known.kind = info.kind
+        known.name = info.name or known.name
+        known.mtu = info.extra.get("mtu") or known.mtu
+        return known
+
+    def _save(self, known: KnownDevice):
+        if self.store is not None:
+            self.store.set("devices", known.address, known.to_dict())
+
+    def _last_state(self) -> dict:
+        if self.store is None:
+            return {}
+        last = self.store.section("last_state")
+        return {key: last.get(key) for key in RESEND_KEYS}
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from typing import NamedTuple, Protocol
+
+from core.color import hex_to_hs
+from core.store import default_root
+
+# 本地控制接口：其它进程（演出控制器、脚本、家居自动化）驱动本机正在使用的灯
+# 行协议（Unix 套接字；不支持时为 127.0.0.1 TCP）：每行一个 JSON 批次，逐行应答
+#   {"id": 1, "commands": [{"op": "color", "hex": "#FF8800"}, {"op": "brightness", "value": 60}]}
+#   -> {"id": 1, "ok": true, "applied": 2}
+# 一批命令先整体校验，任何一条不合法则整批拒绝；合法的整批一次交给 ControlTarget.apply
+# 流模式：发送 {"op": "stream"} 后连接切换为二进制帧 | len u32 | RGB ... |，len 为 0 时回到行协议
+# 设备队列积压超过 high_water 时暂停读取，背压经套接字缓冲传回生产者；backlog_timeout 内没追上则向客户端报错
+# HTTP（只监听 127.0.0.1）：POST /commands（同上 JSON），POST /frame（原始 RGB），GET /state，GET /stats
+# 客户端：python -m core.control '{"op": "color", "hex": "#FF8800"}' '{"op": "brightness", "value": 60}'
+
+FRAME_LEN = struct.Struct("<I")
+
+DEFAULT_TCP_PORT = 47900
+MAX_LINE = 4 * 1024 * 1024              # 一行 JSON（含 base64 帧）的上限
+MAX_FRAME = 0xFFFF * 3                  # 与协议的 led_count 上限一致
+
+
+class ControlError(ValueError):
+    pass
+
+
+# 设备积压在 backlog_timeout 内没有追上（HTTP 回 503）
+class BacklogError(ControlError):
+    pass
+
+
+class Command(NamedTuple):
+    op: str
+    args: dict
+
+
+def default_unix_path() -> str | None:
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    return os.path.join(default_root(), "control.sock")
+
+
+def _number(cmd: dict, key: str, lo: float, hi: float) -> float:
+    value = cmd.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ControlError(f"{cmd.get('op')}: '{key}' must be a number")
+    if not lo <= value <= hi:
+        raise ControlError(f"{cmd.get('op')}: '{key}' must be within [{lo}, {hi}]")
+    return value
+
+
+def parse_command(cmd) -> Command:
+    if not isinstance(cmd, dict):
+        raise ControlError("command must be an object")
+    op = cmd.get("op")
+
+    if op == "color":
+        if "hex" in cmd:
+            try:
+                h, s = hex_to_hs(str(cmd["hex"]))
+            except ValueError as e:
+                raise ControlError(f"color: {e}") from None
+        else:
+            h, s = int(_number(cmd, "h", 0, 359)), int(_number(cmd, "s", 0, 255))
+        return Command(op, {"h": h, "s": s})
+
+    if op == "brightness":
+        return Command(op, {"value": int(_number(cmd, "value", 0, 100))})
+
+    if op == "power":
+        if not isinstance(cmd.get("on"), bool):
+            raise ControlError("power: 'on' must be true or false")
+        return Command(op, {"on": cmd["on"]})
+
+    if op == "effect":
+        from core.effects import EFFECTS
+
+        name = cmd.get("name")
+        if name is not None and name not in EFFECTS:
+            raise ControlError(f"effect: unknown effect {name!r}, expected one of {sorted(EFFECTS)} or null")
+        speed = _number(cmd, "speed", 0.1, 10.0) if "speed" in cmd else None
+        return Command(op, {"name": name, "speed": speed})
+
+    if op == "frame":
+        try:
+            pixels = base64.b64decode(cmd.get("rgb", ""), validate=True)
+        except (ValueError, TypeError):
+            raise ControlError("frame: 'rgb' must be base64") from None
+        if not pixels or len(pixels) % 3 or len(pixels) > MAX_FRAME:
+            raise ControlError(f"frame: {len(pixels)} bytes is not a whole number of RGB pixels")
+        return Command(op, {"pixels": pixels})
+
+    raise ControlError(f"unknown op: {op!r}")
+
+
+# 接受 {"commands": [...]}、命令列表或单条命令
+def parse_batch(obj) -> list[Command]:
+    if isinstance(obj, dict) and "commands" in obj:
+        obj = obj["commands"]
+    if isinstance(obj, dict):
+        obj = [obj]
+    if not isinstance(obj, list) or not obj:
+        raise ControlError("expected a command, a list of commands or {\"commands\": [...]}")
+    return [parse_command(c) for c in obj]
+
+
+class ControlTarget(Protocol):
+    # 控制接口的落地方（按方法名对接，不需要继承）；以下方法都在服务器所在的事件循环线程里调用，不能阻塞
+
+    # 一批已校验的命令，按顺序生效
+    def apply(self, commands: list[Command]): ...
+
+    # 原始 RGB 帧（流模式 / POST /frame），走帧输出路径
+    def send_frame(self, pixels: bytes): ...
+
+    # 设备侧积压（已连接设备里最深的发送队列），用于流模式背压
+    def backlog(self) -> int: ...
+
+    def state(self) -> dict: ...
+
+
+class ControlServer:
+
+    def __init__(self, target: ControlTarget, unix_path: str | None = None, tcp_port: int = 0,
+                 http_port: int = 0, host: str = "127.0.0.1", high_water: int = 2,
+                 backlog_timeout: float = 2.0):
+        self.target = target
+        self.unix_path = unix_path
+        self.tcp_port = tcp_port
+        self.http_port = http_port
+        self.host = host
+        self.high_water = high_water
+        self.backlog_timeout = backlog_timeout
+        self._servers: list[asyncio.AbstractServer] = []
+        self._clients: set[asyncio.Task] = set()
+
+        self.connections = 0
+        self.batches = 0
+        self.commands = 0
+        self.errors = 0
+        self.frames = 0
+        self.stalls = 0
+        self.stall_s = 0.0
+
+    async def start(self):
+        if self.unix_path:
+            os.makedirs(os.path.dirname(self.unix_path) or ".", exist_ok=True)
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self._servers.append(await asyncio.start_unix_server(self._serve_lines, self.unix_path, limit=MAX_LINE))
+            os.chmod(self.unix_path, 0o600)
+        if self.tcp_port:
+            self._servers.append(await asyncio.start_server(self._serve_lines, self.host, self.tcp_port,
+                                                            limit=MAX_LINE))
+        if self.http_port:
+            self._servers.append(await asyncio.start_server(self._serve_http, self.host, self.http_port,
+                                                            limit=MAX_LINE))
+
+    async def stop(self):
+        servers, self._servers = self._servers, []
+        for server in servers:
+            server.close()
+        # 关闭时仍挂着的连接直接取消（处理函数吞掉 CancelledError 正常结束）
+        clients, self._clients = list(self._clients), set()
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        for server in servers:
+            await server.wait_closed()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def endpoints(self) -> list[str]:
+        out = []
+        if self.unix_path:
+            out.append(f"unix:{self.unix_path}")
+        if self.tcp_port:
+            out.append(f"tcp:{self.host}:{self.tcp_port}")
+        if self.http_port:
+            out.append(f"http://{self.host}:{self.http_port}/")
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "batches": self.batches,
+            "commands": self.commands,
+            "errors": self.errors,
+            "frames": self.frames,
+            "stalls": self.stalls,
+            "stall_ms": self.stall_s * 1000.0,
+        }
+
+    # ---------- 公共处理 ----------
+
+    # 含帧的批次和流模式一样受背压约束
+    async def _apply(self, obj) -> int:
+        commands = parse_batch(obj)
+        frames = sum(c.op == "frame" for c in commands)
+        if frames:
+            await self._wait_backlog()
+        self.target.apply(commands)
+        self.batches += 1
+        self.commands += len(commands)
+        self.frames += frames
+        if frames:
+            await asyncio.sleep(0)
+        return len(commands)
+
+    async def _send_frame(self, pixels: bytes):
+        await self._wait_backlog()
+        self.target.send_frame(pixels)
+        self.frames += 1
+        # 目标可能经 call_soon_threadsafe 入队：让出一轮，下一帧前的积压读数才是真实的
+        await asyncio.sleep(0)
+
+    # 积压超过水位时让出事件循环，直到设备队列追上；超时抛 BacklogError
+    async def _wait_backlog(self):
+        if self.target.backlog() <= self.high_water:
+            return
+        self.stalls += 1
+        t0 = time.monotonic()
+        try:
+            while self.target.backlog() > self.high_water:
+                if time.monotonic() - t0 > self.backlog_timeout:
+                    raise BacklogError(f"device backlog did not drain within {self.backlog_timeout:g} s")
+                await asyncio.sleep(0.001)
+        finally:
+            self.stall_s += time.monotonic() - t0
+
+    # ---------- 行协议 ----------
+
+    async def _serve_lines(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    self.errors += 1
+                    await self._reply(writer, {"ok": False, "error": "line too long"})
+                    return
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+
+                reply: dict = {}
+                try:
+                    obj = json.loads(line)
+                    if isinstance(obj, dict) and "id" in obj:
+                        reply["id"] = obj["id"]
+                    if isinstance(obj, dict) and obj.get("op") == "stream":
+                        await self._reply(writer, {**reply, "ok": True, "stream": True})
+                        try:
+                            count = await self._stream(reader)
+                        except ControlError as e:
+                            # 帧边界已经错乱，或设备积压一直不退，只能断开
+                            self.errors += 1
+                            await self._reply(writer, {**reply, "ok": False, "error": str(e)})
+                            return
+                        await self._reply(writer, {**reply, "ok": True, "frames": count})
+                        continue
+                    reply.update(ok=True, applied=await self._apply(obj))
+                except (ValueError, ControlError) as e:
+                    self.errors += 1
+                    reply.update(ok=False, error=str(e))
+                await self._reply(writer, reply)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def _stream(self, reader: asyncio.StreamReader) -> int:
+        count = 0
+        while True:
+            (n,) = FRAME_LEN.unpack(await reader.readexactly(FRAME_LEN.size))
+            if n == 0:
+                return count
+            if n % 3 or n > MAX_FRAME:
+                raise ControlError(f"stream frame of {n} bytes is not a whole number of RGB pixels")
+            await self._send_frame(await reader.readexactly(n))
+            count += 1
+
+    async def _reply(self, writer: asyncio.StreamWriter, obj: dict):
+        writer.write(json.dumps(obj, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+
+    # ---------- HTTP ----------
+
+    async def _serve_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    return
+                parts = request.decode("latin-1").split()
+                if len(parts) != 3:
+                    return
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0") or 0)
+                if length > MAX_LINE:
+                    await self._respond(writer, 413, {"ok": False, "error": "body too large"}, False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(parts[0], parts[1], body)
+                keep = headers.get("connection", "").lower() != "close" and parts[2] == "HTTP/1.1"
+                await self._respond(writer, status, payload, keep)
+                if not keep:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        try:
+            if method == "POST" and path == "/commands":
+                return 200, {"ok": True, "applied": await self._apply(json.loads(body or b"null"))}
+            if method == "POST" and path == "/frame":
+                if not body or len(body) % 3 or len(body) > MAX_FRAME:
+                    raise ControlError(f"frame body of {len(body)} bytes is not a whole number of RGB pixels")
+                await self._send_frame(body)
+                return 200, {"ok": True}
+            if method == "GET" and path == "/state":
+                return 200, {"ok": True, **self.target.state()}
+            if method == "GET" and path == "/stats":
+                return 200, {"ok": True, **self.stats()}
+        except (ValueError, ControlError) as e:
+            self.errors += 1
+            return 503 if isinstance(e, BacklogError) else 400, {"ok": False, "error": str(e)}
+        return 404, {"ok": False, "error": f"no route for {method} {path}"}
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep: bool):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  503: "Service Unavailable"}.get(status, "")
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+# ---------- 命令行客户端 ----------
+
+def _connect(args) -> socket.socket:
+    if args.tcp:
+        return socket.create_connection(("127.0.0.1", args.tcp), timeout=5.0)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5.0)
+    sock.connect(args.unix)
+    return sock
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="prismfx-control", description="send a command batch to a running PrismFX")
+    ap.add_argument("commands", nargs="+", help="JSON command objects, applied as one batch")
+    ap.add_argument("--unix", default=default_unix_path())
+    ap.add_argument("--tcp", type=int, default=0 if default_unix_path() else DEFAULT_TCP_PORT)
+    args = ap.parse_args(argv)
+
+    batch = {"id": 1, "commands": [json.loads(c) for c in args.commands]}
+    with _connect(args) as sock:
+        sock.sendall(json.dumps(batch).encode() + b"\n")
+        reply = sock.makefile("rb").readline()
+    print(reply.decode().rstrip())
+    return 0 if json.loads(reply).get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
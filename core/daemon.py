@@ -0,0 +1,416 @@
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+
+from core.color import hex_to_hs
+from core.control import DEFAULT_TCP_PORT, Command, ControlServer, default_unix_path
+from core.effects import EFFECTS, create_effect
+from core.group import DeviceGroup
+from core.scheduler import FixedStepScheduler
+from core.store import StateStore, load_calibration
+from core.telemetry import Telemetry
+from core.transport.base import DeviceInfo
+from core.transport.registry import discover_all
+from core.transport.worker import TransportWorker
+
+# 无界面守护进程：复用 core 的设备 / 灯效 / 颜色模块，不导入 ui，也就不加载 Qt 与 Fluent 控件
+# python -m core.daemon --device socket:127.0.0.1:47800 --effect rainbow --leds 300 --fps 60
+# python -m core.daemon --scan --gif demo.gif --report 5
+# python -m core.daemon --emulator 2 --split --effect comet        # 自带虚拟设备，便于无硬件验证
+# python -m core.daemon --emulator 1 --audio song.wav --report 1   # 音频律动
+# python -m core.daemon --emulator 1 --effect fire --program       # 编译成程序上传给控制器执行（见 core.program）
+# python -m core.daemon --emulator 1 --timeline show.json          # 关键帧时间轴（Program.to_dict 的 JSON）
+# 不指定 --effect / --gif / --color 时恢复界面上次的静态颜色（读取状态存储的 last_state）
+# --control 开本地控制接口（见 core.control），此时可以不指定初始内容，等外部命令驱动
+
+
+# "kind:address"，例如 socket:127.0.0.1:47800、serial:COM3、ble:AA:BB:CC:DD:EE:FF
+def parse_device(text: str) -> DeviceInfo:
+    kind, sep, address = text.partition(":")
+    if not sep or not address:
+        raise ValueError(f"device must look like kind:address, got {text!r}")
+    return DeviceInfo(kind, address, address)
+
+
+class Daemon:
+    # 设备组 + 一个帧源（灯效调度器或 GIF 播放器），主线程只负责定时汇报和等待退出信号
+
+    def __init__(self, leds: int, fps: float = 60.0, store: StateStore | None = None,
+                 delta: bool = False, queue_size: int = 16):
+        self.leds = leds
+        self.fps = fps
+        self.store = store
+        self.queue_size = queue_size
+
+        self.worker = TransportWorker()
+        self.group = DeviceGroup(self.worker, leds)
+        self.group.set_delta(delta)
+        self.telemetry = Telemetry()
+        self.telemetry.add_source("devices", self.group.stats)
+
+        self._source = None
+        self._audio = None                  # 音频律动效果（持有音源），随帧源一起停止
+        self._session = None                # 程序模式：控制器自己执行上传的程序，主机不推流
+        self._program: dict | None = None   # 正在执行的程序的大小报告
+        self._mode: dict = {}           # 当前帧源
+        self._static: dict = {}         # 最近一次静态命令
+        self._stop = threading.Event()
+        self._emulators = []
+        self.control: ControlServer | None = None
+        # 控制接口的命令 / 帧按到达顺序排队，在控制线程执行：换帧源要等线程退出，不能放在传输线程
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._control_thread: threading.Thread | None = None
+
+    def start(self):
+        self.worker.start()
+
+    def add_device(self, info: DeviceInfo, span: tuple[int, int] | None = None):
+        member = self.group.add(info, span, queue_size=self.queue_size)
+        if self.store is not None:
+            member.link.correction().set_calibration(load_calibration(self.store, info.address))
+        return member
+
+    # 在传输线程上起 n 台虚拟设备并加入设备组
+    def add_emulators(self, n: int, port: int):
+        from core.emulator import VirtualDevice
+
+        for i in range(n):
+            dev = VirtualDevice(f"virt-{i:02d}", self.leds, port=port + i)
+            self.worker.call(dev.start()).result()
+            self._emulators.append(dev)
+            self.add_device(DeviceInfo("socket", dev.address(), dev.name))
+
+    # 阻塞等待所有成员连上，返回耗时（秒）；超时返回 None
+    def wait_connected(self, timeout: float = 5.0) -> float | None:
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < timeout:
+            channels = [m.channel() for m in self.group.members()]
+            if channels and all(ch is not None and ch.state == "connected" for ch in channels):
+                return time.monotonic() - t0
+            time.sleep(0.01)
+        return None
+
+    # ---------- 帧源 ----------
+
+    def run_effect(self, name: str, **params):
+        scheduler = FixedStepScheduler(self.fps, self.group.send_frame)
+        scheduler.set_effect(create_effect(name, self._scene_leds(), **params))
+        self._set_source(scheduler)
+        self._mode = {"effect": name, **params}
+
+    # Pillow 只在播放 GIF 时导入
+    def run_gif(self, path: str):
+        from core.gif import GifPlayer
+
+        self._set_source(GifPlayer(path, self._scene_leds(), self.group.send_frame))
+        self._mode = {"gif": path}
+
+    # 音源规格见 core.audio.open_source；帧带上分析开始时刻，分析到写出的耗时记入 ui_ms
+    def run_audio(self, spec: str, speed: float = 1.0):
+        from core.audio import AudioReactive, open_source
+
+        source = open_source(spec)
+        source.start()
+        effect = AudioReactive(self._scene_leds(), speed=speed, source=source)
+        scheduler = FixedStepScheduler(self.fps, lambda px: self.group.send_frame(px, origin=effect.origin))
+        scheduler.set_effect(effect)
+        self._set_source(scheduler)
+        self._audio = effect
+        self._mode = {"audio": spec}
+
+    # 上传编译好的程序并启动；设备组成员各自按 span 起点执行场景中属于自己的一段
+    def run_program(self, blob: bytes, label: str = ""):
+        from core.program import ProgramSession, size_report
+
+        self._set_source(None)
+        if self._session is None:
+            self._session = ProgramSession(self.group)
+        self._session.upload(blob)
+        self._session.start()
+        self._program = size_report(blob)
+        self._mode = {"program": label, "bytes": len(blob)}
+
+    def run_timeline(self, path: str):
+        from core.program import Program, compile_program
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        prog = Program.from_dict(data, None if "leds" in data else self._scene_leds())
+        self.run_program(compile_program(prog), path)
+
+    def set_static(self, h: int, s: int, brightness: int, power: bool = True):
+        self._set_source(None)
+        self.group.send_command("power", power)
+        self.group.send_command("hs", (h, s))
+        self.group.send_command("brightness", brightness)
+        self._mode = {}
+        self._static = {"hs": [h, s], "brightness": brightness, "power": power}
+
+    # 界面上次的静态状态；没有记录时返回 None
+    def last_state(self) -> tuple[int, int, int, bool] | None:
+        if self.store is None:
+            return None
+        last = self.store.section("last_state")
+        if "hs" not in last:
+            return None
+        h, s = last["hs"]
+        return h, s, last.get("brightness", 80), last.get("power", True)
+
+    def _scene_leds(self) -> int:
+        spans = [m.span for m in self.group.members() if m.span is not None]
+        return max([start + count for start, count in spans], default=self.leds)
+
+    def _set_source(self, source):
+        if self._source is not None:
+            self._source.stop()
+        if self._audio is not None:
+            self._audio.source.stop()
+            self._audio = None
+        if self._program is not None:
+            self._session.stop()
+            self._program = None
+        self._source = source
+        if source is not None:
+            source.start()
+
+    # ---------- 控制接口 ----------
+
+    def start_control(self, unix_path: str | None, tcp_port: int = 0, http_port: int = 0):
+        self._control_thread = threading.Thread(target=self._control_loop, name="prismfx-control", daemon=True)
+        self._control_thread.start()
+        self.control = ControlServer(self, unix_path, tcp_port, http_port)
+        self.worker.call(self.control.start()).result(5.0)
+
+    # 传输线程：只排队，立即返回
+    def apply(self, commands: list[Command]):
+        self._jobs.put((self._apply, commands))
+
+    def send_frame(self, pixels: bytes):
+        self._jobs.put((self._send_frame, pixels))
+
+    # 还没交给设备组的命令 / 帧也算积压，背压才能传回生产者
+    def backlog(self) -> int:
+        return self.group.backlog() + self._jobs.qsize()
+
+    def state(self) -> dict:
+        return {**self._static, **self._mode}
+
+    # 控制线程
+    def _control_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            fn, arg = job
+            try:
+                fn(arg)
+            except Exception as e:
+                print(f"control: {e!r}", file=sys.stderr)
+
+    def _apply(self, commands: list[Command]):
+        for c in commands:
+            if c.op == "frame":
+                self._send_frame(c.args["pixels"])
+            elif c.op == "effect":
+                if c.args["name"] is None:
+                    self._set_source(None)
+                    self._mode = {}
+                else:
+                    speed = c.args["speed"] if c.args["speed"] is not None else self._mode.get("speed", 1.0)
+                    self.run_effect(c.args["name"], speed=speed)
+            else:
+                key, value = {
+                    "color": ("hs", (c.args.get("h"), c.args.get("s"))),
+                    "brightness": ("brightness", c.args.get("value")),
+                    "power": ("power", c.args.get("on")),
+                }[c.op]
+                self.group.send_command(key, value)
+                self._static[key] = list(value) if key == "hs" else value
+
+    # 外部帧接管输出：先停掉正在播放的帧源
+    def _send_frame(self, pixels: bytes):
+        if self._source is not None or self._program is not None:
+            self._set_source(None)
+        self._mode = {"stream": True}
+        self.group.send_frame(pixels)
+
+    # ---------- 运行 ----------
+
+    def request_stop(self):
+        self._stop.set()
+
+    # 每 report 秒 PING 一次并输出一行 JSON 汇总；report 为 0 时不输出
+    def run(self, duration: float = 0.0, report: float = 0.0, out=sys.stdout):
+        deadline = time.monotonic() + duration if duration > 0 else None
+        tick = report if report > 0 else 1.0
+        while not self._stop.is_set():
+            wait = tick if deadline is None else min(tick, deadline - time.monotonic())
+            if wait <= 0 or self._stop.wait(wait):
+                break
+            self.group.ping()
+            snap = self.telemetry.sample()
+            if report > 0:
+                out.write(json.dumps(self.summary(snap), ensure_ascii=False) + "\n")
+                out.flush()
+
+    def summary(self, snap: dict | None = None) -> dict:
+        snap = snap or self.telemetry.latest()
+        out = {"t": round(time.time(), 3), "devices": {}}
+        for name, st in snap.get("devices", {}).items():
+            out["devices"][name] = {
+                "state": st.get("state"),
+                "fps": round(st.get("frames_per_s", 0.0), 1),
+                "bytes_per_s": round(st.get("sent_bytes_per_s", 0.0)),
+                "queue": st.get("queue", 0),
+                "dropped": st.get("dropped", 0),
+                "rtt_ms": round(st.get("rtt_ms", {}).get("p50", 0.0), 2),
+            }
+        # 帧源可能正被控制线程替换：各取一次引用再用
+        source, audio, program = self._source, self._audio, self._program
+        if source is not None:
+            out["source"] = source.stats()
+        if audio is not None:
+            out["audio"] = audio.stats()
+        if program is not None:
+            out["program"] = {**program, "param_updates": self._session.param_updates}
+        if self.control is not None:
+            out["control"] = self.control.stats()
+        return out
+
+    def close(self):
+        if self.control is not None:
+            try:
+                self.worker.call(self.control.stop()).result(2.0)
+            except Exception:
+                pass
+        if self._control_thread is not None:
+            self._jobs.put(None)
+            self._control_thread.join(5.0)
+            self._control_thread = None
+        self._set_source(None)
+        for f in self.group.close():
+            try:
+                f.result(2.0)
+            except Exception:
+                pass
+        for dev in self._emulators:
+            self.worker.call(dev.stop()).result(2.0)
+        self.worker.stop()
+        if self.store is not None:
+            self.store.close()
+
+
+def _scan(worker: TransportWorker, timeout: float) -> list[DeviceInfo]:
+    return worker.call(discover_all(timeout)).result(timeout + 2.0)
+
+
+# --control 不带值：默认 Unix 套接字（不支持时 127.0.0.1 TCP）；纯数字为 TCP 端口；否则为套接字路径
+def _control_endpoint(value: str | None) -> tuple[str | None, int]:
+    if value is None:
+        return None, 0
+    if value.isdigit():
+        return None, int(value)
+    if value:
+        return value, 0
+    path = default_unix_path()
+    return (path, 0) if path else (None, DEFAULT_TCP_PORT)
+
+
+def main(argv: list[str] | None = None) -> int:
+    t_start = time.perf_counter()
+    ap = argparse.ArgumentParser(prog="prismfx-daemon", description="PrismFX headless controller")
+    ap.add_argument("--device", action="append", default=[], help="kind:address, repeatable")
+    ap.add_argument("--scan", action="store_true", help="add every device found by discovery")
+    ap.add_argument("--emulator", type=int, default=0, help="start N in-process virtual devices")
+    ap.add_argument("--emulator-port", type=int, default=47860)
+    ap.add_argument("--split", action="store_true", help="give each device its own slice of the scene")
+    ap.add_argument("--leds", type=int, default=300, help="leds per device")
+    ap.add_argument("--fps", type=float, default=60.0)
+    ap.add_argument("--delta", action="store_true", help="send delta frames")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--effect", choices=sorted(EFFECTS))
+    mode.add_argument("--gif")
+    mode.add_argument("--timeline", metavar="JSON", help="keyframed timeline compiled and uploaded as a program")
+    mode.add_argument("--color", help="static colour, e.g. #FF8800")
+    mode.add_argument("--audio", metavar="SPEC", help="audio-reactive: WAV path, - (s16le mono 44.1 kHz on stdin), "
+                                                     "pipe:PATH or live[:DEVICE]")
+    ap.add_argument("--speed", type=float, default=1.0)
+    ap.add_argument("--program", action="store_true", help="upload --effect as a program instead of streaming frames")
+    ap.add_argument("--brightness", type=int, default=80)
+    ap.add_argument("--control", nargs="?", const="", default=None, metavar="PATH|PORT",
+                    help="serve the local control API on a unix socket (default path) or a localhost TCP port")
+    ap.add_argument("--http", type=int, default=0, metavar="PORT", help="also serve the control API over HTTP")
+    ap.add_argument("--no-store", action="store_true", help="ignore saved calibration / last state")
+    ap.add_argument("--duration", type=float, default=0.0, help="seconds, 0 = until SIGINT/SIGTERM")
+    ap.add_argument("--report", type=float, default=0.0, help="print a JSON stats line every N seconds")
+    args = ap.parse_args(argv)
+
+    store = None if args.no_store else StateStore()
+    daemon = Daemon(args.leds, args.fps, store, args.delta)
+    daemon.start()
+
+    try:
+        infos = [parse_device(d) for d in args.device]
+        if args.scan:
+            infos += _scan(daemon.worker, 3.0)
+        for i, info in enumerate(infos):
+            daemon.add_device(info, (i * args.leds, args.leds) if args.split else None)
+        if args.emulator:
+            base = len(infos)
+            daemon.add_emulators(args.emulator, args.emulator_port)
+            if args.split:
+                for i, m in enumerate(daemon.group.members()[base:], base):
+                    daemon.group.set_span(m.name, (i * args.leds, args.leds))
+        if not len(daemon.group):
+            print("no devices: use --device, --scan or --emulator", file=sys.stderr)
+            return 2
+
+        controlled = args.control is not None or args.http > 0
+        if controlled:
+            daemon.start_control(*_control_endpoint(args.control), args.http)
+
+        connected = daemon.wait_connected()
+        ready_ms = (time.perf_counter() - t_start) * 1000.0
+        ready = {"ready_ms": round(ready_ms, 1), "devices": len(daemon.group), "connected": connected is not None}
+        if controlled:
+            ready["control"] = daemon.control.endpoints()
+        print(json.dumps(ready), flush=True)
+
+        if args.effect and args.program:
+            from core.program import compile_effect
+
+            daemon.run_program(compile_effect(args.effect, daemon._scene_leds(), round(args.fps), args.speed),
+                               args.effect)
+        elif args.effect:
+            daemon.run_effect(args.effect, speed=args.speed)
+        elif args.timeline:
+            daemon.run_timeline(args.timeline)
+        elif args.gif:
+            daemon.run_gif(args.gif)
+        elif args.audio:
+            daemon.run_audio(args.audio, speed=args.speed)
+        elif args.color:
+            h, s = hex_to_hs(args.color)
+            daemon.set_static(h, s, args.brightness)
+        else:
+            last = daemon.last_state()
+            if last is not None:
+                daemon.set_static(*last)
+            elif not controlled:
+                print("nothing to play: use --effect, --gif, --timeline, --color or --control", file=sys.stderr)
+                return 2
+
+        signal.signal(signal.SIGINT, lambda *_: daemon.request_stop())
+        signal.signal(signal.SIGTERM, lambda *_: daemon.request_stop())
+        daemon.run(args.duration, args.report)
+    finally:
+        daemon.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
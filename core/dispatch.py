@@ -0,0 +1,98 @@
+import time
+from typing import Any, Callable
+
+
+class CommandCoalescer:
+    # 按参数合并的命令调度层：同一个 key 只保留最新值，按最大发送频率节流，提交时立即冲刷
+    # on_skip(key)：待发值与上次发送相同、不再发送时回调，调用方据此清理该 key 的附带状态
+
+    def __init__(self, send: Callable[[str, Any], None], max_rate_hz: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_skip: Callable[[str], None] | None = None):
+        self._send = send
+        self._on_skip = on_skip
+        self._clock = clock
+        self._pending: dict[str, Any] = {}
+        self._last_sent: dict[str, Any] = {}
+        self._last_send_t = float("-inf")
+        self.set_max_rate(max_rate_hz)
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+
+    def set_max_rate(self, max_rate_hz: float):
+        self._interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+
+    def interval(self) -> float:
+        return self._interval
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    # 预览值：覆盖同 key 未发送的旧值
+    def submit(self, key: str, value: Any):
+        self.submitted += 1
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = value
+
+    # 最终值：丢弃同 key 的待发值，立即发送（与上次发送相同也照发，确保最终值一定送达）
+    def commit(self, key: str, value: Any):
+        self.submitted += 1
+        if self._pending.pop(key, None) is not None:
+            self.coalesced += 1
+        self._emit(key, value, force=True)
+
+    # 到发送时间就把所有待发 key 各发一次，返回本次发送条数
+    def pump(self) -> int:
+        if not self._pending:
+            return 0
+
+        now = self._clock()
+        if now - self._last_send_t < self._interval:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        n = 0
+        for key, value in pending.items():
+            n += self._emit(key, value)
+        self._last_send_t = now
+        return n
+
+    # 距下次可发送还剩多少秒
+    def time_until_due(self) -> float:
+        return max(0.0, self._last_send_t + self._interval - self._clock())
+
+    # 立即发送所有待发值（退出 / 断开前使用）
+    def flush(self) -> int:
+        pending, self._pending = self._pending, {}
+        n = 0
+        for key, value in pending.items():
+            n += self._emit(key, value, force=True)
+        return n
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "pending": len(self._pending),
+        }
+
+    def _emit(self, key: str, value: Any, force: bool = False) -> int:
+        if not force and self._last_sent.get(key, _MISSING) == value:
+            self.coalesced += 1
+            if self._on_skip is not None:
+                self._on_skip(key)
+            return 0
+
+        self._last_sent[key] = value
+        self._send(key, value)
+        self.sent += 1
+        if force:
+            self._last_send_t = self._clock()
+        return 1
+
+
+_MISSING = object()
@@ -0,0 +1,162 @@
+import numpy as np
+
+from core.color import hsv_to_rgb
+
+# 动态灯效：每个 tick 用整条灯带的数组运算生成一帧，不做逐灯 Python 循环
+# render(t, dt) 返回 (leds, 3) uint8；返回的数组归效果所有，下一次 render 会被覆盖
+
+
+class Effect:
+    name = ""
+    title = ""
+
+    def __init__(self, leds: int, speed: float = 1.0, color: tuple[int, int, int] = (255, 120, 40)):
+        self.leds = leds
+        self.speed = speed
+        self.color = np.array(color, np.float32)
+        self._idx = np.arange(leds, dtype=np.float32)
+        self._out = np.zeros((leds, 3), np.uint8)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        raise NotImplementedError
+
+    def _emit(self, rgb01: np.ndarray) -> np.ndarray:
+        np.multiply(rgb01, 255.0, out=rgb01)
+        np.clip(rgb01, 0.0, 255.0, out=rgb01)
+        self._out[...] = rgb01
+        return self._out
+
+
+class Rainbow(Effect):
+    name = "rainbow"
+    title = "彩虹"
+
+    def __init__(self, leds: int, speed: float = 1.0, density: float = 1.0, **kw):
+        super().__init__(leds, speed, **kw)
+        self._base = self._idx * (360.0 * density / max(1, leds))
+        self._ones = np.ones(leds, np.float32)
+        self._rgb = np.empty((leds, 3), np.float32)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        hue = self._base + (t * self.speed * 120.0)
+        return self._emit(hsv_to_rgb(hue, self._ones, self._ones, self._rgb))
+
+
+class Breathing(Effect):
+    name = "breathing"
+    title = "呼吸"
+
+    def __init__(self, leds: int, speed: float = 1.0, period: float = 4.0, **kw):
+        super().__init__(leds, speed, **kw)
+        self.period = period
+        self._rgb = np.empty((leds, 3), np.float32)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        level = 0.5 - 0.5 * np.cos(2.0 * np.pi * t * self.speed / self.period)
+        self._rgb[...] = self.color * (level * level / 255.0)
+        return self._emit(self._rgb)
+
+
+class Comet(Effect):
+    name = "comet"
+    title = "流星"
+
+    def __init__(self, leds: int, speed: float = 1.0, tail: float = 0.15, **kw):
+        super().__init__(leds, speed, **kw)
+        self.tail = max(1.0, tail * leds)
+        self._rgb = np.empty((leds, 3), np.float32)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        head = (t * self.speed * self.leds * 0.5) % self.leds
+        dist = (head - self._idx) % self.leds
+        level = np.exp(-dist / (self.tail / 3.0))
+        level[dist > self.tail] = 0.0
+        np.multiply(level[:, None], self.color / 255.0, out=self._rgb)
+        return self._emit(self._rgb)
+
+
+class Fire(Effect):
+    name = "fire"
+    title = "火焰"
+
+    def __init__(self, leds: int, speed: float = 1.0, cooling: float = 0.55, sparking: float = 0.5,
+                 seed: int | None = None, **kw):
+        super().__init__(leds, speed, **kw)
+        self.cooling = cooling
+        self.sparking = sparking
+        self._rng = np.random.default_rng(seed)
+        self._heat = np.zeros(leds, np.float32)
+        self._palette = self._build_palette()
+        self._spark_zone = max(1, leds // 10)
+
+    @staticmethod
+    def _build_palette() -> np.ndarray:
+        # 黑 -> 红 -> 黄 -> 白 的 256 级热度色表
+        x = np.arange(256, dtype=np.float32) / 255.0
+        r = np.clip(x * 3.0, 0.0, 1.0)
+        g = np.clip(x * 3.0 - 1.0, 0.0, 1.0)
+        b = np.clip(x * 3.0 - 2.0, 0.0, 1.0)
+        return (np.stack([r, g, b], axis=1) * 255.0).astype(np.uint8)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        steps = dt * 60.0 * self.speed
+        heat = self._heat
+
+        # 冷却
+        heat -= self._rng.random(self.leds, dtype=np.float32) * (self.cooling * 0.15 * steps)
+        np.maximum(heat, 0.0, out=heat)
+
+        # 热量向上扩散：三点加权平均
+        up = np.empty_like(heat)
+        up[2:] = (heat[1:-1] + heat[:-2] * 2.0) / 3.0
+        up[:2] = heat[:2]
+        heat[...] = heat + (up - heat) * min(1.0, steps)
+
+        # 底部随机点火
+        if self._rng.random() < self.sparking * min(1.0, steps):
+            i = self._rng.integers(0, self._spark_zone)
+            heat[i] = min(1.0, heat[i] + self._rng.uniform(0.6, 1.0))
+
+        self._out[...] = self._palette[(heat * 255.0).astype(np.uint8)]
+        return self._out
+
+
+class Twinkle(Effect):
+    name = "twinkle"
+    title = "闪烁"
+
+    def __init__(self, leds: int, speed: float = 1.0, density: float = 0.02, decay: float = 2.5,
+                 seed: int | None = None, **kw):
+        super().__init__(leds, speed, **kw)
+        self.density = density
+        self.decay = decay
+        self._rng = np.random.default_rng(seed)
+        self._level = np.zeros(leds, np.float32)
+        self._hue = np.zeros(leds, np.float32)
+        self._sat = np.full(leds, 0.35, np.float32)
+        self._rgb = np.empty((leds, 3), np.float32)
+
+    def render(self, t: float, dt: float) -> np.ndarray:
+        step = dt * self.speed
+        self._level *= np.float32(np.exp(-self.decay * step))
+
+        spark = self._rng.random(self.leds, dtype=np.float32) < self.density * step * 60.0
+        n = int(spark.sum())
+        if n:
+            self._level[spark] = 1.0
+            self._hue[spark] = self._rng.random(n, dtype=np.float32) * 360.0
+
+        return self._emit(hsv_to_rgb(self._hue, self._sat, self._level, self._rgb))
+
+
+EFFECTS: dict[str, type[Effect]] = {
+    cls.name: cls for cls in (Rainbow, Breathing, Comet, Fire, Twinkle)
+}
+
+
+def create_effect(name: str, leds: int, **params) -> Effect:
+    try:
+        cls = EFFECTS[name]
+    except KeyError:
+        raise ValueError(f"unknown effect: {name}") from None
+    return cls(leds, **params)
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import collections
+import random
+import statistics
+import time
+from dataclasses import dataclass
+
+from core.protocol.codec import (
+    Encoder, MsgType, decode,
+    parse_brightness, parse_color_hs, parse_frame, parse_power, parse_sync_start,
+)
+from core.protocol.delta import DeltaDecoder
+from core.protocol.fragment import FRAG, MAX_INDEX, Reassembler
+from core.program import ACK, ProgramExecutor
+from core.transport.socket_link import DEFAULT_HOST, DEFAULT_PORT, DOWN, HELLO, HELLO_MAGIC, UP
+
+# 虚拟 PrismFX 设备：模拟下位机固件，供 CI / 基准测试在无硬件时使用
+# 运行：python -m core.emulator --leds 300 --mtu 244 --bandwidth 20000 --latency 8 --jitter 3 --loss 0.01
+# 脚本化掉线：--drop-every 10 每 10 s 断开所有主机连接；加 --outage 2 则同时断电 2 s（停止监听、状态清零）
+
+
+@dataclass
+class LinkProfile:
+    mtu: int = 244
+    bandwidth: float = 0.0          # 字节/秒，0 表示不限
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    loss: float = 0.0               # 单片丢失概率
+
+
+class VirtualDevice:
+
+    def __init__(self, name: str = "PrismFX-Virtual", leds: int = 300,
+                 profile: LinkProfile | None = None, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, seed: int | None = None):
+        self.name = name
+        self.leds = leds
+        self.profile = profile or LinkProfile()
+        self.host = host
+        self.port = port
+
+        self.pixels = bytearray(leds * 3)
+        self.power = False
+        self.hs = (0, 0)
+        self.brightness = 100
+        self.start_at: float | None = None        # 收到 SYNC_START 后的本地起点（time.monotonic）
+        self.delta = DeltaDecoder()
+        self.program = ProgramExecutor(leds)      # 上传的灯效程序，START 后由本地定时任务逐帧执行
+        self._program_task: asyncio.Task | None = None
+        self._enc = Encoder(0, ACK.size)          # 上行应答（PONG / PROGRAM_ACK）
+
+        self._rng = random.Random(seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._conns: set[asyncio.StreamWriter] = set()
+        self._latency = collections.deque(maxlen=4096)
+
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.chunks_received = 0
+        self.chunks_lost = 0
+        self.bytes_received = 0
+        self.pings = 0
+        self.program_frames = 0
+        self.connections = 0
+        self.disconnects = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+
+    async def stop(self):
+        self._stop_program()
+        if self._server is not None:
+            self._server.close()
+            self.drop()
+            await self._server.wait_closed()
+            self._server = None
+
+    # ---------- 脚本化掉线 ----------
+
+    # 模拟链路中断：直接断开当前所有主机连接，仍在监听，可以立即重连
+    def drop(self) -> int:
+        conns = list(self._conns)
+        for writer in conns:
+            writer.transport.abort()
+        self.disconnects += len(conns)
+        return len(conns)
+
+    # 模拟断电：停止监听并断开，seconds 后重新上电（灯珠 / 电源 / 颜色回到出厂状态）
+    # port 给出时换到新端口上电，模拟地址变化，只能靠扫描按名字找回
+    async def outage(self, seconds: float, port: int | None = None):
+        await self.stop()
+        self.reboot()
+        await asyncio.sleep(seconds)
+        if port is not None:
+            self.port = port
+        await self.start()
+
+    def reboot(self):
+        self._stop_program()
+        self.pixels[:] = bytes(len(self.pixels))
+        self.power = False
+        self.hs = (0, 0)
+        self.brightness = 100
+        self.start_at = None
+        self.delta.invalidate()
+
+    # 周期性掉线；outage > 0 时每次都断电 outage 秒
+    async def flap(self, every: float, outage: float = 0.0):
+        while True:
+            await asyncio.sleep(every)
+            if outage > 0:
+                await self.outage(outage)
+            else:
+                self.drop()
+
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def stats(self) -> dict:
+        lat = list(self._latency)
+        out = {
+            "frames_received": self.frames_received,
+            "frames_dropped": self.frames_dropped,
+            "chunks_received": self.chunks_received,
+            "chunks_lost": self.chunks_lost,
+            "bytes_received": self.bytes_received,
+            "delta_applied": self.delta.applied,
+            "delta_rejected": self.delta.rejected,
+            "pings": self.pings,
+            "connections": self.connections,
+            "disconnects": self.disconnects,
+            "program": {**self.program.stats(), "frames": self.program_frames},
+        }
+        if self.start_at is not None:
+            out["start_at"] = self.start_at
+        if lat:
+            lat.sort()
+            out["latency_ms"] = {
+                "mean": statistics.fmean(lat),
+                "p50": lat[len(lat) // 2],
+                "p95": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+                "max": lat[-1],
+            }
+        return out
+
+    def reset_stats(self):
+        self._latency.clear()
+        self.frames_received = self.frames_dropped = 0
+        self.chunks_received = self.chunks_lost = self.bytes_received = 0
+        self.pings = 0
+        self.program_frames = 0
+        self.delta.applied = self.delta.rejected = 0
+
+    # ---------- 连接处理 ----------
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(HELLO.pack(HELLO_MAGIC, self.profile.mtu, self.name.encode()[:16]))
+        self._conns.add(writer)
+        self.connections += 1
+
+        inbox: asyncio.Queue = asyncio.Queue()
+        deliver = asyncio.get_running_loop().create_task(self._deliver(inbox, writer))
+        link_free = 0.0
+        last_arrival = 0.0
+
+        try:
+            while True:
+                n, t_sent_ns = UP.unpack(await reader.readexactly(UP.size))
+                chunk = await reader.readexactly(n)
+                self.chunks_received += 1
+                self.bytes_received += n
+
+                if self._rng.random() < self.profile.loss:
+                    self.chunks_lost += 1
+                    continue
+
+                # 链路排队 + 序列化时间 + 传播时延 / 抖动；同一连接保序
+                now = time.monotonic()
+                start = max(now, link_free)
+                link_free = start + (n / self.profile.bandwidth if self.profile.bandwidth > 0 else 0.0)
+                delay = self.profile.latency_ms + self._rng.uniform(-1.0, 1.0) * self.profile.jitter_ms
+                arrival = max(link_free + max(0.0, delay) / 1000.0, last_arrival)
+                last_arrival = arrival
+
+                inbox.put_nowait((arrival, t_sent_ns, chunk))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._conns.discard(writer)
+            deliver.cancel()
+            writer.close()
+
+    async def _deliver(self, inbox: asyncio.Queue, writer: asyncio.StreamWriter):
+        reasm = Reassembler()
+        first_sent_ns = 0
+        dropped_seen = 0
+
+        # 送达后立即回写应答；下行方向不模拟时延与带宽
+        def reply(msg_type: int, payload):
+            data = bytes(self._enc.message(msg_type, payload))
+            writer.write(DOWN.pack(len(data)) + data)
+
+        while True:
+            arrival, t_sent_ns, chunk = await inbox.get()
+            wait = arrival - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            if len(chunk) >= FRAG.size and FRAG.unpack_from(chunk)[1] & MAX_INDEX == 0:
+                first_sent_ns = t_sent_ns
+            # 任何一条坏消息只计入丢弃，不能让接收任务悄悄退出而 _serve 还在往 inbox 里塞
+            try:
+                msg = reasm.feed(chunk)
+            except Exception:
+                self.frames_dropped += 1
+                continue
+
+            if reasm.dropped != dropped_seen:
+                self.frames_dropped += reasm.dropped - dropped_seen
+                dropped_seen = reasm.dropped
+
+            if msg is None:
+                continue
+
+            try:
+                m = decode(msg)
+                self._apply(m.type, m.payload, reply)
+            except Exception:
+                self.frames_dropped += 1
+                continue
+
+            if m.type == MsgType.PING:
+                reply(MsgType.PONG, m.payload)
+                self.pings += 1
+
+            self.frames_received += 1
+            self._latency.append((time.monotonic_ns() - first_sent_ns) / 1e6)
+
+    def _apply(self, msg_type: int, payload: memoryview, reply=None):
+        if msg_type == MsgType.FRAME_DELTA:
+            self.delta.apply(payload, self.pixels)
+        elif msg_type == MsgType.FRAME:
+            # 整帧改写了灯珠缓冲，之后的增量帧要等下一个关键帧
+            self.delta.invalidate()
+            offset, rgb = parse_frame(payload)
+            start = offset * 3
+            end = min(len(self.pixels), start + rgb.nbytes)
+            if end > start:
+                self.pixels[start:end] = rgb[:end - start]
+        elif msg_type == MsgType.COLOR_HS:
+            self.hs = parse_color_hs(payload)
+        elif msg_type == MsgType.BRIGHTNESS:
+            self.brightness = parse_brightness(payload)
+        elif msg_type == MsgType.POWER:
+            self.power = parse_power(payload)
+        elif msg_type == MsgType.SYNC_START:
+            self.start_at = time.monotonic() + parse_sync_start(payload) / 1e6
+        elif msg_type in (MsgType.PROGRAM_UPLOAD, MsgType.PROGRAM_CTRL, MsgType.PROGRAM_PARAM,
+                          MsgType.PROGRAM_CORRECT):
+            action = self.program.feed(msg_type, payload, reply)
+            if action == "start":
+                self._stop_program()
+                self._program_task = asyncio.get_running_loop().create_task(self._run_program())
+            elif action == "stop":
+                self._stop_program()
+
+    # 模拟固件的渲染循环：按程序帧率推进，场景帧中属于本设备的一段写进灯珠缓冲
+    async def _run_program(self):
+        ex = self.program
+        while ex.is_running():
+            frame = ex.render()
+            part = frame[ex.led_offset:ex.led_offset + self.leds]
+            self.delta.invalidate()
+            self.pixels[:part.nbytes] = part.tobytes()
+            self.program_frames += 1
+            await asyncio.sleep(1.0 / ex.fps())
+
+    def _stop_program(self):
+        if self._program_task is not None:
+            self._program_task.cancel()
+            self._program_task = None
+
+
+async def _main(args):
+    profile = LinkProfile(args.mtu, args.bandwidth, args.latency, args.jitter, args.loss)
+    dev = VirtualDevice(args.name, args.leds, profile, args.host, args.port)
+    await dev.start()
+    print(f"{dev.name} listening on {dev.address()}")
+    flapping = None
+    if args.drop_every > 0:
+        flapping = asyncio.get_running_loop().create_task(dev.flap(args.drop_every, args.outage))
+    while flapping is None or not flapping.done():
+        await asyncio.sleep(args.report)
+        print(dev.stats())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PrismFX virtual device")
+    ap.add_argument("--name", default="PrismFX-Virtual")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--leds", type=int, default=300)
+    ap.add_argument("--mtu", type=int, default=244)
+    ap.add_argument("--bandwidth", type=float, default=0.0, help="bytes/s, 0 = unlimited")
+    ap.add_argument("--latency", type=float, default=0.0, help="ms")
+    ap.add_argument("--jitter", type=float, default=0.0, help="ms")
+    ap.add_argument("--loss", type=float, default=0.0, help="per-chunk loss probability")
+    ap.add_argument("--drop-every", type=float, default=0.0, help="drop all host connections every N seconds")
+    ap.add_argument("--outage", type=float, default=0.0, help="with --drop-every: stay powered off for N seconds")
+    ap.add_argument("--report", type=float, default=2.0, help="stats interval in seconds")
+    try:
+        asyncio.run(_main(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterator, NamedTuple
+
+import numpy as np
+from PIL import Image
+
+# GIF -> LED 帧流水线：逐帧惰性解码 + 向量化重采样 + 有界预读队列，内存占用与总帧数无关
+
+MIN_DELAY_MS = 20       # 浏览器对 0 / 过小延时的惯例处理
+CONVERT_VERSION = 2     # 转换结果变化时加一，旧的缓存条目不再命中
+
+
+class GifFrame(NamedTuple):
+    index: int
+    rgb: np.ndarray         # (H, W, 3) uint8
+    delay_ms: int
+    decode_ms: float
+
+
+class LedFrame(NamedTuple):
+    index: int
+    pixels: np.ndarray      # (leds, 3) uint8
+    delay_ms: int
+    decode_ms: float
+    resample_ms: float
+
+
+# 逐帧生成，任意时刻只持有当前帧
+def iter_gif_frames(path: str) -> Iterator[GifFrame]:
+    with Image.open(path) as img:
+        n = getattr(img, "n_frames", 1)
+        for i in range(n):
+            t0 = time.perf_counter()
+            img.seek(i)
+            rgb = np.asarray(img.convert("RGB"))
+            delay = int(img.info.get("duration", 100) or 0)
+            yield GifFrame(i, rgb, max(MIN_DELAY_MS, delay), (time.perf_counter() - t0) * 1000.0)
+
+
+def gif_info(path: str) -> dict:
+    with Image.open(path) as img:
+        return {"size": img.size, "frames": getattr(img, "n_frames", 1), "loop": img.info.get("loop", 0)}
+
+
+class StripResampler:
+    # 把整帧压到一条灯带：先按列求均值，再按 LED 把列分箱（reduceat），分箱边界按宽度缓存
+
+    def __init__(self, leds: int):
+        self.leds = leds
+        self._width = -1
+        self._starts: np.ndarray | None = None
+        self._counts: np.ndarray | None = None
+
+    def __call__(self, rgb: np.ndarray) -> np.ndarray:
+        w = rgb.shape[1]
+        if w != self._width:
+            self._prepare(w)
+
+        cols = rgb.mean(axis=0, dtype=np.float32)                       # (W, 3)
+        sums = np.add.reduceat(cols, self._starts, axis=0)              # (leds, 3)
+        return np.rint(sums / self._counts).astype(np.uint8)
+
+    def _prepare(self, w: int):
+        starts = np.minimum(np.linspace(0, w, self.leds + 1)[:-1].astype(np.int64), w - 1)
+        # reduceat 在相邻起点相同时只取单列，对应计数为 1（LED 多于列数时复用同一列）
+        nxt = np.append(starts[1:], w)
+        self._starts = starts
+        self._counts = np.where(nxt > starts, nxt - starts, 1)[:, None].astype(np.float32)
+        self._width = w
+
+
+class GifPlayer:
+    # 解码线程 -> 有界队列 -> 播放线程；播放线程按帧延时的绝对时刻推送到 sink
+
+    def __init__(self, path: str, leds: int, sink: Callable[[np.ndarray], None],
+                 lookahead: int = 8, loop: bool = True, layout=None, cache=None):
+        self.path = path
+        self.leds = layout.leds if layout is not None else leds
+        self.sink = sink
+        self.loop = loop
+        self.layout = layout
+        self.cache = cache          # core.asset_cache.AssetCache：转换结果按源文件 + 参数缓存，重复播放直接映射
+        self.cached = False
+
+        self._queue: queue.Queue = queue.Queue(maxsize=lookahead)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        # 有空间布局时按布局采样（core.layout，映射按画面尺寸缓存），否则整帧压成一条灯带
+        self._resample = layout.sample if layout is not None else StripResampler(leds)
+
+        self.frames = 0
+        self.late = 0
+        self.decode_ms = 0.0
+        self.resample_ms = 0.0
+        self.last_decode_ms = 0.0
+        self.last_resample_ms = 0.0
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._produce, name="gif-decode", daemon=True),
+            threading.Thread(target=self._play, name="gif-play", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(1.0)
+        self._threads = []
+
+    def is_running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def stats(self) -> dict:
+        n = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "late": self.late,
+            "queued": self._queue.qsize(),
+            "decode_ms_avg": self.decode_ms / n,
+            "resample_ms_avg": self.resample_ms / n,
+            "decode_ms_last": self.last_decode_ms,
+            "resample_ms_last": self.last_resample_ms,
+            "cached": self.cached,
+        }
+
+    def _frames(self) -> Iterator[LedFrame]:
+        cache = self.cache
+        if cache is None:
+            while True:
+                yield from self._convert()
+                if not self.loop:
+                    return
+
+        key = cache.key(self.path, kind="gif", version=CONVERT_VERSION, leds=self.leds,
+                        layout=self.layout.to_dict() if self.layout is not None else None)
+        anim = cache.open(key)
+        if anim is None:
+            # 首次播放边转换边写缓存，写完后的循环改从缓存读
+            writer = cache.writer(key, self.leds)
+            try:
+                for frame in self._convert():
+                    writer.add(frame.pixels, frame.delay_ms)
+                    yield frame
+            except BaseException:
+                writer.abort()
+                raise
+            committed = writer.commit()
+            if not self.loop:
+                return
+            if not committed:
+                while True:
+                    yield from self._convert()
+            anim = cache.open(key)
+            if anim is None:
+                return
+
+        self.cached = True
+        try:
+            while True:
+                for i in range(len(anim)):
+                    yield LedFrame(i, anim.frames[i], int(anim.delays[i]), 0.0, 0.0)
+                if not self.loop:
+                    return
+        finally:
+            anim.close()
+
+    def _convert(self) -> Iterator[LedFrame]:
+        for f in iter_gif_frames(self.path):
+            t0 = time.perf_counter()
+            pixels = self._resample(f.rgb)
+            yield LedFrame(f.index, pixels, f.delay_ms, f.decode_ms, (time.perf_counter() - t0) * 1000.0)
+
+    def _produce(self):
+        frames = self._frames()
+        try:
+            for frame in frames:
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if self._stop.is_set():
+                    return
+        finally:
+            frames.close()
+            self._put_end()
+
+    def _put_end(self):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(None, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _play(self):
+        due = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                frame = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is None:
+                return
+
+            wait = due - time.monotonic()
+            if wait > 0:
+                if self._stop.wait(wait):
+                    return
+            elif wait < -frame.delay_ms / 1000.0:
+                # 解码跟不上：重新对齐时间基准，避免追帧
+                self.late += 1
+                due = time.monotonic()
+
+            self.sink(frame.pixels)
+
+            self.frames += 1
+            self.decode_ms += frame.decode_ms
+            self.resample_ms += frame.resample_ms
+            self.last_decode_ms = frame.decode_ms
+            self.last_resample_ms = frame.resample_ms
+            due += frame.delay_ms / 1000.0
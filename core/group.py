@@ -0,0 +1,192 @@
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+from core.link import DeviceLink
+from core.transport.base import Backend, DeviceInfo
+from core.transport.registry import create_backend
+from core.transport.worker import Channel, TransportWorker
+
+# 多控制器扇出：同一场景（或大场景的各自切片）同时推给 N 台设备
+# 每台设备一条独立 Channel（各自的队列与在途窗口），慢链路只会在自己的队列里丢旧帧，不拖累其他设备
+# 所有 Channel 共用一个 TransportWorker 事件循环，几十台设备也只占一个 I/O 线程
+
+
+@dataclass
+class GroupMember:
+    name: str
+    link: DeviceLink
+    info: DeviceInfo | None = None
+    span: tuple[int, int] | None = None     # (起始灯, 灯数)，None 表示整帧镜像
+    owned: bool = True                      # Channel 是否由设备组打开（移除时负责关闭）
+
+    def channel(self) -> Channel | None:
+        return self.link.channel()
+
+    def label(self) -> str:
+        return self.info.label() if self.info is not None else self.name
+
+    def stats(self) -> dict:
+        ch = self.link.channel()
+        out = ch.stats() if ch is not None else {"state": "detached", "queue": 0, "lag_ms": 0.0}
+        out["span"] = self.span
+        out["unsent"] = self.link.unsent
+        out["frames"] = self.link.frames
+        out["delta"] = self.link.delta_stats()
+        return out
+
+
+class DeviceGroup:
+    # 对外接口与 DeviceLink 一致（send_command / send_frame / send_message），页面可以直接把设备组当作输出
+
+    def __init__(self, worker: TransportWorker, max_leds: int = 2000):
+        self.worker = worker
+        self.max_leds = max_leds
+        self._lock = threading.Lock()
+        self._members: tuple[GroupMember, ...] = ()       # 写时复制，发送线程无锁遍历
+        self._listeners: list[Callable[[], None]] = []
+        self._delta = (False, 60)
+
+    # 成员增删或成员连接状态变化时回调（可能在传输线程）
+    def add_listener(self, fn: Callable[[], None]):
+        self._listeners.append(fn)
+
+    # ---------- 成员 ----------
+
+    # backend 缺省时按 info 创建
+    def add(self, info: DeviceInfo, span: tuple[int, int] | None = None, name: str | None = None,
+            queue_size: int = 16, window: int = 8, backend: Backend | None = None) -> GroupMember:
+        name = name or info.name or info.address
+        backend = backend or create_backend(info)
+        link = DeviceLink(self.max_leds, delta=self._delta[0], keyframe_interval=self._delta[1])
+        member = GroupMember(name, link, info, span, owned=True)
+        self._insert(member)
+
+        ch = self.worker.open(backend, queue_size, window, listener=lambda _ch, _state: self._changed())
+        link.attach(ch)
+        return member
+
+    # 纳入一条已有的 DeviceLink（例如主连接），Channel 仍由原持有者管理
+    def add_link(self, name: str, link: DeviceLink, span: tuple[int, int] | None = None,
+                 info: DeviceInfo | None = None) -> GroupMember:
+        member = GroupMember(name, link, info, span, owned=False)
+        if link.delta_enabled() != self._delta[0]:
+            link.set_delta(*self._delta)
+        self._insert(member)
+        return member
+
+    def remove(self, name: str) -> Future | None:
+        with self._lock:
+            member = self._find(name)
+            if member is None:
+                return None
+            self._members = tuple(m for m in self._members if m is not member)
+        self._changed()
+
+        ch = member.link.channel()
+        member.link.attach(None)
+        if member.owned and ch is not None:
+            return ch.close()
+        return None
+
+    def member(self, name: str) -> GroupMember | None:
+        return self._find(name)
+
+    def members(self) -> list[GroupMember]:
+        return list(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def set_span(self, name: str, span: tuple[int, int] | None):
+        member = self._find(name)
+        if member is None:
+            raise KeyError(name)
+        member.span = span
+        self._changed()
+
+    # 所有成员统一切换增量帧；之后加入的成员沿用当前设置
+    def set_delta(self, enabled: bool, keyframe_interval: int = 60):
+        self._delta = (enabled, keyframe_interval)
+        for m in self._members:
+            m.link.set_delta(enabled, keyframe_interval)
+
+    def delta_enabled(self) -> bool:
+        return self._delta[0]
+
+    def close(self) -> list[Future]:
+        futures = [self.remove(m.name) for m in self.members() if m.owned]
+        return [f for f in futures if f is not None]
+
+    # ---------- 发送 ----------
+
+    def send_command(self, key: str, value: Any, origin: float = 0.0):
+        for m in self._members:
+            m.link.send_command(key, value, origin)
+
+    def send_message(self, msg_type: int, payload=b""):
+        for m in self._members:
+            m.link.send_message(msg_type, payload)
+
+    # pixels 是整个场景；有 span 的成员只收到自己那一段（设备内从 0 开始编号）
+    def send_frame(self, pixels, offset: int = 0, origin: float = 0.0):
+        members = self._members
+        if not members:
+            return
+
+        if not isinstance(pixels, np.ndarray):
+            pixels = np.frombuffer(pixels, np.uint8)
+        scene = pixels.reshape(-1, 3)
+
+        for m in members:
+            if m.span is None:
+                m.link.send_frame(scene, offset, origin)
+                continue
+
+            start, count = m.span
+            part = scene[start:start + count]
+            if len(part):
+                m.link.send_frame(part, origin=origin)
+
+    # 所有成员约定同一起点：返回 start_at，主机侧调度也可以从这一刻开始计时
+    def sync_start(self, delay: float = 0.25, clock: Callable[[], float] = time.monotonic) -> float:
+        start_at = clock() + delay
+        for m in self._members:
+            m.link.send_sync_start(start_at, clock)
+        return start_at
+
+    # ---------- 统计 ----------
+
+    def ping(self):
+        for m in self._members:
+            m.link.ping()
+
+    def stats(self) -> dict[str, dict]:
+        return {m.name: m.stats() for m in self._members}
+
+    # 已连接成员里最深的发送队列；连接中 / 出错的成员不出队，计入会让背压永远等下去
+    def backlog(self) -> int:
+        depths = [ch.queue_depth() for m in self._members
+                  if (ch := m.channel()) is not None and ch.state == "connected"]
+        return max(depths, default=0)
+
+    def _find(self, name: str) -> GroupMember | None:
+        for m in self._members:
+            if m.name == name:
+                return m
+        return None
+
+    def _insert(self, member: GroupMember):
+        with self._lock:
+            if self._find(member.name) is not None:
+                raise ValueError(f"device {member.name!r} is already in the group")
+            self._members = self._members + (member,)
+        self._changed()
+
+    def _changed(self):
+        for fn in self._listeners:
+            fn()
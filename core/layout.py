@@ -0,0 +1,264 @@
+import math
+
+import numpy as np
+
+# 灯珠空间布局：每颗灯在画面上的归一化坐标 (x, y) ∈ [0, 1]²（y 向下）与采样足迹（半宽、半高）
+# 对给定的源分辨率预先算好 像素 -> 灯 的取样索引与权重并缓存，之后整帧映射就是一次 gather + 加权求和
+# 一维源（灯效）按 line_coords 把每颗灯投到 [0, 1] 上，同样预先算成 gather 索引
+# to_dict / layout_from_dict 序列化，设备页编辑，GIF / 动态页共用（经 LinkBridge.layout）
+
+MAX_CACHED_MAPS = 8
+
+
+class SamplingMap:
+    # idx: (leds, taps) 展平像素下标；weights: (leds, taps) 每行和为 1（画面外的采样点权重为 0）
+
+    def __init__(self, idx: np.ndarray, weights: np.ndarray, shape: tuple[int, int]):
+        self.idx = idx
+        self.weights = weights
+        self.shape = shape
+
+    def __call__(self, rgb: np.ndarray) -> np.ndarray:
+        flat = rgb.reshape(-1, rgb.shape[-1])
+        taps = flat[self.idx].astype(np.float32)                        # (leds, taps, C)
+        out = np.einsum("nk,nkc->nc", self.weights, taps)
+        return np.rint(out[:, :3]).astype(np.uint8)
+
+
+class Layout:
+    kind = ""
+    title = ""
+
+    def __init__(self):
+        self._positions: np.ndarray | None = None
+        self._maps: dict[tuple[int, int, int], SamplingMap] = {}
+        self._lines: dict[int, np.ndarray] = {}
+
+    @property
+    def leds(self) -> int:
+        raise NotImplementedError
+
+    # (leds, 2) 归一化中心坐标
+    def positions(self) -> np.ndarray:
+        if self._positions is None:
+            self._positions = self._compute_positions().astype(np.float32)
+        return self._positions
+
+    # (leds, 2) 采样足迹的半宽 / 半高（归一化）
+    def footprints(self) -> np.ndarray:
+        raise NotImplementedError
+
+    # 每颗灯在一维源上的位置 [0, 1]；默认按 x 投影
+    def line_coords(self) -> np.ndarray:
+        x = self.positions()[:, 0]
+        span = float(x.max() - x.min()) if len(x) else 0.0
+        return (x - x.min()) / span if span > 0 else np.zeros_like(x)
+
+    def to_dict(self) -> dict:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return f"{self.title} {self.leds} 颗"
+
+    # ---------- 映射 ----------
+
+    # 画面 (H, W, C) -> (leds, 3) uint8；映射按画面尺寸缓存
+    def sample(self, rgb: np.ndarray, taps: int = 3) -> np.ndarray:
+        return self.image_map(rgb.shape[0], rgb.shape[1], taps)(rgb)
+
+    def image_map(self, h: int, w: int, taps: int = 3) -> SamplingMap:
+        key = (h, w, taps)
+        m = self._maps.get(key)
+        if m is None:
+            if len(self._maps) >= MAX_CACHED_MAPS:
+                self._maps.clear()
+            m = self._maps[key] = self._build_map(h, w, taps)
+        return m
+
+    # 长度为 n 的一维源 -> 每颗灯的下标，用法 frame[layout.line_map(n)]
+    def line_map(self, n: int) -> np.ndarray:
+        idx = self._lines.get(n)
+        if idx is None:
+            idx = self._lines[n] = np.minimum((self.line_coords() * n).astype(np.intp), n - 1)
+        return idx
+
+    # 足迹内 taps×taps 个均匀采样点，最近像素；落在画面外的点不计入
+    def _build_map(self, h: int, w: int, taps: int) -> SamplingMap:
+        pos = self.positions()
+        half = self.footprints().astype(np.float32)
+        g = ((np.arange(taps, dtype=np.float32) + 0.5) / taps) * 2.0 - 1.0
+        ox, oy = (a.ravel() for a in np.meshgrid(g, g))
+
+        xs = pos[:, 0, None] + half[:, 0, None] * ox[None]
+        ys = pos[:, 1, None] + half[:, 1, None] * oy[None]
+        inside = (xs >= 0.0) & (xs <= 1.0) & (ys >= 0.0) & (ys <= 1.0)
+        cols = np.clip((xs * w).astype(np.intp), 0, w - 1)
+        rows = np.clip((ys * h).astype(np.intp), 0, h - 1)
+
+        weights = inside.astype(np.float32)
+        total = weights.sum(axis=1, keepdims=True)
+        # 整个足迹都在画面外：退回到钳位后的采样点，均分权重
+        weights = np.where(total > 0, weights / np.maximum(total, 1.0), 1.0 / weights.shape[1]).astype(np.float32)
+        return SamplingMap(rows * w + cols, weights, (h, w))
+
+    def _compute_positions(self) -> np.ndarray:
+        raise NotImplementedError
+
+
+class Strip(Layout):
+    # 直线灯带：count 颗从 start 均匀排到 end；width 为垂直于灯带方向的采样宽度（1.0 即整幅画面）
+    kind = "strip"
+    title = "灯带"
+
+    def __init__(self, count: int, start: tuple[float, float] = (0.0, 0.5), end: tuple[float, float] = (1.0, 0.5),
+                 width: float = 1.0):
+        super().__init__()
+        self.count = count
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.width = width
+
+    @property
+    def leds(self) -> int:
+        return self.count
+
+    def _compute_positions(self) -> np.ndarray:
+        t = (np.arange(self.count) + 0.5) / max(1, self.count)
+        a, b = np.array(self.start), np.array(self.end)
+        return a + (b - a) * t[:, None]
+
+    def footprints(self) -> np.ndarray:
+        dx, dy = abs(self.end[0] - self.start[0]), abs(self.end[1] - self.start[1])
+        along = 0.5 / max(1, self.count)
+        # 水平 / 竖直为主的灯带：沿灯带方向半个间距，横向 width 的一半
+        half = (dx * along, self.width / 2.0) if dx >= dy else (self.width / 2.0, dy * along)
+        return np.tile(np.array(half, np.float32), (self.count, 1))
+
+    def line_coords(self) -> np.ndarray:
+        return ((np.arange(self.count) + 0.5) / max(1, self.count)).astype(np.float32)
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "count": self.count, "start": list(self.start), "end": list(self.end),
+                "width": self.width}
+
+
+class Ring(Layout):
+    # 圆环：从 start_deg（0 为正右，-90 为正上）起按顺 / 逆时针均匀分布
+    kind = "ring"
+    title = "环形"
+
+    def __init__(self, count: int, center: tuple[float, float] = (0.5, 0.5), radius: float = 0.4,
+                 start_deg: float = -90.0, clockwise: bool = True):
+        super().__init__()
+        self.count = count
+        self.center = tuple(center)
+        self.radius = radius
+        self.start_deg = start_deg
+        self.clockwise = clockwise
+
+    @property
+    def leds(self) -> int:
+        return self.count
+
+    def _angles(self) -> np.ndarray:
+        step = 2.0 * math.pi / max(1, self.count)
+        sign = 1.0 if self.clockwise else -1.0          # y 向下，角度增大即顺时针
+        return math.radians(self.start_deg) + sign * step * np.arange(self.count)
+
+    def _compute_positions(self) -> np.ndarray:
+        a = self._angles()
+        return np.stack([self.center[0] + self.radius * np.cos(a), self.center[1] + self.radius * np.sin(a)], axis=1)
+
+    def footprints(self) -> np.ndarray:
+        half = max(1e-3, self.radius * math.pi / max(1, self.count))
+        return np.full((self.count, 2), half, np.float32)
+
+    # 沿圆周展开：灯效绕环转动
+    def line_coords(self) -> np.ndarray:
+        return (np.arange(self.count) / max(1, self.count)).astype(np.float32)
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "count": self.count, "center": list(self.center), "radius": self.radius,
+                "start_deg": self.start_deg, "clockwise": self.clockwise}
+
+
+class Matrix(Layout):
+    # 矩阵：按行（vertical 时按列）走线，serpentine 时隔行反向；origin 为第 0 颗所在的角
+    kind = "matrix"
+    title = "矩阵"
+    ORIGINS = ("top-left", "top-right", "bottom-left", "bottom-right")
+
+    def __init__(self, cols: int, rows: int, serpentine: bool = True, vertical: bool = False,
+                 origin: str = "top-left"):
+        super().__init__()
+        if origin not in self.ORIGINS:
+            raise ValueError(f"origin must be one of {self.ORIGINS}, got {origin!r}")
+        self.cols = cols
+        self.rows = rows
+        self.serpentine = serpentine
+        self.vertical = vertical
+        self.origin = origin
+
+    @property
+    def leds(self) -> int:
+        return self.cols * self.rows
+
+    def _compute_positions(self) -> np.ndarray:
+        i = np.arange(self.leds)
+        line = self.rows if self.vertical else self.cols
+        major, minor = i // line, i % line
+        if self.serpentine:
+            minor = np.where(major % 2 == 1, line - 1 - minor, minor)
+        col, row = (minor, major) if not self.vertical else (major, minor)
+        if self.origin.endswith("right"):
+            col = self.cols - 1 - col
+        if self.origin.startswith("bottom"):
+            row = self.rows - 1 - row
+        return np.stack([(col + 0.5) / self.cols, (row + 0.5) / self.rows], axis=1)
+
+    def footprints(self) -> np.ndarray:
+        return np.tile(np.array([0.5 / self.cols, 0.5 / self.rows], np.float32), (self.leds, 1))
+
+    def describe(self) -> str:
+        return f"{'蛇形' if self.serpentine else ''}{self.title} {self.cols}×{self.rows}"
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "cols": self.cols, "rows": self.rows, "serpentine": self.serpentine,
+                "vertical": self.vertical, "origin": self.origin}
+
+
+class Points(Layout):
+    # 任意坐标表：coords 为归一化坐标；radius 为每颗灯的采样半径
+    kind = "points"
+    title = "自定义"
+
+    def __init__(self, coords, radius: float = 0.02):
+        super().__init__()
+        self.coords = np.asarray(coords, np.float32).reshape(-1, 2)
+        self.radius = radius
+
+    @property
+    def leds(self) -> int:
+        return len(self.coords)
+
+    def _compute_positions(self) -> np.ndarray:
+        return self.coords
+
+    def footprints(self) -> np.ndarray:
+        return np.full((self.leds, 2), self.radius, np.float32)
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "coords": self.coords.round(5).tolist(), "radius": self.radius}
+
+
+LAYOUTS: dict[str, type[Layout]] = {cls.kind: cls for cls in (Strip, Ring, Matrix, Points)}
+
+
+def layout_from_dict(data: dict) -> Layout:
+    params = dict(data)
+    kind = params.pop("kind", None)
+    try:
+        cls = LAYOUTS[kind]
+    except KeyError:
+        raise ValueError(f"unknown layout kind: {kind!r}") from None
+    return cls(**params)
@@ -0,0 +1,150 @@
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from core.color import OutputCorrection
+from core.protocol.codec import Encoder, MsgType
+from core.protocol.delta import DeltaEncoder, max_payload
+from core.transport.worker import Channel, ping_token
+
+
+class DeviceLink:
+    # 页面与传输层之间的门面：编码在调用线程完成（加锁复用编码缓冲），字节投递给传输线程
+
+    def __init__(self, max_leds: int = 2000, correction: OutputCorrection | None = None,
+                 delta: bool = False, keyframe_interval: int = 60):
+        self._enc = Encoder(max_leds, max_payload(max_leds))
+        self._lock = threading.Lock()
+        self._channel: Channel | None = None
+        self._correction = correction or OutputCorrection()
+        self._delta: DeltaEncoder | None = None
+        self._msg_listeners: list[Callable[["DeviceLink", int, bytes], None]] = []
+        self.unsent = 0
+        self.frames = 0
+
+        if delta:
+            self.set_delta(True, keyframe_interval)
+
+    # 换了连接后设备端没有参考帧，下一帧必须是关键帧
+    def attach(self, channel: Channel | None):
+        old = self._channel
+        if old is not None and old is not channel:
+            old.remove_message_listener(self._on_channel_message)
+        self._channel = channel
+        if channel is not None:
+            channel.add_message_listener(self._on_channel_message)
+        delta = self._delta
+        if delta is not None:
+            delta.request_keyframe()
+
+    def channel(self) -> Channel | None:
+        return self._channel
+
+    def is_attached(self) -> bool:
+        return self._channel is not None
+
+    # send_message 单条 payload 的上限
+    def capacity(self) -> int:
+        return self._enc.capacity()
+
+    # 设备上行消息（如 PROGRAM_ACK），在传输线程回调 fn(link, msg_type, payload)
+    def add_message_listener(self, fn: Callable[["DeviceLink", int, bytes], None]):
+        if fn not in self._msg_listeners:
+            self._msg_listeners.append(fn)
+
+    def remove_message_listener(self, fn: Callable[["DeviceLink", int, bytes], None]):
+        if fn in self._msg_listeners:
+            self._msg_listeners.remove(fn)
+
+    # 该设备的输出校正（gamma / 通道增益 / 亮度），作用于所有逐灯帧
+    def correction(self) -> OutputCorrection:
+        return self._correction
+
+    def set_correction(self, correction: OutputCorrection):
+        self._correction = correction
+
+    # 增量帧：只发送变化的灯区，每 keyframe_interval 帧一个关键帧
+    def set_delta(self, enabled: bool, keyframe_interval: int = 60):
+        self._delta = DeltaEncoder(self._enc.max_leds, keyframe_interval) if enabled else None
+
+    def delta_enabled(self) -> bool:
+        return self._delta is not None
+
+    def delta_stats(self) -> dict | None:
+        delta = self._delta
+        return delta.stats() if delta is not None else None
+
+    # StaticPage.commandReady 的接收端；origin 为触发它的界面事件时刻，用于界面到写出的延迟统计
+    def send_command(self, key: str, value: Any, origin: float = 0.0):
+        if key == "hs":
+            h, s = value
+            self._submit(lambda: self._enc.color_hs(h, s), origin=origin)
+        elif key == "brightness":
+            self._submit(lambda: self._enc.brightness(value), origin=origin)
+        elif key == "power":
+            self._submit(lambda: self._enc.power(value), origin=origin)
+        else:
+            raise ValueError(f"unknown command key: {key}")
+
+    # 校正查表直接写进编码缓冲，不产生中间帧
+    # 增量模式下参考帧必须是真正写出的那一帧：先拷贝校正后的像素，出队写出前一刻再做差分
+    # origin：驱动这一帧的输入时刻（如音频分析开始），写出时同样记入 ui_hist
+    def send_frame(self, pixels, offset: int = 0, origin: float = 0.0):
+        self.frames += 1
+        delta = self._delta
+        if delta is None or offset:
+            self._submit(lambda: self._encode_frame(pixels, offset), origin=origin, droppable=True)
+            return
+
+        if self._channel is None:
+            self.unsent += 1
+            return
+        snapshot = self._correction.apply(pixels)
+        self._submit(lambda: self._enc.message(MsgType.FRAME_DELTA, delta.encode(snapshot)), late=True,
+                     origin=origin, droppable=True)
+
+    def send_message(self, msg_type: int, payload=b""):
+        self._submit(lambda: self._enc.message(msg_type, payload))
+
+    # 共同起点 start_at（clock 时间轴）；剩余时长在写出前一刻计算，排队时间不计入误差
+    def send_sync_start(self, start_at: float, clock: Callable[[], float] = time.monotonic):
+        self._submit(lambda: self._enc.sync_start(round((start_at - clock()) * 1e6)), late=True)
+
+    # 往返时延探测：令牌在写出前一刻取，设备回 PONG 后记入 Channel.rtt_hist
+    def ping(self):
+        self._submit(lambda: self._enc.ping(ping_token()), late=True)
+
+    def _on_channel_message(self, channel: Channel, msg_type: int, payload: bytes):
+        if channel is self._channel:
+            for fn in self._msg_listeners:
+                fn(self, msg_type, payload)
+
+    def _encode_frame(self, pixels, offset: int):
+        corr = self._correction
+        if corr.is_identity():
+            return self._enc.frame(pixels, offset)
+
+        if not isinstance(pixels, np.ndarray):
+            pixels = np.frombuffer(pixels, np.uint8)
+        src = pixels.reshape(-1, 3)
+        dst = np.frombuffer(self._enc.frame_pixels(len(src), offset), np.uint8).reshape(-1, 3)
+        corr.apply(src, out=dst)
+        return self._enc.finish_frame(len(src))
+
+    # droppable：只有逐灯帧可以在队列满时被丢弃，命令与程序消息必须送达
+    def _submit(self, encode, late: bool = False, origin: float = 0.0, droppable: bool = False):
+        ch = self._channel
+        if ch is None:
+            self.unsent += 1
+            return
+
+        if late:
+            ch.submit(lambda: self._encode_locked(encode), origin, droppable)
+        else:
+            ch.submit(self._encode_locked(encode), origin, droppable)
+
+    def _encode_locked(self, encode) -> bytes:
+        with self._lock:
+            return bytes(encode())
@@ -0,0 +1,692 @@
+import math
+import struct
+import threading
+import time
+from binascii import crc_hqx
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+import numpy as np
+
+from core.color import OutputCorrection
+from core.effects import Effect, create_effect
+from core.protocol.codec import FRAME_HDR, OVERHEAD, MsgType
+from core.protocol.fragment import FRAG
+
+# 灯效程序：把灯效 / 关键帧时间轴编译成紧凑的参数化程序，一次上传后由控制器自己逐帧执行
+# 播放期间主机只发很小的参数更新（PROGRAM_PARAM），不再逐帧推流
+#
+# 程序：| version u8 | flags u8 | leds u16 | fps u16 | clip_count u8 | duration_ms u32 | clip ... | crc16 u16 |
+# clip：| opcode u8 | start_ms u32 | duration_ms u32 | n_static u8 | n_tracks u8 | static ... | track ... |
+#        duration_ms 为 0 表示一直持续；static 为 | param u8 | value f32 |
+# track：| param u8 | n_keys u8 | key ... |，key 为 | t_ms u32 | value f32 | easing u8 |，easing 作用于到下一个关键帧的区间
+# 重叠的片段逐通道取最大值合成；flags & LOOP 时按 duration_ms 循环，每一轮片段都从头开始
+#
+# 上传：PROGRAM_UPLOAD | program_id u16 | offset u32 | total u32 | 数据 |，收齐且 crc 正确才生效
+# 应答：PROGRAM_ACK    | program_id u16 | received u32 | total u32 |，设备 -> 主机，每个上传分块都回一次
+#        received 为按序收到的字节数，乱序 / 重复的分块不写入；主机从 received 处重传，received == total 即完成
+# 控制：PROGRAM_CTRL   | program_id u16 | op u8 | at_ms u32 | led_offset u16 |，led_offset 为设备在场景中的起始灯
+# 参数：PROGRAM_PARAM  | program_id u16 | clip u8 | param u8 | value f32 |，clip 为 ALL_CLIPS 时作用于所有片段
+# 校正：PROGRAM_CORRECT | gamma f32 | gain_r f32 | gain_g f32 | gain_b f32 | brightness f32 |
+#        设备自己的输出校正（同 core.color.OutputCorrection），作用于程序渲染的每一帧，逐帧推流时主机已经做过
+# 本模块的 ProgramRunner / ProgramExecutor 就是参考执行器，core.emulator 用它模拟固件
+
+VERSION = 1
+LOOP = 0x01
+
+PROGRAM_HDR = struct.Struct("<BBHHBI")
+CLIP_HDR = struct.Struct("<BIIBB")
+STATIC = struct.Struct("<Bf")
+TRACK_HDR = struct.Struct("<BB")
+KEY = struct.Struct("<IfB")
+CRC = struct.Struct("<H")
+
+UPLOAD_HDR = struct.Struct("<HII")
+ACK = struct.Struct("<HII")
+CTRL = struct.Struct("<HBIH")
+PARAM = struct.Struct("<HBBf")
+CORRECT = struct.Struct("<fffff")
+
+UPLOAD_CHUNK = 1024                 # 上限；实际按链路编码缓冲能装下的 payload 再收窄
+UPLOAD_WINDOW = 4                   # 未确认的上传分块上限，不会一次灌满链路的发送队列
+ACK_TIMEOUT = 1.0                   # 这么久上传进度没有推进就从 received 处重传
+MAX_RETRIES = 5
+ALL_CLIPS = 0xFF
+MAX_CLIPS = 0xFE
+MAX_KEYS = 0xFF
+
+# 操作码与参数编号是线上格式的一部分，只能追加
+OPCODES = {"rainbow": 1, "breathing": 2, "comet": 3, "fire": 4, "twinkle": 5}
+PARAMS = {
+    "speed": 0, "level": 1, "r": 2, "g": 3, "b": 4,
+    "density": 5, "period": 6, "tail": 7, "cooling": 8, "sparking": 9, "decay": 10, "seed": 11,
+}
+ANIMATED = ("speed", "level", "r", "g", "b")            # 每帧生效，可以有关键帧和实时覆盖
+EASINGS = {"linear": 0, "step": 1, "ease_in": 2, "ease_out": 3, "ease_in_out": 4}
+
+START, STOP, SEEK = 1, 2, 3
+
+_EFFECT_NAMES = {v: k for k, v in OPCODES.items()}
+_PARAM_NAMES = {v: k for k, v in PARAMS.items()}
+_EASING_NAMES = {v: k for k, v in EASINGS.items()}
+
+
+class ProgramError(ValueError):
+    pass
+
+
+class Keyframe(NamedTuple):
+    t_ms: int               # 相对片段起点
+    value: float
+    easing: str = "linear"
+
+
+def ease(kind: str, x: float) -> float:
+    if kind == "step":
+        return 0.0
+    if kind == "ease_in":
+        return x * x
+    if kind == "ease_out":
+        return 1.0 - (1.0 - x) * (1.0 - x)
+    if kind == "ease_in_out":
+        return x * x * (3.0 - 2.0 * x)
+    return x
+
+
+@dataclass
+class Clip:
+    effect: str
+    start_ms: int = 0
+    duration_ms: int = 0
+    static: dict[str, float] = field(default_factory=dict)
+    tracks: dict[str, list[Keyframe]] = field(default_factory=dict)
+
+    # 追加关键帧（t 为片段内秒数）；"color" 拆成 r / g / b 三条轨道
+    def key(self, param: str, t: float, value, easing: str = "linear") -> "Clip":
+        if param == "color":
+            for p, v in zip(("r", "g", "b"), value):
+                self.key(p, t, v, easing)
+            return self
+        self.tracks.setdefault(param, []).append(Keyframe(round(t * 1000), float(value), easing))
+        self.tracks[param].sort(key=lambda k: k.t_ms)
+        return self
+
+    def covers(self, t_ms: float) -> bool:
+        return t_ms >= self.start_ms and (not self.duration_ms or t_ms < self.start_ms + self.duration_ms)
+
+    # 片段内 local_ms 时刻的参数值；没有关键帧时取静态值，都没有返回 None（保持灯效自身默认）
+    def value_at(self, param: str, local_ms: float) -> float | None:
+        keys = self.tracks.get(param)
+        if not keys:
+            return self.static.get(param)
+        if local_ms <= keys[0].t_ms:
+            return keys[0].value
+        for a, b in zip(keys, keys[1:]):
+            if local_ms < b.t_ms:
+                x = (local_ms - a.t_ms) / max(1, b.t_ms - a.t_ms)
+                return a.value + (b.value - a.value) * ease(a.easing, x)
+        return keys[-1].value
+
+
+@dataclass
+class Program:
+    leds: int
+    fps: int = 60
+    loop: bool = False
+    clips: list[Clip] = field(default_factory=list)
+
+    # start / duration 为秒，duration 为 0 表示一直持续；其余关键字为灯效参数
+    def add(self, effect: str, start: float = 0.0, duration: float = 0.0, **static) -> Clip:
+        color = static.pop("color", None)
+        if color is not None:
+            static.update(zip(("r", "g", "b"), color))
+        clip = Clip(effect, round(start * 1000), round(duration * 1000), {k: float(v) for k, v in static.items()})
+        self.clips.append(clip)
+        return clip
+
+    def duration_ms(self) -> int:
+        if any(not c.duration_ms for c in self.clips):
+            return 0
+        return max((c.start_ms + c.duration_ms for c in self.clips), default=0)
+
+    def to_dict(self) -> dict:
+        return {
+            "leds": self.leds, "fps": self.fps, "loop": self.loop,
+            "clips": [{
+                "effect": c.effect, "start": c.start_ms / 1000, "duration": c.duration_ms / 1000,
+                "params": dict(c.static),
+                "keys": {p: [[k.t_ms / 1000, k.value, k.easing] for k in keys] for p, keys in c.tracks.items()},
+            } for c in self.clips],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, leds: int | None = None) -> "Program":
+        prog = cls(leds or int(data["leds"]), int(data.get("fps", 60)), bool(data.get("loop", False)))
+        for c in data.get("clips", []):
+            clip = prog.add(c["effect"], c.get("start", 0.0), c.get("duration", 0.0), **c.get("params", {}))
+            for param, keys in c.get("keys", {}).items():
+                for key in keys:
+                    clip.key(param, *key)
+        return prog
+
+
+# 单个灯效一直循环：DynamicPage / 守护进程的程序模式
+def compile_effect(name: str, leds: int, fps: int = 60, speed: float = 1.0, **params) -> bytes:
+    prog = Program(leds, fps)
+    prog.add(name, speed=speed, **params)
+    return compile_program(prog)
+
+
+# ---------- 编译 / 解码 ----------
+
+def compile_program(prog: Program) -> bytes:
+    _validate(prog)
+    out = bytearray(PROGRAM_HDR.pack(VERSION, LOOP if prog.loop else 0, prog.leds, prog.fps,
+                                     len(prog.clips), prog.duration_ms()))
+    for clip in prog.clips:
+        out += CLIP_HDR.pack(OPCODES[clip.effect], clip.start_ms, clip.duration_ms, len(clip.static), len(clip.tracks))
+        for param, value in clip.static.items():
+            out += STATIC.pack(PARAMS[param], value)
+        for param, keys in clip.tracks.items():
+            out += TRACK_HDR.pack(PARAMS[param], len(keys))
+            for k in keys:
+                out += KEY.pack(k.t_ms, k.value, EASINGS[k.easing])
+    out += CRC.pack(crc_hqx(out, 0xFFFF))
+    return bytes(out)
+
+
+def decode_program(blob) -> Program:
+    view = memoryview(blob).cast("B")
+    if view.nbytes < PROGRAM_HDR.size + CRC.size:
+        raise ProgramError(f"program too short: {view.nbytes} bytes")
+    end = view.nbytes - CRC.size
+    if CRC.unpack_from(view, end)[0] != crc_hqx(view[:end], 0xFFFF):
+        raise ProgramError("program crc mismatch")
+
+    try:
+        version, flags, leds, fps, n_clips, _duration = PROGRAM_HDR.unpack_from(view, 0)
+        if version != VERSION:
+            raise ProgramError(f"unsupported program version {version}")
+        prog = Program(leds, fps, bool(flags & LOOP))
+        pos = PROGRAM_HDR.size
+        for _ in range(n_clips):
+            opcode, start, duration, n_static, n_tracks = CLIP_HDR.unpack_from(view, pos)
+            pos += CLIP_HDR.size
+            clip = Clip(_EFFECT_NAMES[opcode], start, duration)
+            for _ in range(n_static):
+                param, value = STATIC.unpack_from(view, pos)
+                pos += STATIC.size
+                clip.static[_PARAM_NAMES[param]] = value
+            for _ in range(n_tracks):
+                param, n_keys = TRACK_HDR.unpack_from(view, pos)
+                pos += TRACK_HDR.size
+                keys = []
+                for _ in range(n_keys):
+                    t_ms, value, easing = KEY.unpack_from(view, pos)
+                    pos += KEY.size
+                    keys.append(Keyframe(t_ms, value, _EASING_NAMES[easing]))
+                clip.tracks[_PARAM_NAMES[param]] = keys
+            prog.clips.append(clip)
+    except (struct.error, KeyError) as e:
+        raise ProgramError(f"malformed program: {e}") from None
+    if pos != end:
+        raise ProgramError(f"program has {end - pos} trailing bytes")
+    return prog
+
+
+def _validate(prog: Program):
+    if not 0 < prog.leds <= 0xFFFF or not 0 < prog.fps <= 0xFFFF:
+        raise ProgramError(f"leds / fps out of range: {prog.leds} / {prog.fps}")
+    if len(prog.clips) > MAX_CLIPS:
+        raise ProgramError(f"{len(prog.clips)} clips, at most {MAX_CLIPS}")
+    if prog.loop and not prog.duration_ms():
+        raise ProgramError("a looping program needs every clip to have a duration")
+    for clip in prog.clips:
+        if clip.effect not in OPCODES:
+            raise ProgramError(f"effect {clip.effect!r} cannot run on the controller")
+        for param in (*clip.static, *clip.tracks):
+            if param not in PARAMS:
+                raise ProgramError(f"unknown parameter {param!r}")
+        for param, keys in clip.tracks.items():
+            if param not in ANIMATED:
+                raise ProgramError(f"parameter {param!r} cannot be keyframed")
+            if len(keys) > MAX_KEYS:
+                raise ProgramError(f"track {param!r} has {len(keys)} keys, at most {MAX_KEYS}")
+            for k in keys:
+                if k.easing not in EASINGS:
+                    raise ProgramError(f"unknown easing {k.easing!r}")
+        try:
+            _create(clip, 1)
+        except TypeError as e:
+            raise ProgramError(f"{clip.effect}: {e}") from None
+
+
+def _create(clip: Clip, leds: int) -> Effect:
+    kw = {k: v for k, v in clip.static.items() if k not in ANIMATED}
+    if "seed" in kw:
+        kw["seed"] = int(kw["seed"])
+    return create_effect(clip.effect, leds, **kw)
+
+
+# ---------- 执行 ----------
+
+class ProgramRunner:
+    # 逐 tick 确定性执行：dt 固定为 1 / fps，有状态的灯效（火焰 / 闪烁）也与 tick 序列一一对应
+    # overrides：PROGRAM_PARAM 的实时覆盖，优先于关键帧
+
+    def __init__(self, prog: Program):
+        self.program = prog
+        self.tick = -1
+        self.overrides: dict[tuple[int, str], float] = {}
+        self._effects: dict[int, Effect] = {}
+        self._cycle = 0
+        self._acc = np.zeros((prog.leds, 3), np.float32)
+        self._out = np.zeros((prog.leds, 3), np.uint8)
+
+    def set_param(self, clip: int, param: str, value: float):
+        targets = range(len(self.program.clips)) if clip == ALL_CLIPS else (clip,)
+        for i in targets:
+            self.overrides[(i, param)] = value
+
+    # 推进到第 tick 帧（含），返回该帧；跳过的 tick 仍逐个执行以保持状态一致
+    def advance_to(self, tick: int) -> np.ndarray:
+        while self.tick < tick:
+            self.tick += 1
+            self._render(self.tick)
+        return self._out
+
+    def frames(self, count: int):
+        for k in range(count):
+            yield self.advance_to(k)
+
+    def _render(self, k: int):
+        prog = self.program
+        dt = 1.0 / prog.fps
+        t_ms = k * 1000.0 / prog.fps
+        total = prog.duration_ms()
+        if prog.loop and total:
+            cycle, t_ms = divmod(t_ms, total)
+            if cycle != self._cycle:
+                self._cycle = cycle
+                self._effects.clear()
+
+        acc = self._acc
+        acc.fill(0.0)
+        for i, clip in enumerate(prog.clips):
+            if not clip.covers(t_ms):
+                self._effects.pop(i, None)
+                continue
+            effect = self._effects.get(i)
+            if effect is None:
+                effect = self._effects[i] = _create(clip, prog.leds)
+
+            local = t_ms - clip.start_ms
+            values = {p: self.overrides.get((i, p), clip.value_at(p, local)) for p in ANIMATED}
+            if values["speed"] is not None:
+                effect.speed = values["speed"]
+            for c, p in enumerate(("r", "g", "b")):
+                if values[p] is not None:
+                    effect.color[c] = values[p]
+
+            frame = effect.render(local / 1000.0, dt)
+            level = values["level"]
+            if level is None or level >= 1.0:
+                np.maximum(acc, frame, out=acc)
+            else:
+                np.maximum(acc, frame * np.float32(max(0.0, level)), out=acc)
+        self._out[...] = acc
+
+
+class ProgramExecutor:
+    # 设备端参考实现：拼装上传分块、校验后登记；START 后按本地时钟推进 ProgramRunner
+    # render(now) 返回需要写到 led_offset 处的帧，未在运行时返回 None
+
+    def __init__(self, leds: int, clock=time.monotonic):
+        self.leds = leds
+        self.clock = clock
+        self.programs: dict[int, Program] = {}
+        self._uploads: dict[int, bytearray] = {}
+        self._received: dict[int, int] = {}
+        self.runner: ProgramRunner | None = None
+        self.correction = OutputCorrection()
+        self.program_id = -1
+        self.last_tick = -1
+        self.led_offset = 0
+        self._origin = 0.0
+        self._start_tick = 0
+
+        self.uploads = 0
+        self.rejected = 0
+        self.params = 0
+
+    def is_running(self) -> bool:
+        return self.runner is not None
+
+    def fps(self) -> int:
+        return self.runner.program.fps if self.runner is not None else 0
+
+    # 返回 "start" / "stop" / None，便于宿主启停自己的定时任务
+    # reply(msg_type, payload)：回给主机的应答（上传进度）
+    def feed(self, msg_type: int, payload, reply=None) -> str | None:
+        try:
+            if msg_type == MsgType.PROGRAM_UPLOAD:
+                ack = self._upload(payload)
+                if reply is not None:
+                    reply(MsgType.PROGRAM_ACK, ack)
+            elif msg_type == MsgType.PROGRAM_CTRL:
+                return self._control(payload)
+            elif msg_type == MsgType.PROGRAM_PARAM:
+                pid, clip, param, value = PARAM.unpack_from(payload)
+                if self.runner is not None and pid == self.program_id and _PARAM_NAMES.get(param) in ANIMATED:
+                    self.runner.set_param(clip, _PARAM_NAMES[param], value)
+                    self.params += 1
+            elif msg_type == MsgType.PROGRAM_CORRECT:
+                gamma, r, g, b, brightness = CORRECT.unpack_from(payload)
+                self.correction.update(gamma=gamma, gains=(r, g, b), brightness=brightness)
+        except (struct.error, ValueError):
+            self.rejected += 1
+        return None
+
+    def render(self, now: float | None = None) -> np.ndarray | None:
+        runner = self.runner
+        if runner is None:
+            return None
+        now = self.clock() if now is None else now
+        tick = self._start_tick + math.floor((now - self._origin) * runner.program.fps)
+        frame = runner.advance_to(max(tick, runner.tick, 0))
+        return frame if self.correction.is_identity() else self.correction.apply(frame)
+
+    def stats(self) -> dict:
+        return {
+            "programs": len(self.programs), "uploads": self.uploads, "rejected": self.rejected,
+            "params": self.params, "running": self.program_id if self.runner is not None else None,
+            "tick": self.runner.tick if self.runner is not None else self.last_tick,
+        }
+
+    def _upload(self, payload) -> bytes:
+        pid, offset, total = UPLOAD_HDR.unpack_from(payload)
+        data = memoryview(payload)[UPLOAD_HDR.size:]
+        if offset + data.nbytes > total:
+            raise ProgramError(f"upload chunk for program {pid} overruns {total} bytes")
+        buf = self._uploads.get(pid)
+        if offset == 0 and (buf is None or len(buf) != total):
+            buf = self._uploads[pid] = bytearray(total)
+            self._received[pid] = 0
+        if buf is None:
+            # 已经收齐（主机没收到应答而重传），或者开头的分块丢了
+            return ACK.pack(pid, total if pid in self.programs else 0, total)
+
+        # 只接受紧接着已收数据的分块；丢了分块时后续分块不写入，应答让主机从缺口处重传
+        received = self._received[pid]
+        if offset == received:
+            buf[offset:offset + data.nbytes] = data
+            received = self._received[pid] = received + data.nbytes
+        if received == total:
+            del self._uploads[pid], self._received[pid]
+            try:
+                self.programs[pid] = decode_program(buf)
+            except ProgramError:
+                self.rejected += 1
+                return ACK.pack(pid, 0, total)
+            self.uploads += 1
+        return ACK.pack(pid, received, total)
+
+    def _control(self, payload) -> str | None:
+        pid, op, at_ms, offset = CTRL.unpack_from(payload)
+        if op == STOP:
+            if pid == self.program_id or pid == 0xFFFF:
+                self.last_tick = self.runner.tick if self.runner is not None else -1
+                self.runner = None
+                self.program_id = -1
+                return "stop"
+            return None
+
+        prog = self.programs.get(pid)
+        if prog is None:
+            raise ProgramError(f"program {pid} is not loaded")
+        if op == START or self.runner is None or pid != self.program_id:
+            self.runner = ProgramRunner(prog)
+            self.program_id = pid
+        self.led_offset = offset
+        self._origin = self.clock()
+        self._start_tick = at_ms * prog.fps // 1000
+        if op == SEEK and self._start_tick < self.runner.tick:
+            # 有状态灯效不能倒退：重新执行到目标位置
+            self.runner = ProgramRunner(prog)
+        return "start"
+
+
+# ---------- 主机侧报文 ----------
+
+def upload_payloads(program_id: int, blob: bytes, chunk: int = UPLOAD_CHUNK) -> list[bytes]:
+    total = len(blob)
+    return [UPLOAD_HDR.pack(program_id, pos, total) + blob[pos:pos + chunk] for pos in range(0, total, chunk)] \
+        or [UPLOAD_HDR.pack(program_id, 0, 0)]
+
+
+def start_payload(program_id: int, at_ms: int = 0, led_offset: int = 0) -> bytes:
+    return CTRL.pack(program_id, START, at_ms, led_offset)
+
+
+def stop_payload(program_id: int = 0xFFFF) -> bytes:
+    return CTRL.pack(program_id, STOP, 0, 0)
+
+
+def correction_payload(correction: OutputCorrection) -> bytes:
+    return CORRECT.pack(correction.gamma(), *correction.gains(), correction.brightness())
+
+
+def param_payload(program_id: int, param: str, value: float, clip: int = ALL_CLIPS) -> bytes:
+    if param not in ANIMATED:
+        raise ProgramError(f"parameter {param!r} cannot be changed while running")
+    return PARAM.pack(program_id, clip, PARAMS[param], value)
+
+
+# 线上字节数（含消息头尾与按 mtu 切片的分片头）
+def _wire_bytes(payload_len: int, mtu: int) -> int:
+    size = OVERHEAD + payload_len
+    return size + FRAG.size * max(1, -(-size // (mtu - FRAG.size)))
+
+
+# 程序上传 vs 同样时长的逐帧推流；无限时长的程序按 seconds 估算
+def size_report(blob: bytes, seconds: float | None = None, mtu: int = 244) -> dict:
+    prog = decode_program(blob)
+    if seconds is None:
+        seconds = prog.duration_ms() / 1000.0 or 60.0
+    frames = math.ceil(seconds * prog.fps)
+    upload = sum(_wire_bytes(len(p), mtu) for p in upload_payloads(0, blob))
+    control = _wire_bytes(CTRL.size, mtu)
+    stream = frames * _wire_bytes(FRAME_HDR.size + prog.leds * 3, mtu)
+    return {
+        "leds": prog.leds, "fps": prog.fps, "seconds": seconds, "frames": frames,
+        "program_bytes": len(blob), "upload_bytes": upload + control,
+        "param_update_bytes": _wire_bytes(PARAM.size, mtu),
+        "stream_bytes": stream, "stream_bytes_per_s": stream / seconds if seconds else 0.0,
+        "ratio": stream / (upload + control),
+    }
+
+
+@dataclass
+class _Upload:
+    # 一台设备上的一次上传；应答与重传都在该设备的传输线程里推进
+    link: object
+    program_id: int
+    chunk: int
+    payloads: list[bytes]
+    total: int
+    next: int = 0                                   # 下一个要发的分块
+    acked: int = 0
+    resent_from: int = -1
+    last_seen: int = -1
+    retries: int = 0
+    done: bool = False
+    start: tuple[int, int, float] | None = None     # (at_ms, led_offset, 调用 start 的时刻)
+    start_queued: bool = False                      # START 已排在全部分块之后
+
+
+class ProgramSession:
+    # 主机侧：把程序上传到一个 DeviceLink 或整个 DeviceGroup（各成员按 span 起点执行自己那一段）
+    # 每台设备单独按应答滑动窗口上传：重复应答立即从缺口处重传，ack_timeout 内没有进展也重传，连续 max_retries 次放弃
+    # 分块还没全部发出（或发生了重传）时 START 等收齐再发，at_ms 补上等待的时间
+    # 程序帧不经过主机的 OutputCorrection：START 前把每台设备的校正发过去，校正变化后 sync_correction 补发
+    # 参数更新按参数合并，只有值变化才发
+
+    def __init__(self, output, ack_timeout: float = ACK_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 window: int = UPLOAD_WINDOW):
+        self.output = output
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.window = window
+        self.program_id = 0
+        self.blob = b""
+        self._params: dict[tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+        self._uploads: dict[int, _Upload] = {}
+        self._corrections: dict[int, bytes] = {}
+        self.param_updates = 0
+        self.retransmits = 0
+        self.failed = 0
+
+    def upload(self, blob: bytes):
+        self.program_id = (self.program_id + 1) & 0x7FFF
+        self.blob = blob
+        self._params.clear()
+        uploads = {}
+        for link, _offset in self._targets():
+            # 分块连同上传头必须装进链路的编码缓冲
+            chunk = max(1, min(UPLOAD_CHUNK, link.capacity() - UPLOAD_HDR.size))
+            uploads[id(link)] = _Upload(link, self.program_id, chunk,
+                                        upload_payloads(self.program_id, blob, chunk), len(blob))
+        with self._lock:
+            for up in self._uploads.values():
+                up.done = True
+            self._uploads = uploads
+            for up in uploads.values():
+                up.link.add_message_listener(self._on_message)
+                self._pump(up)
+        for up in uploads.values():
+            ch = up.link.channel()
+            if ch is not None and ch.worker.loop is not None:
+                ch.worker.loop.call_soon_threadsafe(self._watch, up)
+
+    def start(self, at: float = 0.0):
+        self.sync_correction(force=True)
+        at_ms = round(at * 1000)
+        now = time.monotonic()
+        for link, offset in self._targets():
+            with self._lock:
+                up = self._uploads.get(id(link))
+                if up is not None and not up.done:
+                    up.start = (at_ms, offset, now)
+                    up.start_queued = up.next == len(up.payloads)
+                    if not up.start_queued:
+                        continue
+            link.send_message(MsgType.PROGRAM_CTRL, start_payload(self.program_id, at_ms, offset))
+
+    def stop(self):
+        with self._lock:
+            for up in self._uploads.values():
+                up.start = None
+        self.output.send_message(MsgType.PROGRAM_CTRL, stop_payload(self.program_id))
+
+    def set_param(self, param: str, value: float, clip: int = ALL_CLIPS):
+        if self._params.get((clip, param)) == value:
+            return
+        self._params[(clip, param)] = value
+        self.param_updates += 1
+        self.output.send_message(MsgType.PROGRAM_PARAM, param_payload(self.program_id, param, value, clip))
+
+    # 只发校正有变化的设备
+    def sync_correction(self, force: bool = False):
+        for link, _offset in self._targets():
+            payload = correction_payload(link.correction())
+            if force or self._corrections.get(id(link)) != payload:
+                self._corrections[id(link)] = payload
+                link.send_message(MsgType.PROGRAM_CORRECT, payload)
+
+    # 上传是否已在所有设备上收齐
+    def is_uploaded(self) -> bool:
+        with self._lock:
+            return all(up.acked == up.total for up in self._uploads.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(1 for up in self._uploads.values() if not up.done)
+        return {"program_id": self.program_id, "pending": pending, "retransmits": self.retransmits,
+                "failed": self.failed, "param_updates": self.param_updates}
+
+    # (link, 场景起始灯)
+    def _targets(self) -> list[tuple]:
+        members = getattr(self.output, "members", None)
+        if members is None:
+            return [(self.output, 0)]
+        return [(m.link, m.span[0] if m.span is not None else 0) for m in members()]
+
+    # 以下在持锁时调用
+    def _pump(self, up: _Upload):
+        limit = min(len(up.payloads), up.acked // up.chunk + self.window)
+        while up.next < limit:
+            up.link.send_message(MsgType.PROGRAM_UPLOAD, up.payloads[up.next])
+            up.next += 1
+
+    # 回退 N 帧：从 offset 起重发，已排在前面的 START 会被设备拒绝
+    def _retransmit(self, up: _Upload, offset: int):
+        up.resent_from = offset
+        up.next = offset // up.chunk
+        up.start_queued = False
+        self.retransmits += 1
+        self._pump(up)
+
+    # 传输线程：设备应答
+    def _on_message(self, link, msg_type: int, payload: bytes):
+        if msg_type != MsgType.PROGRAM_ACK:
+            return
+        try:
+            pid, received, total = ACK.unpack_from(payload)
+        except struct.error:
+            return
+        with self._lock:
+            up = self._uploads.get(id(link))
+            if up is None or up.done or pid != up.program_id or total != up.total:
+                return
+            if received >= total:
+                up.acked = total
+                up.done = True
+                start = up.start if not up.start_queued else None
+            elif received > up.acked:
+                up.acked = received
+                self._pump(up)
+                return
+            elif received < up.acked:
+                # 设备丢了已收数据（重启 / crc 不对），从它的进度重来
+                up.acked = received
+                self._retransmit(up, received)
+                return
+            else:
+                # 重复应答：received 之后的分块丢了，每个缺口只立即重传一次
+                if up.resent_from != received:
+                    self._retransmit(up, received)
+                return
+        if start is not None:
+            at_ms, offset, t0 = start
+            at_ms += round((time.monotonic() - t0) * 1000)
+            link.send_message(MsgType.PROGRAM_CTRL, start_payload(up.program_id, at_ms, offset))
+
+    # 传输线程：每 ack_timeout 检查一次进度，没有推进就从已确认处重传
+    def _watch(self, up: _Upload):
+        with self._lock:
+            if up.done:
+                return
+            if up.acked == up.last_seen:
+                if up.retries >= self.max_retries:
+                    up.done = True
+                    self.failed += 1
+                    return
+                up.retries += 1
+                self._retransmit(up, up.acked)
+            else:
+                up.retries = 0
+            up.last_seen = up.acked
+        ch = up.link.channel()
+        if ch is not None:
+            ch.worker.loop.call_later(self.ack_timeout, self._watch, up)
@@ -0,0 +1,187 @@
+import struct
+from binascii import crc_hqx
+from enum import IntEnum
+from typing import NamedTuple
+
+# 帧格式：| magic u8 | type u8 | seq u16 | len u16 | payload ... | crc16 u16 |
+# crc 为 CRC-16/CCITT-FALSE，覆盖 header + payload，全部小端
+
+MAGIC = 0xA5
+
+HEADER = struct.Struct("<BBHH")
+CRC = struct.Struct("<H")
+OVERHEAD = HEADER.size + CRC.size
+
+MAX_PAYLOAD = 0xFFFF
+
+
+class MsgType(IntEnum):
+    POWER = 0x01
+    COLOR_HS = 0x02
+    BRIGHTNESS = 0x03
+    SYNC_START = 0x04
+    PING = 0x05
+    FRAME = 0x10
+    FRAME_DELTA = 0x11          # 见 core.protocol.delta
+    PROGRAM_UPLOAD = 0x20       # 灯效程序，见 core.program
+    PROGRAM_CTRL = 0x21
+    PROGRAM_PARAM = 0x22
+    PROGRAM_CORRECT = 0x23
+    PONG = 0x85                 # 设备 -> 主机，原样带回 PING 的 payload
+    PROGRAM_ACK = 0x86          # 设备 -> 主机，程序上传进度
+
+
+# 各消息 payload 布局
+POWER = struct.Struct("<B")
+COLOR_HS = struct.Struct("<HB")
+BRIGHTNESS = struct.Struct("<B")
+SYNC_START = struct.Struct("<I")            # 距共同起点的微秒数，在写出前一刻才计算
+FRAME_HDR = struct.Struct("<HH")            # offset, led_count；后接 led_count * RGB
+PING = struct.Struct("<I")                  # 主机单调时钟微秒（低 32 位），写出前一刻才取
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+class Message(NamedTuple):
+    type: int
+    seq: int
+    payload: memoryview
+
+
+def crc16(data) -> int:
+    return crc_hqx(data, 0xFFFF)
+
+
+class Encoder:
+    # 预分配一块帧缓冲，每次编码复用；返回的 memoryview 在下一次编码前有效
+    # max_payload：通用消息需要比整帧更大的 payload 时（如增量帧的最坏情况）按此预留
+
+    def __init__(self, max_leds: int = 2000, max_payload: int = 0):
+        self.max_leds = max_leds
+        self._buf = bytearray(OVERHEAD + max(FRAME_HDR.size + max_leds * 3, max_payload))
+        self._view = memoryview(self._buf)
+        self._seq = 0
+
+    def seq(self) -> int:
+        return self._seq
+
+    # 通用消息 payload 的上限
+    def capacity(self) -> int:
+        return len(self._buf) - OVERHEAD
+
+    def power(self, on: bool) -> memoryview:
+        POWER.pack_into(self._buf, HEADER.size, 1 if on else 0)
+        return self._finish(MsgType.POWER, POWER.size)
+
+    def color_hs(self, h: int, s: int) -> memoryview:
+        COLOR_HS.pack_into(self._buf, HEADER.size, int(h) % 360, max(0, min(255, int(s))))
+        return self._finish(MsgType.COLOR_HS, COLOR_HS.size)
+
+    def brightness(self, percent: int) -> memoryview:
+        BRIGHTNESS.pack_into(self._buf, HEADER.size, max(0, min(100, int(percent))))
+        return self._finish(MsgType.BRIGHTNESS, BRIGHTNESS.size)
+
+    def sync_start(self, delay_us: int) -> memoryview:
+        SYNC_START.pack_into(self._buf, HEADER.size, max(0, min(0xFFFFFFFF, int(delay_us))))
+        return self._finish(MsgType.SYNC_START, SYNC_START.size)
+
+    def ping(self, token: int) -> memoryview:
+        PING.pack_into(self._buf, HEADER.size, int(token) & 0xFFFFFFFF)
+        return self._finish(MsgType.PING, PING.size)
+
+    def pong(self, token: int) -> memoryview:
+        PING.pack_into(self._buf, HEADER.size, int(token) & 0xFFFFFFFF)
+        return self._finish(MsgType.PONG, PING.size)
+
+    # pixels：任意连续 RGB 字节缓冲（bytes / bytearray / memoryview / uint8 ndarray），整体一次拷贝
+    def frame(self, pixels, offset: int = 0) -> memoryview:
+        src = memoryview(pixels).cast("B")
+        n, rem = divmod(src.nbytes, 3)
+        if rem:
+            raise ProtocolError(f"pixel buffer length {src.nbytes} is not a multiple of 3")
+
+        self.frame_pixels(n, offset)[:] = src
+        return self.finish_frame(n)
+
+    # 两段式编码：先取帧缓冲里 n 个灯的 RGB 区域由调用方直接写入（如校正查表的输出），再 finish_frame
+    def frame_pixels(self, n: int, offset: int = 0) -> memoryview:
+        if n > self.max_leds:
+            raise ProtocolError(f"frame has {n} leds, encoder holds at most {self.max_leds}")
+
+        start = HEADER.size + FRAME_HDR.size
+        FRAME_HDR.pack_into(self._buf, HEADER.size, offset, n)
+        return self._view[start:start + n * 3]
+
+    def finish_frame(self, n: int) -> memoryview:
+        return self._finish(MsgType.FRAME, FRAME_HDR.size + n * 3)
+
+    # 通用入口：payload 已经序列化好的消息类型
+    def message(self, msg_type: int, payload=b"") -> memoryview:
+        src = memoryview(payload).cast("B")
+        if src.nbytes > self.capacity():
+            raise ProtocolError(f"payload of {src.nbytes} bytes does not fit the frame buffer")
+
+        self._view[HEADER.size:HEADER.size + src.nbytes] = src
+        return self._finish(msg_type, src.nbytes)
+
+    def _finish(self, msg_type: int, payload_len: int) -> memoryview:
+        seq = self._seq
+        self._seq = (seq + 1) & 0xFFFF
+
+        end = HEADER.size + payload_len
+        HEADER.pack_into(self._buf, 0, MAGIC, int(msg_type), seq, payload_len)
+        CRC.pack_into(self._buf, end, crc16(self._view[:end]))
+        return self._view[:end + CRC.size]
+
+
+def decode(data) -> Message:
+    view = memoryview(data).cast("B")
+    if view.nbytes < OVERHEAD:
+        raise ProtocolError(f"message too short: {view.nbytes} bytes")
+
+    magic, msg_type, seq, length = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ProtocolError(f"bad magic 0x{magic:02X}")
+
+    end = HEADER.size + length
+    if view.nbytes != end + CRC.size:
+        raise ProtocolError(f"length mismatch: header says {length}, got {view.nbytes - OVERHEAD}")
+
+    (crc,) = CRC.unpack_from(view, end)
+    if crc != crc16(view[:end]):
+        raise ProtocolError(f"crc mismatch on seq {seq}")
+
+    return Message(msg_type, seq, view[HEADER.size:end])
+
+
+# ---------- payload 解析 ----------
+
+def parse_power(payload) -> bool:
+    return bool(POWER.unpack_from(payload)[0])
+
+
+def parse_color_hs(payload) -> tuple[int, int]:
+    return COLOR_HS.unpack_from(payload)
+
+
+def parse_brightness(payload) -> int:
+    return BRIGHTNESS.unpack_from(payload)[0]
+
+
+def parse_sync_start(payload) -> int:
+    return SYNC_START.unpack_from(payload)[0]
+
+
+def parse_ping(payload) -> int:
+    return PING.unpack_from(payload)[0]
+
+
+# 返回 (offset, RGB 视图)，不拷贝
+def parse_frame(payload) -> tuple[int, memoryview]:
+    offset, n = FRAME_HDR.unpack_from(payload)
+    rgb = memoryview(payload)[FRAME_HDR.size:FRAME_HDR.size + n * 3]
+    if rgb.nbytes != n * 3:
+        raise ProtocolError(f"frame payload truncated: expected {n} leds")
+    return offset, rgb
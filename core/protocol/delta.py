@@ -0,0 +1,236 @@
+import struct
+import time
+
+import numpy as np
+
+from core.protocol.codec import FRAME_HDR, ProtocolError
+
+# 增量帧（MsgType.FRAME_DELTA）：只发送与上一帧不同的灯区，均匀的一段用游程编码
+# payload：| frame_id u16 | ref_id u16 | led_count u16 | flags u8 | span ... |
+# span：   | start u16 | len u16 | 数据 |，len 最高位为 1 表示游程（数据为 1 个 RGB），否则为 len 个 RGB
+# 关键帧（flags & KEY）以全黑为基准，设备先清零再应用；其余帧只在 ref_id 等于设备当前帧号时应用，
+# 否则丢弃并等待下一个关键帧。参考帧是最后一次真正写出的帧，在队列里被丢弃的帧不会成为参考
+
+DELTA_HDR = struct.Struct("<HHHB")
+SPAN = struct.Struct("<HH")
+
+KEY = 0x01
+RUN = 0x8000
+MAX_SPAN = RUN - 1
+
+MERGE_GAP = SPAN.size // 3          # 间隔不超过该灯数的两段合并，比再开一个 span 头更省
+MIN_RUN = 4                         # 游程至少这么长才值得单独成段（span 头 + 1 RGB，另加恢复原始段的 span 头）
+
+
+# 最坏情况（关键帧退化为单个原始段）的 payload 大小，编码缓冲按此预留
+def max_payload(leds: int) -> int:
+    return DELTA_HDR.size + SPAN.size * max(1, -(-leds // MAX_SPAN)) + leds * 3
+
+
+def _dirty_spans(cur: np.ndarray, ref: np.ndarray | None) -> list[tuple[int, int]]:
+    if ref is None:
+        dirty = cur.any(axis=1)
+    else:
+        dirty = (cur != ref).any(axis=1)
+
+    idx = np.flatnonzero(dirty)
+    if not len(idx):
+        return []
+
+    breaks = np.flatnonzero(np.diff(idx) > MERGE_GAP + 1)
+    starts = idx[np.r_[0, breaks + 1]]
+    ends = idx[np.r_[breaks, len(idx) - 1]] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+# 一段脏区内再按相邻像素是否相同切出游程：[(start, end, is_run), ...]
+def _segments(cur: np.ndarray, start: int, end: int) -> list[tuple[int, int, bool]]:
+    if end - start < MIN_RUN:
+        return [(start, end, False)]
+
+    seg = cur[start:end]
+    change = np.flatnonzero((seg[1:] != seg[:-1]).any(axis=1)) + 1
+    run_starts = np.r_[0, change]
+    run_ends = np.r_[change, len(seg)]
+    long = np.flatnonzero(run_ends - run_starts >= MIN_RUN)
+    if not len(long):
+        return [(start, end, False)]
+
+    out = []
+    pos = 0
+    for i in long.tolist():
+        rs, re_ = int(run_starts[i]), int(run_ends[i])
+        if rs > pos:
+            out.append((start + pos, start + rs, False))
+        out.append((start + rs, start + re_, True))
+        pos = re_
+    if pos < len(seg):
+        out.append((start + pos, end, False))
+    return out
+
+
+class DeltaEncoder:
+    # 发送端：持有参考帧与帧号；encode 返回的 payload 视图在下一次 encode 前有效
+
+    def __init__(self, max_leds: int = 2000, keyframe_interval: int = 60):
+        self.max_leds = max_leds
+        self.keyframe_interval = keyframe_interval
+        self._buf = bytearray(max_payload(max_leds))
+        self._view = memoryview(self._buf)
+        self._key_buf = bytearray(len(self._buf))       # 增量较大时同时编一份关键帧比大小
+        self._key_view = memoryview(self._key_buf)
+        self._ref: np.ndarray | None = None
+        self._frame_id = 0
+        self._since_key = 0
+        self._force_key = True
+
+        self.frames = 0
+        self.keyframes = 0
+        self.spans = 0
+        self.bytes = 0
+        self.raw_bytes = 0
+        self._encode_s = 0.0
+
+    # 下一帧强制为关键帧（重连、设备请求或切换模式时）
+    def request_keyframe(self):
+        self._force_key = True
+
+    def reset(self):
+        self._ref = None
+        self._frame_id = 0
+        self._since_key = 0
+        self._force_key = True
+
+    # pixels: (n, 3) uint8，编码后成为新的参考帧
+    def encode(self, pixels) -> memoryview:
+        t0 = time.perf_counter()
+        cur = np.ascontiguousarray(pixels, np.uint8).reshape(-1, 3)
+        n = len(cur)
+        if n > self.max_leds:
+            raise ProtocolError(f"frame has {n} leds, encoder holds at most {self.max_leds}")
+
+        key = (self._force_key or self._ref is None or len(self._ref) != n
+               or self._since_key >= self.keyframe_interval)
+
+        buf, view = self._buf, self._view
+        if not key:
+            size, spans = self._write(self._view, cur, self._ref)
+            # 不止一个游程时与关键帧比大小：关键帧只发非黑的部分（如移动的彗星只发彗星本身，增量要发新旧两处），
+            # 不大于增量就发关键帧，顺便刷新设备端参考
+            if size > DELTA_HDR.size + SPAN.size + 3:
+                key_size, key_spans = self._write(self._key_view, cur, None)
+                if key_size <= size:
+                    key, size, spans = True, key_size, key_spans
+                    buf, view = self._key_buf, self._key_view
+        else:
+            size, spans = self._write(self._view, cur, None)
+
+        ref_id = self._frame_id
+        self._frame_id = (self._frame_id + 1) & 0xFFFF
+        DELTA_HDR.pack_into(buf, 0, self._frame_id, ref_id, n, KEY if key else 0)
+
+        if self._ref is None or len(self._ref) != n:
+            self._ref = np.empty((n, 3), np.uint8)
+        self._ref[...] = cur
+        self._force_key = False
+        self._since_key = 0 if key else self._since_key + 1
+
+        self.frames += 1
+        self.keyframes += key
+        self.spans += spans
+        self.bytes += size
+        self.raw_bytes += FRAME_HDR.size + n * 3
+        self._encode_s += time.perf_counter() - t0
+        return view[:size]
+
+    # ref 为 None 时以全黑为基准（关键帧）；返回 (payload 长度, span 数)，放不下时长度为缓冲长度 + 1
+    def _write(self, out: memoryview, cur: np.ndarray, ref: np.ndarray | None) -> tuple[int, int]:
+        pos = DELTA_HDR.size
+        limit = out.nbytes
+        spans = 0
+        # 关键帧里全黑的部分不用发（设备先清零）
+        for s, e in _dirty_spans(cur, ref):
+            for a, b, run in _segments(cur, s, e):
+                while a < b:
+                    ln = min(b - a, MAX_SPAN)
+                    need = SPAN.size + (3 if run else ln * 3)
+                    if pos + need > limit:
+                        return limit + 1, spans
+                    SPAN.pack_into(out, pos, a, ln | (RUN if run else 0))
+                    pos += SPAN.size
+                    if run:
+                        out[pos:pos + 3] = cur[a].tobytes()
+                        pos += 3
+                    else:
+                        out[pos:pos + ln * 3] = memoryview(cur[a:a + ln]).cast("B")
+                        pos += ln * 3
+                    spans += 1
+                    a += ln
+        return pos, spans
+
+    def stats(self) -> dict:
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "bytes": self.bytes,
+            "raw_bytes": self.raw_bytes,
+            "ratio": self.raw_bytes / self.bytes if self.bytes else 0.0,
+            "bytes_per_frame": self.bytes / frames,
+            "spans_per_frame": self.spans / frames,
+            "encode_us_avg": self._encode_s * 1e6 / frames,
+        }
+
+
+class DeltaDecoder:
+    # 设备端：把增量帧应用到灯珠缓冲；参考帧号对不上时拒收，直到下一个关键帧
+
+    def __init__(self):
+        self.frame_id: int | None = None
+        self.applied = 0
+        self.rejected = 0
+
+    def invalidate(self):
+        self.frame_id = None
+
+    # pixels：设备的 RGB 缓冲（bytearray），超出缓冲长度的部分截断
+    def apply(self, payload, pixels: bytearray) -> bool:
+        view = memoryview(payload).cast("B")
+        frame_id, ref_id, n, flags = DELTA_HDR.unpack_from(view)
+        cap = len(pixels) // 3
+
+        if flags & KEY:
+            end = min(n, cap) * 3
+            pixels[0:end] = bytes(end)
+        elif self.frame_id is None or ref_id != self.frame_id:
+            self.rejected += 1
+            self.frame_id = None
+            return False
+
+        # 中途发现格式错误时缓冲已被改了一部分，不能再作为后续增量的参考
+        self.frame_id = None
+        pos = DELTA_HDR.size
+        while pos < view.nbytes:
+            start, ln = SPAN.unpack_from(view, pos)
+            pos += SPAN.size
+            run = ln & RUN
+            ln &= MAX_SPAN
+            if start + ln > n:
+                raise ProtocolError(f"delta span {start}+{ln} exceeds {n} leds")
+
+            count = max(0, min(start + ln, cap) - start)
+            if run:
+                if count:
+                    pixels[start * 3:(start + count) * 3] = bytes(view[pos:pos + 3]) * count
+                pos += 3
+            else:
+                if count:
+                    pixels[start * 3:(start + count) * 3] = view[pos:pos + count * 3]
+                pos += ln * 3
+
+        if pos != view.nbytes:
+            raise ProtocolError("delta payload truncated")
+
+        self.frame_id = frame_id
+        self.applied += 1
+        return True
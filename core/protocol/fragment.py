@@ -0,0 +1,113 @@
+import struct
+
+from core.protocol.codec import ProtocolError
+
+# 分片头：| msg_id u8 | index u16 |，index 最高位表示最后一片
+# BLE write-without-response 在同一连接上保序，因此只需按序号检测丢片
+
+FRAG = struct.Struct("<BH")
+LAST = 0x8000
+MAX_INDEX = LAST - 1
+
+
+class Fragmenter:
+    # 按 MTU 切片；切片写入复用的缓冲区，返回的视图在下一次 split 前有效
+
+    def __init__(self, mtu: int = 20):
+        self.set_mtu(mtu)
+        self._buf = bytearray(0)
+        self._msg_id = 0
+
+    def set_mtu(self, mtu: int):
+        if mtu <= FRAG.size:
+            raise ValueError(f"mtu {mtu} leaves no room for payload")
+        self.mtu = mtu
+        self.chunk = mtu - FRAG.size
+
+    def count(self, size: int) -> int:
+        return max(1, -(-size // self.chunk))
+
+    def split(self, message) -> list[memoryview]:
+        src = memoryview(message).cast("B")
+        size = src.nbytes
+        count = self.count(size)
+        if count - 1 > MAX_INDEX:
+            raise ProtocolError(f"message of {size} bytes needs {count} fragments at mtu {self.mtu}")
+
+        need = size + count * FRAG.size
+        if len(self._buf) < need:
+            self._buf = bytearray(need)
+        view = memoryview(self._buf)
+
+        msg_id = self._msg_id
+        self._msg_id = (msg_id + 1) & 0xFF
+
+        out = []
+        pos = 0
+        for i in range(count):
+            part = src[i * self.chunk:(i + 1) * self.chunk]
+            end = pos + FRAG.size + part.nbytes
+            FRAG.pack_into(self._buf, pos, msg_id, i | (LAST if i == count - 1 else 0))
+            view[pos + FRAG.size:end] = part
+            out.append(view[pos:end])
+            pos = end
+        return out
+
+
+class Reassembler:
+    # 按序拼接分片；乱序 / 缺片时丢弃当前消息并计数
+
+    def __init__(self, max_size: int = 1 << 16):
+        self.max_size = max_size
+        self._buf = bytearray(max_size)
+        self._view = memoryview(self._buf)
+        self._msg_id: int | None = None
+        self._expect = 0
+        self._len = 0
+
+        self.completed = 0
+        self.dropped = 0
+
+    # 输入一片，凑齐时返回完整消息视图（下一次 feed 前有效），否则返回 None
+    def feed(self, fragment) -> memoryview | None:
+        view = memoryview(fragment).cast("B")
+        if view.nbytes < FRAG.size:
+            self._drop()
+            return None
+
+        msg_id, index = FRAG.unpack_from(view, 0)
+        last = bool(index & LAST)
+        index &= MAX_INDEX
+        part = view[FRAG.size:]
+
+        if index == 0:
+            if self._msg_id is not None:
+                self._drop()
+            self._msg_id = msg_id
+            self._expect = 0
+            self._len = 0
+        elif msg_id != self._msg_id or index != self._expect:
+            if self._msg_id is not None:
+                self._drop()
+            return None
+
+        end = self._len + part.nbytes
+        if end > self.max_size:
+            self._drop()
+            return None
+
+        self._view[self._len:end] = part
+        self._len = end
+        self._expect = index + 1
+
+        if not last:
+            return None
+
+        self._msg_id = None
+        self.completed += 1
+        return self._view[:end]
+
+    def _drop(self):
+        self._msg_id = None
+        self._len = 0
+        self.dropped += 1
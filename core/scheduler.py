@@ -0,0 +1,118 @@
+import collections
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+from core.effects import Effect
+
+
+class FrameStats:
+    # 单个效果的帧耗时统计（最近 N 帧窗口 + 累计）
+
+    def __init__(self, window: int = 512):
+        self._samples = collections.deque(maxlen=window)
+        self.frames = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self._samples.append(ms)
+        self.frames += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def snapshot(self) -> dict:
+        s = sorted(self._samples)
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "mean_ms": self.total_ms / self.frames if self.frames else 0.0,
+            "p95_ms": s[min(len(s) - 1, int(len(s) * 0.95))] if s else 0.0,
+            "max_ms": self.max_ms,
+        }
+
+
+class FixedStepScheduler:
+    # 固定步长调度：按绝对截止时间推进（不累积漂移），超时则整步跳帧而不是追帧
+
+    def __init__(self, fps: float, sink: Callable[[np.ndarray], None],
+                 clock: Callable[[], float] = time.perf_counter):
+        self.fps = fps
+        self.sink = sink
+        self._clock = clock
+        self._effect: Effect | None = None
+        self._stats: dict[str, FrameStats] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        self.ticks = 0
+        self._t_start = 0.0
+
+    def set_effect(self, effect: Effect):
+        with self._lock:
+            self._effect = effect
+            self._stats.setdefault(effect.name, FrameStats())
+
+    def effect(self) -> Effect | None:
+        return self._effect
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="effect-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            out = {name: st.snapshot() for name, st in self._stats.items()}
+        elapsed = self._clock() - self._t_start if self._thread is not None else 0.0
+        if elapsed > 0:
+            out["_scheduler"] = {"fps": self.ticks / elapsed, "target_fps": self.fps}
+        return out
+
+    def _run(self):
+        dt = 1.0 / self.fps
+        self._t_start = start = self._clock()
+        self.ticks = 0
+        deadline = start
+
+        while not self._stop.is_set():
+            now = self._clock()
+            if now < deadline:
+                self._stop.wait(deadline - now)
+                continue
+
+            with self._lock:
+                effect = self._effect
+                stats = self._stats.get(effect.name) if effect is not None else None
+
+            # 落后一整步以上：跳过这些步，时间轴仍按整步对齐
+            behind = int((now - deadline) / dt)
+            if behind and stats is not None:
+                stats.skipped += behind
+            deadline += behind * dt
+            step = dt * (behind + 1)
+
+            if effect is not None:
+                t0 = self._clock()
+                frame = effect.render(deadline - start, step)
+                self.sink(frame)
+                stats.record((self._clock() - t0) * 1000.0)
+
+            self.ticks += 1
+            deadline += dt
@@ -0,0 +1,209 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+# 持久化状态：每个分区一个 JSON 文件，首次访问时才读取解析
+# 写入只改内存并标脏，由后台线程防抖落盘（临时文件 + os.replace 原子替换），调用线程从不碰磁盘
+
+SECTIONS = ("last_state", "favorites", "devices", "calibration", "settings", "layouts")
+
+
+def default_root() -> str:
+    env = os.environ.get("PRISMFX_HOME")
+    if env:
+        return env
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), "PrismFX")
+    return os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"), "prismfx")
+
+
+# 某台设备的校准：没有单独保存过的设备沿用 "default"
+def load_calibration(store: "StateStore", key: str) -> dict:
+    saved = store.get("calibration", key)
+    if saved is None:
+        saved = store.get("calibration", "default", {})
+    return dict(saved)
+
+
+class StateStore:
+
+    def __init__(self, root: str | None = None, delay: float = 0.5, max_delay: float = 5.0):
+        self.root = root or default_root()
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()        # 取快照 + 写文件整体串行，旧快照不会覆盖新快照
+        self._wake = threading.Condition(self._lock)
+        self._data: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._first_dirty = 0.0
+        self._last_change = 0.0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+        self.loads = 0
+        self.changes = 0
+        self.writes = 0
+        self.errors = 0
+
+    def path(self, section: str) -> str:
+        return os.path.join(self.root, f"{section}.json")
+
+    # ---------- 读 ----------
+
+    # 返回副本；修改请走 set / update / replace
+    def section(self, section: str) -> dict:
+        with self._lock:
+            return dict(self._section(section))
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._section(section).get(key, default)
+
+    def is_loaded(self, section: str) -> bool:
+        return section in self._data
+
+    # ---------- 写（只改内存） ----------
+
+    def set(self, section: str, key: str, value: Any):
+        with self._lock:
+            data = self._section(section)
+            if key in data and data[key] == value:
+                return
+            data[key] = value
+            self._mark(section)
+
+    def update(self, section: str, values: dict):
+        with self._lock:
+            data = self._section(section)
+            if all(k in data and data[k] == v for k, v in values.items()):
+                return
+            data.update(values)
+            self._mark(section)
+
+    def delete(self, section: str, key: str):
+        with self._lock:
+            if self._section(section).pop(key, None) is not None:
+                self._mark(section)
+
+    def replace(self, section: str, data: dict):
+        with self._lock:
+            self._data[section] = dict(data)
+            self._mark(section)
+
+    # ---------- 落盘 ----------
+
+    # 立即写出所有脏分区（退出时 / 测试用）
+    def flush(self):
+        with self._io_lock:
+            with self._lock:
+                pending = self._take_dirty()
+            self._write(pending)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "root": self.root,
+            "loaded": sorted(self._data),
+            "dirty": sorted(self._dirty),
+            "loads": self.loads,
+            "changes": self.changes,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+    # ---------- 内部（持锁调用） ----------
+
+    def _section(self, section: str) -> dict:
+        data = self._data.get(section)
+        if data is None:
+            data = self._load(section)
+            self._data[section] = data
+        return data
+
+    def _load(self, section: str) -> dict:
+        self.loads += 1
+        try:
+            with open(self.path(section), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self.errors += 1
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _mark(self, section: str):
+        now = time.monotonic()
+        if not self._dirty:
+            self._first_dirty = now
+        self._dirty.add(section)
+        self._last_change = now
+        self.changes += 1
+
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="prismfx-store", daemon=True)
+            self._thread.start()
+        self._wake.notify()
+
+    def _take_dirty(self) -> dict[str, str]:
+        # 序列化在锁内完成，拿到的是一致的快照；写文件在锁外
+        # 某个分区里有不能序列化的值时只跳过该分区并计数，写线程不能因此退出
+        pending = {}
+        for section in self._dirty:
+            try:
+                pending[section] = json.dumps(self._data[section], ensure_ascii=False, indent=2)
+            except (TypeError, ValueError):
+                self.errors += 1
+        self._dirty.clear()
+        return pending
+
+    # 最后一次修改后静默 delay 秒再写；持续修改时最多拖 max_delay 秒
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._dirty and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+
+                due = min(self._last_change + self.delay, self._first_dirty + self.max_delay)
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._wake.wait(wait)
+                    continue
+            self.flush()
+
+    def _write(self, pending: dict[str, str]):
+        if not pending:
+            return
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError:
+            self.errors += 1
+            return
+
+        for section, text in pending.items():
+            path = self.path(section)
+            tmp = f"{path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+                self.writes += 1
+            except OSError:
+                self.errors += 1
@@ -0,0 +1,202 @@
+import collections
+import csv
+import json
+import time
+from typing import Callable
+
+# 运行时遥测：各组件自己维护累计计数（普通 int 属性）和延迟直方图，这里只负责定期采样、
+# 把累计值换算成速率、保留一段历史并导出。采样在 GUI 定时器里做，热路径上只有 Histogram.record
+
+SUB_BITS = 4
+SUB = 1 << SUB_BITS
+MAX_US = (1 << 32) - 1                  # 约 71 分钟，超出的记在最后一格
+BUCKETS = ((MAX_US.bit_length() - SUB_BITS) << SUB_BITS) + SUB
+
+
+def _index(us: int) -> int:
+    if us < SUB:
+        return us
+    e = us.bit_length() - SUB_BITS - 1
+    return ((e + 1) << SUB_BITS) + (us >> e) - SUB
+
+
+# 桶的 [下界, 上界)，单位微秒
+def _bounds(i: int) -> tuple[int, int]:
+    if i < SUB:
+        return i, i + 1
+    e = (i >> SUB_BITS) - 1
+    lo = ((i & (SUB - 1)) + SUB) << e
+    return lo, lo + (1 << e)
+
+
+class Histogram:
+    # HDR 风格对数分桶：每个 2 的幂区间再均分 16 格，相对误差 < 6.25%，固定 464 个计数
+    # record 只做一次位运算和一次列表自增，不加锁；跨线程读到的是近似一致的快照，统计用足够
+
+    def __init__(self):
+        self._counts = [0] * BUCKETS
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    # seconds：一段耗时（通常是两个 time.monotonic() 之差）
+    def record(self, seconds: float):
+        us = int(seconds * 1e6)
+        if us < 0:
+            us = 0
+        elif us > MAX_US:
+            us = MAX_US
+        self._counts[_index(us)] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def reset(self):
+        self._counts = [0] * BUCKETS
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def merge(self, other: "Histogram"):
+        for i, c in enumerate(other._counts):
+            if c:
+                self._counts[i] += c
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    # 返回毫秒；取所在桶的中点，并不超过实际最大值
+    def percentile(self, p: float) -> float:
+        return self.percentiles((p,))[0]
+
+    # ps 需升序；一次遍历求出全部分位
+    def percentiles(self, ps) -> list[float]:
+        counts = self._counts
+        total = self.count
+        if not total:
+            return [0.0 for _ in ps]
+
+        ranks = [max(1, int(total * p / 100.0 + 0.5)) for p in ps]
+        out = []
+        seen = 0
+        for i, c in enumerate(counts):
+            if not c:
+                continue
+            seen += c
+            while len(out) < len(ranks) and seen >= ranks[len(out)]:
+                lo, hi = _bounds(i)
+                out.append(min((lo + hi - 1) / 2.0, self.max_us) / 1000.0)
+            if len(out) == len(ranks):
+                return out
+        # 并发 record 时 count 可能领先于桶计数，剩余分位取最大值
+        return out + [self.max_us / 1000.0] * (len(ranks) - len(out))
+
+    def summary(self) -> dict:
+        p50, p90, p99 = self.percentiles((50, 90, 99))
+        count = self.count
+        return {
+            "count": count,
+            "mean": self.total_us / count / 1000.0 if count else 0.0,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": self.max_us / 1000.0,
+        }
+
+
+# 嵌套 stats 字典压平成 "a.b.c" -> 数值，非数值项丢弃
+def flatten(stats: dict, prefix: str = "") -> dict[str, float]:
+    out = {}
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(flatten(value, f"{name}."))
+        elif isinstance(value, bool):
+            out[name] = int(value)
+        elif isinstance(value, (int, float)):
+            out[name] = value
+    return out
+
+
+class Telemetry:
+    # 注册若干数据源（返回 stats 字典的函数），sample 时统一采集
+    # RATE_KEYS 里的累计计数额外给出 "<key>_per_s"，按相邻两次采样之差计算
+
+    RATE_KEYS = ("sent_bytes", "sent_msgs", "frames", "dropped", "coalesced", "submitted", "sent")
+
+    def __init__(self, history: int = 600, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._sources: dict[str, Callable[[], dict]] = {}
+        self._prev: tuple[float, dict[str, float]] | None = None
+        self._history: collections.deque = collections.deque(maxlen=history)
+        self._latest: dict = {}
+        self.sample_us = 0.0
+
+    def add_source(self, name: str, fn: Callable[[], dict]):
+        self._sources[name] = fn
+
+    def remove_source(self, name: str):
+        self._sources.pop(name, None)
+
+    def sources(self) -> list[str]:
+        return list(self._sources)
+
+    # 采集一次；返回 {source: stats}，stats 里速率项已经补齐
+    def sample(self) -> dict:
+        t0 = time.perf_counter()
+        now = self._clock()
+
+        snap = {}
+        for name, fn in list(self._sources.items()):
+            try:
+                snap[name] = fn()
+            except Exception as e:
+                snap[name] = {"error": str(e)}
+
+        counters: dict[tuple, float] = {}
+        prev_t, prev = self._prev if self._prev is not None else (now, {})
+        self._add_rates(snap, (), prev, now - prev_t, counters)
+        self._prev = (now, counters)
+
+        self._latest = snap
+        self._history.append((time.time(), flatten(snap)))
+        self.sample_us = (time.perf_counter() - t0) * 1e6
+        return snap
+
+    def latest(self) -> dict:
+        return self._latest
+
+    def history(self) -> list[tuple[float, dict[str, float]]]:
+        return list(self._history)
+
+    # 按路径（元组，设备名里可能带点）记录累计值，与上次采样相减得到速率
+    def _add_rates(self, d: dict, path: tuple, prev: dict, dt: float, counters: dict):
+        for key, value in list(d.items()):
+            p = path + (key,)
+            if isinstance(value, dict):
+                self._add_rates(value, p, prev, dt, counters)
+            elif key in self.RATE_KEYS and isinstance(value, (int, float)):
+                counters[p] = value
+                if dt > 0 and p in prev:
+                    d[f"{key}_per_s"] = max(0.0, (value - prev[p]) / dt)
+
+    # ---------- 导出 ----------
+
+    def to_json(self) -> str:
+        return json.dumps({"time": time.time(), "latest": self._latest,
+                           "history": [{"time": t, **flat} for t, flat in self._history]},
+                          ensure_ascii=False, indent=2, default=str)
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    # 长表：每行 time, metric, value，便于表格软件透视
+    def write_csv(self, path: str):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["time", "metric", "value"])
+            for t, flat in self._history:
+                for key, value in flat.items():
+                    w.writerow([f"{t:.3f}", key, value])
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+class TransportError(RuntimeError):
+    pass
+
+
+@dataclass
+class DeviceInfo:
+    kind: str               # "ble" / "serial" / "socket" / "loopback"
+    address: str
+    name: str = ""
+    rssi: int | None = None
+    extra: dict = field(default_factory=dict)
+
+    def label(self) -> str:
+        return f"{self.name or self.address} ({self.kind}: {self.address})"
+
+
+class Backend(ABC):
+    # 通信后端接口：所有方法都在传输线程的事件循环里调用
+
+    kind = ""
+
+    def __init__(self):
+        self.mtu = 20
+        self.caps: dict = {}            # 连接时得到的固件能力，供下次直连复用
+        self.handles: dict = {}         # 已解析的特征句柄（BLE）
+        self._on_notify: Callable[[bytes], None] | None = None
+        self._on_disconnect: Callable[[], None] | None = None
+
+    def set_callbacks(self, on_notify: Callable[[bytes], None] | None = None,
+                     on_disconnect: Callable[[], None] | None = None):
+        self._on_notify = on_notify
+        self._on_disconnect = on_disconnect
+
+    @abstractmethod
+    async def connect(self):
+        ...
+
+    @abstractmethod
+    async def disconnect(self):
+        ...
+
+    # write-without-response：只保证进入底层发送队列，不等待设备应答
+    @abstractmethod
+    async def write(self, data: bytes):
+        ...
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, "")
+
+    @classmethod
+    async def discover(cls, timeout: float = 3.0) -> list[DeviceInfo]:
+        return []
+
+    def _notify(self, data: bytes):
+        if self._on_notify is not None:
+            self._on_notify(data)
+
+    def _disconnected(self):
+        if self._on_disconnect is not None:
+            self._on_disconnect()
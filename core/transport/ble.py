@@ -0,0 +1,108 @@
+from core.transport.base import Backend, DeviceInfo, TransportError
+
+# 可选依赖：bleak
+# 下位机使用 NUS 风格的透传服务：RX 为主机写入特征，TX 为设备通知特征
+
+SERVICE_UUID = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
+RX_CHAR_UUID = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"
+TX_CHAR_UUID = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
+FIRMWARE_REV_UUID = "00002a26-0000-1000-8000-00805f9b34fb"
+DIS_SERVICE_UUID = "0000180a-0000-1000-8000-00805f9b34fb"
+
+NAME_PREFIX = "PrismFX"
+
+ATT_OVERHEAD = 3
+
+
+def _import_bleak():
+    try:
+        import bleak
+    except ImportError as e:
+        raise TransportError("BLE backend requires bleak: pip install bleak") from e
+    return bleak
+
+
+class BleBackend(Backend):
+    kind = "ble"
+
+    # handles / caps：上次连接缓存的特征句柄与固件能力，有则直接按句柄读写、不再读固件版本
+    def __init__(self, address: str, name: str = "", rx_char: str = RX_CHAR_UUID, tx_char: str = TX_CHAR_UUID,
+                 handles: dict | None = None, caps: dict | None = None):
+        super().__init__()
+        self.address = address
+        self.name = name
+        self.rx_char = rx_char
+        self.tx_char = tx_char
+        self.handles = dict(handles or {})
+        self.caps = dict(caps or {})
+        self._client = None
+
+    async def connect(self):
+        bleak = _import_bleak()
+        # 只发现用得到的服务，缩短连接后的 GATT 发现
+        services = [SERVICE_UUID] if "firmware" in self.caps else [SERVICE_UUID, DIS_SERVICE_UUID]
+        self._client = bleak.BleakClient(self.address, disconnected_callback=lambda _c: self._disconnected(),
+                                         services=services)
+        try:
+            await self._client.connect()
+        except Exception as e:
+            self._client = None
+            raise TransportError(f"connect {self.address} failed: {e}") from e
+
+        self.mtu = max(20, self._client.mtu_size - ATT_OVERHEAD)
+        self._resolve_handles()
+
+        if "firmware" not in self.caps:
+            try:
+                raw = await self._client.read_gatt_char(FIRMWARE_REV_UUID)
+                self.caps["firmware"] = bytes(raw).decode("utf-8", "replace").strip("\0 ")
+            except Exception:
+                self.caps["firmware"] = ""
+
+        try:
+            await self._client.start_notify(self.handles.get("tx", self.tx_char),
+                                            lambda _h, data: self._notify(bytes(data)))
+            self.caps["notify"] = True
+        except Exception:
+            self.caps["notify"] = False
+
+    # 缓存的句柄在本次服务表里仍指向同一特征才沿用，否则按 UUID 重新查找
+    def _resolve_handles(self):
+        svcs = self._client.services
+        for key, uuid in (("rx", self.rx_char), ("tx", self.tx_char)):
+            handle = self.handles.get(key)
+            char = svcs.get_characteristic(handle) if handle is not None else None
+            if char is None or char.uuid.lower() != uuid.lower():
+                char = svcs.get_characteristic(uuid)
+            if char is not None:
+                self.handles[key] = char.handle
+            else:
+                self.handles.pop(key, None)
+
+    async def disconnect(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.disconnect()
+
+    async def write(self, data: bytes):
+        if self._client is None:
+            raise TransportError("BLE device is not connected")
+        await self._client.write_gatt_char(self.handles.get("rx", self.rx_char), data, response=False)
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, self.address, self.name)
+
+    @classmethod
+    async def discover(cls, timeout: float = 3.0) -> list[DeviceInfo]:
+        try:
+            bleak = _import_bleak()
+        except TransportError:
+            return []
+
+        found = await bleak.BleakScanner.discover(timeout=timeout, return_adv=True)
+        out = []
+        for dev, adv in found.values():
+            name = dev.name or adv.local_name or ""
+            if name.startswith(NAME_PREFIX) or SERVICE_UUID in (adv.service_uuids or []):
+                out.append(DeviceInfo(cls.kind, dev.address, name, adv.rssi))
+        return out
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Callable
+
+from core.protocol.codec import Encoder, Message, MsgType, ProtocolError, decode, parse_ping
+from core.protocol.fragment import Reassembler
+from core.transport.base import Backend, DeviceInfo
+
+
+class LoopbackBackend(Backend):
+    # 进程内回环：直接重组 + 解码收到的数据，便于调试和无设备运行
+
+    kind = "loopback"
+
+    def __init__(self, mtu: int = 244, write_delay: float = 0.0,
+                 on_message: Callable[[Message], None] | None = None):
+        super().__init__()
+        self.mtu = mtu
+        self.write_delay = write_delay
+        self.on_message = on_message
+        self.connected = False
+
+        self._reasm = Reassembler()
+        self._enc = Encoder(0)
+        self.messages = 0
+        self.errors = 0
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def write(self, data: bytes):
+        if self.write_delay > 0:
+            await asyncio.sleep(self.write_delay)
+
+        msg = self._reasm.feed(data)
+        if msg is None:
+            return
+
+        try:
+            m = decode(msg)
+        except ProtocolError:
+            self.errors += 1
+            return
+
+        self.messages += 1
+        if m.type == MsgType.PING:
+            self._notify(bytes(self._enc.pong(parse_ping(m.payload))))
+        if self.on_message is not None:
+            self.on_message(m)
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, "loopback", "Loopback")
+
+    @classmethod
+    async def discover(cls, timeout: float = 3.0) -> list[DeviceInfo]:
+        return [DeviceInfo(cls.kind, "loopback", "Loopback")]
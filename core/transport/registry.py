@@ -0,0 +1,43 @@
+import asyncio
+
+from core.transport.base import Backend, DeviceInfo, TransportError
+from core.transport.ble import BleBackend
+from core.transport.loopback import LoopbackBackend
+from core.transport.serial_port import SerialBackend
+from core.transport.socket_link import SocketBackend
+
+BACKENDS: dict[str, type[Backend]] = {
+    BleBackend.kind: BleBackend,
+    SerialBackend.kind: SerialBackend,
+    SocketBackend.kind: SocketBackend,
+    LoopbackBackend.kind: LoopbackBackend,
+}
+
+
+def register_backend(cls: type[Backend]):
+    BACKENDS[cls.kind] = cls
+    return cls
+
+
+# 并发扫描所有后端；单个后端失败不影响其它结果
+async def discover_all(timeout: float = 3.0, kinds: list[str] | None = None) -> list[DeviceInfo]:
+    classes = [BACKENDS[k] for k in (kinds or BACKENDS) if k in BACKENDS]
+    results = await asyncio.gather(*(c.discover(timeout) for c in classes), return_exceptions=True)
+
+    out: list[DeviceInfo] = []
+    for r in results:
+        if isinstance(r, list):
+            out.extend(r)
+    return out
+
+
+def create_backend(info: DeviceInfo) -> Backend:
+    if info.kind == BleBackend.kind:
+        return BleBackend(info.address, info.name, handles=info.extra.get("handles"), caps=info.extra.get("caps"))
+    if info.kind == SerialBackend.kind:
+        return SerialBackend(info.address)
+    if info.kind == SocketBackend.kind:
+        return SocketBackend.from_address(info.address, info.name)
+    if info.kind == LoopbackBackend.kind:
+        return LoopbackBackend()
+    raise TransportError(f"unknown backend kind: {info.kind}")
@@ -0,0 +1,77 @@
+import asyncio
+
+from core.transport.base import Backend, DeviceInfo, TransportError
+
+# 可选依赖：pyserial
+
+
+def _import_serial():
+    try:
+        import serial
+        import serial.tools.list_ports
+    except ImportError as e:
+        raise TransportError("serial backend requires pyserial: pip install pyserial") from e
+    return serial
+
+
+class SerialBackend(Backend):
+    # 串口后端：pyserial 为阻塞 I/O，读写放到默认线程池执行
+
+    kind = "serial"
+
+    def __init__(self, port: str, baudrate: int = 921600, mtu: int = 256):
+        super().__init__()
+        self.port = port
+        self.baudrate = baudrate
+        self.mtu = mtu
+        self._ser = None
+        self._reader: asyncio.Task | None = None
+
+    async def connect(self):
+        serial = _import_serial()
+        loop = asyncio.get_running_loop()
+        try:
+            self._ser = await loop.run_in_executor(
+                None, lambda: serial.Serial(self.port, self.baudrate, timeout=0.1, write_timeout=1.0)
+            )
+        except serial.SerialException as e:
+            raise TransportError(str(e)) from e
+        self._reader = loop.create_task(self._read_loop())
+
+    async def disconnect(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._ser is not None:
+            ser, self._ser = self._ser, None
+            await asyncio.get_running_loop().run_in_executor(None, ser.close)
+
+    async def write(self, data: bytes):
+        if self._ser is None:
+            raise TransportError("serial port is not open")
+        await asyncio.get_running_loop().run_in_executor(None, self._ser.write, data)
+
+    async def _read_loop(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._ser is not None:
+                data = await loop.run_in_executor(None, self._ser.read, 256)
+                if data:
+                    self._notify(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self._ser = None
+            self._disconnected()
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, self.port, self.port)
+
+    @classmethod
+    async def discover(cls, timeout: float = 3.0) -> list[DeviceInfo]:
+        try:
+            serial = _import_serial()
+        except TransportError:
+            return []
+        ports = await asyncio.get_running_loop().run_in_executor(None, serial.tools.list_ports.comports)
+        return [DeviceInfo(cls.kind, p.device, p.description or p.device) for p in ports]
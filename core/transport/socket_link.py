@@ -0,0 +1,109 @@
+import asyncio
+import struct
+import time
+
+from core.transport.base import Backend, DeviceInfo, TransportError
+
+# 本地套接字链路，供虚拟设备（core.emulator）使用
+# 握手：设备先发 HELLO；之后主机 -> 设备每片前缀 | len u16 | t_sent_ns u64 |，设备 -> 主机前缀 | len u16 |
+
+HELLO = struct.Struct("<4sH16s")
+HELLO_MAGIC = b"PRFX"
+UP = struct.Struct("<HQ")
+DOWN = struct.Struct("<H")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47800
+SCAN_PORTS = 8
+
+
+async def read_hello(reader: asyncio.StreamReader) -> tuple[int, str]:
+    magic, mtu, name = HELLO.unpack(await reader.readexactly(HELLO.size))
+    if magic != HELLO_MAGIC:
+        raise TransportError("peer is not a PrismFX device")
+    return mtu, name.rstrip(b"\0").decode("utf-8", "replace")
+
+
+class SocketBackend(Backend):
+    kind = "socket"
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, name: str = ""):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.name = name
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._rx: asyncio.Task | None = None
+
+    @classmethod
+    def from_address(cls, address: str, name: str = "") -> "SocketBackend":
+        host, _, port = address.rpartition(":")
+        return cls(host or DEFAULT_HOST, int(port), name)
+
+    async def connect(self):
+        try:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self.mtu, name = await asyncio.wait_for(read_hello(self._reader), 2.0)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, TransportError) as e:
+            await self.disconnect()
+            raise TransportError(f"connect {self.host}:{self.port} failed: {e!r}") from e
+
+        self.name = self.name or name
+        self._rx = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def disconnect(self):
+        if self._rx is not None:
+            self._rx.cancel()
+            self._rx = None
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def write(self, data: bytes):
+        if self._writer is None:
+            raise TransportError("socket is not connected")
+        self._writer.write(UP.pack(len(data), time.monotonic_ns()) + data)
+        await self._writer.drain()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                (n,) = DOWN.unpack(await self._reader.readexactly(DOWN.size))
+                self._notify(await self._reader.readexactly(n))
+        except asyncio.CancelledError:
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+
+        self._writer = None
+        self._disconnected()
+
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def info(self) -> DeviceInfo:
+        return DeviceInfo(self.kind, self.address(), self.name)
+
+    # 探测本机固定端口段上的虚拟设备
+    @classmethod
+    async def discover(cls, timeout: float = 3.0) -> list[DeviceInfo]:
+        async def probe(port: int) -> DeviceInfo | None:
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(DEFAULT_HOST, port), 0.3)
+            except (OSError, asyncio.TimeoutError):
+                return None
+            try:
+                mtu, name = await asyncio.wait_for(read_hello(reader), 0.5)
+                return DeviceInfo(cls.kind, f"{DEFAULT_HOST}:{port}", name, extra={"mtu": mtu})
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, TransportError):
+                return None
+            finally:
+                writer.close()
+
+        found = await asyncio.gather(*(probe(DEFAULT_PORT + i) for i in range(SCAN_PORTS)))
+        return [d for d in found if d is not None]
@@ -0,0 +1,281 @@
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Coroutine
+
+from core.protocol.codec import MsgType, ProtocolError, decode, parse_ping
+from core.protocol.fragment import Fragmenter
+from core.telemetry import Histogram
+from core.transport.base import Backend, TransportError
+
+
+# PING 令牌：单调时钟微秒的低 32 位，回环差值按 32 位回绕
+def ping_token() -> int:
+    return (time.monotonic_ns() // 1000) & 0xFFFFFFFF
+
+
+class Channel:
+    # 单个设备连接：独立的发送队列 + 有界在途窗口，所有内部状态只在传输线程里修改
+
+    def __init__(self, worker: "TransportWorker", backend: Backend,
+                 queue_size: int = 64, window: int = 8):
+        self.worker = worker
+        self.backend = backend
+        self.queue_size = queue_size
+        self.window = window
+        self.state = "idle"
+
+        self._queue: collections.deque = collections.deque()
+        self._wake: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._frag = Fragmenter(backend.mtu)
+        self._task: asyncio.Task | None = None
+        self._writes: set[asyncio.Task] = set()
+        self._listeners: list[Callable[["Channel", str], None]] = []
+        self._msg_listeners: list[Callable[["Channel", int, bytes], None]] = []
+
+        self.in_flight = 0
+        self.sent_msgs = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_wait_ms = 0.0
+
+        # 延迟直方图：队列等待、界面事件到写出、设备往返
+        self.wait_hist = Histogram()
+        self.ui_hist = Histogram()
+        self.rtt_hist = Histogram()
+
+    # 状态回调在传输线程触发；Qt 侧通过信号转回 GUI 线程
+    def add_listener(self, fn: Callable[["Channel", str], None]):
+        self._listeners.append(fn)
+
+    # 设备上行的应答消息（PONG 之外，如 PROGRAM_ACK），同样在传输线程回调
+    def add_message_listener(self, fn: Callable[["Channel", int, bytes], None]):
+        if fn not in self._msg_listeners:
+            self._msg_listeners.append(fn)
+
+    def remove_message_listener(self, fn: Callable[["Channel", int, bytes], None]):
+        if fn in self._msg_listeners:
+            self._msg_listeners.remove(fn)
+
+    # 线程安全、永不阻塞：队列满时丢弃最旧的一条可丢弃消息（逐灯帧，后一帧会覆盖它）
+    # 命令 / 同步 / 程序等控制消息不可丢弃，按序保留，队列里全是控制消息时允许超出 queue_size
+    # data 也可以是无参可调用对象，出队写出前一刻才求值（如依赖发送时刻的同步报文）
+    # origin：触发这条消息的界面事件时刻（time.monotonic），写出时记入 ui_hist
+    def submit(self, data: bytes | Callable[[], bytes], origin: float = 0.0, droppable: bool = False):
+        self.worker.loop.call_soon_threadsafe(self._enqueue, data, origin, droppable)
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    # 队首消息已等待的时间；队列空时为 0
+    def lag_ms(self) -> float:
+        try:
+            t = self._queue[0][0]
+        except IndexError:
+            return 0.0
+        return (time.monotonic() - t) * 1000.0
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "queue": len(self._queue),
+            "lag_ms": self.lag_ms(),
+            "last_wait_ms": self.last_wait_ms,
+            "in_flight": self.in_flight,
+            "sent_msgs": self.sent_msgs,
+            "sent_bytes": self.sent_bytes,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "wait_ms": self.wait_hist.summary(),
+            "ui_ms": self.ui_hist.summary(),
+            "rtt_ms": self.rtt_hist.summary(),
+        }
+
+    def close(self) -> Future:
+        return self.worker.call(self._close())
+
+    def _enqueue(self, data, origin: float, droppable: bool):
+        queue = self._queue
+        if len(queue) >= self.queue_size:
+            for i, item in enumerate(queue):
+                if item[3]:
+                    del queue[i]
+                    self.dropped += 1
+                    break
+        queue.append((time.monotonic(), data, origin, droppable))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _set_state(self, state: str):
+        self.state = state
+        for fn in self._listeners:
+            fn(self, state)
+
+    def _start(self):
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.window)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        self.backend.set_callbacks(on_notify=self._on_backend_notify, on_disconnect=self._on_backend_disconnect)
+        self._set_state("connecting")
+        try:
+            await self.backend.connect()
+        except Exception as e:
+            self.errors += 1
+            self._set_state(f"error: {e}")
+            return
+
+        self._frag.set_mtu(self.backend.mtu)
+        self._set_state("connected")
+
+        try:
+            await self._send_loop()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # 发送循环本身出错：不能让通道停在 connected 而队列无人消费
+            self.errors += 1
+            self._set_state(f"error: {e}")
+
+    async def _send_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+
+            t, data, origin, _droppable = self._queue.popleft()
+            now = time.monotonic()
+            self.last_wait_ms = (now - t) * 1000.0
+            self.wait_hist.record(now - t)
+            if origin:
+                self.ui_hist.record(now - origin)
+            # 单条消息编码 / 切片失败只丢这一条，后续消息照常发送
+            try:
+                if callable(data):
+                    data = data()
+                chunks = self._frag.split(data)
+            except Exception:
+                self.errors += 1
+                continue
+            self.sent_msgs += 1
+            for chunk in chunks:
+                await self._slots.acquire()
+                self.in_flight += 1
+                task = loop.create_task(self._write(bytes(chunk)))
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+
+    async def _write(self, chunk: bytes):
+        try:
+            await self.backend.write(chunk)
+            self.sent_bytes += len(chunk)
+        except Exception:
+            self.errors += 1
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    # 设备上行消息（未分片）：PONG 记入往返时延，其余交给消息监听者
+    def _on_backend_notify(self, data: bytes):
+        try:
+            m = decode(data)
+        except ProtocolError:
+            self.errors += 1
+            return
+        if m.type == MsgType.PONG:
+            rtt_us = (ping_token() - parse_ping(m.payload)) & 0xFFFFFFFF
+            self.rtt_hist.record(rtt_us / 1e6)
+            return
+        payload = bytes(m.payload)
+        for fn in self._msg_listeners:
+            fn(self, m.type, payload)
+
+    def _on_backend_disconnect(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._set_state("disconnected")
+
+    async def _close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._writes):
+            task.cancel()
+        try:
+            await self.backend.disconnect()
+        finally:
+            self.worker._channels.discard(self)
+            self._set_state("closed")
+
+
+class TransportWorker:
+    # 独立线程上的 asyncio 事件循环，承载所有设备 I/O，GUI 线程只做投递
+
+    def __init__(self, name: str = "prismfx-transport"):
+        self.name = name
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._channels: set[Channel] = set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._main, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: float = 2.0):
+        if self._thread is None:
+            return
+        try:
+            self.call(self._shutdown()).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        self._ready.clear()
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    # 在传输线程上执行协程，返回 concurrent.futures.Future
+    def call(self, coro: Coroutine) -> Future:
+        if self.loop is None:
+            raise TransportError("transport worker is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def open(self, backend: Backend, queue_size: int = 64, window: int = 8,
+             listener: Callable[[Channel, str], None] | None = None) -> Channel:
+        ch = Channel(self, backend, queue_size, window)
+        if listener is not None:
+            ch.add_listener(listener)
+        self.loop.call_soon_threadsafe(self._open, ch)
+        return ch
+
+    def channels(self) -> list[Channel]:
+        return list(self._channels)
+
+    def _open(self, ch: Channel):
+        self._channels.add(ch)
+        ch._start()
+
+    def _main(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def _shutdown(self):
+        for ch in list(self._channels):
+            await ch._close()
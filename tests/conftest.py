@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试与 bench 一样按仓库根目录导入 core.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
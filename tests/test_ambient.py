@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.ambient import (AmbientError, AmbientPipeline, ArraySource, EdgeLayout, EdgeSampler,
+                          ImageSequenceSource, Latest)
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _gradient(h=200, w=300):
+    # R 随列增大，G 随行增大
+    frame = np.zeros((h, w, 3), np.uint8)
+    frame[..., 0] = np.linspace(0, 255, w)[None, :]
+    frame[..., 1] = np.linspace(0, 255, h)[:, None]
+    return frame
+
+
+def test_edge_order_clockwise_from_bottom_left():
+    lay = EdgeLayout(top=6, right=4, bottom=6, left=4)
+    px = EdgeSampler(lay)(_gradient()).astype(int)
+    assert px.shape == (20, 3)
+    left, top, right, bottom = px[:4], px[4:10], px[10:14], px[14:]
+    assert (np.diff(left[:, 1]) < 0).all() and (left[:, 0] < 40).all()
+    assert (np.diff(top[:, 0]) > 0).all() and (top[:, 1] < 40).all()
+    assert (np.diff(right[:, 1]) > 0).all() and (right[:, 0] > 215).all()
+    assert (np.diff(bottom[:, 0]) < 0).all() and (bottom[:, 1] > 215).all()
+
+
+def test_offset_reverse_and_channels():
+    frame = _gradient()
+    base = EdgeSampler(EdgeLayout(5, 3, 5, 3))(frame)
+    shifted = EdgeSampler(EdgeLayout(5, 3, 5, 3, offset=2))(frame)
+    assert (shifted == np.roll(base, -2, axis=0)).all()
+    reverse = EdgeSampler(EdgeLayout(5, 3, 5, 3, reverse=True))(frame)
+    assert (reverse == base[::-1]).all()
+    bgr = EdgeSampler(EdgeLayout(5, 3, 5, 3), channels=(2, 1, 0))(frame[..., ::-1].copy())
+    assert (bgr == base).all()
+
+
+def test_downsampled_frame_matches_layout():
+    sampler = EdgeSampler(EdgeLayout(30, 20, 30, 20), max_side=320)
+    assert sampler.step_for(1080, 1920) == 6
+    frame = np.full((1080, 1920, 4), 90, np.uint8)
+    px = sampler(frame)
+    assert px.shape == (100, 3) and (px == 90).all()
+    # 尺寸变化后重新建表
+    assert sampler(np.zeros((50, 80, 3), np.uint8)).shape == (100, 3)
+
+
+def test_image_sequence_source(tmp_path):
+    for i, name in enumerate(("b.png", "a.png")):
+        Image.new("RGB", (4, 2), (i * 100, 0, 0)).save(tmp_path / name)
+    (tmp_path / "notes.txt").write_text("x")
+    src = ImageSequenceSource(str(tmp_path), loop=False)
+    src.open()
+    assert src.read()[0, 0].tolist() == [100, 0, 0]
+    assert src.read().shape == (2, 4, 3)
+    assert src.read() is None
+
+    with pytest.raises(AmbientError):
+        ImageSequenceSource(str(tmp_path / "*.jpg")).open()
+
+
+def test_latest_keeps_newest():
+    box = Latest()
+    assert box.get(0.0) is None
+    box.put(1)
+    box.put(2)
+    assert box.get(0.0) == 2 and box.overwritten == 1
+    assert box.get(0.01) is None
+
+
+def test_pipeline_from_source():
+    sent = []
+    frame = _gradient()
+    sampler = EdgeSampler(EdgeLayout(6, 4, 6, 4))
+    pipe = AmbientPipeline(sampler, lambda px, origin: sent.append((px.copy(), origin)),
+                           ArraySource([frame], fps=200.0), fps=100.0)
+    pipe.start()
+    assert _wait(lambda: len(sent) >= 5)
+    pipe.stop()
+    assert not pipe.is_running()
+    assert (sent[0][0] == EdgeSampler(EdgeLayout(6, 4, 6, 4))(frame)).all()
+    stats = pipe.stats()
+    assert stats["error"] is None and stats["sent"] == len(sent)
+    assert stats["latency_ms"]["count"] == len(sent)
+
+
+def test_pipeline_push_and_sink_errors():
+    def sink(px, origin):
+        raise RuntimeError("link gone")
+
+    pipe = AmbientPipeline(EdgeSampler(EdgeLayout(2, 2, 2, 2)), sink, fps=0.0)
+    pipe.start()
+    pipe.push(np.zeros((20, 20, 3), np.uint8), grabbed_at=1.0)
+    assert _wait(lambda: pipe.error is not None)
+    pipe.stop()
+    assert pipe.error == "link gone" and pipe.sent == 0 and pipe.grabbed == 1
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from core.asset_cache import HEADER, AssetCache
+
+
+def _source(tmp_path, name="a.gif", data=b"GIF89a-data"):
+    p = tmp_path / name
+    p.write_bytes(data)
+    return str(p)
+
+
+def _write(cache, key, leds=4, n=3):
+    w = cache.writer(key, leds)
+    for i in range(n):
+        w.add(np.full((leds, 3), i, np.uint8), 40 + i)
+    assert w.commit()
+
+
+def test_key_depends_on_content_and_variant(tmp_path):
+    cache = AssetCache(str(tmp_path / "cache"))
+    a = _source(tmp_path, "a.gif")
+    b = _source(tmp_path, "b.gif")
+    # 内容相同即同一个键，与文件名无关
+    assert cache.key(a, leds=10) == cache.key(b, leds=10)
+    assert cache.key(a, leds=10) != cache.key(a, leds=11)
+    assert cache.key(a, leds=10, fps=30) == cache.key(a, fps=30, leds=10)
+    c = _source(tmp_path, "c.gif", b"other")
+    assert cache.key(a, leds=10) != cache.key(c, leds=10)
+
+
+def test_write_and_open(tmp_path):
+    cache = AssetCache(str(tmp_path / "cache"))
+    assert cache.open("k") is None
+    _write(cache, "k")
+    anim = cache.open("k")
+    assert len(anim) == 3 and anim.leds == 4
+    assert anim.frames[2].tolist() == [[2, 2, 2]] * 4
+    assert anim.delays.tolist() == [40, 41, 42]
+    assert not anim.frames.flags.writeable
+    anim.close()
+    st = cache.stats()
+    assert (st["hits"], st["misses"], st["writes"], st["entries"]) == (1, 1, 1, 1)
+
+
+def test_abort_and_corrupt_files_are_misses(tmp_path):
+    cache = AssetCache(str(tmp_path / "cache"))
+    w = cache.writer("k", 4)
+    w.add(np.zeros((4, 3), np.uint8), 10)
+    w.abort()
+    assert not w.commit()
+    assert cache.open("k") is None
+    assert os.listdir(cache.root) == []
+
+    _write(cache, "bad")
+    with open(cache.path("bad"), "r+b") as f:
+        f.truncate(HEADER.size + 5)
+    assert cache.open("bad") is None
+
+
+def test_oversized_asset_not_cached(tmp_path):
+    cache = AssetCache(str(tmp_path / "cache"), max_bytes=100)
+    w = cache.writer("big", 10)
+    for _ in range(5):
+        w.add(np.zeros((10, 3), np.uint8), 10)
+    assert not w.commit()
+    assert cache.usage() == (0, 0)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = AssetCache(str(tmp_path / "cache"))
+    for i, key in enumerate(("old", "mid", "new")):
+        _write(cache, key)
+        os.utime(cache.path(key), (1000 + i, 1000 + i))
+    size = os.path.getsize(cache.path("old"))
+    assert cache.usage() == (3, 3 * size)
+
+    # 命中会刷新最近使用时间
+    cache.open("old").close()
+    cache.set_max_bytes(2 * size)
+    assert cache.open("mid") is None
+    assert cache.open("old") is not None and cache.open("new") is not None
+    assert cache.evictions == 1
+    assert cache.usage() == (2, 2 * size)
+
+    assert cache.clear() == 2
+    assert cache.usage() == (0, 0)
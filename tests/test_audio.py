@@ -0,0 +1,115 @@
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from core.audio import (AudioError, AudioReactive, BandAnalyzer, LiveSource, PipeSource, RingBuffer, WavSource,
+                        _pcm24_to_mono, open_source, pcm_to_mono)
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _sine(freq, n, sr=44100):
+    return np.sin(2 * np.pi * freq * np.arange(n) / sr).astype(np.float32)
+
+
+def test_pcm_to_mono():
+    s16 = np.array([0, 16384, -32768, 32767], "<i2").tobytes()
+    assert pcm_to_mono(s16, "<i2").tolist() == pytest.approx([0.0, 0.5, -1.0, 32767 / 32768])
+    assert pcm_to_mono(bytes([128, 0, 255]), "u1").tolist() == pytest.approx([0.0, -1.0, 127 / 128])
+    # 立体声取平均，末尾不完整的采样丢弃
+    stereo = np.array([16384, 0, -16384, -16384], "<i2").tobytes() + b"\x01"
+    assert pcm_to_mono(stereo, "<i2", channels=2).tolist() == pytest.approx([0.25, -0.5])
+    pcm24 = bytes([0x00, 0x00, 0x40, 0x00, 0x00, 0x80])
+    assert _pcm24_to_mono(pcm24, 1).tolist() == pytest.approx([0.5, -1.0])
+
+
+def test_ring_buffer_keeps_latest():
+    ring = RingBuffer(8)
+    out = np.empty(5, np.float32)
+    ring.write(np.arange(6, dtype=np.float32))
+    ring.write(np.arange(6, 11, dtype=np.float32))
+    written, _ = ring.latest(out)
+    assert written == 11 and out.tolist() == [6, 7, 8, 9, 10]
+    # 单块超过容量时只保留最后 capacity 个
+    ring.write(np.arange(100, 120, dtype=np.float32))
+    ring.latest(out)
+    assert out.tolist() == [115, 116, 117, 118, 119]
+
+
+def test_wav_source(tmp_path):
+    path = str(tmp_path / "tone.wav")
+    pcm = (_sine(440, 4410) * 20000).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(pcm.tobytes())
+
+    src = WavSource(path, loop=False, realtime=False)
+    src.start()
+    assert _wait(lambda: not src.is_running())
+    src.stop()
+    assert src.error is None and src.ring.written == 4410
+    out = np.empty(10, np.float32)
+    src.ring.latest(out)
+    assert out == pytest.approx(pcm[-10:] / 32768.0)
+
+    with pytest.raises(AudioError):
+        WavSource(str(tmp_path / "missing.wav")).start()
+
+
+def test_pipe_source(tmp_path):
+    path = tmp_path / "pcm.raw"
+    path.write_bytes(np.full(1000, 0.25, "<f4").tobytes())
+    src = open_source(f"pipe:{path}", sample_format="f32le", block=256)
+    assert isinstance(src, PipeSource) and src.label() == str(path)
+    src.start()
+    assert _wait(lambda: not src.is_running())
+    src.stop()
+    assert src.ring.written == 1000 and src.blocks == 4
+
+    with pytest.raises(AudioError):
+        PipeSource(str(path), sample_format="s24le")
+
+
+def test_open_source_specs():
+    assert isinstance(open_source("song.wav"), WavSource)
+    assert open_source("-").label() == "stdin"
+    live = open_source("live:3")
+    assert isinstance(live, LiveSource) and live.device == 3
+    assert open_source("live:Mic").device == "Mic" and open_source("live").device is None
+
+
+def test_band_analyzer_finds_tone():
+    an = BandAnalyzer(44100, fft_size=2048, bands=16)
+    levels = None
+    for _ in range(20):
+        levels = an.analyze(_sine(1000, 2048), 0.05)
+    band = int(np.argmax(levels))
+    assert an.centers[band] == pytest.approx(1000, rel=0.5)
+    assert levels[band] > 0.9 and levels[0] < 0.1 and levels[-1] < 0.1
+
+
+def test_audio_reactive_render():
+    effect = AudioReactive(30)
+    assert not effect.render(0.0, 0.02).any()
+
+    src = WavSource("unused.wav")
+    src.samplerate = 44100
+    src.ring = RingBuffer(8192)
+    src.ring.write(_sine(60, 8192) * 0.8)
+    effect.source = src
+    for i in range(10):
+        frame = effect.render(i * 0.02, 0.02)
+    # 低频在灯带起点
+    assert frame[0].max() > frame[-1].max()
+    assert effect.stats()["capture_ms"]["count"] == 10
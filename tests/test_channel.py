@@ -0,0 +1,53 @@
+import time
+
+from core.protocol.codec import Encoder, ProtocolError
+from core.transport.loopback import LoopbackBackend
+from core.transport.worker import Channel, TransportWorker
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_full_queue_drops_oldest_frame_only():
+    ch = Channel(None, LoopbackBackend(), queue_size=3)
+    ch._enqueue(b"power", 0.0, False)
+    ch._enqueue(b"frame-1", 0.0, True)
+    ch._enqueue(b"frame-2", 0.0, True)
+    ch._enqueue(b"frame-3", 0.0, True)
+    assert [item[1] for item in ch._queue] == [b"power", b"frame-2", b"frame-3"]
+    assert ch.dropped == 1
+
+
+def test_control_messages_are_never_dropped():
+    ch = Channel(None, LoopbackBackend(), queue_size=2)
+    for i in range(4):
+        ch._enqueue(b"cmd-%d" % i, 0.0, False)
+    # 队列里全是控制消息时允许超出 queue_size
+    assert ch.queue_depth() == 4
+    assert ch.dropped == 0
+
+
+def test_failing_message_is_counted_and_skipped():
+    received = []
+    worker = TransportWorker()
+    worker.start()
+    try:
+        ch = worker.open(LoopbackBackend(on_message=lambda m: received.append(bytes(m.payload))))
+
+        def broken():
+            raise ProtocolError("cannot encode")
+
+        ch.submit(broken)
+        ch.submit(bytes(Encoder(1).power(True)))
+        assert _wait(lambda: received)
+        assert received == [b"\x01"]
+        assert ch.errors == 1
+        assert ch.state == "connected"
+    finally:
+        worker.stop()
@@ -0,0 +1,87 @@
+import pytest
+
+from core.protocol.codec import OVERHEAD, Encoder, MsgType, ProtocolError, decode, parse_color_hs, parse_frame
+from core.protocol.fragment import FRAG, Fragmenter, Reassembler
+
+
+def test_round_trip():
+    enc = Encoder(max_leds=4)
+    msg = decode(bytes(enc.color_hs(370, 300)))
+    assert msg.type == MsgType.COLOR_HS
+    assert parse_color_hs(msg.payload) == (10, 255)
+
+    pixels = bytes(range(12))
+    offset, rgb = parse_frame(decode(bytes(enc.frame(pixels, offset=5))).payload)
+    assert offset == 5
+    assert bytes(rgb) == pixels
+
+
+def test_sequence_numbers_wrap():
+    enc = Encoder(max_leds=1)
+    enc._seq = 0xFFFF
+    assert decode(bytes(enc.power(True))).seq == 0xFFFF
+    assert decode(bytes(enc.power(False))).seq == 0
+
+
+def test_encoder_limits():
+    enc = Encoder(max_leds=4)
+    with pytest.raises(ProtocolError):
+        enc.frame(bytes(15))
+    with pytest.raises(ProtocolError):
+        enc.frame(bytes(10))
+
+    enc = Encoder(0, max_payload=64)
+    assert enc.capacity() == 64
+    assert len(enc.message(MsgType.PROGRAM_UPLOAD, bytes(64))) == OVERHEAD + 64
+    with pytest.raises(ProtocolError):
+        enc.message(MsgType.PROGRAM_UPLOAD, bytes(65))
+
+
+def test_decode_rejects_corruption():
+    data = bytearray(Encoder(max_leds=1).brightness(50))
+    with pytest.raises(ProtocolError):
+        decode(data[:-1])
+    data[-1] ^= 0xFF
+    with pytest.raises(ProtocolError):
+        decode(data)
+    with pytest.raises(ProtocolError):
+        decode(b"\x00" * 3)
+
+
+def test_fragment_round_trip():
+    frag = Fragmenter(mtu=20)
+    reasm = Reassembler()
+    message = bytes(range(256)) * 2
+    parts = [bytes(p) for p in frag.split(message)]
+    assert len(parts) == frag.count(len(message))
+    assert all(len(p) <= 20 for p in parts)
+    out = [reasm.feed(p) for p in parts]
+    assert out[:-1] == [None] * (len(parts) - 1)
+    assert bytes(out[-1]) == message
+    assert reasm.completed == 1
+
+
+def test_fragment_limits():
+    with pytest.raises(ValueError):
+        Fragmenter(mtu=FRAG.size)
+    frag = Fragmenter(mtu=FRAG.size + 1)
+    with pytest.raises(ProtocolError):
+        frag.split(bytes(0x8001))
+
+    reasm = Reassembler(max_size=30)
+    parts = [bytes(p) for p in Fragmenter(mtu=20).split(bytes(40))]
+    assert [reasm.feed(p) for p in parts] == [None] * len(parts)
+    assert reasm.dropped == 1
+
+
+def test_missing_fragment_drops_message():
+    frag = Fragmenter(mtu=10)
+    reasm = Reassembler()
+    parts = [bytes(p) for p in frag.split(bytes(range(30)))]
+    for p in parts[:1] + parts[2:]:
+        assert reasm.feed(p) is None
+    assert reasm.dropped == 1
+
+    # 下一条完整的消息照常拼出
+    parts = [bytes(p) for p in frag.split(b"hello world")]
+    assert bytes([reasm.feed(p) for p in parts][-1]) == b"hello world"
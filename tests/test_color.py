@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from core.color import (OutputCorrection, hex_to_hs, hs_to_rgb8, hsv_to_rgb, kelvin_to_rgb, parse_hex,
+                        parse_hex_array, rgb8_to_hs, rgb_to_hsv, to_hex, to_rgb8, white_balance)
+
+
+def test_hsv_primaries():
+    rgb = to_rgb8(hsv_to_rgb([0, 60, 120, 240, 360], 1.0, 1.0))
+    assert rgb.tolist() == [[255, 0, 0], [255, 255, 0], [0, 255, 0], [0, 0, 255], [255, 0, 0]]
+    assert to_rgb8(hsv_to_rgb(200, 0.0, 0.5)).tolist() == [128, 128, 128]
+
+
+def test_rgb_hsv_round_trip():
+    rgb = np.random.default_rng(3).integers(0, 256, (4096, 3), dtype=np.uint8)
+    h, s, v = rgb_to_hsv(rgb)
+    assert (to_rgb8(hsv_to_rgb(h, s, v)) == rgb).all()
+
+
+def test_static_hs_round_trip():
+    assert hs_to_rgb8(0, 255) == (255, 0, 0)
+    assert hs_to_rgb8(123, 0) == (255, 255, 255)
+    for h in range(0, 360, 15):
+        assert rgb8_to_hs(hs_to_rgb8(h, 255)) == (h, 255)
+
+
+def test_hex_parsing():
+    assert parse_hex("#ff8800") == (255, 136, 0)
+    assert parse_hex(" F80 ") == (255, 136, 0)
+    assert parse_hex_array(["#000000", "FFFFFF"]).tolist() == [[0, 0, 0], [255, 255, 255]]
+    assert to_hex((255, 136, 0)) == "#FF8800"
+    assert hex_to_hs("#00FF00") == (120, 255)
+    for bad in ("#12345", "#GGGGGG", ""):
+        with pytest.raises(ValueError):
+            parse_hex(bad)
+
+
+def test_color_temperature():
+    assert np.allclose(kelvin_to_rgb(6600), 1.0, atol=0.02)
+    warm = kelvin_to_rgb(2000)
+    assert warm[0] == 1.0 and warm[2] < warm[1] < warm[0]
+    gains = white_balance(3000)
+    assert max(gains) == 1.0 and gains[2] < gains[0]
+
+
+def test_correction_defaults_to_identity():
+    corr = OutputCorrection()
+    assert corr.is_identity()
+    px = np.arange(30, dtype=np.uint8).reshape(10, 3)
+    assert (corr.apply(px) == px).all()
+    corr.set_calibration({})
+    assert corr.is_identity()
+
+
+def test_correction_table():
+    corr = OutputCorrection(gamma=2.2, brightness=0.5)
+    assert not corr.is_identity()
+    table = corr.table()
+    assert table[0, 0] == 0 and table[0, 255] == 128
+    assert table[1, 128] == round(255 * 0.5 * (128 / 255) ** 2.2)
+
+    corr.update(gamma=1.0, gains=(1.0, 2.0, 0.5), brightness=1.0)
+    assert corr.gains() == (1.0, 1.0, 0.5)
+    px = np.full((4, 3), 200, np.uint8)
+    # 可以原地写回
+    assert corr.apply(px, out=px) is px
+    assert px[0].tolist() == [200, 200, 100]
+
+    with pytest.raises(ValueError):
+        corr.set_gamma(0)
+
+
+def test_calibration_dict():
+    corr = OutputCorrection()
+    corr.set_calibration({"kelvin": 3000, "brightness": 50})
+    assert corr.gains() == pytest.approx(white_balance(3000))
+    assert corr.brightness() == 0.5
+    assert corr.apply(bytes([255, 255, 255])).tolist() == [[128, round(255 * 0.5 * corr.gains()[1]),
+                                                             round(255 * 0.5 * corr.gains()[2])]]
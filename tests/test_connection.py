@@ -0,0 +1,19 @@
+import random
+
+from core.connection import Backoff
+
+
+def test_backoff_grows_to_cap_and_resets():
+    backoff = Backoff(base=0.25, factor=2.0, cap=3.0, jitter=0.0)
+    assert [backoff.next() for _ in range(6)] == [0.25, 0.5, 1.0, 2.0, 3.0, 3.0]
+    assert backoff.failures == 6
+    backoff.reset()
+    assert backoff.next() == 0.25
+
+
+def test_backoff_jitter_stays_in_bounds():
+    backoff = Backoff(base=1.0, factor=1.0, cap=1.0, jitter=0.2, rng=random.Random(7))
+    delays = [backoff.next() for _ in range(200)]
+    assert all(0.8 <= d <= 1.2 for d in delays)
+    # 抖动后多台设备不会在同一时刻重试
+    assert len(set(delays)) > 150
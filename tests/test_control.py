@@ -0,0 +1,89 @@
+import base64
+import time
+
+import pytest
+
+from core.control import Command, ControlError, parse_batch, parse_command
+from core.daemon import Daemon
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+
+
+def test_parse_color():
+    assert parse_command({"op": "color", "h": 120, "s": 255}) == Command("color", {"h": 120, "s": 255})
+    assert parse_command({"op": "color", "hex": "#FF0000"}).args == {"h": 0, "s": 255}
+    for bad in ({"op": "color", "h": 360, "s": 0}, {"op": "color", "h": True, "s": 0},
+                {"op": "color", "h": "1", "s": 0}, {"op": "color", "hex": "nope"}):
+        with pytest.raises(ControlError):
+            parse_command(bad)
+
+
+def test_parse_brightness_power_effect():
+    assert parse_command({"op": "brightness", "value": 55.7}).args == {"value": 55}
+    assert parse_command({"op": "power", "on": False}).args == {"on": False}
+    assert parse_command({"op": "effect", "name": None}).args == {"name": None, "speed": None}
+    assert parse_command({"op": "effect", "name": "fire", "speed": 2}).args == {"name": "fire", "speed": 2}
+    for bad in ({"op": "brightness", "value": 101}, {"op": "power", "on": 1},
+                {"op": "effect", "name": "nope"}, {"op": "effect", "name": "fire", "speed": 0},
+                {"op": "reboot"}, ["op", "power"]):
+        with pytest.raises(ControlError):
+            parse_command(bad)
+
+
+def test_parse_frame():
+    rgb = bytes(range(9))
+    cmd = parse_command({"op": "frame", "rgb": base64.b64encode(rgb).decode()})
+    assert cmd.args == {"pixels": rgb}
+    for bad in ("***", "", base64.b64encode(bytes(4)).decode()):
+        with pytest.raises(ControlError):
+            parse_command({"op": "frame", "rgb": bad})
+
+
+def test_parse_batch_forms():
+    power = {"op": "power", "on": True}
+    level = {"op": "brightness", "value": 10}
+    assert [c.op for c in parse_batch(power)] == ["power"]
+    assert [c.op for c in parse_batch([power, level])] == ["power", "brightness"]
+    assert [c.op for c in parse_batch({"commands": [level]})] == ["brightness"]
+    for bad in ([], {"commands": []}, "power", None):
+        with pytest.raises(ControlError):
+            parse_batch(bad)
+    # 一条出错整批拒绝
+    with pytest.raises(ControlError):
+        parse_batch([power, {"op": "brightness"}])
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_daemon_switches_sources_off_the_transport_thread(tmp_path):
+    daemon = Daemon(10)
+    daemon.start()
+    daemon.group.add(DeviceInfo("loopback", "loopback", "loopback"), backend=LoopbackBackend())
+    daemon.wait_connected()
+    daemon.start_control(str(tmp_path / "control.sock"))
+    try:
+        daemon.run_effect("rainbow")
+        source = daemon._source
+        # 在传输线程上下发：只排队，停帧源在控制线程做
+        t0 = time.monotonic()
+        daemon.worker.call(_apply(daemon, parse_batch([
+            {"op": "power", "on": False},
+            {"op": "frame", "rgb": base64.b64encode(bytes(30)).decode()},
+        ]))).result(1.0)
+        assert time.monotonic() - t0 < 0.5
+        assert _wait(lambda: daemon.state().get("stream"))
+        assert daemon._source is None and not source.is_running()
+        assert daemon.state()["power"] is False
+    finally:
+        daemon.close()
+
+
+async def _apply(daemon, commands):
+    daemon.apply(commands)
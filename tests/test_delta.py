@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from core.protocol.codec import ProtocolError
+from core.protocol.delta import DELTA_HDR, KEY, SPAN, DeltaDecoder, DeltaEncoder
+
+
+def _flags(payload) -> int:
+    return DELTA_HDR.unpack_from(payload)[3]
+
+
+def test_round_trip_random_frames():
+    rng = np.random.default_rng(1)
+    enc = DeltaEncoder(max_leds=300, keyframe_interval=10)
+    dec = DeltaDecoder()
+    pixels = bytearray(300 * 3)
+    frame = np.zeros((300, 3), np.uint8)
+    for _ in range(40):
+        # 每帧改几段：随机像素 + 一段纯色（游程）
+        for _ in range(3):
+            a = int(rng.integers(0, 290))
+            frame[a:a + int(rng.integers(1, 10))] = rng.integers(0, 256, 3)
+        frame[int(rng.integers(0, 300))] = rng.integers(0, 256, 3)
+        assert dec.apply(bytes(enc.encode(frame)), pixels)
+        assert bytes(pixels) == frame.tobytes()
+    assert dec.rejected == 0
+    assert enc.stats()["keyframes"] >= 4
+
+
+def test_unchanged_frame_is_header_only():
+    enc = DeltaEncoder(max_leds=10)
+    frame = np.full((10, 3), 7, np.uint8)
+    enc.encode(frame)
+    assert len(enc.encode(frame)) == DELTA_HDR.size
+
+
+def test_lost_reference_waits_for_keyframe():
+    enc = DeltaEncoder(max_leds=50)
+    dec = DeltaDecoder()
+    pixels = bytearray(50 * 3)
+    frame = np.zeros((50, 3), np.uint8)
+    frame[::3] = 200
+    enc.encode(frame)                       # 这一帧在链路上丢了
+    frame[1] = (1, 2, 3)
+    assert not dec.apply(bytes(enc.encode(frame)), pixels)
+    assert dec.rejected == 1
+
+    enc.request_keyframe()
+    frame[2] = (4, 5, 6)
+    payload = bytes(enc.encode(frame))
+    assert _flags(payload) & KEY
+    assert dec.apply(payload, pixels)
+    assert bytes(pixels) == frame.tobytes()
+
+
+def test_smaller_keyframe_replaces_delta():
+    enc = DeltaEncoder(max_leds=100)
+    dec = DeltaDecoder()
+    pixels = bytearray(100 * 3)
+    comet = np.array([[255, 0, 0], [200, 0, 0], [150, 0, 0], [100, 0, 0], [50, 0, 0]], np.uint8)
+    frame = np.zeros((100, 3), np.uint8)
+    frame[10:15] = comet
+    dec.apply(bytes(enc.encode(frame)), pixels)
+
+    # 彗星整体移走：增量要清掉旧位置再写新位置，关键帧只写新位置
+    frame[:] = 0
+    frame[40:45] = comet
+    payload = bytes(enc.encode(frame))
+    assert _flags(payload) & KEY
+    assert len(payload) == DELTA_HDR.size + SPAN.size + comet.nbytes
+    assert dec.apply(payload, pixels)
+    assert bytes(pixels) == frame.tobytes()
+
+    # 之后的增量以这个关键帧为参考
+    frame[44] = (9, 9, 9)
+    payload = bytes(enc.encode(frame))
+    assert not _flags(payload) & KEY
+    assert dec.apply(payload, pixels)
+    assert bytes(pixels) == frame.tobytes()
+
+
+def test_malformed_delta_drops_reference():
+    enc = DeltaEncoder(max_leds=10)
+    dec = DeltaDecoder()
+    pixels = bytearray(10 * 3)
+    dec.apply(bytes(enc.encode(np.ones((10, 3), np.uint8))), pixels)
+    frame_id = dec.frame_id
+
+    bad = bytearray(DELTA_HDR.pack((frame_id + 1) & 0xFFFF, frame_id, 10, 0))
+    bad += SPAN.pack(0, 1) + bytes(3) + SPAN.pack(8, 5) + bytes(15)
+    with pytest.raises(ProtocolError):
+        dec.apply(bad, pixels)
+    # 缓冲已被改了一部分，后续增量必须等关键帧
+    assert dec.frame_id is None
+    assert not dec.apply(bytes(enc.encode(np.full((10, 3), 2, np.uint8))), pixels)
+
+
+def test_encoder_limit():
+    with pytest.raises(ProtocolError):
+        DeltaEncoder(max_leds=4).encode(np.zeros((5, 3), np.uint8))
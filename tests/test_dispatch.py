@@ -0,0 +1,82 @@
+from core.dispatch import CommandCoalescer
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def make(**kw):
+    sent = []
+    clock = Clock()
+    co = CommandCoalescer(lambda k, v: sent.append((k, v)), max_rate_hz=10.0, clock=clock, **kw)
+    return co, sent, clock
+
+
+def test_pump_sends_latest_value_per_key():
+    co, sent, clock = make()
+    for v in range(5):
+        co.submit("hs", v)
+    co.submit("brightness", 40)
+    assert co.pump() == 2
+    assert sent == [("hs", 4), ("brightness", 40)]
+    assert co.stats()["coalesced"] == 4
+
+
+def test_pump_respects_max_rate():
+    co, sent, clock = make()
+    co.submit("hs", 1)
+    co.pump()
+    co.submit("hs", 2)
+    assert co.pump() == 0
+    assert co.time_until_due() > 0
+    clock.t += 0.1
+    assert co.pump() == 1
+    assert sent[-1] == ("hs", 2)
+
+
+def test_commit_sends_final_value_immediately():
+    co, sent, clock = make()
+    co.submit("hs", 1)
+    co.pump()
+    co.submit("hs", 2)
+    # 松手时的最终值不等节流间隔，并替换还没发出的预览值
+    co.commit("hs", 3)
+    assert sent == [("hs", 1), ("hs", 3)]
+    assert not co.has_pending()
+    clock.t += 1.0
+    assert co.pump() == 0
+
+
+def test_flush_sends_every_pending_value():
+    co, sent, clock = make()
+    co.submit("hs", 1)
+    co.pump()
+    co.submit("hs", 1)
+    co.submit("power", True)
+    # 退出前冲刷：即使与上次发送相同也发
+    assert co.flush() == 2
+    assert sent[1:] == [("hs", 1), ("power", True)]
+    assert not co.has_pending()
+
+
+def test_unchanged_value_is_skipped_and_reported():
+    skipped = []
+    co, sent, clock = make(on_skip=skipped.append)
+    co.submit("hs", 7)
+    co.pump()
+    clock.t += 1.0
+    co.submit("hs", 7)
+    assert co.pump() == 0
+    assert sent == [("hs", 7)]
+    assert skipped == ["hs"]
+
+
+def test_commit_resends_unchanged_value():
+    co, sent, clock = make()
+    co.commit("hs", 5)
+    co.commit("hs", 5)
+    assert sent == [("hs", 5), ("hs", 5)]
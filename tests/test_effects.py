@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+import pytest
+
+from core.effects import EFFECTS, Breathing, Comet, Effect, create_effect
+from core.scheduler import FixedStepScheduler, FrameStats
+
+
+@pytest.mark.parametrize("name", sorted(EFFECTS))
+def test_effects_render_frames(name):
+    effect = create_effect(name, 60, seed=1) if name in ("fire", "twinkle") else create_effect(name, 60)
+    for i in range(30):
+        frame = effect.render(i / 60, 1 / 60)
+        assert frame.shape == (60, 3) and frame.dtype == np.uint8
+
+
+def test_create_effect_unknown():
+    with pytest.raises(ValueError):
+        create_effect("nope", 10)
+
+
+def test_breathing_levels():
+    effect = Breathing(8, period=2.0, color=(200, 100, 50))
+    assert not effect.render(0.0, 0.0).any()
+    assert (effect.render(1.0, 0.0) == [200, 100, 50]).all()
+
+
+def test_comet_head_moves():
+    effect = Comet(100)
+    first = int(np.argmax(effect.render(0.1, 0.1)[:, 0]))
+    second = int(np.argmax(effect.render(0.2, 0.1)[:, 0]))
+    assert second == first + 5
+
+
+@pytest.mark.parametrize("name", ["fire", "twinkle"])
+def test_seeded_effects_are_deterministic(name):
+    a, b = create_effect(name, 40, seed=7), create_effect(name, 40, seed=7)
+    for i in range(20):
+        assert (a.render(i / 60, 1 / 60) == b.render(i / 60, 1 / 60)).all()
+
+
+def test_frame_stats():
+    stats = FrameStats(window=4)
+    for ms in (1.0, 2.0, 3.0, 4.0, 10.0):
+        stats.record(ms)
+    snap = stats.snapshot()
+    assert snap["frames"] == 5 and snap["max_ms"] == 10.0
+    assert snap["mean_ms"] == 4.0 and snap["p95_ms"] == 10.0
+
+
+class _Slow(Effect):
+    name = "slow"
+
+    def __init__(self, leds, delay):
+        super().__init__(leds)
+        self.delay = delay
+        self.times = []
+
+    def render(self, t, dt):
+        self.times.append(t)
+        time.sleep(self.delay)
+        return self._out
+
+
+def test_scheduler_runs_at_fixed_step():
+    frames = []
+    sched = FixedStepScheduler(100, frames.append)
+    effect = _Slow(4, 0.0)
+    sched.set_effect(effect)
+    sched.start()
+    time.sleep(0.3)
+    stats = sched.stats()
+    sched.stop()
+    assert not sched.is_running()
+    assert 15 <= len(frames) <= 35
+    assert 0 < stats["slow"]["frames"] <= len(frames)
+    # 时间轴按整步对齐
+    steps = np.array(effect.times) * 100
+    assert np.allclose(steps, np.rint(steps), atol=1e-6)
+
+
+def test_scheduler_skips_instead_of_catching_up():
+    frames = []
+    sched = FixedStepScheduler(100, frames.append)
+    sched.set_effect(_Slow(4, 0.035))
+    sched.start()
+    time.sleep(0.3)
+    sched.stop()
+    snap = sched.stats()["slow"]
+    assert snap["skipped"] > 0
+    assert snap["frames"] <= 12
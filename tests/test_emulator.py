@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from core.emulator import VirtualDevice
+from core.protocol.codec import Encoder, MsgType
+from core.protocol.fragment import Fragmenter
+from core.transport.base import TransportError
+from core.transport.socket_link import SocketBackend
+
+PORT = 47790
+
+
+async def _until(pred, timeout: float = 2.0) -> bool:
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    while loop.time() - t0 < timeout:
+        if pred():
+            return True
+        await asyncio.sleep(0.005)
+    return False
+
+
+def test_bad_message_does_not_stop_the_device():
+    async def run():
+        dev = VirtualDevice("test-dev", 10, port=PORT)
+        await dev.start()
+        backend = SocketBackend.from_address(dev.address())
+        try:
+            await backend.connect()
+            enc = Encoder(10)
+            frag = Fragmenter(backend.mtu)
+            # payload 太短，解析时抛 struct.error 而不是 ProtocolError
+            for msg in (bytes(enc.message(MsgType.COLOR_HS, b"\x01")), bytes(enc.brightness(42))):
+                for chunk in frag.split(msg):
+                    await backend.write(bytes(chunk))
+            assert await _until(lambda: dev.brightness == 42)
+            assert dev.stats()["frames_dropped"] == 1
+        finally:
+            await backend.disconnect()
+            await dev.stop()
+
+    asyncio.run(run())
+
+
+def test_connect_to_foreign_peer_closes_socket():
+    async def run():
+        async def serve(reader, writer):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            await writer.drain()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", PORT + 1)
+        backend = SocketBackend("127.0.0.1", PORT + 1)
+        try:
+            with pytest.raises(TransportError):
+                await backend.connect()
+            assert backend._writer is None
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
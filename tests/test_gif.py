@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+from PIL import Image
+
+from core.asset_cache import AssetCache
+from core.gif import MIN_DELAY_MS, GifPlayer, StripResampler, gif_info, iter_gif_frames
+
+
+def make_gif(path, colors, size=(16, 4), duration=30):
+    frames = [Image.new("RGB", size, c) for c in colors]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=duration, loop=0)
+    return str(path)
+
+
+def _wait(pred, timeout: float = 3.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_resampler_averages_columns_and_rounds():
+    rgb = np.zeros((2, 4, 3), np.uint8)
+    rgb[:, 0] = 10
+    rgb[:, 1] = 11
+    rgb[:, 2:] = 11
+    rgb[1, 0] = 11
+    # 第一颗灯：(10 + 11 + 11 + 11) / 4 = 10.75，截断会得到 10
+    out = StripResampler(2)(rgb)
+    assert out.tolist() == [[11, 11, 11], [11, 11, 11]]
+
+
+def test_resampler_with_more_leds_than_columns():
+    rgb = np.array([[[255, 0, 0], [0, 0, 255]]], np.uint8)
+    out = StripResampler(6)(rgb)
+    assert out.shape == (6, 3)
+    assert out[0].tolist() == [255, 0, 0] and out[-1].tolist() == [0, 0, 255]
+
+
+def test_iter_frames_and_info(tmp_path):
+    path = make_gif(tmp_path / "a.gif", [(255, 0, 0), (0, 255, 0), (0, 0, 255)], duration=0)
+    assert gif_info(path)["frames"] == 3
+    frames = list(iter_gif_frames(path))
+    assert [f.index for f in frames] == [0, 1, 2]
+    assert frames[1].rgb.shape == (4, 16, 3)
+    assert all(f.delay_ms >= MIN_DELAY_MS for f in frames)
+
+
+def test_player_plays_once_then_from_cache(tmp_path):
+    path = make_gif(tmp_path / "a.gif", [(255, 0, 0), (0, 255, 0)])
+    cache = AssetCache(str(tmp_path / "cache"))
+
+    for cached in (False, True):
+        got = []
+        player = GifPlayer(path, 8, got.append, loop=False, cache=cache)
+        player.start()
+        assert _wait(lambda: not player.is_running())
+        player.stop()
+        assert [p[0].tolist() for p in got] == [[255, 0, 0], [0, 255, 0]]
+        assert player.cached == cached
@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+import pytest
+
+from core.group import DeviceGroup
+from core.link import DeviceLink
+from core.protocol.codec import MsgType, parse_frame
+from core.transport.base import DeviceInfo
+from core.transport.loopback import LoopbackBackend
+from core.transport.worker import TransportWorker
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class _Device:
+    # 记录回环设备收到的最后一帧
+
+    def __init__(self):
+        self.frame = None
+        self.backend = LoopbackBackend(on_message=self._on_message)
+
+    def _on_message(self, m):
+        if m.type == MsgType.FRAME:
+            offset, rgb = parse_frame(m.payload)
+            self.frame = offset, bytes(rgb)
+
+
+@pytest.fixture
+def worker():
+    worker = TransportWorker()
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def _add(group, name, span=None):
+    dev = _Device()
+    group.add(DeviceInfo("loopback", name, name), span=span, backend=dev.backend)
+    return dev
+
+
+def test_frame_split_by_span(worker):
+    group = DeviceGroup(worker, max_leds=16)
+    left = _add(group, "left", (0, 3))
+    right = _add(group, "right", (3, 2))
+    mirror = _add(group, "mirror")
+    assert _wait(lambda: all(m.channel().state == "connected" for m in group.members()))
+
+    scene = np.arange(15, dtype=np.uint8).reshape(5, 3)
+    group.send_frame(scene)
+    assert _wait(lambda: left.frame and right.frame and mirror.frame)
+    # 切片在设备内从 0 开始编号
+    assert left.frame == (0, scene[:3].tobytes())
+    assert right.frame == (0, scene[3:].tobytes())
+    assert mirror.frame == (0, scene.tobytes())
+    assert _wait(lambda: group.backlog() == 0)
+    for f in group.close():
+        f.result(1.0)
+    assert len(group) == 0
+
+
+def test_members_and_listeners(worker):
+    group = DeviceGroup(worker)
+    changes = []
+    group.add_listener(lambda: changes.append(len(group)))
+    _add(group, "a")
+    with pytest.raises(ValueError):
+        _add(group, "a")
+    with pytest.raises(KeyError):
+        group.set_span("b", (0, 1))
+    group.set_span("a", (0, 10))
+    assert group.member("a").span == (0, 10)
+    assert changes and changes[0] == 1
+
+    group.remove("a").result(1.0)
+    assert group.remove("a") is None
+    assert len(group) == 0 and changes[-1] == 0
+
+
+def test_borrowed_link_is_not_closed(worker):
+    group = DeviceGroup(worker)
+    ch = worker.open(LoopbackBackend())
+    link = DeviceLink()
+    link.attach(ch)
+    assert _wait(lambda: ch.state == "connected")
+
+    group.set_delta(True, 30)
+    group.add_link("main", link)
+    assert link.delta_enabled()
+    # 之后加入的成员沿用增量帧设置
+    _add(group, "extra")
+    assert group.member("extra").link.delta_enabled()
+
+    assert group.remove("main") is None
+    assert ch.state == "connected" and link.channel() is None
+    ch.close().result(1.0)
+    for f in group.close():
+        f.result(1.0)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from core.layout import Matrix, Points, Ring, SamplingMap, Strip, layout_from_dict
+
+
+def test_uniform_image_samples_exactly():
+    img = np.full((36, 64, 3), (200, 37, 255), np.uint8)
+    for layout in (Strip(30), Ring(24), Matrix(8, 4), Points([(0.1, 0.1), (0.9, 0.5)])):
+        out = layout.sample(img)
+        assert out.shape == (layout.leds, 3)
+        assert (out == (200, 37, 255)).all()
+
+
+def test_weighted_samples_round():
+    smap = SamplingMap(np.array([[0, 1]]), np.array([[0.3, 0.7]], np.float32), (1, 2))
+    rgb = np.array([[[10, 10, 10], [11, 11, 11]]], np.uint8)
+    assert smap(rgb).tolist() == [[11, 11, 11]]
+
+
+def test_strip_follows_gradient():
+    img = np.repeat(np.linspace(0, 255, 64, dtype=np.float32)[None, :, None], 3, axis=2)
+    img = np.repeat(img, 8, axis=0).astype(np.uint8)
+    out = Strip(16).sample(img)[:, 0].astype(int)
+    assert (np.diff(out) >= 0).all()
+    assert out[0] < 32 and out[-1] > 223
+
+
+def test_image_map_is_cached_per_size():
+    layout = Ring(12)
+    assert layout.image_map(36, 64) is layout.image_map(36, 64)
+    assert layout.image_map(36, 64) is not layout.image_map(72, 128)
+
+
+def test_to_dict_round_trip():
+    for layout in (Strip(30), Ring(24), Matrix(8, 4, serpentine=False), Points([(0.1, 0.2), (0.3, 0.4)])):
+        again = layout_from_dict(layout.to_dict())
+        assert type(again) is type(layout)
+        assert np.allclose(again.positions(), layout.positions())
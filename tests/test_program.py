@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+
+from core.color import OutputCorrection
+from core.program import (ACK, UPLOAD_HDR, Program, ProgramError, ProgramExecutor, ProgramRunner, ProgramSession,
+                          compile_effect, compile_program, correction_payload, decode_program, start_payload,
+                          upload_payloads)
+from core.protocol.codec import MsgType
+
+
+def show(leds: int = 30) -> Program:
+    prog = Program(leds, 30, loop=True)
+    rainbow = prog.add("rainbow", 0.0, 2.0, density=2.0)
+    rainbow.key("level", 0.0, 0.0).key("level", 0.5, 1.0, "ease_in_out")
+    comet = prog.add("comet", 1.0, 1.0, color=(0, 120, 255), tail=0.25)
+    comet.key("color", 0.0, (0, 0, 255), "ease_out").key("color", 1.0, (255, 40, 0))
+    return prog
+
+
+def test_compile_decode_round_trip():
+    prog = show()
+    blob = compile_program(prog)
+    assert decode_program(blob).to_dict() == prog.to_dict()
+    assert compile_program(decode_program(blob)) == blob
+
+
+def test_decode_rejects_corruption():
+    blob = bytearray(compile_program(show()))
+    blob[10] ^= 0x01
+    with pytest.raises(ProgramError):
+        decode_program(blob)
+    with pytest.raises(ProgramError):
+        decode_program(b"\x01")
+
+
+def test_compile_validates():
+    bad = Program(10)
+    bad.add("plasma")
+    with pytest.raises(ProgramError):
+        compile_program(bad)
+    endless = Program(10, loop=True)
+    endless.add("rainbow")
+    with pytest.raises(ProgramError):
+        compile_program(endless)
+    static_key = Program(10)
+    static_key.add("rainbow").key("density", 0.0, 1.0)
+    with pytest.raises(ProgramError):
+        compile_program(static_key)
+
+
+def _acks(replies) -> list[int]:
+    return [ACK.unpack(p)[1] for t, p in replies if t == MsgType.PROGRAM_ACK]
+
+
+def test_executor_acks_contiguous_chunks_only():
+    blob = compile_program(show())
+    chunks = upload_payloads(1, blob, chunk=32)
+    ex = ProgramExecutor(30)
+    replies = []
+    reply = lambda t, p: replies.append((t, bytes(p)))
+
+    ex.feed(MsgType.PROGRAM_UPLOAD, chunks[0], reply)
+    ex.feed(MsgType.PROGRAM_UPLOAD, chunks[2], reply)      # chunks[1] 丢了
+    assert _acks(replies) == [32, 32]
+    for c in chunks[1:]:
+        ex.feed(MsgType.PROGRAM_UPLOAD, c, reply)
+    assert _acks(replies)[-1] == len(blob)
+    assert 1 in ex.programs and ex.uploads == 1
+
+    # 收齐后主机重传的分块直接应答 total
+    ex.feed(MsgType.PROGRAM_UPLOAD, chunks[-1], reply)
+    assert _acks(replies)[-1] == len(blob)
+
+
+def test_executor_rejects_bad_crc():
+    blob = bytearray(compile_program(show()))
+    blob[-1] ^= 0xFF
+    ex = ProgramExecutor(30)
+    replies = []
+    for c in upload_payloads(1, bytes(blob), chunk=64):
+        ex.feed(MsgType.PROGRAM_UPLOAD, c, lambda t, p: replies.append((t, bytes(p))))
+    assert _acks(replies)[-1] == 0
+    assert ex.programs == {} and ex.rejected == 1
+
+
+def test_executor_matches_runner():
+    prog = show()
+    clock = [0.0]
+    ex = ProgramExecutor(prog.leds, clock=lambda: clock[0])
+    for c in upload_payloads(3, compile_program(prog)):
+        ex.feed(MsgType.PROGRAM_UPLOAD, c)
+    assert ex.feed(MsgType.PROGRAM_CTRL, start_payload(3)) == "start"
+
+    runner = ProgramRunner(decode_program(compile_program(prog)))
+    for tick in (0, 1, 15, 45, 70):
+        clock[0] = tick / prog.fps + 1e-6
+        assert np.array_equal(ex.render(), runner.advance_to(tick))
+
+    corr = OutputCorrection()
+    corr.update(gamma=2.2, gains=(1.0, 0.5, 0.25), brightness=0.8)
+    ex.feed(MsgType.PROGRAM_CORRECT, correction_payload(corr))
+    assert np.array_equal(ex.render(), corr.apply(runner.advance_to(70)))
+
+
+class FakeLink:
+    # 发往设备的消息排队，测试逐条投递（可丢弃），应答再交给会话
+
+    def __init__(self, capacity: int = 64):
+        self.cap = capacity
+        self.outbox: list[tuple[int, bytes]] = []
+        self.listeners = []
+
+    def capacity(self) -> int:
+        return self.cap
+
+    def channel(self):
+        return None
+
+    def correction(self) -> OutputCorrection:
+        return OutputCorrection()
+
+    def add_message_listener(self, fn):
+        if fn not in self.listeners:
+            self.listeners.append(fn)
+
+    def send_message(self, msg_type: int, payload: bytes):
+        self.outbox.append((msg_type, bytes(payload)))
+
+    def run(self, ex: ProgramExecutor, drop=lambda i, msg_type, payload: False) -> list[str]:
+        events = []
+        i = 0
+        while self.outbox:
+            msg_type, payload = self.outbox.pop(0)
+            i += 1
+            if drop(i, msg_type, payload):
+                continue
+            replies = []
+            events.append(ex.feed(msg_type, payload, lambda t, p: replies.append((t, bytes(p)))))
+            for t, p in replies:
+                for fn in self.listeners:
+                    fn(self, t, p)
+        return events
+
+
+def test_session_uploads_within_link_capacity():
+    blob = compile_program(show())
+    link = FakeLink(capacity=40)
+    session = ProgramSession(link)
+    session.upload(blob)
+    uploads = [p for t, p in link.outbox if t == MsgType.PROGRAM_UPLOAD]
+    assert len(uploads) == session.window
+    assert all(len(p) <= 40 for p in uploads)
+
+    session.start()
+    ex = ProgramExecutor(30)
+    # START 排在全部分块之后，收齐才发
+    assert link.run(ex)[-1] == "start"
+    assert session.is_uploaded()
+    assert ex.program_id == session.program_id
+    assert session.stats()["retransmits"] == 0
+
+
+def test_session_retransmits_lost_chunk():
+    blob = compile_program(show())
+    link = FakeLink(capacity=40)
+    session = ProgramSession(link)
+    session.upload(blob)
+    session.start()
+    lost = []
+
+    def drop(i, msg_type, payload):
+        if msg_type == MsgType.PROGRAM_UPLOAD and UPLOAD_HDR.unpack_from(payload)[1] == 30 and not lost:
+            lost.append(i)
+            return True
+        return False
+
+    ex = ProgramExecutor(30)
+    events = link.run(ex, drop)
+    assert lost
+    assert session.is_uploaded()
+    assert session.stats()["retransmits"] >= 1
+    assert events.count("start") == 1 and ex.is_running()
+    assert ex.programs[session.program_id].to_dict() == show().to_dict()
+
+
+def test_compile_effect_runs_forever():
+    prog = decode_program(compile_effect("breathing", 12, fps=20, speed=2.0))
+    assert prog.duration_ms() == 0 and not prog.loop
+    assert prog.clips[0].static["speed"] == 2.0
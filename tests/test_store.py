@@ -0,0 +1,93 @@
+import json
+import time
+
+from core.store import StateStore
+
+
+def _wait(pred, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_changes_are_debounced_into_one_write(tmp_path):
+    store = StateStore(str(tmp_path), delay=0.1, max_delay=5.0)
+    try:
+        for v in range(20):
+            store.set("last_state", "brightness", v)
+        assert store.writes == 0
+        assert _wait(lambda: store.writes == 1)
+        time.sleep(0.2)
+        assert store.writes == 1
+        with open(store.path("last_state"), encoding="utf-8") as f:
+            assert json.load(f) == {"brightness": 19}
+    finally:
+        store.close()
+
+
+def test_continuous_changes_still_write_after_max_delay(tmp_path):
+    store = StateStore(str(tmp_path), delay=0.2, max_delay=0.3)
+    try:
+        t0 = time.monotonic()
+        v = 0
+        # 一直在改（间隔小于 delay），也最晚 max_delay 后写一次
+        while store.writes == 0 and time.monotonic() - t0 < 2.0:
+            v += 1
+            store.set("last_state", "brightness", v)
+            time.sleep(0.02)
+        assert store.writes >= 1
+        assert time.monotonic() - t0 < 1.0
+    finally:
+        store.close()
+
+
+def test_unchanged_value_does_not_mark_dirty(tmp_path):
+    store = StateStore(str(tmp_path), delay=0.05)
+    try:
+        store.set("settings", "theme", "dark")
+        store.flush()
+        changes = store.changes
+        store.set("settings", "theme", "dark")
+        assert store.changes == changes
+        assert store.stats()["dirty"] == []
+    finally:
+        store.close()
+
+
+def test_close_flushes_and_reloads(tmp_path):
+    store = StateStore(str(tmp_path), delay=60.0)
+    store.update("favorites", {"colors": ["#FFB900"]})
+    store.close()
+    assert StateStore(str(tmp_path)).get("favorites", "colors") == ["#FFB900"]
+
+
+def test_unserialisable_value_skips_only_that_section(tmp_path):
+    store = StateStore(str(tmp_path), delay=0.05)
+    try:
+        store.set("settings", "bad", {(1, 2): "tuple key"})
+        store.set("last_state", "brightness", 30)
+        assert _wait(lambda: store.writes == 1 and store.errors == 1)
+        # 写线程还活着：之后的修改照常落盘
+        store.set("settings", "bad", None)
+        assert _wait(lambda: store.writes == 2)
+        with open(store.path("settings"), encoding="utf-8") as f:
+            assert json.load(f) == {"bad": None}
+    finally:
+        store.close()
+
+
+def test_update_with_same_values_does_not_mark_dirty(tmp_path):
+    store = StateStore(str(tmp_path), delay=0.05)
+    try:
+        store.update("last_state", {"power": True, "brightness": 40})
+        store.flush()
+        changes = store.changes
+        store.update("last_state", {"brightness": 40})
+        assert store.changes == changes
+        store.update("last_state", {"brightness": 41})
+        assert store.changes == changes + 1
+    finally:
+        store.close()
@@ -0,0 +1,89 @@
+import csv
+import json
+import random
+
+import pytest
+
+from core.telemetry import BUCKETS, MAX_US, Histogram, Telemetry, _bounds, _index, flatten
+
+
+def test_buckets_cover_range():
+    rng = random.Random(1)
+    values = list(range(200)) + [rng.randrange(MAX_US) for _ in range(2000)] + [MAX_US]
+    for us in values:
+        lo, hi = _bounds(_index(us))
+        assert lo <= us < hi
+        # 相对误差 < 1/16
+        assert hi - lo <= max(1, lo / 16)
+    assert _index(MAX_US) == BUCKETS - 1
+
+
+def test_histogram_percentiles():
+    hist = Histogram()
+    assert hist.summary()["p99"] == 0.0
+    for ms in range(1, 1001):
+        hist.record(ms / 1000.0)
+    hist.record(-1.0)
+    s = hist.summary()
+    assert s["count"] == 1001 and s["max"] == 1000.0
+    assert s["p50"] == pytest.approx(500, rel=0.0625)
+    assert s["p99"] == pytest.approx(990, rel=0.0625)
+    assert hist.percentile(100) == pytest.approx(1000, rel=0.0625) and hist.percentile(100) <= 1000.0
+
+    other = Histogram()
+    other.record(5.0)
+    hist.merge(other)
+    assert hist.count == 1002 and hist.max_us == 5_000_000
+    hist.reset()
+    assert hist.count == 0 and hist.percentile(50) == 0.0
+
+
+def test_flatten():
+    stats = {"a": {"b": 1, "ok": True, "name": "x", "c": {"d": 2.5}}, "e": 3}
+    assert flatten(stats) == {"a.b": 1, "a.ok": 1, "a.c.d": 2.5, "e": 3}
+
+
+def test_sample_rates_and_errors():
+    now = [0.0]
+    counters = {"frames": 0}
+    tel = Telemetry(history=2, clock=lambda: now[0])
+    tel.add_source("dev.1", lambda: {"link": {"frames": counters["frames"], "queue": 3}})
+    tel.add_source("broken", lambda: 1 / 0)
+
+    first = tel.sample()
+    assert "frames_per_s" not in first["dev.1"]["link"]
+    assert "error" in first["broken"]
+
+    now[0] = 2.0
+    counters["frames"] = 120
+    snap = tel.sample()
+    assert snap["dev.1"]["link"]["frames_per_s"] == 60.0
+    assert "queue_per_s" not in snap["dev.1"]["link"]
+    assert tel.latest() is snap
+
+    # 计数回绕 / 重置时速率不为负
+    now[0] = 3.0
+    counters["frames"] = 0
+    assert tel.sample()["dev.1"]["link"]["frames_per_s"] == 0.0
+    assert len(tel.history()) == 2
+
+    tel.remove_source("broken")
+    assert tel.sources() == ["dev.1"]
+
+
+def test_export(tmp_path):
+    tel = Telemetry()
+    tel.add_source("s", lambda: {"sent": 1, "state": "connected"})
+    tel.sample()
+    tel.sample()
+
+    tel.write_json(str(tmp_path / "t.json"))
+    data = json.loads((tmp_path / "t.json").read_text(encoding="utf-8"))
+    assert data["latest"]["s"]["state"] == "connected"
+    assert [h["s.sent"] for h in data["history"]] == [1, 1]
+
+    tel.write_csv(str(tmp_path / "t.csv"))
+    with open(tmp_path / "t.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["time", "metric", "value"]
+    assert {r[1] for r in rows[1:]} >= {"s.sent"}
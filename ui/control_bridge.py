@@ -0,0 +1,76 @@
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+from core.control import DEFAULT_TCP_PORT, Command, ControlServer, default_unix_path
+from core.store import StateStore
+from ui.link_bridge import LinkBridge
+
+
+class ControlBridge(QObject):
+    # 控制服务器跑在传输线程：命令批次经信号排队到 GUI 线程，由主窗口按界面操作的同一路径生效
+    # 只有帧的批次（推流）不经过 GUI 线程，直接进设备组；混在命令里的帧随整批到 GUI 线程按顺序发送
+    # 发帧时经 streamReceived 让主窗口停掉页面上的帧源，避免两路帧交错
+    batchReceived = Signal(list)
+    streamReceived = Signal()
+
+    STREAM_NOTIFY_S = 0.25          # 连续推流时至多这么久提醒一次，期间页面又开始播放也会被停掉
+
+    def __init__(self, bridge: LinkBridge, store: StateStore | None = None, parent=None):
+        super().__init__(parent)
+        self._bridge = bridge
+        self._store = store
+        self.server: ControlServer | None = None
+        self._lastStreamNotify = 0.0
+
+    # 默认只开本机 Unix 套接字（不支持时退回 127.0.0.1 TCP）；HTTP 端口显式给出才开
+    def start(self, http_port: int = 0):
+        unix_path = default_unix_path()
+        tcp_port = 0 if unix_path else DEFAULT_TCP_PORT
+
+        self.server = ControlServer(self, unix_path, tcp_port, http_port)
+        fut = self._bridge.worker.call(self.server.start())
+        fut.add_done_callback(self._on_start_done)
+
+    def stop(self):
+        if self.server is not None:
+            try:
+                self._bridge.worker.call(self.server.stop()).result(2.0)
+            except Exception:
+                pass
+            self.server = None
+
+    # ---------- ControlTarget（传输线程） ----------
+
+    def apply(self, commands: list[Command]):
+        if all(c.op == "frame" for c in commands):
+            for c in commands:
+                self.send_frame(c.args["pixels"])
+        else:
+            self.batchReceived.emit(list(commands))
+
+    def send_frame(self, pixels: bytes):
+        now = time.monotonic()
+        if now - self._lastStreamNotify >= self.STREAM_NOTIFY_S:
+            self._lastStreamNotify = now
+            self.streamReceived.emit()
+        self._bridge.group.send_frame(pixels)
+
+    def backlog(self) -> int:
+        return self._bridge.group.backlog()
+
+    def state(self) -> dict:
+        last = self._store.section("last_state") if self._store is not None else {}
+        members = self._bridge.group.members()
+        return {
+            "hs": last.get("hs"),
+            "brightness": last.get("brightness"),
+            "power": last.get("power"),
+            "devices": {m.name: (m.channel().state if m.channel() is not None else "detached") for m in members},
+        }
+
+    def _on_start_done(self, fut):
+        try:
+            fut.result()
+        except Exception as e:
+            self._bridge.errorOccurred.emit(f"control server: {e}")
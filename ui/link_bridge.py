@@ -0,0 +1,191 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from core.color import DEFAULT_CALIBRATION
+from core.connection import PRIMARY, ConnectionManager, KnownDevice
+from core.group import DeviceGroup
+from core.layout import Layout, layout_from_dict
+from core.link import DeviceLink
+from core.store import StateStore, load_calibration
+from core.telemetry import Telemetry
+from core.transport.base import DeviceInfo
+from core.transport.registry import discover_all
+from core.transport.worker import TransportWorker
+
+
+class LinkBridge(QObject):
+    # 传输线程 -> GUI 线程：信号在传输线程发射，Qt 自动排队到接收者所在的 GUI 线程
+    stateChanged = Signal(str)
+    devicesFound = Signal(list)
+    errorOccurred = Signal(str)
+    groupChanged = Signal()
+    telemetryUpdated = Signal(dict)
+    layoutChanged = Signal(object)
+    connectionChanged = Signal(str, str)    # (连接名, 状态)，主连接名为 "primary"
+    calibrationChanged = Signal()
+
+    def __init__(self, parent=None, max_leds: int = 2000, store: StateStore | None = None):
+        super().__init__(parent)
+        self.worker = TransportWorker()
+        self.maxLeds = max_leds
+        self.link = DeviceLink(max_leds)
+        self.store = store
+        self._device: DeviceInfo | None = None
+        self._layout: Layout | None = None
+        self._layoutLoaded = False
+
+        # 页面的输出端是设备组：主连接是其中一员，其余控制器按需加入
+        self.group = DeviceGroup(self.worker, max_leds)
+        self._primary = self.group.add_link(PRIMARY, self.link)
+        self.group.add_listener(self.groupChanged.emit)
+
+        # 连接管理：已知设备直连、断线退避重连、连上后补发上次状态
+        self.connections = ConnectionManager(self.worker, self.group, store, primary=self.link)
+        self.connections.add_listener(self._on_connection_state)
+
+        # 遥测常开：定时采样各数据源，顺带向每台设备发 PING 测往返时延
+        self.telemetry = Telemetry()
+        self.telemetry.add_source("devices", self.group.stats)
+        self.telemetry.add_source("connections", self.connections.stats)
+        self._telemetryTimer = QTimer(self)
+        self._telemetryTimer.setInterval(500)
+        self._telemetryTimer.timeout.connect(self._sample_telemetry)
+        self._pingTick = 0
+
+    def start(self):
+        self.worker.start()
+        self._telemetryTimer.start()
+
+    def stop(self):
+        self._telemetryTimer.stop()
+        self.connections.close()
+        self.group.close()
+        self.worker.stop()
+
+    def device(self) -> DeviceInfo | None:
+        return self._device
+
+    # 异步扫描，结果通过 devicesFound 返回
+    def scan(self, timeout: float = 3.0):
+        fut = self.worker.call(discover_all(timeout))
+        fut.add_done_callback(self._on_scan_done)
+
+    # 断线后由连接管理自动重连，直到 disconnectDevice
+    def connectDevice(self, info: DeviceInfo, queue_size: int = 64, window: int = 8):
+        self.disconnectDevice()
+        self._set_primary(info)
+        self.connections.connect(info, PRIMARY, queue_size=queue_size, window=window)
+
+    def disconnectDevice(self):
+        self.connections.disconnect(PRIMARY)
+        self._device = None
+        self._primary.info = None
+
+    # 额外的控制器加入设备组，span 为其在整体场景中的 (起始灯, 灯数)
+    def addGroupDevice(self, info: DeviceInfo, span: tuple[int, int] | None = None):
+        try:
+            self.connections.connect(info, span=span)
+        except Exception as e:
+            self.errorOccurred.emit(str(e))
+
+    def removeGroupDevice(self, name: str):
+        if name != PRIMARY:
+            self.connections.disconnect(name)
+
+    # 启动时并行直连上次在用的设备；一台都没有记录时才退回扫描
+    def restoreConnections(self, limit: int = 4) -> list[KnownDevice]:
+        try:
+            started = self.connections.restorable(limit)
+            for k in started:
+                if k.role == PRIMARY:
+                    self.connectDevice(k.info())
+                else:
+                    self.addGroupDevice(k.info(), tuple(k.span) if k.span else None)
+        except Exception as e:
+            self.errorOccurred.emit(str(e))
+            return []
+        if not started:
+            self.scan()
+        return started
+
+    def syncStart(self, delay: float = 0.25) -> float:
+        return self.group.sync_start(delay)
+
+    # 校准按设备地址保存，未连接时读写 "default"
+    def calibrationKey(self) -> str:
+        return self._device.address if self._device is not None else "default"
+
+    def calibration(self) -> dict:
+        values = dict(DEFAULT_CALIBRATION)
+        if self.store is not None:
+            values.update(load_calibration(self.store, self.calibrationKey()))
+        return values
+
+    # 立即作用到主连接的输出校正，存盘由 store 防抖
+    def setCalibration(self, **values):
+        merged = self.calibration()
+        merged.update(values)
+        self.link.correction().set_calibration(merged)
+        if self.store is not None:
+            self.store.set("calibration", self.calibrationKey(), merged)
+        self.calibrationChanged.emit()
+
+    # 已知设备（最近用过的在前），带缓存的 MTU / 能力 / 句柄与上次连接耗时
+    def knownDevices(self) -> list[KnownDevice]:
+        return self.connections.known()
+
+    def forgetDevice(self, address: str):
+        self.connections.forget(address)
+
+    # 场景的灯珠空间布局，None 表示按一条直线灯带处理；首次访问时从存储读取
+    def layout(self) -> Layout | None:
+        if not self._layoutLoaded:
+            self._layoutLoaded = True
+            saved = self.store.get("layouts", "current") if self.store is not None else None
+            if saved:
+                try:
+                    self._layout = self._check_layout(layout_from_dict(saved))
+                except (TypeError, ValueError) as e:
+                    self.errorOccurred.emit(f"layout: {e}")
+        return self._layout
+
+    # 灯数超过帧缓冲上限（maxLeds）的布局抛 ValueError，保持原布局不变
+    def setLayout(self, layout: Layout | None):
+        self._check_layout(layout)
+        self._layout = layout
+        self._layoutLoaded = True
+        if self.store is not None:
+            self.store.set("layouts", "current", layout.to_dict() if layout is not None else None)
+        self.layoutChanged.emit(layout)
+
+    def _check_layout(self, layout: Layout | None) -> Layout | None:
+        if layout is not None and layout.leds > self.maxLeds:
+            raise ValueError(f"layout has {layout.leds} leds, the frame buffer holds at most {self.maxLeds}")
+        return layout
+
+    def _set_primary(self, info: DeviceInfo):
+        self._device = info
+        self._primary.info = info
+        self.link.correction().set_calibration(self.calibration())
+        self.calibrationChanged.emit()
+
+    # 每次采样都刷新界面，PING 每秒一次
+    def _sample_telemetry(self):
+        self._pingTick ^= 1
+        if self._pingTick:
+            self.group.ping()
+        self.telemetryUpdated.emit(self.telemetry.sample())
+
+    def _on_connection_state(self, name: str, state: str):
+        self.connectionChanged.emit(name, state)
+        if name != PRIMARY:
+            self.groupChanged.emit()
+            return
+        self.stateChanged.emit(state)
+        if state.startswith("error"):
+            self.errorOccurred.emit(state)
+
+    def _on_scan_done(self, fut):
+        try:
+            self.devicesFound.emit(fut.result())
+        except Exception as e:
+            self.errorOccurred.emit(str(e))
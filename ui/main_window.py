@@ -1,37 +1,45 @@
-from PySide6.QtCore import Qt
+import os
+
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QGuiApplication
+from PySide6.QtWidgets import QWidget
 from qfluentwidgets import (
-    FluentWindow,
     FluentIcon,
     NavigationItemPosition,
-    PushButton,
-    BodyLabel,
 )
 
-from ui.pages.home import HomePage
-from ui.pages.static import StaticPage
-from ui.pages.dynamic import DynamicPage
-from ui.pages.gif import GifPage
-from ui.pages.connect import ConnectPage
-from ui.pages.device import DevicePage
-from ui.pages.setting import SettingPage
+from core.asset_cache import MB, AssetCache
+from core.store import StateStore
+from ui.control_bridge import ControlBridge
+from ui.link_bridge import LinkBridge
+from ui.widgets.lazy_page import LazyPage, page_factory
 from qfluentwidgets import MSFluentWindow
 
 class MainWindow(MSFluentWindow):
-    def __init__(self):
+    def __init__(self, warm_pages: bool = True):
         super().__init__()
-        self.pageHome = HomePage()
-        self.pageStatic = StaticPage()
-        self.pageDynamic = DynamicPage()
-        self.pageGif = GifPage()
-        self.pageConnect = ConnectPage()
-        self.pageDevice = DevicePage()
-        self.pageSetting = SettingPage()
+        # 持久化状态按分区懒加载：这里只建对象，不读盘
+        self.store = StateStore()
+        self.linkBridge = LinkBridge(self, store=self.store)
+        self.linkBridge.start()
+        # GIF 转换结果的磁盘缓存；上限在 GIF / 设置页构造时从 settings 读取
+        self.assetCache = AssetCache(os.path.join(self.store.root, "cache"))
+
+        # 本地控制接口：其它进程的命令排队到 GUI 线程，和界面操作走同一条路径
+        self.controlBridge = ControlBridge(self.linkBridge, self.store, self)
+        self.controlBridge.batchReceived.connect(self._on_control_batch_handle)
+        self.controlBridge.streamReceived.connect(self._on_control_stream_handle)
+
+        self._lazyPages: dict[str, LazyPage] = {}
+        self._warmQueue: list[LazyPage] = []
+        self._warmPages = warm_pages
+        self._restored = False
+
         self.initWindow()
         self.initNavigation()
 
-    
-    def initWindow(self): 
+
+    def initWindow(self):
         self.setWindowTitle("PrismFX ARGB Connter")
         self.resize(1120, 780)
 
@@ -40,19 +48,121 @@ class MainWindow(MSFluentWindow):
         width = geometry.width()
         height = geometry.height()
         self.move(((width //2) - (self.width()//2)), ((height//2) - (self.height()//2)))
-        
 
+    # 页面只注册工厂，首次导航到时才导入模块并构造
     def initNavigation(self):
+        # 输出统一走设备组：主连接 + 额外加入的控制器
+        output = self.linkBridge.group
+
+        self.addLazyPage("pageHome", page_factory("ui.pages.home:HomePage"), FluentIcon.HOME, "主页", FluentIcon.HOME_FILL)
+        self.addLazyPage("pageStatic", page_factory("ui.pages.static:StaticPage", store=self.store), FluentIcon.PALETTE, "静态")
+        self.addLazyPage("pageDynamic", page_factory("ui.pages.dynamic:DynamicPage", output), FluentIcon.MOVIE, "动态")
+        self.addLazyPage("pageGif", page_factory("ui.pages.gif:GifPage", output, self.assetCache), FluentIcon.PHOTO, "GIF")
+        self.addLazyPage("pageAmbient", page_factory("ui.pages.ambient:AmbientPage", output), FluentIcon.PROJECTOR, "氛围")
+        self.addLazyPage("pageDevice", page_factory("ui.pages.device:DevicePage", self.linkBridge), FluentIcon.DEVELOPER_TOOLS, "设备")
+
+        self.addLazyPage("pageConnect", page_factory("ui.pages.connect:ConnectPage", self.linkBridge),
+                         FluentIcon.BLUETOOTH, "连接", None, NavigationItemPosition.BOTTOM)
+        self.addLazyPage("pageSetting",
+                         page_factory("ui.pages.setting:SettingPage", self.linkBridge, self.store, self.assetCache),
+                         FluentIcon.SETTING, "设置", None, NavigationItemPosition.BOTTOM)
+
+        self.stackedWidget.currentChanged.connect(self._on_current_page_changed)
+        self.switchTo(self._lazyPages["pageHome"])
+
+    def addLazyPage(self, name: str, factory, icon, text: str, selectedIcon=None,
+                    position=NavigationItemPosition.TOP) -> LazyPage:
+        holder = LazyPage(name, factory)
+        holder.created.connect(lambda page, name=name: self.onPageCreated(name, page))
+
+        self._lazyPages[name] = holder
+        self._warmQueue.append(holder)
+        self.addSubInterface(holder, icon, text, selectedIcon, position)
+        return holder
+
+    # 取页面（未构造则立即构造）
+    def page(self, name: str) -> QWidget:
+        return self._lazyPages[name].ensure()
+
+    # 已构造的页面，未构造返回 None
+    def createdPage(self, name: str) -> QWidget | None:
+        return self._lazyPages[name].page()
+
+    # 页面构造完成后的连线
+    def onPageCreated(self, name: str, page: QWidget):
+        if name == "pageStatic":
+            page.commandReady.connect(self.linkBridge.group.send_command)
+            self.linkBridge.telemetry.add_source("static", page.dispatchStats)
+        if name == "pageGif":
+            limit = self.store.get("settings", "asset_cache_mb")
+            if limit:
+                self.assetCache.max_bytes = limit * MB
+        if name in ("pageDynamic", "pageGif"):
+            # 场景布局：构造时取当前值，之后跟随设备页的修改
+            page.setLedLayout(self.linkBridge.layout())
+            self.linkBridge.layoutChanged.connect(page.setLedLayout)
+        if name == "pageDynamic":
+            self.linkBridge.calibrationChanged.connect(page.syncCorrection)
+
+    # 控制接口的命令批次（已校验），按顺序交给对应页面的统一更新接口
+    def _on_control_batch_handle(self, commands: list):
+        for c in commands:
+            if c.op == "color":
+                self.page("pageStatic").static_color_update(c.args["h"], c.args["s"], source="ipc", commit=True)
+            elif c.op == "brightness":
+                self.page("pageStatic").static_brightness_update(c.args["value"], source="ipc", commit=True)
+            elif c.op == "power":
+                self.page("pageStatic").static_power_update(c.args["on"], source="ipc")
+            elif c.op == "effect":
+                self.page("pageDynamic").dynamic_effect_update(c.args["name"], c.args["speed"], source="ipc")
+            elif c.op == "frame":
+                self.controlBridge.send_frame(c.args["pixels"])
+
+    # 外部帧接管输出：停掉各页面正在播放的帧源（未构造的页面不会在播放）
+    def _on_control_stream_handle(self):
+        for name in ("pageDynamic", "pageGif", "pageAmbient"):
+            page = self.createdPage(name)
+            if page is not None:
+                page.stopOutput()
+
+    def switchTo(self, interface: QWidget):
+        if isinstance(interface, LazyPage):
+            interface.ensure()
+        super().switchTo(interface)
 
-        self.addSubInterface(self.pageHome, FluentIcon.HOME, "主页", FluentIcon.HOME_FILL)
-        self.addSubInterface(self.pageStatic, FluentIcon.PALETTE, "静态")
-        self.addSubInterface(self.pageDynamic, FluentIcon.MOVIE, "动态")
-        self.addSubInterface(self.pageGif, FluentIcon.PHOTO, "GIF")
-        self.addSubInterface(self.pageDevice, FluentIcon.DEVELOPER_TOOLS, "设备")
+    def _on_current_page_changed(self, index: int):
+        w = self.stackedWidget.widget(index)
+        if isinstance(w, LazyPage):
+            w.ensure()
 
-        self.addSubInterface(self.pageConnect, FluentIcon.BLUETOOTH, "连接", None, NavigationItemPosition.BOTTOM)
-        self.addSubInterface(self.pageSetting, FluentIcon.SETTING, "设置", None, NavigationItemPosition.BOTTOM)
-        
+    # 首帧之后利用空闲时间逐个预热剩余页面
+    def showEvent(self, e):
+        super().showEvent(e)
+        if self.controlBridge.server is None:
+            # HTTP 默认关闭，PRISMFX_HTTP_PORT 指定端口时才监听 127.0.0.1
+            self.controlBridge.start(int(os.environ.get("PRISMFX_HTTP_PORT", "0") or 0))
+        if not self._restored:
+            # 首帧之后并行直连上次使用的设备，没有记录时才扫描
+            self._restored = True
+            QTimer.singleShot(0, self.linkBridge.restoreConnections)
+        if self._warmPages:
+            QTimer.singleShot(200, self._warm_next_page)
 
-        self.stackedWidget.setCurrentWidget(self.pageHome)
+    def _warm_next_page(self):
+        while self._warmQueue:
+            holder = self._warmQueue.pop(0)
+            if not holder.isCreated():
+                holder.ensure()
+                QTimer.singleShot(30, self._warm_next_page)
+                return
 
+    def closeEvent(self, e):
+        self._warmQueue.clear()
+        for holder in self._lazyPages.values():
+            page = holder.page()
+            if page is not None and hasattr(page, "shutdown"):
+                page.shutdown()
+        self.controlBridge.stop()
+        self.linkBridge.stop()
+        self.store.close()
+        super().closeEvent(e)
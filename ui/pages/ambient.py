@@ -0,0 +1,247 @@
+import os
+import time
+
+import numpy as np
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QGuiApplication, QImage
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, IconWidget,
+    ComboBox, SpinBox, PrimaryPushButton, PushButton, FluentIcon,
+    InfoBar, InfoBarPosition
+)
+
+from core.group import DeviceGroup
+from core.link import DeviceLink
+
+SOURCES = [("screen", "屏幕"), ("video", "视频文件"), ("images", "图片序列")]
+
+
+class AmbientPage(QWidget):
+    # 屏幕抓取只能在 GUI 线程：定时器抓屏 + 步长降采样后投递给流水线，归约和发送在流水线自己的线程里
+    def __init__(self, link: DeviceLink | DeviceGroup | None = None):
+        super().__init__()
+        self.setObjectName("pageAmbient")
+
+        self._link = link
+        self._pipeline = None
+        self._path = ""
+
+        v = QVBoxLayout(self)
+        v.setContentsMargins(24, 24, 24, 24)
+        v.setSpacing(12)
+        v.addWidget(TitleLabel("氛围光"))
+
+        v.addWidget(self._build_source_card())
+        v.addWidget(self._build_layout_card())
+        v.addWidget(self._build_play_card())
+
+        self.statsLabel = CaptionLabel("")
+        self.statsLabel.setTextColor("#606060", "#d2d2d2")
+        v.addWidget(self.statsLabel)
+        v.addStretch(1)
+
+        self._grabTimer = QTimer(self)
+        self._grabTimer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._grabTimer.timeout.connect(self._grab_screen)
+
+        self._statsTimer = QTimer(self)
+        self._statsTimer.setInterval(500)
+        self._statsTimer.timeout.connect(self._refresh_stats)
+
+    ## 帧源卡
+    def _build_source_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.PROJECTOR)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("画面来源"))
+        self.sourceLabel = CaptionLabel("主屏幕")
+        self.sourceLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.sourceLabel)
+
+        self.sourceCombo = ComboBox()
+        for key, text in SOURCES:
+            self.sourceCombo.addItem(text, userData=key)
+        self.sourceCombo.currentIndexChanged.connect(self._on_source_changed)
+
+        self.openBtn = PushButton(FluentIcon.FOLDER, "选择")
+        self.openBtn.setEnabled(False)
+        self.openBtn.clicked.connect(self._open_btn_click_handle)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.sourceCombo, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.openBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 灯珠布局卡：四条边的灯珠数 + 采样深度
+    def _build_layout_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        self.edgeSpins: dict[str, SpinBox] = {}
+        for key, text, default in (("top", "上", 30), ("right", "右", 17), ("bottom", "下", 30), ("left", "左", 17)):
+            lay.addWidget(BodyLabel(text), 0, Qt.AlignmentFlag.AlignVCenter)
+            spin = SpinBox()
+            spin.setRange(0, 500)
+            spin.setValue(default)
+            self.edgeSpins[key] = spin
+            lay.addWidget(spin, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addWidget(BodyLabel("深度"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.depthSpin = SpinBox()
+        self.depthSpin.setRange(1, 50)
+        self.depthSpin.setValue(10)
+        self.depthSpin.setSuffix(" %")
+        lay.addWidget(self.depthSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addStretch(1)
+        return card
+
+    ## 播放卡
+    def _build_play_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        lay.addWidget(BodyLabel("帧率"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.fpsSpin = SpinBox()
+        self.fpsSpin.setRange(1, 120)
+        self.fpsSpin.setValue(60)
+        lay.addWidget(self.fpsSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addStretch(1)
+
+        self.startBtn = PrimaryPushButton(FluentIcon.PLAY, "开始")
+        self.stopBtn = PushButton(FluentIcon.PAUSE, "停止")
+        self.startBtn.clicked.connect(self._start_btn_click_handle)
+        self.stopBtn.clicked.connect(self._stop_btn_click_handle)
+
+        lay.addWidget(self.startBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.stopBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    def _on_source_changed(self, _index: int):
+        kind = self.sourceCombo.currentData()
+        self.openBtn.setEnabled(kind != "screen")
+        self._path = ""
+        self.sourceLabel.setText("主屏幕" if kind == "screen" else "未选择")
+
+    def _open_btn_click_handle(self):
+        if self.sourceCombo.currentData() == "video":
+            path, _ = QFileDialog.getOpenFileName(self, "选择视频", "", "视频 (*.mp4 *.mkv *.avi *.mov *.webm)")
+        else:
+            path = QFileDialog.getExistingDirectory(self, "选择图片目录")
+        if path:
+            self.setSourcePath(path)
+
+    def setSourcePath(self, path: str):
+        self._path = path
+        self.sourceLabel.setText(os.path.basename(path.rstrip(os.sep)) or path)
+
+    def edgeLayout(self):
+        from core.ambient import EdgeLayout
+
+        return EdgeLayout(*(self.edgeSpins[k].value() for k in ("top", "right", "bottom", "left")),
+                          depth=self.depthSpin.value() / 100.0)
+
+    def _create_source(self):
+        from core.ambient import ImageSequenceSource, VideoSource
+
+        kind = self.sourceCombo.currentData()
+        if kind == "screen":
+            return None
+        if kind == "video":
+            return VideoSource(self._path)
+        return ImageSequenceSource(self._path)
+
+    def _start_btn_click_handle(self):
+        from core.ambient import AmbientError, AmbientPipeline, EdgeSampler
+
+        self._stop_btn_click_handle()
+        if self.sourceCombo.currentData() != "screen" and not self._path:
+            return
+        layout = self.edgeLayout()
+        if not layout.leds:
+            return
+
+        sampler = EdgeSampler(layout, channels=(2, 1, 0))       # 屏幕抓取是 BGRA；文件帧源启动时会覆盖
+        pipeline = AmbientPipeline(sampler, self._send_frame, self._create_source(), self.fpsSpin.value())
+        try:
+            pipeline.start()
+        except AmbientError as e:
+            InfoBar.error("无法打开画面来源", str(e), duration=4000, position=InfoBarPosition.TOP, parent=self)
+            return
+
+        self._pipeline = pipeline
+        if pipeline.source is None:
+            self._grabTimer.start(max(1, int(1000 / self.fpsSpin.value())))
+        self._statsTimer.start()
+
+    def _stop_btn_click_handle(self):
+        self._grabTimer.stop()
+        if self._pipeline is not None:
+            self._refresh_stats()
+            self._pipeline.stop()
+            self._pipeline = None
+        self._statsTimer.stop()
+
+    # GUI 线程：抓主屏幕，按采样器的步长降采样后拷一份小图投递（QImage 的缓冲随对象释放）
+    def _grab_screen(self):
+        screen = QGuiApplication.primaryScreen()
+        if screen is None or self._pipeline is None:
+            return
+        t0 = time.monotonic()
+        img = screen.grabWindow(0).toImage().convertToFormat(QImage.Format.Format_RGB32)
+        w, h = img.width(), img.height()
+        if not w or not h:
+            return
+        arr = np.frombuffer(img.constBits(), np.uint8, img.sizeInBytes()).reshape(h, img.bytesPerLine() // 4, 4)
+        step = self._pipeline.sampler.step_for(h, w)
+        small = arr[::step, :w:step].copy()
+        self._pipeline.grab_hist.record(time.monotonic() - t0)
+        self._pipeline.push(small, t0)
+
+    # 发送线程回调：DeviceLink / DeviceGroup 线程安全；origin 为抓取时刻
+    def _send_frame(self, pixels, origin: float):
+        if self._link is not None:
+            self._link.send_frame(pixels, origin=origin)
+
+    def _refresh_stats(self):
+        if self._pipeline is None:
+            return
+        st = self._pipeline.stats()
+        text = (
+            f"输出 {st['fps']:.1f} FPS · 已发送 {st['sent']} 帧 · 跳过 {st['skipped']} · "
+            f"抓取 P50 {st['grab_ms']['p50']:.2f} ms · 采样 P99 {st['reduce_ms']['p99']:.2f} ms · "
+            f"抓取→发送 P99 {st['latency_ms']['p99']:.2f} ms"
+        )
+        if st["error"]:
+            text += f"\n{st['error']}"
+        self.statsLabel.setText(text)
+        if self._pipeline.source is not None and not self._pipeline.is_running():
+            self._statsTimer.stop()
+
+    # 外部（控制接口）推流接管输出时调用
+    def stopOutput(self):
+        self._stop_btn_click_handle()
+
+    # 主窗口关闭时调用
+    def shutdown(self):
+        self._stop_btn_click_handle()
@@ -1,14 +1,204 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from qfluentwidgets import TitleLabel, BodyLabel
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+from PySide6.QtCore import Qt
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, ListWidget,
+    PrimaryPushButton, PushButton, FluentIcon
+)
+
+from core.connection import PRIMARY, KnownDevice
+from core.transport.base import DeviceInfo
+from ui.link_bridge import LinkBridge
+
+
+ROLE_TEXT = {PRIMARY: "主连接", "group": "设备组"}
+
+
+# 已知设备一行：名字 / 地址 + 上次角色、缓存的 MTU 与上次建立连接的耗时
+def _known_label(k: KnownDevice) -> str:
+    parts = [k.label(), "已知"]
+    if k.role in ROLE_TEXT:
+        parts.append(ROLE_TEXT[k.role])
+    if k.mtu:
+        parts.append(f"MTU {k.mtu}")
+    if k.connect_ms is not None:
+        parts.append(f"上次连接 {k.connect_ms:.0f} ms")
+    return " · ".join(parts)
+
 
 class ConnectPage(QWidget):
-    def __init__(self):
+    def __init__(self, bridge: LinkBridge):
         super().__init__()
         self.setObjectName("pageConnect")
 
+        self._bridge = bridge
+        self._devices: list[DeviceInfo] = []        # 列表各行：已知设备在前，其后是扫描到的新设备
+        self._known: set[str] = set()
+        self._found: list[DeviceInfo] = []
+
         v = QVBoxLayout(self)
         v.setContentsMargins(24, 24, 24, 24)
         v.setSpacing(12)
         v.addWidget(TitleLabel("设备连接"))
-        v.addWidget(BodyLabel("这里后面接扫描/连接逻辑"))
-        v.addStretch(1)
+
+        self._build_toolbar(v)
+        self._build_reconnect_card(v)
+
+        self.deviceList = ListWidget(self)
+        self.deviceList.itemDoubleClicked.connect(lambda _item: self._connect_btn_click_handle())
+        v.addWidget(self.deviceList, 1)
+
+        self._bridge.devicesFound.connect(self._on_devices_found)
+        self._bridge.stateChanged.connect(self._on_state_changed)
+        self._bridge.errorOccurred.connect(self._on_error)
+        self._bridge.connectionChanged.connect(self._on_connection_changed)
+
+        self._refresh_list()
+        self._update_reconnect_label()
+
+    # 扫描 / 连接 / 断开 + 状态
+    def _build_toolbar(self, v: QVBoxLayout):
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("连接状态"))
+        self.stateLabel = CaptionLabel("未连接")
+        self.stateLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.stateLabel)
+
+        self.scanBtn = PrimaryPushButton(FluentIcon.SYNC, "扫描")
+        self.connectBtn = PushButton(FluentIcon.LINK, "连接")
+        self.disconnectBtn = PushButton(FluentIcon.CLOSE, "断开")
+        self.joinBtn = PushButton(FluentIcon.ADD, "加入设备组")
+
+        self.scanBtn.clicked.connect(self._scan_btn_click_handle)
+        self.connectBtn.clicked.connect(self._connect_btn_click_handle)
+        self.disconnectBtn.clicked.connect(self._disconnect_btn_click_handle)
+        self.joinBtn.clicked.connect(self._join_btn_click_handle)
+
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.scanBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.connectBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.disconnectBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.joinBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        v.addWidget(card)
+
+    # 快速重连：启动时直连上次在用的设备，这里显示连上用时与自动重连情况
+    def _build_reconnect_card(self, v: QVBoxLayout):
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("快速重连"))
+        self.reconnectLabel = CaptionLabel("启动时直连上次使用的设备，断线后自动重连")
+        self.reconnectLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.reconnectLabel)
+
+        self.restoreBtn = PushButton(FluentIcon.HISTORY, "重连上次设备")
+        self.forgetBtn = PushButton(FluentIcon.DELETE, "忘记设备")
+
+        self.restoreBtn.clicked.connect(self._restore_btn_click_handle)
+        self.forgetBtn.clicked.connect(self._forget_btn_click_handle)
+
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.restoreBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.forgetBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        v.addWidget(card)
+
+    # 已知设备在前（最近用过的在前），扫描结果里的新设备在后
+    def _refresh_list(self):
+        row = self.deviceList.currentRow()
+        known = self._bridge.knownDevices()
+        self._known = {k.address for k in known}
+        found = [d for d in self._found if d.address not in self._known]
+        self._devices = [k.info() for k in known] + found
+
+        self.deviceList.clear()
+        for k in known:
+            self.deviceList.addItem(_known_label(k))
+        for d in found:
+            self.deviceList.addItem(d.label())
+        if 0 <= row < len(self._devices):
+            self.deviceList.setCurrentRow(row)
+
+    def _update_reconnect_label(self):
+        stats = self._bridge.connections.stats()
+        ttc = stats.pop("time_to_connected_ms", None)
+        if not stats:
+            return
+        connected = sum(1 for s in stats.values() if s["state"] == "connected")
+        reconnects = sum(s["reconnects"] for s in stats.values())
+        text = f"{connected}/{len(stats)} 台已连接"
+        if ttc is not None:
+            text += f"，连上用时 {ttc:.0f} ms"
+        if reconnects:
+            text += f"，自动重连 {reconnects} 次"
+        self.reconnectLabel.setText(text)
+
+    def _restore_btn_click_handle(self):
+        started = self._bridge.restoreConnections()
+        if not started:
+            self.scanBtn.setEnabled(False)
+            self.stateLabel.setText("没有上次使用的设备，扫描中…")
+
+    def _forget_btn_click_handle(self):
+        row = self.deviceList.currentRow()
+        if 0 <= row < len(self._devices) and self._devices[row].address in self._known:
+            self._bridge.forgetDevice(self._devices[row].address)
+            self._refresh_list()
+
+    def _scan_btn_click_handle(self):
+        self.scanBtn.setEnabled(False)
+        self.stateLabel.setText("扫描中…")
+        self._bridge.scan()
+
+    def _connect_btn_click_handle(self):
+        row = self.deviceList.currentRow()
+        if 0 <= row < len(self._devices):
+            self._bridge.connectDevice(self._devices[row])
+
+    def _disconnect_btn_click_handle(self):
+        self._bridge.disconnectDevice()
+        self.stateLabel.setText("未连接")
+
+    # 不替换当前连接，作为额外控制器加入设备组
+    def _join_btn_click_handle(self):
+        row = self.deviceList.currentRow()
+        if 0 <= row < len(self._devices):
+            self._bridge.addGroupDevice(self._devices[row])
+            self.stateLabel.setText(f"{self._devices[row].label()} 已加入设备组")
+
+    def _on_devices_found(self, devices: list):
+        self.scanBtn.setEnabled(True)
+        self._found = devices
+        self._refresh_list()
+        self.stateLabel.setText(f"发现 {len(devices)} 个设备")
+
+    # 连上时已知设备的缓存（MTU / 连接耗时）已更新，顺带刷新列表
+    def _on_connection_changed(self, name: str, state: str):
+        self._update_reconnect_label()
+        if state == "connected":
+            self._refresh_list()
+
+    def _on_state_changed(self, state: str):
+        dev = self._bridge.device()
+        name = dev.name or dev.address if dev is not None else ""
+        self.stateLabel.setText(f"{name} {state}".strip())
+
+    def _on_error(self, msg: str):
+        self.scanBtn.setEnabled(True)
+        self.stateLabel.setText(msg)
@@ -1,14 +1,402 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from qfluentwidgets import TitleLabel, BodyLabel
+import json
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PySide6.QtCore import Qt
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, IconWidget, TableWidget,
+    ComboBox, PrimaryPushButton, PushButton, SpinBox, SwitchButton, FluentIcon, InfoBar
+)
+
+from ui.link_bridge import LinkBridge
+
+LAYOUT_KINDS = [("", "直线（默认）"), ("strip", "灯带"), ("ring", "环形"), ("matrix", "蛇形矩阵")]
+
 
 class DevicePage(QWidget):
-    def __init__(self):
+    # 设备组总览：每台控制器的连接状态、灯区、队列深度与排队延迟，以及遥测（速率 / 往返 / 界面延迟）
+    COLUMNS = ["设备", "状态", "灯区", "队列", "延迟", "帧率", "吞吐", "往返 p50", "界面→写出 p99",
+               "丢弃", "错误", "压缩比"]
+
+    def __init__(self, bridge: LinkBridge):
         super().__init__()
         self.setObjectName("pageDevice")
 
+        self._bridge = bridge
+        self._rows: list[str] = []
+        self._snapshot: dict = {}
+
         v = QVBoxLayout(self)
         v.setContentsMargins(24, 24, 24, 24)
         v.setSpacing(12)
         v.addWidget(TitleLabel("设备信息"))
-        v.addWidget(BodyLabel("占位"))
-        v.addStretch(1)
+
+        v.addWidget(self._build_group_card())
+        v.addWidget(self._build_span_card())
+        v.addWidget(self._build_layout_card())
+        v.addWidget(self._build_telemetry_card())
+
+        self.table = TableWidget(self)
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+        v.addWidget(self.table, 1)
+
+        self._bridge.groupChanged.connect(self._rebuild_rows)
+        self._bridge.telemetryUpdated.connect(self._on_telemetry_handle)
+        self._rebuild_rows()
+
+    ## 设备组卡
+    def _build_group_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.DEVELOPER_TOOLS)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("设备组"))
+        self.summaryLabel = CaptionLabel("")
+        self.summaryLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.summaryLabel)
+
+        self.deltaSwitch = SwitchButton()
+        self.deltaSwitch.setOnText("增量帧")
+        self.deltaSwitch.setOffText("整帧")
+        self.deltaSwitch.setChecked(self._bridge.group.delta_enabled())
+        self.deltaSwitch.checkedChanged.connect(self._on_delta_switch_handle)
+
+        self.syncBtn = PrimaryPushButton(FluentIcon.SYNC, "同步启动")
+        self.removeBtn = PushButton(FluentIcon.DELETE, "移出设备组")
+        self.syncBtn.clicked.connect(self._sync_btn_click_handle)
+        self.removeBtn.clicked.connect(self._remove_btn_click_handle)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.deltaSwitch, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.syncBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.removeBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 灯区卡：选中设备在整体场景中的切片
+    def _build_span_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("灯区"))
+        desc = CaptionLabel("数量为 0 时镜像整帧")
+        desc.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(desc)
+
+        self.spanStartSpin = SpinBox()
+        self.spanStartSpin.setRange(0, 65535)
+        self.spanCountSpin = SpinBox()
+        self.spanCountSpin.setRange(0, 2000)
+
+        self.spanBtn = PushButton(FluentIcon.ACCEPT, "应用")
+        self.spanBtn.clicked.connect(self._span_btn_click_handle)
+
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(BodyLabel("起始"), 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.spanStartSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(BodyLabel("数量"), 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.spanCountSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.spanBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 布局卡：整个场景的灯珠空间排布，GIF / 动态页按它采样
+    def _build_layout_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("布局"))
+        self.layoutLabel = CaptionLabel("")
+        self.layoutLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.layoutLabel)
+
+        self.layoutCombo = ComboBox()
+        for key, text in LAYOUT_KINDS:
+            self.layoutCombo.addItem(text, userData=key)
+        self.layoutCombo.currentIndexChanged.connect(self._on_layout_kind_changed)
+
+        self.layoutCountSpin = SpinBox()
+        self.layoutCountSpin.setRange(1, 2000)
+        self.layoutCountSpin.setValue(60)
+        self.layoutRowsSpin = SpinBox()
+        self.layoutRowsSpin.setRange(1, 256)
+        self.layoutRowsSpin.setValue(16)
+
+        self.layoutBtn = PushButton(FluentIcon.ACCEPT, "应用")
+        self.importLayoutBtn = PushButton(FluentIcon.FOLDER, "导入")
+        self.exportLayoutBtn = PushButton(FluentIcon.SAVE, "导出")
+        self.layoutBtn.clicked.connect(self._layout_btn_click_handle)
+        self.importLayoutBtn.clicked.connect(self._import_layout_btn_click_handle)
+        self.exportLayoutBtn.clicked.connect(self._export_layout_btn_click_handle)
+
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.layoutCombo, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.layoutCountSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(BodyLabel("×"), 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.layoutRowsSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.layoutBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.importLayoutBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.exportLayoutBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        self._show_layout(self._bridge.layout())
+        return card
+
+    ## 遥测卡：界面侧合并 / 延迟概况与导出
+    def _build_telemetry_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.SPEED_HIGH)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("遥测"))
+        self.telemetryLabel = CaptionLabel("")
+        self.telemetryLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.telemetryLabel)
+
+        self.jsonBtn = PushButton(FluentIcon.SAVE, "导出 JSON")
+        self.csvBtn = PushButton(FluentIcon.SAVE, "导出 CSV")
+        self.jsonBtn.clicked.connect(self._export_json_btn_click_handle)
+        self.csvBtn.clicked.connect(self._export_csv_btn_click_handle)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.jsonBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.csvBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    def _export_json_btn_click_handle(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出遥测", "telemetry.json", "JSON (*.json)")
+        if path:
+            self._export(path, self._bridge.telemetry.write_json)
+
+    def _export_csv_btn_click_handle(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出遥测", "telemetry.csv", "CSV (*.csv)")
+        if path:
+            self._export(path, self._bridge.telemetry.write_csv)
+
+    def _export(self, path: str, write):
+        try:
+            write(path)
+        except OSError as e:
+            InfoBar.error("导出失败", str(e), parent=self)
+            return
+        InfoBar.success("导出完成", path, parent=self)
+
+    def _on_layout_kind_changed(self, _index: int):
+        kind = self.layoutCombo.currentData()
+        self.layoutCountSpin.setEnabled(bool(kind))
+        self.layoutRowsSpin.setEnabled(kind == "matrix")
+
+    def _show_layout(self, layout):
+        self.layoutLabel.setText(layout.describe() if layout is not None else "整帧压成一条直线灯带")
+        kind = layout.kind if layout is not None else ""
+        index = self.layoutCombo.findData(kind)
+        self.layoutCombo.setCurrentIndex(max(0, index))
+        if kind == "matrix":
+            self.layoutCountSpin.setValue(layout.cols)
+            self.layoutRowsSpin.setValue(layout.rows)
+        elif kind in ("strip", "ring"):
+            self.layoutCountSpin.setValue(layout.count)
+        self._on_layout_kind_changed(self.layoutCombo.currentIndex())
+
+    def _layout_btn_click_handle(self):
+        from core.layout import Matrix, Ring, Strip
+
+        kind = self.layoutCombo.currentData()
+        count = self.layoutCountSpin.value()
+        if kind == "strip":
+            layout = Strip(count)
+        elif kind == "ring":
+            layout = Ring(count)
+        elif kind == "matrix":
+            layout = Matrix(count, self.layoutRowsSpin.value())
+        else:
+            layout = None
+        self._apply_layout(layout)
+
+    # 布局 JSON 与 core.layout 的 to_dict 一致，任意坐标表（points）只能导入
+    def _import_layout_btn_click_handle(self):
+        from core.layout import layout_from_dict
+
+        path, _ = QFileDialog.getOpenFileName(self, "导入布局", "", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                layout = layout_from_dict(json.load(f))
+        except (OSError, TypeError, ValueError) as e:
+            InfoBar.error("导入失败", str(e), parent=self)
+            return
+        self._apply_layout(layout)
+
+    # 灯数超过上限时帧缓冲放不下：拒绝并保留原布局
+    def _apply_layout(self, layout):
+        try:
+            self._bridge.setLayout(layout)
+        except ValueError as e:
+            InfoBar.error("布局过大", str(e), parent=self)
+            return
+        self._show_layout(layout)
+
+    def _export_layout_btn_click_handle(self):
+        layout = self._bridge.layout()
+        if layout is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出布局", "layout.json", "JSON (*.json)")
+        if path:
+            self._export(path, lambda p: _write_json(p, layout.to_dict()))
+
+    def _selected_name(self) -> str | None:
+        row = self.table.currentRow()
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    # 增量帧开关：只发送变化的灯区
+    def _on_delta_switch_handle(self, on: bool):
+        self._bridge.group.set_delta(on)
+
+    def _sync_btn_click_handle(self):
+        self._bridge.syncStart()
+
+    def _remove_btn_click_handle(self):
+        name = self._selected_name()
+        if name is not None:
+            self._bridge.removeGroupDevice(name)
+
+    def _span_btn_click_handle(self):
+        name = self._selected_name()
+        if name is None:
+            return
+        count = self.spanCountSpin.value()
+        span = (self.spanStartSpin.value(), count) if count > 0 else None
+        self._bridge.group.set_span(name, span)
+
+    def _on_selection_changed(self):
+        name = self._selected_name()
+        member = self._bridge.group.member(name) if name is not None else None
+        if member is None:
+            return
+
+        start, count = member.span or (0, 0)
+        self.spanStartSpin.setValue(start)
+        self.spanCountSpin.setValue(count)
+        self.removeBtn.setEnabled(member.owned)
+
+    # 成员变化时重建行，统计刷新只改单元格文本
+    def _rebuild_rows(self):
+        members = self._bridge.group.members()
+        names = [m.name for m in members]
+        if names != self._rows:
+            self._rows = names
+            self.table.setRowCount(len(names))
+            for r, m in enumerate(members):
+                for c in range(len(self.COLUMNS)):
+                    if self.table.item(r, c) is None:
+                        self.table.setItem(r, c, QTableWidgetItem())
+            # 新成员先用最近一次采样填表，下一次定时采样再补上它的数据；这里不额外采样，以免打乱速率计算
+            self._snapshot = self._bridge.telemetry.latest()
+        self._refresh_stats()
+
+    def _on_telemetry_handle(self, snapshot: dict):
+        self._snapshot = snapshot
+        self._refresh_stats()
+
+    # 只读最近一次遥测采样，不在这里另行采集
+    def _refresh_stats(self):
+        devices = self._snapshot.get("devices", {})
+        total_queue = 0
+        worst_lag = 0.0
+        total_bps = 0.0
+
+        for r, name in enumerate(self._rows):
+            m = self._bridge.group.member(name)
+            st = devices.get(name)
+            if m is None or st is None:
+                continue
+            total_queue += st.get("queue", 0)
+            worst_lag = max(worst_lag, st.get("lag_ms", 0.0))
+            total_bps += st.get("sent_bytes_per_s", 0.0)
+
+            span = f"{m.span[0]}–{m.span[0] + m.span[1] - 1}" if m.span else "整帧"
+            delta = st.get("delta")
+            ratio = f"{delta['ratio']:.1f}x" if delta and delta["frames"] else "-"
+            rtt = st.get("rtt_ms", {})
+            ui = st.get("ui_ms", {})
+            cells = [
+                m.label(), st.get("state", ""), span, str(st.get("queue", 0)),
+                f"{st.get('lag_ms', 0.0):.1f} ms", f"{st.get('frames_per_s', 0.0):.1f}",
+                _format_rate(st.get("sent_bytes_per_s", 0.0)),
+                f"{rtt['p50']:.1f} ms" if rtt.get("count") else "-",
+                f"{ui['p99']:.1f} ms" if ui.get("count") else "-",
+                str(st.get("dropped", 0) + st.get("unsent", 0)), str(st.get("errors", 0)), ratio,
+            ]
+            for c, text in enumerate(cells):
+                item = self.table.item(r, c)
+                if item is not None and item.text() != text:
+                    item.setText(text)
+
+        self.summaryLabel.setText(f"{len(self._rows)} 台设备 · 总队列 {total_queue} · 最大延迟 {worst_lag:.1f} ms"
+                                  f" · {_format_rate(total_bps)}")
+
+        static = self._snapshot.get("static")
+        ui = static.get("ui_ms", {}) if static else {}
+        parts = []
+        if static:
+            parts.append(f"界面→命令 p50 {ui.get('p50', 0.0):.1f} / p99 {ui.get('p99', 0.0):.1f} ms")
+            parts.append(f"合并 {static.get('coalesced', 0)} / 提交 {static.get('submitted', 0)}")
+        parts.append(f"采样 {self._bridge.telemetry.sample_us:.0f} µs")
+        self.telemetryLabel.setText(" · ".join(parts))
+
+    # 主窗口关闭时调用
+    def shutdown(self):
+        self._bridge.telemetryUpdated.disconnect(self._on_telemetry_handle)
+
+
+def _write_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _format_rate(bps: float) -> str:
+    if bps >= 1024 * 1024:
+        return f"{bps / 1024 / 1024:.1f} MB/s"
+    if bps >= 1024:
+        return f"{bps / 1024:.1f} KB/s"
+    return f"{bps:.0f} B/s"
@@ -1,14 +1,352 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from qfluentwidgets import TitleLabel, BodyLabel
+import numpy as np
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from PySide6.QtCore import Qt, QTimer
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, IconWidget,
+    ComboBox, SpinBox, DoubleSpinBox, PrimaryPushButton, PushButton, SwitchButton, FluentIcon,
+    InfoBar, InfoBarPosition
+)
+
+from core.group import DeviceGroup
+from core.link import DeviceLink
+
 
 class DynamicPage(QWidget):
-    def __init__(self):
+    def __init__(self, link: DeviceLink | DeviceGroup | None = None):
         super().__init__()
         self.setObjectName("pageDynamic")
 
+        self._link = link
+        self._scheduler = None
+        self._audio = None
+        self._layout = None
+        self._gather = None         # 布局的 line_map，直线灯带（恒等映射）时为 None
+        self._session = None        # 程序模式：灯效编译后上传给控制器执行，见 core.program
+        self._programRunning = False
+
         v = QVBoxLayout(self)
         v.setContentsMargins(24, 24, 24, 24)
         v.setSpacing(12)
         v.addWidget(TitleLabel("动态模式"))
-        v.addWidget(BodyLabel("占位"))
+
+        v.addWidget(self._build_effect_card())
+        v.addWidget(self._build_audio_card())
+        v.addWidget(self._build_play_card())
+
+        self.statsLabel = CaptionLabel("")
+        self.statsLabel.setTextColor("#606060", "#d2d2d2")
+        v.addWidget(self.statsLabel)
         v.addStretch(1)
+
+        self._statsTimer = QTimer(self)
+        self._statsTimer.setInterval(500)
+        self._statsTimer.timeout.connect(self._refresh_stats)
+
+    ## 效果选择卡
+    def _build_effect_card(self) -> CardWidget:
+        from core.effects import EFFECTS
+
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.MOVIE)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("灯效"))
+        desc = CaptionLabel("切换立即生效")
+        desc.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(desc)
+
+        self.effectCombo = ComboBox()
+        for name, cls in EFFECTS.items():
+            self.effectCombo.addItem(cls.title or name, userData=name)
+        self.effectCombo.addItem("音频律动", userData="audio")
+        self.effectCombo.setMinimumWidth(140)
+        self.effectCombo.currentIndexChanged.connect(self._on_effect_changed)
+
+        self.speedSpin = DoubleSpinBox()
+        self.speedSpin.setRange(0.1, 10.0)
+        self.speedSpin.setSingleStep(0.1)
+        self.speedSpin.setValue(1.0)
+        self.speedSpin.valueChanged.connect(self._on_speed_changed)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.effectCombo, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(BodyLabel("速度"), 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.speedSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 音频输入卡：音频律动的音源，WAV 文件或实时采集
+    def _build_audio_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.MUSIC)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("音频输入"))
+        self.audioLabel = CaptionLabel("未选择音源")
+        self.audioLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.audioLabel)
+
+        self.wavBtn = PushButton(FluentIcon.FOLDER, "WAV 文件")
+        self.liveBtn = PushButton(FluentIcon.MICROPHONE, "实时采集")
+        self.wavBtn.clicked.connect(self._wav_btn_click_handle)
+        self.liveBtn.clicked.connect(self._live_btn_click_handle)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.wavBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.liveBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 播放卡
+    def _build_play_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        lay.addWidget(BodyLabel("灯珠数"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.ledSpin = SpinBox()
+        self.ledSpin.setRange(1, 2000)
+        self.ledSpin.setValue(60)
+        lay.addWidget(self.ledSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        self.layoutLabel = CaptionLabel("")
+        self.layoutLabel.setTextColor("#606060", "#d2d2d2")
+        lay.addWidget(self.layoutLabel, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addWidget(BodyLabel("帧率"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.fpsSpin = SpinBox()
+        self.fpsSpin.setRange(1, 240)
+        self.fpsSpin.setValue(60)
+        lay.addWidget(self.fpsSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        self.programSwitch = SwitchButton()
+        self.programSwitch.setOnText("上传程序")
+        self.programSwitch.setOffText("逐帧推流")
+        self.programSwitch.checkedChanged.connect(self._on_program_switch_handle)
+        lay.addWidget(self.programSwitch, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addStretch(1)
+
+        self.startBtn = PrimaryPushButton(FluentIcon.PLAY, "开始")
+        self.stopBtn = PushButton(FluentIcon.PAUSE, "停止")
+        self.startBtn.clicked.connect(self._start_btn_click_handle)
+        self.stopBtn.clicked.connect(self._stop_btn_click_handle)
+
+        lay.addWidget(self.startBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.stopBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    def _create_current_effect(self):
+        from core.effects import create_effect
+
+        if self.effectCombo.currentData() == "audio":
+            from core.audio import AudioReactive
+
+            return AudioReactive(self.ledSpin.value(), speed=self.speedSpin.value(), source=self._audio)
+        return create_effect(self.effectCombo.currentData(), self.ledSpin.value(),
+                             speed=self.speedSpin.value())
+
+    # 场景布局：灯效仍是一维的，按布局的 line_map 把每颗灯映射到灯效上的位置（矩阵按 x 投影、环形沿圆周）
+    def setLedLayout(self, layout):
+        self._layout = layout
+        self._gather = None
+        if layout is not None:
+            self.ledSpin.setValue(layout.leds)
+            idx = layout.line_map(layout.leds)
+            if not np.array_equal(idx, np.arange(layout.leds)):
+                self._gather = idx
+        self.ledSpin.setEnabled(layout is None)
+        self.layoutLabel.setText(layout.describe() if layout is not None else "")
+        if self._scheduler is not None or self._programRunning:
+            self._on_effect_changed(0)
+
+    # 输出校正变化：程序模式下设备自己做校正，需要补发
+    def syncCorrection(self):
+        if self._programRunning:
+            self._session.sync_correction()
+
+    def _wav_btn_click_handle(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择音频", "", "WAV 音频 (*.wav)")
+        if path:
+            self.setAudioSource(path)
+
+    def _live_btn_click_handle(self):
+        self.setAudioSource("live")
+
+    # 切换音源（规格同 core.audio.open_source）；正在播放音频律动时立即换上新音源
+    def setAudioSource(self, spec: str) -> bool:
+        from core.audio import AudioError, open_source
+
+        source = open_source(spec)
+        try:
+            source.start()
+        except AudioError as e:
+            InfoBar.error("音源打开失败", str(e), duration=4000, position=InfoBarPosition.TOP, parent=self)
+            return False
+
+        old, self._audio = self._audio, source
+        if old is not None:
+            old.stop()
+        self.audioLabel.setText(f"{source.label()} · {source.samplerate} Hz")
+
+        if self.effectCombo.currentData() != "audio":
+            self.effectCombo.setCurrentIndex(self.effectCombo.findData("audio"))
+        elif self._scheduler is not None:
+            self._scheduler.set_effect(self._create_current_effect())
+        return True
+
+    # 程序模式只适用于控制器能执行的灯效：音频律动依赖主机的实时输入，空间布局的映射也只在主机侧，这两种仍逐帧推流
+    def _program_mode(self) -> bool:
+        from core.program import OPCODES
+
+        return (self.programSwitch.isChecked() and self._link is not None and self._gather is None
+                and self.effectCombo.currentData() in OPCODES)
+
+    def _on_program_switch_handle(self, _on: bool):
+        if self._scheduler is not None or self._programRunning:
+            self._start_btn_click_handle()
+
+    def _start_btn_click_handle(self):
+        from core.scheduler import FixedStepScheduler
+
+        self._stop_btn_click_handle()
+        if self._program_mode():
+            self._start_program()
+            return
+        self._scheduler = FixedStepScheduler(self.fpsSpin.value(), self._send_frame)
+        self._scheduler.set_effect(self._create_current_effect())
+        self._scheduler.start()
+        self._statsTimer.start()
+
+    # 编译当前灯效并上传，之后速度调整只发参数更新
+    def _start_program(self):
+        from core.program import ProgramError, ProgramSession, compile_effect, size_report
+
+        try:
+            blob = compile_effect(self.effectCombo.currentData(), self.ledSpin.value(), self.fpsSpin.value(),
+                                  speed=self.speedSpin.value())
+        except ProgramError as e:
+            InfoBar.error("无法编译灯效", str(e), duration=4000, position=InfoBarPosition.TOP, parent=self)
+            return
+        if self._session is None:
+            self._session = ProgramSession(self._link)
+        self._session.upload(blob)
+        self._session.start()
+        self._programRunning = True
+
+        r = size_report(blob, seconds=60.0)
+        self.statsLabel.setText(
+            f"程序模式：程序 {r['program_bytes']} B · 上传 {r['upload_bytes']} B · "
+            f"参数更新 {r['param_update_bytes']} B/次 · 逐帧推流需 {r['stream_bytes_per_s'] / 1024:.1f} KB/s"
+        )
+
+    def _stop_btn_click_handle(self):
+        if self._programRunning:
+            self._session.stop()
+            self._programRunning = False
+        if self._scheduler is not None:
+            self._refresh_stats()
+            self._scheduler.stop()
+            self._scheduler = None
+        self._statsTimer.stop()
+
+    # 推流 <-> 程序模式之间切换需要重启，同一模式内推流直接换灯效
+    def _on_effect_changed(self, _index: int):
+        if self._programRunning or (self._scheduler is not None and self._program_mode()):
+            self._start_btn_click_handle()
+        elif self._scheduler is not None:
+            self._scheduler.set_effect(self._create_current_effect())
+
+    def _on_speed_changed(self, value: float):
+        if self._programRunning:
+            self._session.set_param("speed", value)
+        elif self._scheduler is not None and self._scheduler.effect() is not None:
+            self._scheduler.effect().speed = value
+
+    # 外部（控制接口）切换灯效：同步下拉框 / 速度并启停，name 为 None 表示停止
+    def dynamic_effect_update(self, name: str | None, speed: float | None = None, *, source: str | None = None):
+        if name is None:
+            self._stop_btn_click_handle()
+            return
+
+        index = self.effectCombo.findData(name)
+        if index < 0:
+            return
+        self.effectCombo.blockSignals(True)
+        self.effectCombo.setCurrentIndex(index)
+        self.effectCombo.blockSignals(False)
+        if speed is not None:
+            self.speedSpin.blockSignals(True)
+            self.speedSpin.setValue(speed)
+            self.speedSpin.blockSignals(False)
+
+        if self._scheduler is None and not self._programRunning:
+            self._start_btn_click_handle()
+        else:
+            self._on_effect_changed(index)
+
+    # 调度线程回调：DeviceLink / DeviceGroup 线程安全
+    # 音频律动的帧带上分析开始时刻，分析到写出的耗时记入连接的 ui_ms
+    def _send_frame(self, pixels):
+        scheduler = self._scheduler
+        effect = scheduler.effect() if scheduler is not None else None
+        gather = self._gather
+        if gather is not None and len(pixels) == len(gather):
+            pixels = pixels[gather]
+        if self._link is not None:
+            self._link.send_frame(pixels, origin=getattr(effect, "origin", 0.0))
+
+    def _refresh_stats(self):
+        if self._scheduler is None:
+            return
+        stats = self._scheduler.stats()
+        sched = stats.pop("_scheduler", {})
+        lines = [f"实际帧率 {sched.get('fps', 0):.1f} / {sched.get('target_fps', 0):.0f} FPS"]
+        for name, st in stats.items():
+            lines.append(
+                f"{name}: {st['frames']} 帧 · 平均 {st['mean_ms']:.2f} ms · "
+                f"P95 {st['p95_ms']:.2f} ms · 最大 {st['max_ms']:.2f} ms · 跳帧 {st['skipped']}"
+            )
+        effect = self._scheduler.effect()
+        if effect is not None and effect.name == "audio":
+            lines.append(self._audio_stats_line(effect.stats()))
+        self.statsLabel.setText("\n".join(lines))
+
+    def _audio_stats_line(self, audio: dict) -> str:
+        send = [st.get("ui_ms", {}).get("p99", 0.0) for st in self._link.stats().values()] \
+            if isinstance(self._link, DeviceGroup) else []
+        return (
+            f"音频：窗长 {audio['window_ms']:.1f} ms · 采集→分析 P50 {audio['capture_ms']['p50']:.2f} ms · "
+            f"分析 P99 {audio['analysis_ms']['p99']:.2f} ms · 分析→写出 P99 {max(send, default=0.0):.2f} ms"
+        )
+
+    # 外部（控制接口）推流接管输出时调用
+    def stopOutput(self):
+        self._stop_btn_click_handle()
+
+    # 主窗口关闭时调用
+    def shutdown(self):
+        self._stop_btn_click_handle()
+        if self._audio is not None:
+            self._audio.stop()
+            self._audio = None
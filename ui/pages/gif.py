@@ -1,14 +1,180 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from qfluentwidgets import TitleLabel, BodyLabel
+import os
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from PySide6.QtCore import Qt, QTimer
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, IconWidget,
+    PrimaryPushButton, PushButton, SpinBox, SwitchButton, FluentIcon, InfoBar, InfoBarPosition
+)
+
+from core.asset_cache import MB
+from core.group import DeviceGroup
+from core.link import DeviceLink
+
 
 class GifPage(QWidget):
-    def __init__(self):
+    def __init__(self, link: DeviceLink | DeviceGroup | None = None, cache=None):
         super().__init__()
         self.setObjectName("pageGif")
 
+        self._link = link
+        self._cache = cache         # core.asset_cache.AssetCache，重复播放同一文件不再解码
+        self._player = None
+        self._path = ""
+        self._layout = None
+
         v = QVBoxLayout(self)
         v.setContentsMargins(24, 24, 24, 24)
         v.setSpacing(12)
-        v.addWidget(TitleLabel("GIF 模式（预留）"))
-        v.addWidget(BodyLabel("占位"))
+        v.addWidget(TitleLabel("GIF 模式"))
+
+        v.addWidget(self._build_file_card())
+        v.addWidget(self._build_play_card())
+
+        self.statsLabel = CaptionLabel("")
+        self.statsLabel.setTextColor("#606060", "#d2d2d2")
+        v.addWidget(self.statsLabel)
         v.addStretch(1)
+
+        self._statsTimer = QTimer(self)
+        self._statsTimer.setInterval(500)
+        self._statsTimer.timeout.connect(self._refresh_stats)
+
+    ## 文件卡
+    def _build_file_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        icon = IconWidget(FluentIcon.PHOTO)
+        icon.setFixedSize(20, 20)
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel("GIF 文件"))
+        self.fileLabel = CaptionLabel("未选择")
+        self.fileLabel.setTextColor("#606060", "#d2d2d2")
+        textLay.addWidget(self.fileLabel)
+
+        self.openBtn = PushButton(FluentIcon.FOLDER, "打开")
+        self.openBtn.clicked.connect(self._open_btn_click_handle)
+
+        lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        lay.addWidget(self.openBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 播放卡
+    def _build_play_card(self) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(12)
+
+        lay.addWidget(BodyLabel("灯珠数"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.ledSpin = SpinBox()
+        self.ledSpin.setRange(1, 2000)
+        self.ledSpin.setValue(60)
+        lay.addWidget(self.ledSpin, 0, Qt.AlignmentFlag.AlignVCenter)
+        self.layoutLabel = CaptionLabel("")
+        self.layoutLabel.setTextColor("#606060", "#d2d2d2")
+        lay.addWidget(self.layoutLabel, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addWidget(BodyLabel("循环"), 0, Qt.AlignmentFlag.AlignVCenter)
+        self.loopSwitch = SwitchButton()
+        self.loopSwitch.setChecked(True)
+        lay.addWidget(self.loopSwitch, 0, Qt.AlignmentFlag.AlignVCenter)
+
+        lay.addStretch(1)
+
+        self.playBtn = PrimaryPushButton(FluentIcon.PLAY, "播放")
+        self.stopBtn = PushButton(FluentIcon.PAUSE, "停止")
+        self.playBtn.clicked.connect(self._play_btn_click_handle)
+        self.stopBtn.clicked.connect(self._stop_btn_click_handle)
+
+        lay.addWidget(self.playBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.stopBtn, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    def _open_btn_click_handle(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择 GIF", "", "GIF (*.gif)")
+        if path:
+            self.setGifPath(path)
+
+    # 打不开或不是图片时提示并保留原来的文件
+    def setGifPath(self, path: str):
+        from PIL import UnidentifiedImageError
+
+        from core.gif import gif_info
+
+        try:
+            info = gif_info(path)
+        except (OSError, UnidentifiedImageError) as e:
+            InfoBar.error("无法打开 GIF", str(e), duration=4000, position=InfoBarPosition.TOP, parent=self)
+            return
+        self._path = path
+        w, h = info["size"]
+        self.fileLabel.setText(f"{os.path.basename(path)}  {w}×{h}  {info['frames']} 帧")
+
+    # 场景布局（设备页设置，经 LinkBridge.layoutChanged）；有布局时灯珠数由布局决定，正在播放的立即换上
+    def setLedLayout(self, layout):
+        self._layout = layout
+        self.ledSpin.setEnabled(layout is None)
+        self.layoutLabel.setText(layout.describe() if layout is not None else "")
+        if layout is not None:
+            self.ledSpin.setValue(layout.leds)
+        if self._player is not None and self._player.is_running():
+            self._play_btn_click_handle()
+
+    def _play_btn_click_handle(self):
+        if not self._path:
+            return
+        from core.gif import GifPlayer
+
+        self._stop_btn_click_handle()
+        self._player = GifPlayer(self._path, self.ledSpin.value(), self._send_frame,
+                                 loop=self.loopSwitch.isChecked(), layout=self._layout, cache=self._cache)
+        self._player.start()
+        self._statsTimer.start()
+
+    def _stop_btn_click_handle(self):
+        if self._player is not None:
+            self._player.stop()
+            self._refresh_stats()
+            self._player = None
+        self._statsTimer.stop()
+
+    # 播放线程回调：DeviceLink / DeviceGroup 线程安全
+    def _send_frame(self, pixels):
+        if self._link is not None:
+            self._link.send_frame(pixels)
+
+    def _refresh_stats(self):
+        if self._player is None:
+            return
+        st = self._player.stats()
+        text = (
+            f"已播放 {st['frames']} 帧 · 预读 {st['queued']} · 掉帧 {st['late']} · "
+            f"解码 {st['decode_ms_avg']:.2f} ms/帧 · 重采样 {st['resample_ms_avg']:.2f} ms/帧"
+        )
+        if self._cache is not None:
+            cs = self._cache.stats()
+            text += (f"\n{'缓存命中' if st['cached'] else '缓存未命中'} · 命中率 {cs['hit_rate'] * 100:.0f}% · "
+                     f"{cs['entries']} 个 / {cs['bytes'] / MB:.1f} MB")
+        self.statsLabel.setText(text)
+        if not self._player.is_running():
+            self._statsTimer.stop()
+
+    # 外部（控制接口）推流接管输出时调用
+    def stopOutput(self):
+        self._stop_btn_click_handle()
+
+    # 主窗口关闭时调用
+    def shutdown(self):
+        self._stop_btn_click_handle()
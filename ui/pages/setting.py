@@ -1,14 +1,161 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from qfluentwidgets import TitleLabel, BodyLabel
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+from PySide6.QtCore import Qt
+from qfluentwidgets import (
+    TitleLabel, BodyLabel, CaptionLabel, CardWidget, IconWidget,
+    DoubleSpinBox, SpinBox, Slider, PushButton, FluentIcon
+)
+
+from core.asset_cache import DEFAULT_MAX_BYTES, MB, AssetCache
+from core.store import StateStore
+from ui.link_bridge import LinkBridge
+
 
 class SettingPage(QWidget):
-    def __init__(self):
+    # 输出校准（gamma / 色温 / 亮度上限）与数据目录；校准即时生效，按设备保存
+    def __init__(self, bridge: LinkBridge, store: StateStore, cache: AssetCache | None = None):
         super().__init__()
         self.setObjectName("Setting")
 
+        self._bridge = bridge
+        self._store = store
+        self._cache = cache
+
         v = QVBoxLayout(self)
         v.setContentsMargins(24, 24, 24, 24)
         v.setSpacing(12)
-        v.addWidget(TitleLabel("设备连接"))
-        v.addWidget(BodyLabel("这里后面接扫描/连接逻辑"))
+        v.addWidget(TitleLabel("设置"))
+
+        self.targetLabel = BodyLabel("")
+        v.addWidget(self.targetLabel)
+
+        self.gammaSpin = DoubleSpinBox()
+        self.gammaSpin.setRange(0.5, 3.0)
+        self.gammaSpin.setSingleStep(0.1)
+        self.gammaSpin.setDecimals(2)
+
+        self.kelvinSpin = SpinBox()
+        self.kelvinSpin.setRange(1000, 12000)
+        self.kelvinSpin.setSingleStep(100)
+        self.kelvinSpin.setSuffix(" K")
+
+        self.limitValue = BodyLabel("")
+        self.limitValue.setMinimumWidth(44)
+        self.limitValue.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.limitSlider = Slider(Qt.Orientation.Horizontal)
+        self.limitSlider.setRange(10, 100)
+        self.limitSlider.setFixedWidth(240)
+
+        v.addWidget(self._build_card(FluentIcon.BRIGHTNESS, "Gamma", "灯珠亮度曲线校正，1.0 为不校正", self.gammaSpin))
+        v.addWidget(self._build_card(FluentIcon.PALETTE, "色温", "白点校正，6500 K 为不校正", self.kelvinSpin))
+        v.addWidget(self._build_card(FluentIcon.SPEED_HIGH, "亮度上限", "限制整体输出，降低功耗与发热",
+                                     self.limitSlider, self.limitValue))
+        v.addWidget(self._build_data_card())
+        if cache is not None:
+            v.addWidget(self._build_cache_card())
         v.addStretch(1)
+
+        self._load_calibration()
+
+        self.gammaSpin.valueChanged.connect(self._on_gamma_changed_handle)
+        self.kelvinSpin.valueChanged.connect(self._on_kelvin_changed_handle)
+        self.limitSlider.valueChanged.connect(self._on_limit_changed_handle)
+        self._bridge.stateChanged.connect(self._on_link_state_handle)
+
+    # desc 可以直接给 CaptionLabel，需要之后改文字的卡片自己持有引用
+    def _build_card(self, icon, title: str, desc: str | CaptionLabel, *widgets) -> CardWidget:
+        card = CardWidget()
+        card.setFixedHeight(73)
+
+        lay = QHBoxLayout(card)
+        lay.setContentsMargins(20, 11, 11, 11)
+        lay.setSpacing(15)
+
+        iconWidget = IconWidget(icon)
+        iconWidget.setFixedSize(20, 20)
+
+        descLabel = desc if isinstance(desc, CaptionLabel) else CaptionLabel(desc)
+        descLabel.setTextColor("#606060", "#d2d2d2")
+
+        textLay = QVBoxLayout()
+        textLay.setSpacing(0)
+        textLay.addWidget(BodyLabel(title))
+        textLay.addWidget(descLabel)
+
+        lay.addWidget(iconWidget, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addLayout(textLay)
+        lay.addStretch(1)
+        for w in widgets:
+            lay.addWidget(w, 0, Qt.AlignmentFlag.AlignVCenter)
+        return card
+
+    ## 数据目录卡：状态在后台防抖写出，这里可以立即落盘
+    def _build_data_card(self) -> CardWidget:
+        self.saveBtn = PushButton(FluentIcon.SAVE, "立即保存")
+        self.saveBtn.clicked.connect(self._save_btn_click_handle)
+        return self._build_card(FluentIcon.FOLDER, "数据目录", self._store.root, self.saveBtn)
+
+    ## 动画缓存卡：GIF 转换结果的磁盘缓存，超过上限按最近使用淘汰
+    def _build_cache_card(self) -> CardWidget:
+        self.cacheSpin = SpinBox()
+        self.cacheSpin.setRange(16, 65536)
+        self.cacheSpin.setSingleStep(64)
+        self.cacheSpin.setSuffix(" MB")
+        # 输入过程中的中间值（如把 512 改成 2048 时的 2、20）不能触发淘汰
+        self.cacheSpin.setKeyboardTracking(False)
+        self.cacheSpin.setValue(self._store.get("settings", "asset_cache_mb", DEFAULT_MAX_BYTES // MB))
+        self._cache.max_bytes = self.cacheSpin.value() * MB
+        self.cacheSpin.valueChanged.connect(self._on_cache_limit_changed_handle)
+
+        self.clearCacheBtn = PushButton(FluentIcon.DELETE, "清空")
+        self.clearCacheBtn.clicked.connect(self._clear_cache_btn_click_handle)
+
+        self.cacheLabel = CaptionLabel()
+        card = self._build_card(FluentIcon.HISTORY, "动画缓存", self.cacheLabel, self.cacheSpin, self.clearCacheBtn)
+        self._refresh_cache_label()
+        return card
+
+    def _refresh_cache_label(self):
+        count, size = self._cache.usage()
+        self.cacheLabel.setText(f"{count} 个动画 · {size / MB:.1f} MB")
+
+    def _on_cache_limit_changed_handle(self, value: int):
+        self._store.set("settings", "asset_cache_mb", value)
+        self._cache.set_max_bytes(value * MB)
+        self._refresh_cache_label()
+
+    def _clear_cache_btn_click_handle(self):
+        self._cache.clear()
+        self._refresh_cache_label()
+
+    # 当前校准对象（已连接设备或默认）的值回填到控件，不触发保存
+    def _load_calibration(self):
+        values = self._bridge.calibration()
+        key = self._bridge.calibrationKey()
+        self.targetLabel.setText("默认校准（未连接设备）" if key == "default" else f"设备校准：{key}")
+
+        for w in (self.gammaSpin, self.kelvinSpin, self.limitSlider):
+            w.blockSignals(True)
+        self.gammaSpin.setValue(values["gamma"])
+        self.kelvinSpin.setValue(values["kelvin"])
+        self.limitSlider.setValue(values["brightness"])
+        for w in (self.gammaSpin, self.kelvinSpin, self.limitSlider):
+            w.blockSignals(False)
+        self.limitValue.setText(f"{values['brightness']}%")
+
+    def _on_gamma_changed_handle(self, value: float):
+        self._bridge.setCalibration(gamma=round(value, 2))
+
+    def _on_kelvin_changed_handle(self, value: int):
+        self._bridge.setCalibration(kelvin=value)
+
+    def _on_limit_changed_handle(self, value: int):
+        self.limitValue.setText(f"{value}%")
+        self._bridge.setCalibration(brightness=value)
+
+    # 连上 / 断开后切换到对应设备的校准
+    def _on_link_state_handle(self, state: str):
+        if state in ("connecting", "closed"):
+            self._load_calibration()
+
+    def _save_btn_click_handle(self):
+        self._store.flush()
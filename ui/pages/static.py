@@ -1,5 +1,7 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFrame, QApplication, QGridLayout
-from PySide6.QtCore import Qt
+import time
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QApplication
+from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtGui import QColor, QFont
 from qfluentwidgets import (
     TitleLabel, BodyLabel, CaptionLabel, IconWidget,
@@ -7,35 +9,140 @@ from qfluentwidgets import (
     TransparentToolButton, FluentIcon, HeaderCardWidget
 )
 
+from core.color import hex_to_hs, hs_to_rgb8, to_hex
+from core.dispatch import CommandCoalescer
+from core.store import StateStore
+from core.telemetry import Histogram
+from ui.widgets.color_swatch import ColorSwatch
 from ui.widgets.color_wheel import ColorWheel
-from ui.widgets.preset_color import PresetColorTile
+from ui.widgets.frame_updater import FrameUpdater
+from ui.widgets.palette_view import PaletteView
 
 
 class StaticPage(QWidget):
-    def __init__(self):
+    # 合并后的下发命令：key 为 "hs" / "brightness" / "power"，最后一项为触发它的界面事件时刻（0 表示无）
+    commandReady = Signal(str, object, float)
+
+    MAX_FAVORITES = 20
+
+    def __init__(self, max_send_rate_hz: float = 30.0, store: StateStore | None = None):
         super().__init__()
         self.setObjectName("pageStatic")
 
-        self._build_root()
+        # 构建期间的初始化刷新不写回 store
+        self._store = None
+        self._favorites: list[str] = []
 
-        self.static_color_update(33, 255, source="external")
-        self.static_brightness_update(80, source="external")
+        # 卡片上的文字 / 色块 / 控件位置：每个显示刷新周期最多应用一次
+        self._view = FrameUpdater(self)
+
+        self._build_dispatcher(max_send_rate_hz)
+        self._build_root()
+        self._restore_state(store)
+        self._view.flush()
+
+        self._store = store
+
+    # 恢复上次的颜色 / 亮度 / 开关；只读取本页用到的分区
+    # 只恢复控件，不发命令：连上设备时由 ConnectionManager 按 last_state 补发
+    def _restore_state(self, store: StateStore | None):
+        last = store.section("last_state") if store is not None else {}
+        self._show_color(*last.get("hs", (33, 255)))
+        self._show_brightness(last.get("brightness", 80))
+
+        if "power" in last:
+            self._update_power_card_ui(bool(last["power"]))
+
+        if store is not None:
+            self._favorites = list(store.get("favorites", "colors", []))
+            self.presetView.setColors(self._palette())
+
+    # 只改内存，store 后台防抖落盘；拖动时每帧调用也不碰磁盘
+    def _save_state(self, key: str, value):
+        if self._store is not None:
+            self._store.set("last_state", key, value)
+
+    # 命令合并调度：拖动期间只保留最新值，按频率节流
+    def _build_dispatcher(self, max_send_rate_hz: float):
+        self._dispatcher = CommandCoalescer(self._emit_command, max_send_rate_hz, on_skip=self._drop_origin)
+
+        # 每个 key 记录最早一次尚未发出的界面事件时刻，发出时记入直方图（含节流等待）；值没变不发时一并丢弃
+        self._origins: dict[str, float] = {}
+        self._dispatchHist = Histogram()
+
+        self._dispatchTimer = QTimer(self)
+        self._dispatchTimer.setSingleShot(True)
+        self._dispatchTimer.timeout.connect(self._pump_dispatcher)
+
+    def _schedule_dispatch(self, key: str, value, commit: bool):
+        if commit:
+            self._dispatcher.commit(key, value)
+        else:
+            self._dispatcher.submit(key, value)
+
+        if self._dispatcher.has_pending() and not self._dispatchTimer.isActive():
+            self._dispatchTimer.start(int(self._dispatcher.time_until_due() * 1000))
+
+    def _mark_origin(self, key: str):
+        self._origins.setdefault(key, time.monotonic())
+
+    def _drop_origin(self, key: str):
+        self._origins.pop(key, None)
+
+    def _emit_command(self, key: str, value):
+        origin = self._origins.pop(key, 0.0)
+        if origin:
+            self._dispatchHist.record(time.monotonic() - origin)
+        self.commandReady.emit(key, value, origin)
+
+    def _pump_dispatcher(self):
+        self._dispatcher.pump()
+        if self._dispatcher.has_pending():
+            self._dispatchTimer.start(int(self._dispatcher.time_until_due() * 1000))
+
+    def setMaxSendRate(self, max_rate_hz: float):
+        self._dispatcher.set_max_rate(max_rate_hz)
+
+    # 合并 / 发送统计，ui_ms 为界面事件到命令发出（进入设备队列）的耗时
+    def dispatchStats(self) -> dict:
+        out = self._dispatcher.stats()
+        out["ui_ms"] = self._dispatchHist.summary()
+        out["view"] = self._view.stats()
+        return out
 
     # 色盘预览事件回调
     def _wheel_is_Preview_handle(self, h: int, s: int):
+        self._mark_origin("hs")
         self.static_color_update(h, s, source="wheel")
 
-    # 当前颜色卡片更新（只用 HS；V 固定 255 用来显示纯色）
+    # 色盘松手提交
+    def _wheel_is_Commit_handle(self, h: int, s: int):
+        self._mark_origin("hs")
+        self.static_color_update(h, s, source="wheel", commit=True)
+
+    # 当前颜色（只用 HS；V 固定 255 用来显示纯色），不等界面刷新
+    def _current_hex(self) -> str:
+        return to_hex(hs_to_rgb8(*self._hs))
+
+    # 当前颜色卡片更新：登记到本帧统一应用
     def _update_current_color_card_ui(self, h: int, s: int):
-        color = QColor()
-        color.setHsv((h % 360), max(0, min(255, s)), 255)
+        self._view.set("color", self._apply_current_color_card, h, s)
 
-        color_hex = color.name(QColor.NameFormat.HexRgb).upper()
-        self.hexLabel.setText(color_hex)
+    def _apply_current_color_card(self, h: int, s: int):
+        rgb = hs_to_rgb8(h, s)
+        self.hexLabel.setText(to_hex(rgb))
+        self.colorSwatch.setColor(QColor(*rgb))
 
-        self.colorSwatch.setStyleSheet(
-            f"border-radius:8px; background:{color_hex}; border:1px solid rgba(0,0,0,0.08);"
-        )
+    # 外部来源改色时同步色盘选中点（不发信号）
+    def _apply_wheel(self, h: int, s: int):
+        self.wheel.blockSignals(True)
+        self.wheel.setHS(h, s, False)
+        self.wheel.blockSignals(False)
+
+    def _apply_slider(self, br_percent: int):
+        self.slider.blockSignals(True)
+        self.slider.setValue(br_percent)
+        self.slider.blockSignals(False)
 
     # 更新开关卡片，但不触发发送
     def _update_power_card_ui(self, sw: bool):
@@ -45,70 +152,121 @@ class StaticPage(QWidget):
 
     # 亮度变化预览
     def _on_change_br_preview_handle(self, v_percent: int):
+        self._mark_origin("brightness")
         self.static_brightness_update(v_percent, source="slider")
      
     # 亮度变化提交
     def _on_change_br_commit_handle(self):
-        pass
+        self._mark_origin("brightness")
+        self.static_brightness_update(self.slider.value(), source="slider", commit=True)
+
+    # 开关切换
+    def _on_power_switch_handle(self, on: bool):
+        self._mark_origin("power")
+        self.static_power_update(on, source="switch")
 
     # 当前颜色复制事件
     def _current_color_copy_btn_click_handle(self):
-        QApplication.clipboard().setText(self.hexLabel.text())
+        color_hex = self._current_hex()
+        QApplication.clipboard().setText(color_hex)
 
         Flyout.create(
             icon=InfoBarIcon.SUCCESS,
             title="复制成功",
             content=f'当前颜色 '
-                    f'<span style="background:{self.hexLabel.text()}; color:white; '
+                    f'<span style="background:{color_hex}; color:white; '
                     f'padding:1px 6px; border-radius:4px; '
-                    f'font-family:Consolas;">{self.hexLabel.text()}</span> '
+                    f'font-family:Consolas;">{color_hex}</span> '
                     f'已复制至粘贴板',
             isClosable=True,
             parent=self,
             target=self.copyBtn
         )
 
+    # 收藏当前颜色：放在主题色最前面，重复收藏则移到最前
+    def _favorite_btn_click_handle(self):
+        color_hex = self._current_hex()
+        self._favorites = [c for c in self._favorites if c != color_hex]
+        self._favorites.insert(0, color_hex)
+        del self._favorites[self.MAX_FAVORITES:]
+
+        if self._store is not None:
+            self._store.set("favorites", "colors", list(self._favorites))
+        self.presetView.setColors(self._palette())
+        self.presetView.setSelected(color_hex)
+
+    # 收藏在前，已收藏的主题色不再重复列出
+    def _palette(self) -> list[str]:
+        favorites = {c.upper() for c in self._favorites}
+        return self._favorites + [c for c in self._preset_colors if c.upper() not in favorites]
+
     # 预设颜色点击事件
     def _preset_color_btn_click_handle(self, hex_color: str):
         h, s = self._hex_to_hs(hex_color)
         if h is None:
             return
-        self.static_color_update(h, s)
+        self.static_color_update(h, s, commit=True)
 
     def _hex_to_hs(self, hex_color: str):
-        c = QColor((hex_color or "").upper())
-        if not c.isValid():
+        try:
+            return hex_to_hs(hex_color or "")
+        except ValueError:
             return (None, None)
 
-        h, s, _v, _a = c.getHsv()
-        if h < 0:
-            h = 0
-        return (h, s)
-
     # 统一更新接口
-    def static_color_update(self, h: int, s: int, *, source: str | None = None):
+    def static_color_update(self, h: int, s: int, *, source: str | None = None, commit: bool = False):
         h = int(h) % 360
         s = int(max(0, min(255, int(s))))
 
         self._hs = (h, s)
 
         self._update_current_color_card_ui(h, s)
-
-        if source != "wheel":
-            self.wheel.blockSignals(True)
-            self.wheel.setHS(h, s, False)
-            self.wheel.blockSignals(False)
+        self._schedule_dispatch("hs", (h, s), commit)
+        self._save_state("hs", [h, s])
+
+        # 色盘拖动后不再对应任何预设
+        if source == "wheel":
+            self.presetView.setSelected(None)
+
+        # 用户正在拖色盘时丢掉尚未应用的外部位置，免得把选中点拉回旧值
+        if source == "wheel":
+            self._view.discard("wheel")
+        else:
+            self._view.set("wheel", self._apply_wheel, h, s)
+
+    # 只同步界面（色卡 / 色盘 / 亮度），不发送也不写回 store
+    def _show_color(self, h: int, s: int):
+        self._hs = (int(h) % 360, int(max(0, min(255, int(s)))))
+        self._update_current_color_card_ui(*self._hs)
+        self._view.set("wheel", self._apply_wheel, *self._hs)
+
+    def _show_brightness(self, br_percent: int):
+        br_percent = int(max(0, min(100, int(br_percent))))
+        self._view.set("brightness", self.brightValue.setText, f"{br_percent}%")
+        self._view.set("slider", self._apply_slider, br_percent)
 
     # 统一亮度更新
-    def static_brightness_update(self, br_percent: int, *, source: str | None = None):
+    def static_brightness_update(self, br_percent: int, *, source: str | None = None, commit: bool = False):
         br_percent = int(max(0, min(100, int(br_percent))))
 
-        self.brightValue.setText(f"{br_percent}%")
+        self._view.set("brightness", self.brightValue.setText, f"{br_percent}%")
+        self._schedule_dispatch("brightness", br_percent, commit)
+        self._save_state("brightness", br_percent)
+
+        if source == "slider":
+            self._view.discard("slider")
+        else:
+            self._view.set("slider", self._apply_slider, br_percent)
 
-        if source != "slider":
-            self.slider.blockSignals(True)
-            self.slider.setValue(br_percent)
-            self.slider.blockSignals(False)
+    # 统一开关更新
+    def static_power_update(self, on: bool, *, source: str | None = None):
+        on = bool(on)
+
+        self._schedule_dispatch("power", on, commit=True)
+        self._save_state("power", on)
+
+        if source != "switch":
+            self._update_power_card_ui(on)
 
     # 根布局
     def _build_root(self):
@@ -142,9 +300,8 @@ class StaticPage(QWidget):
         self._build_left_panel()
         self._build_right_panel()
 
-        # 初始用 wheel 的当前位置刷新一次右侧色卡（不反写 wheel）
-        h, s = self.wheel.hs()
-        self.static_color_update(h, s, source="wheel")
+        # 初始用 wheel 的当前位置刷新一次右侧色卡
+        self._show_color(*self.wheel.hs())
 
     # 左布局
     def _build_left_panel(self):
@@ -162,6 +319,7 @@ class StaticPage(QWidget):
         self.leftLay.addWidget(self.wheel, 0, Qt.AlignmentFlag.AlignCenter)
 
         self.wheel.hsPreview.connect(self._wheel_is_Preview_handle)
+        self.wheel.hsCommit.connect(self._wheel_is_Commit_handle)
 
     # 右布局
     def _build_right_panel(self):
@@ -203,6 +361,7 @@ class StaticPage(QWidget):
         self.powerSwitch.setChecked(False)
         self.powerSwitch.setOnText("开灯")
         self.powerSwitch.setOffText("关灯")
+        self.powerSwitch.checkedChanged.connect(self._on_power_switch_handle)
 
         lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
         lay.addLayout(textLay)
@@ -233,11 +392,8 @@ class StaticPage(QWidget):
         textLay.addWidget(desc)
         textLay.setAlignment(Qt.AlignmentFlag.AlignVCenter)
 
-        self.colorSwatch = QFrame()
+        self.colorSwatch = ColorSwatch("#FF8844")
         self.colorSwatch.setFixedSize(28, 28)
-        self.colorSwatch.setStyleSheet(
-            "border-radius:8px; background:#FF8844; border:1px solid rgba(0,0,0,0.08);"
-        )
 
         self.hexLabel = BodyLabel("#FFFFFF")
 
@@ -245,11 +401,17 @@ class StaticPage(QWidget):
         self.copyBtn.setFixedSize(32, 32)
         self.copyBtn.clicked.connect(self._current_color_copy_btn_click_handle)
 
+        self.favoriteBtn = TransparentToolButton(FluentIcon.HEART)
+        self.favoriteBtn.setFixedSize(32, 32)
+        self.favoriteBtn.setToolTip("收藏到主题色")
+        self.favoriteBtn.clicked.connect(self._favorite_btn_click_handle)
+
         lay.addWidget(icon, 0, Qt.AlignmentFlag.AlignVCenter)
         lay.addLayout(textLay)
         lay.addStretch(1)
         lay.addWidget(self.colorSwatch, 0, Qt.AlignmentFlag.AlignVCenter)
         lay.addWidget(self.hexLabel, 0, Qt.AlignmentFlag.AlignVCenter)
+        lay.addWidget(self.favoriteBtn, 0, Qt.AlignmentFlag.AlignVCenter)
         lay.addWidget(self.copyBtn, 0, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
 
         return card
@@ -316,17 +478,6 @@ class StaticPage(QWidget):
         card.headerLayout.insertWidget(0, icon)
         card.headerLayout.setSpacing(8)
 
-        wrap = QWidget()
-        v = QVBoxLayout(wrap)
-        v.setContentsMargins(0, 0, 0, 0)
-        v.setSpacing(10)
-
-        gridWrap = QWidget()
-        grid = QGridLayout(gridWrap)
-        grid.setContentsMargins(0, 0, 0, 0)
-        grid.setHorizontalSpacing(10)
-        grid.setVerticalSpacing(10)
-
         self._preset_colors = [
             "#FFB900", "#FF8C00", "#F7630C", "#CA5010", "#DA3B01", "#EF6950", "#D13438", "#FF4343", "#E74856",
             "#E81123", "#EA005E", "#C30052", "#E3008C", "#BF0077", "#C239B3", "#9A0089", "#0078D4", "#0063B1",
@@ -335,19 +486,10 @@ class StaticPage(QWidget):
             "#498205", "#107C10", "#767676", "#4C4A48", "#69797E", "#4A5459", "#647C64"
         ]
 
-        self._preset_tiles = []
-        cols = 9
-
-        for i, hex_color in enumerate(self._preset_colors):
-            r, c = divmod(i, cols)
-
-            tile = PresetColorTile(hex_color, 44, gridWrap)
-            tile.clicked.connect(self._preset_color_btn_click_handle)
-
-            self._preset_tiles.append(tile)
-            grid.addWidget(tile, r, c)
+        # 单控件绘制全部色块，行数多时只绘制可见行
+        self.presetView = PaletteView(self._preset_colors, 44, 10)
+        self.presetView.clicked.connect(self._preset_color_btn_click_handle)
 
-        v.addWidget(gridWrap)
-        card.viewLayout.addWidget(wrap)
+        card.viewLayout.addWidget(self.presetView)
 
         return card
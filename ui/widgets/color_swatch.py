@@ -0,0 +1,32 @@
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QWidget
+
+
+class ColorSwatch(QWidget):
+    # 自绘色块：改颜色只重绘自身，不像改样式表那样触发整套 polish
+    def __init__(self, color: QColor | str = "#FF8844", radius: float = 8.0, parent=None):
+        super().__init__(parent)
+        self._color = QColor(color)
+        self._radius = radius
+        self._border = QColor(0, 0, 0, 20)
+
+    def color(self) -> QColor:
+        return QColor(self._color)
+
+    def setColor(self, color: QColor | str):
+        color = QColor(color)
+        if color == self._color:
+            return
+        self._color = color
+        self.update()
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        try:
+            p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            p.setPen(QPen(self._border, 1))
+            p.setBrush(self._color)
+            p.drawRoundedRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5), self._radius, self._radius)
+        finally:
+            p.end()
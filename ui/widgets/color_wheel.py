@@ -1,12 +1,60 @@
+import collections
 import math
-from PySide6.QtCore import (Qt, Signal, QPoint)
-from PySide6.QtGui import (QColor, QPainter, QImage, QPen, QConicalGradient, QRadialGradient, QBrush)
+import time
+from functools import lru_cache
+
+import numpy as np
+from PySide6.QtCore import (Qt, Signal, QPoint, QRect, QTimer)
+from PySide6.QtGui import (QColor, QPainter, QImage, QPen)
 from PySide6.QtWidgets import QWidget
 
+from core.color import HUE_LUT
+from ui.widgets.frame_updater import frame_interval_ms
+
 def _clamp(v: int, lo: int, hi: int) -> int:
     # 将数值限制在 [lo, hi] 区间
     return lo if v < lo else hi if v > hi else v
 
+
+# 精确 HSV 色盘位图：每个像素按与 _pick 相同的公式求 (h, s)，保证取到的颜色就是画出来的颜色
+# 按 (边长, DPR, V) 缓存，窗口缩放 / 跨屏移动时命中缓存不再重算
+@lru_cache(maxsize=8)
+def _wheel_image(size: int, dpr: float, value: int) -> QImage:
+    radius = max(1, (size // 2) - 2)
+    c = size // 2
+    px = max(1, round(size * dpr))
+
+    # 物理像素中心 -> 逻辑坐标
+    coords = (np.arange(px, dtype=np.float32) + 0.5) / dpr - c
+    dx = coords[None, :]
+    dy = coords[:, None]
+
+    r = np.hypot(dx, dy)
+    ang = np.degrees(np.arctan2(-dy, dx))
+    ang += np.float32(360.0) * (ang < 0)
+
+    h = ang.astype(np.int32)
+    h[h >= 360] = 0
+    s = np.floor(np.minimum(r / radius, 1.0) * 255.0) / 255.0
+    v = value / 255.0
+
+    # HSV -> RGB：整数色相查表得到满饱和色，再按 s / v 混合
+    rgb = v - (v * s)[..., None] * (1.0 - HUE_LUT[h])
+
+    # 圆边 1px 抗锯齿，预乘 alpha
+    alpha = np.clip((radius - r) * dpr + 0.5, 0.0, 1.0)
+    rgb *= alpha[..., None]
+
+    bgra = np.empty((px, px, 4), np.uint8)
+    bgra[..., 0] = np.rint(rgb[..., 2] * 255.0)
+    bgra[..., 1] = np.rint(rgb[..., 1] * 255.0)
+    bgra[..., 2] = np.rint(rgb[..., 0] * 255.0)
+    bgra[..., 3] = np.rint(alpha * 255.0)
+
+    img = QImage(bgra.data, px, px, px * 4, QImage.Format.Format_ARGB32_Premultiplied).copy()
+    img.setDevicePixelRatio(dpr)
+    return img
+
 class ColorWheel(QWidget):
     hsPreview = Signal(int, int)
     hsCommit = Signal(int, int)
@@ -19,11 +67,32 @@ class ColorWheel(QWidget):
 
         self._h = 0
         self._s = 255
+        self._v = 255
 
         self._img: QImage | None = None
+        self._imgKey: tuple[int, float, int] | None = None
         self._center = QPoint(0, 0)
         self._radius = 1
 
+        # 连续缩放期间先拉伸旧位图，停下后再精确重算
+        self._regenTimer = QTimer(self)
+        self._regenTimer.setSingleShot(True)
+        self._regenTimer.setInterval(80)
+        self._regenTimer.timeout.connect(self._drawPalette)
+
+        # 拖动合并：每个显示刷新周期最多取色 / 重绘一次
+        self._pendingPos: QPoint | None = None
+        self._dragTimer = QTimer(self)
+        self._dragTimer.setSingleShot(True)
+        self._dragTimer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._dragTimer.timeout.connect(self._flushDrag)
+
+        # 上一次绘制的选中点区域（局部重绘用）
+        self._markerRect = QRect()
+
+        # 重绘面积统计（最近 1 秒，物理像素）
+        self._paintLog: collections.deque = collections.deque()
+
         self.setMouseTracking(True) # 鼠标跟踪
 
     # 鼠标点击事件
@@ -31,19 +100,47 @@ class ColorWheel(QWidget):
         if e.button() == Qt.MouseButton.LeftButton:
             self._pressed = True
             self._pick(e.position().toPoint(), commit=False) 
+            self._updateMarker()
 
     # 鼠标松手事件
     def mouseReleaseEvent(self, e):
+        self._dragTimer.stop()
+        self._pendingPos = None
         self._pressed = False
         self._pick(e.position().toPoint(), commit=True)
+        self._updateMarker()
 
-    # 鼠标拖动事件
+    # 鼠标拖动事件：只记录最新位置，按刷新周期处理
     def mouseMoveEvent(self, e):
         if e.buttons() & Qt.MouseButton.LeftButton:
-            self._pick(e.position().toPoint(), commit=False)
+            self._pendingPos = e.position().toPoint()
+            if not self._dragTimer.isActive():
+                self._dragTimer.start(self._frameIntervalMs())
+
+    def _flushDrag(self):
+        pos, self._pendingPos = self._pendingPos, None
+        if pos is not None:
+            self._pick(pos, commit=False)
+
+    def _frameIntervalMs(self) -> int:
+        return frame_interval_ms(self)
 
     def hs(self) -> tuple[int, int]:
         return self._h, self._s
+
+    # 色盘明度（只影响显示）
+    def setV(self, v: int):
+        v = _clamp(int(v), 0, 255)
+        if v != self._v:
+            self._v = v
+            self._drawPalette()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._updateGeometry()
+
+        if self._img is not None and self._paletteKey() != self._imgKey:
+            self._regenTimer.start()
     
     # 设置HS
     def setHS(self, h: int, s: int, commit: bool = False):
@@ -62,7 +159,7 @@ class ColorWheel(QWidget):
             self.hsCommit.emit(self._h, self._s)
 
         if changed or commit:
-            self.update()
+            self._updateMarker()
     
     # 鼠标滴管
     def _pick(self, pos: QPoint, commit:bool=False):
@@ -90,62 +187,98 @@ class ColorWheel(QWidget):
 
         self.setHS(h, s, commit)
 
-    # 渲染色盘
-    def _drawPalette(self):
+    # 选中点圆心
+    def _markerPoint(self) -> QPoint:
+        r = (self._s / 255.0) * self._radius    # 半径比
+        theta = math.radians(self._h)           # 角度转弧度 
+
+        # 极坐标 -> 平面直角坐标
+        x = int(self._center.x() + r * math.cos(theta))
+        y = int(self._center.y() - r * math.sin(theta))
+        return QPoint(x, y)
+
+    # 根据按压状态决定大小
+    def _markerRadius(self) -> int:
+        return 12 if self._pressed else 8
+
+    # 选中点包围盒：主体 + 白描边 + 右下 2px 阴影，外扩 1px 抗锯齿余量
+    def _markerBounds(self) -> QRect:
+        pt = self._markerPoint()
+        r = self._markerRadius() + 1
+        return QRect(pt.x() - r, pt.y() - r, 2 * r + 3, 2 * r + 3)
+
+    # 只重绘旧 / 新选中点区域
+    def _updateMarker(self):
+        new = self._markerBounds()
+        if not self._markerRect.isNull():
+            self.update(self._markerRect)
+        self.update(new)
+        self._markerRect = new
+
+    # 最近 1 秒重绘统计：次数与物理像素面积
+    def paintStats(self) -> dict[str, float]:
+        self._trimPaintLog(time.monotonic())
+        return {
+            "paints_per_s": len(self._paintLog),
+            "area_per_s": sum(a for _t, a in self._paintLog),
+        }
+
+    def _trimPaintLog(self, now: float):
+        log = self._paintLog
+        while log and now - log[0][0] > 1.0:
+            log.popleft()
+
+    # 中心与半径
+    def _updateGeometry(self):
         w, h = max(1, self.width()), max(1, self.height())
         size = min(w, h)
 
         self._radius = max(1, (size // 2) - 2)
         self._center = QPoint(w // 2, h // 2)
 
-        img = QImage(w, h, QImage.Format.Format_ARGB32_Premultiplied)
-        img.fill(Qt.GlobalColor.transparent)
-
-        p = QPainter(img)
-        p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-
-        conical = QConicalGradient(self._center, 0)
-
-        conical.setColorAt(0.0, QColor(255, 0, 0))
-        conical.setColorAt(1/6, QColor(255, 255, 0))
-        conical.setColorAt(2/6, QColor(0, 255, 0))
-        conical.setColorAt(3/6, QColor(0, 255, 255))
-        conical.setColorAt(4/6, QColor(0, 0, 255))
-        conical.setColorAt(5/6, QColor(255, 0, 255))
-        conical.setColorAt(1.0, QColor(255, 0, 0))
-
-        p.setBrush(QBrush(conical))
-        p.setPen(Qt.PenStyle.NoPen)
-        p.drawEllipse(self._center, self._radius, self._radius)
-
-        radial = QRadialGradient(self._center, self._radius)
+    def _paletteKey(self) -> tuple[int, float, int]:
+        size = max(1, min(self.width(), self.height()))
+        return (size, self.devicePixelRatioF(), self._v)
 
-        radial.setColorAt(0.0, QColor(255, 255, 255))
-        radial.setColorAt(1.0, QColor(255, 255, 255, 0))
-
-        p.setBrush(QBrush(radial))
-        p.drawEllipse(self._center, self._radius, self._radius)
+    # 渲染色盘（命中缓存时无需重算）
+    def _drawPalette(self):
+        self._ensurePalette()
+        self.update()
 
-        p.end()
+    def _ensurePalette(self):
+        self._regenTimer.stop()
+        self._updateGeometry()
 
-        self._img = img
-        self.update()
+        key = self._paletteKey()
+        self._img = _wheel_image(*key)
+        self._imgKey = key
 
     # 选中点画图事件
     def paintEvent(self, e):
+        now = time.monotonic()
+        dpr = self.devicePixelRatioF()
+        area = sum(r.width() * r.height() for r in e.region()) * dpr * dpr
+        self._paintLog.append((now, area))
+        self._trimPaintLog(now)
+
         p = QPainter(self)
 
         try:
             p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
 
+            key = self._paletteKey()
+            if self._img is None or (key != self._imgKey and not self._regenTimer.isActive()):
+                self._ensurePalette()
             img = self._img
-            if img is None:
-                self._drawPalette()
-                img = self._img
             if img is None :
                 return
 
-            p.drawImage(QPoint(0, 0), img)
+            size = min(self.width(), self.height())
+            target = QRect(self._center.x() - size // 2, self._center.y() - size // 2, size, size)
+            if key != self._imgKey:
+                # 缩放进行中：临时拉伸上一张位图
+                p.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+            p.drawImage(target, img)
 
             p.setPen(QPen(Qt.GlobalColor.black, 1))
             p.drawEllipse(self._center, self._radius, self._radius)
@@ -153,18 +286,9 @@ class ColorWheel(QWidget):
 
             # ---------- 画当前选中点 ----------
 
-            r = (self._s / 255.0) * self._radius    # 半径比
-            theta = math.radians(self._h)           # 角度转弧度 
-
-            # 极坐标 -> 平面直角坐标
-            x = int(self._center.x() + r * math.cos(theta))
-            y = int(self._center.y() - r * math.sin(theta))
-
-            pt = QPoint(x, y)
-
-            # 根据按压状态决定大小
-            base_r = 8
-            draw_r = 12 if self._pressed else base_r
+            pt = self._markerPoint()
+            draw_r = self._markerRadius()
+            self._markerRect = self._markerBounds()
 
             # 阴影
             p.setPen(Qt.PenStyle.NoPen)
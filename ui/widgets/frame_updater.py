@@ -0,0 +1,77 @@
+import time
+from typing import Callable
+
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtWidgets import QWidget
+
+from core.telemetry import Histogram
+
+# 界面刷新合并：同一 key 的视图更新只保留最新一次，每个显示刷新周期最多统一应用一次
+# 拖动或外部命令高频到来时，标签 / 色块 / 控件位置每帧只改一次，不随每个事件重排重绘
+
+
+# 当前屏幕刷新周期（毫秒），取不到刷新率时按 60 Hz
+def frame_interval_ms(widget: QWidget | None = None) -> int:
+    screen = (widget.screen() if widget is not None else None) or QGuiApplication.primaryScreen()
+    hz = screen.refreshRate() if screen is not None else 60.0
+    return max(1, int(1000.0 / (hz if hz > 0 else 60.0)))
+
+
+class FrameUpdater(QObject):
+
+    def __init__(self, widget: QWidget):
+        super().__init__(widget)
+        self._widget = widget
+        self._pending: dict[str, tuple[Callable, tuple]] = {}
+        self._lastFlush = 0.0
+
+        # 距上次应用已满一帧时下一轮事件循环就应用，否则等到这一帧结束
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+
+        self.requests = 0
+        self.flushes = 0
+        self.applied = 0
+        self.flushHist = Histogram()
+
+    # 登记一次视图更新：fn(*args) 推迟到本帧统一调用，同 key 的旧值直接被覆盖
+    def set(self, key: str, fn: Callable, *args):
+        self.requests += 1
+        self._pending[key] = (fn, args)
+        if not self._timer.isActive():
+            wait = self._lastFlush + frame_interval_ms(self._widget) / 1000.0 - time.monotonic()
+            self._timer.start(max(0, int(wait * 1000)))
+
+    # 丢弃尚未应用的更新（例如用户正在直接操作该控件，不能再被旧值覆盖）
+    def discard(self, key: str):
+        self._pending.pop(key, None)
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    # 立即应用全部待定更新
+    def flush(self):
+        self._timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        t0 = time.monotonic()
+        for fn, args in pending.values():
+            fn(*args)
+        self._lastFlush = t0
+        self.flushHist.record(time.monotonic() - t0)
+        self.flushes += 1
+        self.applied += len(pending)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "applied": self.applied,
+            "coalesced": self.requests - self.applied - len(self._pending),
+            "flush_ms": self.flushHist.summary(),
+        }
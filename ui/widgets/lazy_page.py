@@ -0,0 +1,44 @@
+import importlib
+from typing import Callable
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+
+
+# 按模块路径延迟导入页面类，"ui.pages.static:StaticPage"
+def page_factory(target: str, *args, **kwargs) -> Callable[[], QWidget]:
+    module, _, name = target.partition(":")
+
+    def create() -> QWidget:
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    return create
+
+
+class LazyPage(QWidget):
+    # 导航用的轻量占位：首次切换到该页时才导入模块并构造真正的页面
+    created = Signal(QWidget)
+
+    def __init__(self, objectName: str, factory: Callable[[], QWidget], parent=None):
+        super().__init__(parent)
+        self.setObjectName(objectName)
+
+        self._factory = factory
+        self._page: QWidget | None = None
+
+        self._lay = QVBoxLayout(self)
+        self._lay.setContentsMargins(0, 0, 0, 0)
+        self._lay.setSpacing(0)
+
+    def page(self) -> QWidget | None:
+        return self._page
+
+    def isCreated(self) -> bool:
+        return self._page is not None
+
+    def ensure(self) -> QWidget:
+        if self._page is None:
+            self._page = self._factory()
+            self._lay.addWidget(self._page)
+            self.created.emit(self._page)
+        return self._page
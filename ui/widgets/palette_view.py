@@ -0,0 +1,181 @@
+from PySide6.QtCore import Qt, Signal, QRect, QRectF, QSize
+from PySide6.QtGui import QColor, QPainter, QPen, QFont
+from PySide6.QtWidgets import QAbstractScrollArea, QFrame
+
+
+class PaletteView(QAbstractScrollArea):
+    # 单控件色板：一次 paintEvent 画出所有可见色块，点击按行列算术命中，只绘制可见行
+    clicked = Signal(str)
+
+    def __init__(self, colors: list[str] | None = None, tile: int = 44, gap: int = 10,
+                 maxVisibleRows: int = 6, parent=None):
+        super().__init__(parent)
+        self._tile = tile
+        self._gap = gap
+        self._maxRows = maxVisibleRows
+
+        self._hex: list[str] = []
+        self._qcolors: list[QColor] = []
+        self._index: dict[str, int] = {}
+        self._selected = -1
+
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.viewport().setAutoFillBackground(False)
+        self.setStyleSheet("background: transparent;")
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self._checkFont = QFont(self.font())
+        self._checkFont.setBold(True)
+
+        self.setColors(colors or [])
+
+    # ---------- 数据 ----------
+
+    def setColors(self, colors: list[str]):
+        self._hex = [c.upper() for c in colors]
+        self._qcolors = [QColor(c) for c in self._hex]
+        self._index = {c: i for i, c in enumerate(self._hex)}
+        self._selected = -1
+        self._updateScroll()
+        self.updateGeometry()
+        self.viewport().update()
+
+    def colors(self) -> list[str]:
+        return list(self._hex)
+
+    def count(self) -> int:
+        return len(self._hex)
+
+    # 选中指定颜色；None 或不存在时清除选中
+    def setSelected(self, hex_color: str | None):
+        idx = self._index.get(hex_color.upper(), -1) if hex_color else -1
+        if idx == self._selected:
+            return
+
+        old, self._selected = self._selected, idx
+        for i in (old, idx):
+            if i >= 0:
+                self.viewport().update(self._tileRect(i))
+
+    def selected(self) -> str | None:
+        return self._hex[self._selected] if self._selected >= 0 else None
+
+    # ---------- 几何 ----------
+
+    def _pitch(self) -> int:
+        return self._tile + self._gap
+
+    def columns(self) -> int:
+        return max(1, (self.viewport().width() + self._gap) // self._pitch())
+
+    def rows(self) -> int:
+        return -(-len(self._hex) // self.columns()) if self._hex else 0
+
+    def _contentHeight(self, rows: int) -> int:
+        return max(0, rows * self._pitch() - self._gap)
+
+    def _tileRect(self, i: int) -> QRect:
+        r, c = divmod(i, self.columns())
+        y = r * self._pitch() - self.verticalScrollBar().value()
+        return QRect(c * self._pitch(), y, self._tile, self._tile)
+
+    def indexAt(self, x: int, y: int) -> int:
+        y += self.verticalScrollBar().value()
+        if x < 0 or y < 0:
+            return -1
+
+        c, cx = divmod(x, self._pitch())
+        r, ry = divmod(y, self._pitch())
+        if cx >= self._tile or ry >= self._tile or c >= self.columns():
+            return -1
+
+        i = r * self.columns() + c
+        return i if i < len(self._hex) else -1
+
+    def sizeHint(self) -> QSize:
+        cols = max(1, min(len(self._hex), 9))
+        rows = min(-(-len(self._hex) // cols) if self._hex else 0, self._maxRows)
+        return QSize(self._contentHeight(cols) + self._gap, self._contentHeight(rows))
+
+    def minimumSizeHint(self) -> QSize:
+        return QSize(self._tile, self._tile)
+
+    def hasHeightForWidth(self) -> bool:
+        return True
+
+    def heightForWidth(self, w: int) -> int:
+        cols = max(1, (w + self._gap) // self._pitch())
+        rows = -(-len(self._hex) // cols) if self._hex else 0
+        return self._contentHeight(min(rows, self._maxRows))
+
+    def _updateScroll(self):
+        sb = self.verticalScrollBar()
+        sb.setSingleStep(self._pitch() // 2)
+        sb.setPageStep(max(1, self.viewport().height()))
+        sb.setRange(0, max(0, self._contentHeight(self.rows()) - self.viewport().height()))
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._updateScroll()
+
+    # ---------- 交互 ----------
+
+    def mousePressEvent(self, e):
+        if e.button() != Qt.MouseButton.LeftButton:
+            return super().mousePressEvent(e)
+
+        pos = e.position().toPoint()
+        i = self.indexAt(pos.x(), pos.y())
+        if i >= 0:
+            self.setSelected(self._hex[i])
+            self.clicked.emit(self._hex[i])
+
+    # ---------- 绘制 ----------
+
+    def paintEvent(self, e):
+        if not self._hex:
+            return
+
+        p = QPainter(self.viewport())
+        try:
+            p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+
+            cols = self.columns()
+            pitch = self._pitch()
+            scroll = self.verticalScrollBar().value()
+
+            # 只画与脏区相交的行
+            dirty = e.rect()
+            first = max(0, (dirty.top() + scroll) // pitch)
+            last = min(self.rows() - 1, (dirty.bottom() + scroll) // pitch)
+
+            border = QPen(QColor(0, 0, 0, 26), 1)
+            for r in range(first, last + 1):
+                y = r * pitch - scroll
+                for c in range(cols):
+                    i = r * cols + c
+                    if i >= len(self._hex):
+                        break
+
+                    rect = QRectF(c * pitch + 0.5, y + 0.5, self._tile - 1, self._tile - 1)
+                    p.setPen(border)
+                    p.setBrush(self._qcolors[i])
+                    p.drawRoundedRect(rect, 6, 6)
+
+                    if i == self._selected:
+                        self._drawCheck(p, c * pitch, y)
+        finally:
+            p.end()
+
+    # 右上角勾选角标
+    def _drawCheck(self, p: QPainter, x: int, y: int):
+        badge = QRectF(x + self._tile - 18 - 6, y + 6, 18, 18)
+        p.setPen(Qt.PenStyle.NoPen)
+        p.setBrush(QColor(0, 0, 0, 184))
+        p.drawEllipse(badge)
+
+        p.setPen(QColor(255, 255, 255))
+        p.setFont(self._checkFont)
+        p.drawText(badge, Qt.AlignmentFlag.AlignCenter, "✓")